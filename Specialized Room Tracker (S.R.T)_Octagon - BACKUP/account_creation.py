@@ -4,37 +4,29 @@
 
 
 # REQUIREMENTS
-import mysql.connector
 import bcrypt
 
 # IMPORT
 from predefined_accounts import predefined_accounts
-
-# DATABASE CONFIGURATION SETTINGS
-database_host_address = "localhost"
-database_user_login = "root"
-database_user_password = "password"
-database_port_number = "3306"
-database_name_string = "specialized_room_tracker_backup"
+import database_manager
 
 
 # FUNCTION PARA MAGKAROON RECORDS IN DATABASE
 def account_initiation():
-    database_connection = mysql.connector.connect(
-        host=database_host_address,
-        user=database_user_login,
-        password=database_user_password,
-        port=database_port_number,
-        database=database_name_string
-    )
-
-    # CHECK IF CONNECTION IS SUCCESSFUL
-    if database_connection.is_connected():
-        database_execution = database_connection.cursor()
-
+    # ONE TRANSACTION: ONE LOOKUP, ONE BATCH OF UPDATES, ONE MULTI-ROW INSERT, ONE COMMIT
+    with database_manager.transaction() as unit_of_work:
         print("-"*30)
         print("Successfully connected to database! Processsing predefined accounts...")
 
+        # FIND WHICH EMAILS ALREADY EXIST (SINGLE ROUND TRIP)
+        predefined_email_list = [persons["user_email"] for persons in predefined_accounts]
+        search_query = "SELECT email FROM users WHERE email IN (" + ", ".join(["%s"] * len(predefined_email_list)) + ")"
+        existing_records_list = unit_of_work.fetch_all(search_query, tuple(predefined_email_list))
+        existing_email_set = set(record["email"] for record in existing_records_list)
+
+        update_values_list = []
+        insert_values_list = []
+
         # LOOP THROUGH LIST DICTIONARY
         for persons in predefined_accounts:
             account_username = persons["username"]
@@ -46,31 +38,19 @@ def account_initiation():
             salt = bcrypt.gensalt()
             hashed_password = bcrypt.hashpw(account_plain_password.encode('utf-8'), salt)
 
-            search_query = "SELECT user_id FROM users WHERE email = %s"
-            search_data = (account_email,) 
-            database_execution.execute(search_query, search_data)
-            existing_record_found = database_execution.fetchone()
-
-            if existing_record_found is not None:
-                update_sql_command = "UPDATE users SET username = %s, password_hash = %s, role = %s WHERE email = %s"
-                update_values = (account_username, hashed_password, account_role, account_email)
-                database_execution.execute(update_sql_command, update_values)
+            if account_email in existing_email_set:
+                update_values_list.append((account_username, hashed_password, account_role, account_email))
             else:
-                insert_sql_command = "INSERT INTO users (username, password_hash, email, role) VALUES (%s, %s, %s, %s)"
-                insert_values = (account_username, hashed_password, account_email, account_role)
-                database_execution.execute(insert_sql_command, insert_values)
-            
-            database_connection.commit()
+                insert_values_list.append((account_username, hashed_password, account_email, account_role))
+
+        update_sql_command = "UPDATE users SET username = %s, password_hash = %s, role = %s WHERE email = %s"
+        unit_of_work.execute_many(update_sql_command, update_values_list)
+        unit_of_work.bulk_insert("users", ["username", "password_hash", "email", "role"], insert_values_list)
 
         print("-"*30)
         print("ALL ACCOUNTS PROCESSED SUCCESSFULLY.")
+        print("Updated: " + str(len(update_values_list)) + " | Inserted: " + str(len(insert_values_list)))
         print("-"*30)
-        database_execution.close()
-        database_connection.close()
-        
-
-    else:
-        print("Error: Could not reach database server.")
 
 
 # LOGGING TERMINAL (FOR DEBUGGING PURPOSES)
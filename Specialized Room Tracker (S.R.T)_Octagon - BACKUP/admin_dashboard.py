@@ -1,14 +1,43 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                               QPushButton, QTableWidget, QTableWidgetItem,
+                               QPushButton, QTableWidget, QTableWidgetItem, QTableView,
                                QHeaderView, QComboBox, QLineEdit, QMessageBox, QMenu,
-                               QDialog, QGridLayout, QDateEdit, QTimeEdit)
+                               QDialog, QGridLayout, QDateEdit, QTimeEdit, QAbstractItemView)
 from PySide6.QtCore import Qt, Signal, QTimer, QDate, QTime
 from PySide6.QtGui import QPixmap, QAction, QCursor
 import os
-import smtplib
-from email.mime.text import MIMEText
 
-import user_email_list # NOTIFICATIONS
+import notification_outbox
+from background_executor import BackgroundQueryExecutor
+from reservation_table_model import ReservationTableModel, reservation_id_role
+from reservation_filter_proxy import ReservationFilterProxyModel, search_debounce_milliseconds
+from status_badge_delegate import StatusBadgeDelegate
+from reservation_change_tracking import ReservationChangeTracker
+from change_feed_client import ChangeFeedClient
+from refresh_scheduler import RefreshScheduler
+from reservation_batch_operations import (apply_status_batch, changed_reservation_ids,
+                                          batch_outcome_unchanged, batch_outcome_missing)
+from reservation_queries import (reservation_page_size, default_date_window, build_date_window_sql,
+                                 row_in_date_window)
+
+# Columns for the admin table; updated_at feeds the delta-refresh high-water mark
+admin_requests_select_sql = """
+    SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section, 
+           r.reservation_type, r.created_at, r.start_time, 
+           r.current_status, r.activity_description, r.updated_at 
+    FROM reservations r
+    JOIN rooms rm ON r.room_id = rm.room_id
+    LEFT JOIN users u ON r.user_id = u.user_id
+"""
+
+# One reservation for the "View Details" box
+admin_reservation_detail_sql = """
+    SELECT r.reservation_id, rm.room_name, r.room_id, r.full_name, r.course_section, 
+           r.reservation_type, r.start_time, r.created_at, 
+           r.activity_description, r.current_status
+    FROM reservations r
+    JOIN rooms rm ON r.room_id = rm.room_id
+    WHERE r.reservation_id = %s
+"""
 
 class AdminDashboard(QWidget):
     logout_requested = Signal()
@@ -74,11 +103,33 @@ class AdminDashboard(QWidget):
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["Pending", "Approved", "Cancelled", "Rejected", "All"])
         self.filter_combo.setFixedWidth(150)
-        self.filter_combo.currentTextChanged.connect(lambda: self.load_requests())
+        # Status and search filter the loaded rows locally (no database round trip)
+        self.filter_combo.currentTextChanged.connect(lambda: self.apply_local_filters())
         filter_layout.addWidget(filter_label)
         filter_layout.addWidget(self.filter_combo)
         controls_layout.addLayout(filter_layout)
         
+        controls_layout.addSpacing(20)
+
+        # Date window: today through the next 30 days by default, pending requests of any age always show
+        date_layout = QHBoxLayout()
+        date_label = QLabel("Dates:")
+        date_label.setObjectName("ControlLabel")
+        window_start_date, window_end_date = default_date_window()
+        self.window_start_input = QDateEdit()
+        self.window_start_input.setCalendarPopup(True)
+        self.window_start_input.setDate(QDate(window_start_date.year, window_start_date.month, window_start_date.day))
+        self.window_start_input.dateChanged.connect(lambda: self.load_requests())
+        self.window_end_input = QDateEdit()
+        self.window_end_input.setCalendarPopup(True)
+        self.window_end_input.setDate(QDate(window_end_date.year, window_end_date.month, window_end_date.day))
+        self.window_end_input.dateChanged.connect(lambda: self.load_requests())
+        date_layout.addWidget(date_label)
+        date_layout.addWidget(self.window_start_input)
+        date_layout.addWidget(QLabel("to"))
+        date_layout.addWidget(self.window_end_input)
+        controls_layout.addLayout(date_layout)
+
         controls_layout.addSpacing(20)
         
         search_layout = QHBoxLayout()
@@ -86,7 +137,12 @@ class AdminDashboard(QWidget):
         search_label.setObjectName("ControlLabel")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter room or name")
-        self.search_input.textChanged.connect(lambda: self.load_requests())
+        # Re-filter once typing pauses, not on every keystroke
+        self.search_debounce_timer = QTimer(self)
+        self.search_debounce_timer.setSingleShot(True)
+        self.search_debounce_timer.setInterval(search_debounce_milliseconds)
+        self.search_debounce_timer.timeout.connect(self.apply_local_filters)
+        self.search_input.textChanged.connect(lambda: self.search_debounce_timer.start())
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
         controls_layout.addLayout(search_layout)
@@ -102,23 +158,31 @@ class AdminDashboard(QWidget):
         layout.addLayout(controls_layout)
 
         # 3. Table
-        self.table = QTableWidget()
-        # Added checkbox column at index 0
-        cols = ["", "ID", "Room", "Name", "Course/Section", "Type", "Date & Time", "Purpose", "Status"]
-        self.table.setColumnCount(len(cols))
-        self.table.setHorizontalHeaderLabels(cols)
+        # Model/view: rows live in the model, the view only paints what is on screen
+        # Checkbox column at index 0, checks are kept per reservation_id inside the model
+        # The model holds the date window's snapshot, the proxy hides rows outside the status/search filter
+        self.table_model = ReservationTableModel(parent=self)
+        self.filter_proxy = ReservationFilterProxyModel(parent=self)
+        self.filter_proxy.setSourceModel(self.table_model)
+        self.filter_proxy.set_filters(self.filter_combo.currentText(), self.search_input.text())
+        self.table = QTableView()
+        self.table.setModel(self.filter_proxy)
         
         # Adjust Header resizing
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(0, QHeaderView.Fixed)
         self.table.setColumnWidth(0, 40) # Small width for checkbox
-        for i in range(1, len(cols)):
+        for i in range(1, self.table_model.columnCount()):
             header.setSectionResizeMode(i, QHeaderView.Stretch)
             
         self.table.verticalHeader().setVisible(False)
         self.table.verticalHeader().setDefaultSectionSize(45) # Set row height
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSortingEnabled(True) # Enable sorting
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Status badges are painted by one delegate (no per-row widgets)
+        self.table.setItemDelegateForColumn(8, StatusBadgeDelegate(self.table))
+        self.table.setSortingEnabled(True) # Enable sorting (the model sorts itself)
+        self.table.sortByColumn(6, Qt.AscendingOrder) # Date & Time, same order as the pages
         self.table.setContextMenuPolicy(Qt.CustomContextMenu) # Enable Context Menu
         self.table.customContextMenuRequested.connect(self.open_context_menu)
 
@@ -189,20 +253,48 @@ class AdminDashboard(QWidget):
         self.refresh_btn.setProperty("class", "MaroonBtn")
         self.refresh_btn.setStyleSheet("QPushButton { background-color: #4CAF50; color: white; } QPushButton:hover { background-color: #45a049; }")
         self.refresh_btn.clicked.connect(self.load_requests)
+
+        # Non-blocking loading indicator (DB work runs on background threads)
+        self.loading_label = QLabel("")
+        self.loading_label.setObjectName("ControlLabel")
     
+        bottom_bar.addWidget(self.loading_label)
         bottom_bar.addWidget(details_btn)
         bottom_bar.addWidget(edit_btn)
         bottom_bar.addWidget(self.refresh_btn)
         
         layout.addLayout(bottom_bar)
 
-        # Auto-Refresh Timer (30 seconds)
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.load_requests)
-        self.refresh_timer.start(30000) # 30 seconds
-        self.refresh_timer.start(2000) # 2 seconds for demo
+        # Background executor: MySQL calls never run on the GUI thread
+        self.query_executor = BackgroundQueryExecutor(self)
+        self.query_executor.busy_changed.connect(self.show_loading_state)
+
+        # Refresh ticks only fetch rows changed since the last one (plus deletions)
+        self.change_tracker = ReservationChangeTracker(self.db_manager, admin_requests_select_sql)
+
+        # Rows arrive one page at a time; scrolling to the bottom asks for the next one,
+        # clicking a header reloads the first page in that column's order
+        self.table_model.fetch_more_requested.connect(self.load_next_page)
+        self.table_model.sort_changed.connect(self.load_requests)
+
+        # Auto-Refresh: 2 seconds, backing off while nothing changes, paused while hidden
+        # (intervals in refresh_scheduler.refresh_interval_settings["admin"])
+        self.refresh_scheduler = RefreshScheduler(self, "admin", self)
+        self.refresh_scheduler.refresh_due.connect(self.load_requests)
+
+        # Push refresh from change_notifier.py; polling above is the fallback when it isn't running
+        self.change_feed = ChangeFeedClient(parent=self)
+        self.change_feed.reservations_changed.connect(self.handle_reservations_changed)
+        self.change_feed.connection_changed.connect(self.handle_change_feed_connection)
+        self.change_feed.start()
+
+        # Status emails are queued with the change itself and sent by the outbox worker (retries, dead letters)
+        self.outbox_worker = None
+        if notification_outbox.run_worker_in_dashboard:
+            self.outbox_worker = notification_outbox.get_shared_worker()
         
-        self.load_requests()
+        # First load as soon as the dashboard is shown
+        self.refresh_scheduler.start()
 
     def open_add_room_dialog(self):
         if RoomDialog(self.db_manager, self.theme_handler.is_dark_mode, self).exec():
@@ -210,11 +302,33 @@ class AdminDashboard(QWidget):
             pass
 
     def toggle_select_all(self, state):
-        check_state = Qt.Checked if state == Qt.Checked or state == 2 else Qt.Unchecked
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item:
-                item.setCheckState(check_state)
+        # Only the rows the filter shows
+        self.table_model.set_all_checked(state == Qt.Checked or state == 2,
+                                         self.filter_proxy.visible_reservation_ids())
+
+    def current_reservation_id(self):
+        current_index = self.table.currentIndex()
+        if not current_index.isValid():
+            return None
+        return current_index.data(reservation_id_role)
+
+    def apply_local_filters(self):
+        self.search_debounce_timer.stop()
+        if self.filter_proxy.set_filters(self.filter_combo.currentText(), self.search_input.text()):
+            self.drop_hidden_checks()
+
+    def drop_hidden_checks(self):
+        # A checked row the filter hides must not be batch-processed (it used to leave the table)
+        had_checked_rows = len(self.table_model.checked_reservation_id_set) > 0
+        self.table_model.retain_checked(set(self.filter_proxy.visible_reservation_ids()))
+        self.reset_header_checkbox_if_cleared(had_checked_rows)
+
+    def reset_header_checkbox_if_cleared(self, had_checked_rows):
+        # Reset header checkbox once nothing is checked anymore, without triggering signal
+        if had_checked_rows and len(self.table_model.checked_reservation_id_set) == 0:
+            self.header_checkbox.blockSignals(True)
+            self.header_checkbox.setCheckState(Qt.Unchecked)
+            self.header_checkbox.blockSignals(False)
 
     def toggle_theme(self):
         self.is_dark_mode = not self.is_dark_mode
@@ -228,121 +342,115 @@ class AdminDashboard(QWidget):
         if hasattr(self.theme_handler, 'is_dark_mode'):
             self.theme_handler.is_dark_mode = self.is_dark_mode
 
-    def load_requests(self):
-        # 1. Preserve Selection (Fix for disappearing checklist)
-        # We store the IDs of the rows that are currently checked
-        previously_checked_ids_list = []
-        
-        for row_index in range(self.table.rowCount()):
-            checkbox_item = self.table.item(row_index, 0)
-            id_item = self.table.item(row_index, 1)
-            
-            if checkbox_item and checkbox_item.checkState() == Qt.Checked:
-                # Try to get text, if empty (due to previous bug), try data
-                r_id = id_item.text()
-                if not r_id:
-                    r_id = str(id_item.data(Qt.EditRole))
-                previously_checked_ids_list.append(r_id)
+    def handle_reservations_changed(self, change_message):
+        # Any reservation change can affect the admin table (deferred while the dashboard is hidden)
+        self.refresh_scheduler.request_refresh()
 
-        query = """
-            SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section, 
-                   r.reservation_type, r.created_at, r.start_time, 
-                   r.current_status, r.activity_description 
-            FROM reservations r
-            JOIN rooms rm ON r.room_id = rm.room_id
-            LEFT JOIN users u ON r.user_id = u.user_id
-            WHERE 1=1
-        """
-        params = []
-        
-        if self.filter_combo.currentText() != "All":
-            query += " AND r.current_status = %s"
-            params.append(self.filter_combo.currentText())
-            
-        search = self.search_input.text()
-        if search:
-            query += " AND (rm.room_name LIKE %s OR r.full_name LIKE %s)"
-            params.extend([f"%{search}%", f"%{search}%"])
+    def handle_change_feed_connection(self, is_connected):
+        # Only a slow safety poll while notifications arrive
+        self.refresh_scheduler.set_push_active(is_connected)
+        if is_connected:
+            # Catch up on anything that changed before we connected
+            self.refresh_scheduler.request_refresh()
 
-        requests = self.db_manager.fetch_all(query, tuple(params))
-        self.table.setRowCount(len(requests))
-        
-        # Reset header checkbox state without triggering signal
-        self.header_checkbox.blockSignals(True)
-        self.header_checkbox.setCheckState(Qt.Unchecked)
-        self.header_checkbox.blockSignals(False)
-        
-        self.table.setSortingEnabled(False) # Temporarily disable while loading
-        
-        for i, req in enumerate(requests):
-            # 0. Checkbox
-            check_item = QTableWidgetItem()
-            check_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
-            
-            # Restore check state if ID was in our list
-            current_id_str = str(req['reservation_id'])
-            if current_id_str in previously_checked_ids_list:
-                check_item.setCheckState(Qt.Checked)
-            else:
-                check_item.setCheckState(Qt.Unchecked)
-                
-            self.table.setItem(i, 0, check_item)
+    def show_loading_state(self, is_busy):
+        self.loading_label.setText("Loading..." if is_busy else "")
 
-            # 1. ID (Numeric Sorting)
-            id_item = QTableWidgetItem()
-            id_item.setText(current_id_str) # Ensure text is visible and retrievable
-            id_item.setData(Qt.EditRole, int(req['reservation_id']))
-            self.table.setItem(i, 1, id_item)
-            
-            # 2. Room
-            self.table.setItem(i, 2, QTableWidgetItem(req['room_name']))
-            # 3. Name
-            self.table.setItem(i, 3, QTableWidgetItem(req['full_name'] or "N/A"))
-            # 4. Course
-            self.table.setItem(i, 4, QTableWidgetItem(req['course_section'] or "-"))
-            # 5. Type
-            self.table.setItem(i, 5, QTableWidgetItem(req['reservation_type'] or "Academic"))
-            
-            # 6. Date Time
-            dt_str = str(req['start_time'])
-            self.table.setItem(i, 6, QTableWidgetItem(dt_str))
-            
-            # 7. Purpose
-            self.table.setItem(i, 7, QTableWidgetItem(req['activity_description'] or "N/A"))
-            
-            # 8. Status
-            status_widget = QLabel(req['current_status'])
-            status_widget.setAlignment(Qt.AlignCenter)
-            status_widget.setProperty("class", "StatusBadge")
-            
-            style = "font-weight: bold; padding: 3px;"
-            if req['current_status'] == 'Approved':
-                style += "background-color: #8BC34A; color: black;"
-            elif req['current_status'] == 'Pending':
-                style += "background-color: #FF9800; color: black;"
-            elif req['current_status'] in ['Cancelled', 'Rejected']:
-                style += "background-color: #FFCDD2; color: #D32F2F;"
-                
-            status_widget.setStyleSheet(style)
-            self.table.setCellWidget(i, 8, status_widget)
+    def show_background_error(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        self.loading_label.setText("Could not reach the database.")
+
+    def current_date_window(self):
+        # (first day, last day) in order, whichever way round the user picked them
+        first_date = self.window_start_input.date().toPython()
+        last_date = self.window_end_input.date().toPython()
+        return min(first_date, last_date), max(first_date, last_date)
 
-        self.table.setSortingEnabled(True) # Re-enable sorting after load
+    def build_filter_sql(self):
+        filter_sql = ""
+        params = []
+
+        window_start_date, window_end_date = self.current_date_window()
+        window_sql, window_params = build_date_window_sql(window_start_date, window_end_date)
+        filter_sql += window_sql
+        params.extend(window_params)
+        # Status / search are applied by self.filter_proxy, the snapshot holds every status
+        return filter_sql, params
+
+    def load_requests(self):
+        filter_sql, params = self.build_filter_sql()
+
+        # Runs on a worker thread; a newer refresh cancels this one if it is still in flight
+        sort_key_name = self.table_model.sort_key_name()
+        is_descending = self.table_model.is_sorted_descending()
+        filter_key = (self.current_date_window(), sort_key_name, is_descending)
+        if self.change_tracker.needs_full_load(filter_key):
+            # A page still loading belongs to the old filter/order
+            self.query_executor.cancel("load_next_page")
+            # Keep every row already scrolled in (never less than one page)
+            page_row_limit = max(reservation_page_size, self.table_model.rowCount())
+            if filter_key != self.change_tracker.loaded_filter_key:
+                page_row_limit = reservation_page_size
+            self.query_executor.submit("load_requests", self.change_tracker.fetch_full_result,
+                                       filter_sql, params, filter_key, sort_key_name, is_descending, page_row_limit,
+                                       on_success=self.populate_requests_table,
+                                       on_error=self.handle_load_failed)
+        else:
+            self.query_executor.submit("load_requests", self.change_tracker.fetch_changes,
+                                       self.change_tracker.row_high_water_mark,
+                                       self.change_tracker.tombstone_high_water_mark,
+                                       on_success=self.populate_requests_table,
+                                       on_error=self.handle_load_failed)
+
+    def handle_load_failed(self, error_message):
+        self.show_background_error(error_message)
+        self.table_model.cancel_fetch_more()
+        self.refresh_scheduler.report_refresh_result(False)
+
+    def load_next_page(self, after_cursor):
+        filter_sql, params = self.build_filter_sql()
+        self.query_executor.submit("load_next_page", self.change_tracker.fetch_next_page,
+                                   filter_sql, params, self.table_model.sort_key_name(),
+                                   self.table_model.is_sorted_descending(), after_cursor,
+                                   on_success=self.append_requests_page,
+                                   on_error=self.handle_page_failed)
+
+    def append_requests_page(self, page_result):
+        self.table_model.append_page(page_result["rows"], page_result["has_more"])
+
+    def handle_page_failed(self, error_message):
+        self.show_background_error(error_message)
+        # The view asks again on the next scroll
+        self.table_model.cancel_fetch_more()
+
+    def request_matches_filter(self, request_row):
+        # Same test as the SQL in load_requests, for rows that arrive through a delta refresh
+        return row_in_date_window(request_row, *self.current_date_window())
+
+    def populate_requests_table(self, fetch_result):
+        # The model diffs against what is shown: only new/removed/changed rows are touched,
+        # checked boxes stay with their reservation_id
+        had_checked_rows = len(self.table_model.checked_reservation_id_set) > 0
+        if fetch_result["is_full"]:
+            had_changes = self.table_model.set_rows(fetch_result["rows"], fetch_result["has_more"])
+        else:
+            had_changes = self.table_model.apply_delta(fetch_result["rows"], fetch_result["deleted_ids"],
+                                                       self.request_matches_filter)
+        self.change_tracker.accept_result(fetch_result)
+        self.refresh_scheduler.report_refresh_result(had_changes)
+        # A row whose status changed may have just moved out of the filter
+        if had_changes:
+            self.table_model.retain_checked(set(self.filter_proxy.visible_reservation_ids()))
+        self.reset_header_checkbox_if_cleared(had_checked_rows)
 
     def process_batch(self, new_status):
-        ids_to_update = []
-        for row in range(self.table.rowCount()):
-            item = self.table.item(row, 0)
-            if item and item.checkState() == Qt.Checked:
-                # Column 1 is ID now
-                res_id = self.table.item(row, 1).text()
-                ids_to_update.append(res_id)
+        ids_to_update = self.table_model.checked_reservation_ids()
         
         if not ids_to_update:
             # Fallback to selected row if no checkboxes are checked
-            selected_rows = sorted(list(set(index.row() for index in self.table.selectedIndexes())))
-            for row in selected_rows:
-                res_id = self.table.item(row, 1).text()
-                ids_to_update.append(res_id)
+            selected_indexes = sorted(self.table.selectionModel().selectedRows(), key=lambda index: index.row())
+            for index in selected_indexes:
+                ids_to_update.append(index.data(reservation_id_role))
         
         if not ids_to_update:
             QMessageBox.warning(self, "No Selection", "Please check boxes or select rows to process.")
@@ -355,25 +463,33 @@ class AdminDashboard(QWidget):
         if confirm != QMessageBox.Yes:
             return
 
-        cnt = 0
-        for rid in ids_to_update:
-            if new_status == "Delete":
-                query = "DELETE FROM reservations WHERE reservation_id = %s"
-                params = (rid,)
-            else:
-                query = "UPDATE reservations SET current_status = %s WHERE reservation_id = %s"
-                params = (new_status, rid)
-                
-            if self.db_manager.execute_query(query, params):
-                 cnt += 1
-                 # Send email notification if it is not a deletion
-                 if new_status != "Delete":
-                     self.send_notification_email(rid, new_status)
+        # Runs on a worker thread: one transaction, one UPDATE/DELETE ... IN (...) per chunk of ids
+        self.query_executor.submit(None, apply_status_batch, ids_to_update, new_status,
+                                   on_success=lambda outcomes: self.finish_batch(outcomes, new_status),
+                                   on_error=self.show_background_error)
+
+    def finish_batch(self, outcomes, new_status):
+        # outcomes: {reservation_id: "updated" / "deleted" / "unchanged" / "missing"}
+        processed_ids = changed_reservation_ids(outcomes)
+        cnt = len(processed_ids)
+
+        # The emails were queued in the same transaction and go out as one digest per recipient once the
+        # coalescing window closes (with the window set to 0, waking the worker sends them right away)
+        if new_status != "Delete" and processed_ids:
+            self.wake_outbox_worker()
         
         self.load_requests()
         # Reset header checkbox
         self.header_checkbox.setCheckState(Qt.Unchecked)
-        QMessageBox.information(self, "Success", f"Successfully processed {cnt} request(s).")
+
+        result_text = f"Successfully processed {cnt} request(s)."
+        unchanged_count = list(outcomes.values()).count(batch_outcome_unchanged)
+        missing_count = list(outcomes.values()).count(batch_outcome_missing)
+        if unchanged_count:
+            result_text += f"\n{unchanged_count} were already {new_status}."
+        if missing_count:
+            result_text += f"\n{missing_count} no longer exist."
+        QMessageBox.information(self, "Success", result_text)
 
     def open_context_menu(self, position):
         menu = QMenu()
@@ -405,51 +521,42 @@ class AdminDashboard(QWidget):
 
     def process_single_context(self, new_status):
         # Get selected row from context menu trigger
-        row = self.table.currentRow()
-        if row >= 0:
-            res_id = self.table.item(row, 1).text()
-            
-            if new_status == "Delete":
-                query = "DELETE FROM reservations WHERE reservation_id = %s"
-                params = (res_id,)
-            else:
-                query = "UPDATE reservations SET current_status = %s WHERE reservation_id = %s"
-                params = (new_status, res_id)
-
-            if self.db_manager.execute_query(query, params):
-                # Send email notification if it is not a deletion
-                if new_status != "Delete":
-                    self.send_notification_email(res_id, new_status)
-                self.load_requests()
+        res_id = self.current_reservation_id()
+        if res_id is not None:
+            # Same path as the batch buttons, a batch of one
+            self.query_executor.submit(None, apply_status_batch, [res_id], new_status,
+                                       on_success=lambda outcomes: self.finish_single_context(outcomes, new_status),
+                                       on_error=self.show_background_error)
+
+    def finish_single_context(self, outcomes, new_status):
+        processed_ids = changed_reservation_ids(outcomes)
+        if processed_ids:
+            # Email was queued with the change (not for deletions)
+            if new_status != "Delete":
+                self.wake_outbox_worker()
+            self.load_requests()
 
     def edit_request(self):
-        row = self.table.currentRow()
-        if row < 0:
+        rid = self.current_reservation_id()
+        if rid is None:
             QMessageBox.warning(self, "No Selection", "Please select a reservation to edit.")
             return
         
-        rid = self.table.item(row, 1).text()
         if AdminReservationEditDialog(self.db_manager, self.theme_handler.is_dark_mode, rid, self).exec():
             self.load_requests()
                 
     def view_details(self):
-        row = self.table.currentRow()
-        if row < 0:
+        rid = self.current_reservation_id()
+        if rid is None:
             QMessageBox.warning(self, "No Selection", "Please select a reservation to view details.")
             return
 
-        rid = self.table.item(row, 1).text()
-        
-        query = """
-            SELECT r.reservation_id, rm.room_name, r.room_id, r.full_name, r.course_section, 
-                   r.reservation_type, r.start_time, r.created_at, 
-                   r.activity_description, r.current_status
-            FROM reservations r
-            JOIN rooms rm ON r.room_id = rm.room_id
-            WHERE r.reservation_id = %s
-        """
-        results = self.db_manager.fetch_all(query, (rid,))
-        
+        # Fetched on a worker thread, the box opens once the row arrives
+        self.query_executor.submit("view_details", self.db_manager.fetch_all, admin_reservation_detail_sql, (rid,),
+                                   on_success=self.show_reservation_details,
+                                   on_error=self.show_background_error)
+
+    def show_reservation_details(self, results):
         if results:
             res = results[0]
             from datetime import datetime
@@ -484,55 +591,9 @@ class AdminDashboard(QWidget):
             detail_box.setStandardButtons(QMessageBox.Ok)
             detail_box.exec()
 
-    def send_notification_email(self, reservation_id_string, new_status_string):
-        ping_result_code = os.system("ping -n 1 smtp.gmail.com > nul")
-        
-        if ping_result_code != 0:
-            print("System: No internet connection. Skipping email notification.")
-            return
-
-        sql_query_string = """
-            SELECT u.email, r.full_name, rm.room_name, r.start_time 
-            FROM reservations r 
-            JOIN users u ON r.user_id = u.user_id 
-            JOIN rooms rm ON r.room_id = rm.room_id 
-            WHERE r.reservation_id = %s
-        """
-        parameters_tuple = (reservation_id_string,)
-        
-        results_list = self.db_manager.fetch_all(sql_query_string, parameters_tuple)
-        
-        if len(results_list) == 0:
-            return
-
-        data_dictionary = results_list[0]
-        student_name_string = data_dictionary['full_name']
-        room_name_string = data_dictionary['room_name']
-        start_time_string = str(data_dictionary['start_time'])
-
-        email_subject_string = "Reservation Update: " + new_status_string
-        
-        email_body_string = "Dear " + student_name_string + ",\n\n"
-        email_body_string += "Your reservation for " + room_name_string + " on " + start_time_string + " has been " + new_status_string + ".\n\n"
-        email_body_string += "Regards,\nCampus Administration"
-
-        sender_email_string = "jalmascogab002@gmail.com" # SIMULATED ADMIN EMAIL
-        sender_password_string = "amdw ocfr corr mkvj"
-
-        server_connection = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-        server_connection.login(sender_email_string, sender_password_string)
-        
-        # Loop through the list of emails from user_email_list.py
-        for recipient_email_string in user_email_list.list_of_active_user_email_addresses:
-            message_object = MIMEText(email_body_string)
-            message_object['Subject'] = email_subject_string
-            message_object['From'] = sender_email_string
-            message_object['To'] = recipient_email_string
-            
-            server_connection.send_message(message_object)
-            print("System: Email sent successfully to " + recipient_email_string)
-            
-        server_connection.quit()
+    def wake_outbox_worker(self):
+        if self.outbox_worker is not None:
+            self.outbox_worker.wake()
 
 class RoomDialog(QDialog):
     def __init__(self, db_manager, is_dark_mode, parent=None):
@@ -596,11 +657,11 @@ class RoomDialog(QDialog):
         layout.addLayout(form_layout)
         
         btn_layout = QHBoxLayout()
-        add_btn = QPushButton("Add Room")
-        add_btn.setStyleSheet("background-color: #8BC34A; color: black; font-weight: bold; padding: 10px; border-radius: 5px;")
-        add_btn.clicked.connect(self.add_room)
+        self.add_btn = QPushButton("Add Room")
+        self.add_btn.setStyleSheet("background-color: #8BC34A; color: black; font-weight: bold; padding: 10px; border-radius: 5px;")
+        self.add_btn.clicked.connect(self.add_room)
         
-        btn_layout.addWidget(add_btn)
+        btn_layout.addWidget(self.add_btn)
         layout.addLayout(btn_layout)
 
         # Room List Section
@@ -614,6 +675,8 @@ class RoomDialog(QDialog):
         self.room_table.verticalHeader().setDefaultSectionSize(45) # Set row height
         layout.addWidget(self.room_table)
         
+        # Room queries and writes run on a worker thread, like the dashboard's
+        self.query_executor = BackgroundQueryExecutor(self)
         self.load_rooms()
         
         cancel_btn = QPushButton("Close")
@@ -622,7 +685,12 @@ class RoomDialog(QDialog):
         layout.addWidget(cancel_btn)
 
     def load_rooms(self):
-        rooms = self.db_manager.fetch_all("SELECT * FROM rooms")
+        self.query_executor.submit("load_rooms", self.db_manager.fetch_all, "SELECT * FROM rooms",
+                                   cache_ttl_seconds=self.db_manager.reference_data_cache_ttl_seconds,
+                                   on_success=self.populate_rooms,
+                                   on_error=self.show_task_error)
+
+    def populate_rooms(self, rooms):
         self.room_table.setRowCount(len(rooms))
         for i, r in enumerate(rooms):
             self.room_table.setItem(i, 0, QTableWidgetItem(r['room_name']))
@@ -637,12 +705,23 @@ class RoomDialog(QDialog):
         confirm = QMessageBox.question(self, "Confirm Delete", "Are you sure? This will remove all reservations for this room.",
                                      QMessageBox.Yes | QMessageBox.No)
         if confirm == QMessageBox.Yes:
-            # First delete reservations to avoid foreign key issues
-            self.db_manager.execute_query("DELETE FROM reservations WHERE room_id = %s", (room_id,))
-            if self.db_manager.execute_query("DELETE FROM rooms WHERE room_id = %s", (room_id,)):
-                self.load_rooms()
-            else:
-                QMessageBox.critical(self, "Error", "Failed to delete room.")
+            self.query_executor.submit(None, self.delete_room_rows, room_id,
+                                       on_success=self.finish_delete_room,
+                                       on_error=self.show_task_error)
+
+    def delete_room_rows(self, room_id):
+        # Worker thread. First delete reservations to avoid foreign key issues
+        # Both deletes commit together so a failure can't leave a room with no reservations half-way
+        with self.db_manager.transaction() as unit_of_work:
+            unit_of_work.execute("DELETE FROM reservations WHERE room_id = %s", (room_id,))
+            delete_result = unit_of_work.execute("DELETE FROM rooms WHERE room_id = %s", (room_id,))
+        return delete_result["affected_rows"] > 0
+
+    def finish_delete_room(self, was_deleted):
+        if was_deleted:
+            self.load_rooms()
+        else:
+            QMessageBox.critical(self, "Error", "Failed to delete room.")
 
     def add_room(self):
         name = self.room_name.text()
@@ -659,13 +738,26 @@ class RoomDialog(QDialog):
             return
 
         query = "INSERT INTO rooms (room_name, capacity, is_active) VALUES (%s, %s, 1)"
-        if self.db_manager.execute_query(query, (name, cap)):
+        # No second click while the insert is on its way
+        self.add_btn.setEnabled(False)
+        self.query_executor.submit(None, self.db_manager.execute_query, query, (name, cap),
+                                   on_success=self.finish_add_room,
+                                   on_error=self.show_task_error)
+
+    def finish_add_room(self, was_added):
+        self.add_btn.setEnabled(True)
+        if was_added:
             self.room_name.clear()
             self.capacity.clear()
             self.load_rooms()
         else:
             QMessageBox.critical(self, "Error", "Failed to add room.")
 
+    def show_task_error(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        self.add_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", "Could not reach the database.")
+
 class AdminReservationEditDialog(QDialog):
     def __init__(self, db_manager, is_dark_mode, res_id, parent=None):
         super().__init__(parent)
@@ -719,11 +811,8 @@ class AdminReservationEditDialog(QDialog):
         form_layout.setVerticalSpacing(15)
         form_layout.setHorizontalSpacing(10)
         
-        # Fields
+        # Fields (rooms are filled in by populate_form)
         self.room_combo = QComboBox()
-        rooms = self.db_manager.fetch_all("SELECT * FROM rooms")
-        for r in rooms:
-            self.room_combo.addItem(r['room_name'], r['room_id'])
         
         self.name_input = QLineEdit()
         self.course_input = QLineEdit()
@@ -752,25 +841,48 @@ class AdminReservationEditDialog(QDialog):
         layout.addLayout(form_layout)
         
         btn_layout = QHBoxLayout()
-        save_btn = QPushButton("Save Changes")
-        save_btn.setStyleSheet("background-color: #8BC34A; color: black; font-size: 16px; border-radius: 5px; padding: 10px; font-weight: bold;")
-        save_btn.setFixedHeight(45)
-        save_btn.clicked.connect(self.save_changes)
+        self.save_btn = QPushButton("Save Changes")
+        self.save_btn.setStyleSheet("background-color: #8BC34A; color: black; font-size: 16px; border-radius: 5px; padding: 10px; font-weight: bold;")
+        self.save_btn.setFixedHeight(45)
+        self.save_btn.clicked.connect(self.save_changes)
+        # Saving before the reservation arrives would overwrite it with the empty form
+        self.save_btn.setEnabled(False)
         
         cancel_btn = QPushButton("Cancel")
         cancel_btn.setStyleSheet("background-color: #EF9A9A; color: black; font-size: 16px; border-radius: 5px; padding: 10px; font-weight: bold;")
         cancel_btn.setFixedHeight(45)
         cancel_btn.clicked.connect(self.reject)
         
-        btn_layout.addWidget(save_btn)
+        btn_layout.addWidget(self.save_btn)
         btn_layout.addWidget(cancel_btn)
         layout.addLayout(btn_layout)
 
+        # Rooms, the reservation and the save all run on a worker thread
+        self.query_executor = BackgroundQueryExecutor(self)
         self.load_data()
 
     def load_data(self):
-        results = self.db_manager.fetch_all("SELECT * FROM reservations WHERE reservation_id = %s", (self.res_id,))
+        self.query_executor.submit("load_data", self.fetch_form_data,
+                                   on_success=self.populate_form,
+                                   on_error=self.handle_load_failed)
+
+    def fetch_form_data(self):
+        # Worker thread: (rooms, [reservation row])
+        rooms = self.db_manager.fetch_all("SELECT * FROM rooms", cache_ttl_seconds=self.db_manager.reference_data_cache_ttl_seconds)
+        results = self.db_manager.fetch_all("SELECT * FROM reservations WHERE reservation_id = %s", (self.res_id,), use_cache=False)
+        return rooms, results
+
+    def handle_load_failed(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        QMessageBox.critical(self, "Error", "Could not load this reservation.")
+        self.reject()
+
+    def populate_form(self, form_data):
+        rooms, results = form_data
+        for r in rooms:
+            self.room_combo.addItem(r['room_name'], r['room_id'])
         if results:
+            self.save_btn.setEnabled(True)
             res = results[0]
             for i in range(self.room_combo.count()):
                 if self.room_combo.itemData(i) == res['room_id']:
@@ -832,8 +944,20 @@ class AdminReservationEditDialog(QDialog):
         """
         params = (rid, name, course, rtype, start_dt, end_dt, purpose, self.res_id)
         
-        if self.db_manager.execute_query(query, params):
+        self.save_btn.setEnabled(False)
+        self.query_executor.submit(None, self.db_manager.execute_query, query, params,
+                                   on_success=self.finish_save,
+                                   on_error=self.handle_save_failed)
+
+    def finish_save(self, was_updated):
+        if was_updated:
             QMessageBox.information(self, "Success", "Reservation updated successfully.")
             self.accept()
         else:
+            self.save_btn.setEnabled(True)
             QMessageBox.critical(self, "Error", "Failed to update reservation.")
+
+    def handle_save_failed(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        self.save_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", "Failed to update reservation.")
@@ -0,0 +1,137 @@
+# BACKEND CODE FOR THE ASYNCIO VERSION OF database_manager
+# FOR HEADLESS SERVICES (NOTIFICATION WORKER, BULK IMPORTERS, FUTURE JSON API)
+#
+# SAME SIGNATURES AS database_manager, BUT AS COROUTINES:
+#     rows = await async_database_manager.fetch_all("SELECT ... WHERE id = %s", (5,))
+#     ok = await async_database_manager.execute_query("UPDATE ...", (...))
+#
+# THE DRIVER ITSELF IS BLOCKING, SO EACH CALL RUNS ON A SMALL DEDICATED THREAD POOL SIZED TO THE
+# CONNECTION POOL. HUNDREDS OF COROUTINES CAN BE WAITING, BUT ONLY database_pool_size QUERIES ARE IN
+# FLIGHT AT ONCE AND EACH WORKER THREAD KEEPS ITS OWN WARM CONNECTION (POOL THREAD AFFINITY).
+# database_manager STAYS THE ONE PLACE THAT TALKS TO THE DATABASE, SO THE Qt CODE IS UNCHANGED AND
+# WHATEVER BACKEND database_manager IS CONFIGURED FOR IS WHAT THE ASYNC CALLS USE.
+
+import asyncio
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+import database_manager
+
+async_worker_thread_count = database_manager.database_pool_size
+
+async_executor_lock = threading.Lock()
+async_query_executor = None
+# ONE SEMAPHORE PER EVENT LOOP (asyncio PRIMITIVES BELONG TO THE LOOP THAT CREATED THEM)
+concurrency_gate_by_loop = weakref.WeakKeyDictionary()
+
+async_statistics_dictionary = {
+    "calls": 0,
+    "waiting": 0,
+    "in_flight": 0,
+    "maximum_waiting": 0,
+}
+
+
+def get_async_query_executor():
+    global async_query_executor
+    with async_executor_lock:
+        if async_query_executor is None:
+            async_query_executor = ThreadPoolExecutor(
+                max_workers=async_worker_thread_count,
+                thread_name_prefix="async-db"
+            )
+        return async_query_executor
+
+
+def get_concurrency_gate():
+    running_loop = asyncio.get_running_loop()
+    concurrency_gate = concurrency_gate_by_loop.get(running_loop)
+    if concurrency_gate is None:
+        concurrency_gate = asyncio.Semaphore(async_worker_thread_count)
+        concurrency_gate_by_loop[running_loop] = concurrency_gate
+    return concurrency_gate
+
+
+async def run_blocking(blocking_function, *function_arguments, **function_keyword_arguments):
+    # WAIT FOR A FREE SLOT IN asyncio LAND (CANCELLABLE, NO UNBOUNDED THREAD QUEUE), THEN HAND OFF
+    async_statistics_dictionary["calls"] += 1
+    async_statistics_dictionary["waiting"] += 1
+    if async_statistics_dictionary["waiting"] > async_statistics_dictionary["maximum_waiting"]:
+        async_statistics_dictionary["maximum_waiting"] = async_statistics_dictionary["waiting"]
+
+    concurrency_gate = get_concurrency_gate()
+    try:
+        await concurrency_gate.acquire()
+    finally:
+        async_statistics_dictionary["waiting"] -= 1
+
+    async_statistics_dictionary["in_flight"] += 1
+
+    def release_slot():
+        async_statistics_dictionary["in_flight"] -= 1
+        concurrency_gate.release()
+
+    running_loop = asyncio.get_running_loop()
+    try:
+        executor_future = get_async_query_executor().submit(
+            functools.partial(blocking_function, *function_arguments, **function_keyword_arguments))
+    except BaseException:
+        release_slot()
+        raise
+
+    def release_slot_when_done(finished_future):
+        # A CANCELLED AWAIT DOESN'T STOP A QUERY THAT ALREADY STARTED: ITS THREAD STILL HOLDS A POOLED
+        # CONNECTION, SO THE SLOT IS ONLY FREED WHEN THE BLOCKING CALL ITSELF RETURNS (OR NEVER STARTED)
+        try:
+            running_loop.call_soon_threadsafe(release_slot)
+        except RuntimeError:
+            # THE LOOP IS CLOSED, NOBODY IS WAITING ON ITS SEMAPHORE ANY MORE
+            release_slot()
+
+    executor_future.add_done_callback(release_slot_when_done)
+    return await asyncio.wrap_future(executor_future, loop=running_loop)
+
+
+# SAME API AS database_manager
+
+async def fetch_all(sql_query_string, parameters_tuple=(), use_cache=True, cache_ttl_seconds=None):
+    return await run_blocking(database_manager.fetch_all, sql_query_string, parameters_tuple,
+                              use_cache=use_cache, cache_ttl_seconds=cache_ttl_seconds)
+
+
+async def execute_query(sql_query, parameters=()):
+    return await run_blocking(database_manager.execute_query, sql_query, parameters)
+
+
+async def execute_many(sql_query, parameters_list):
+    return await run_blocking(database_manager.execute_many, sql_query, parameters_list)
+
+
+async def bulk_insert(table_name, column_name_list, row_values_list, chunk_size=None):
+    return await run_blocking(database_manager.bulk_insert, table_name, column_name_list, row_values_list, chunk_size)
+
+
+async def run_in_transaction(work_function, *work_arguments):
+    # work_function(unit_of_work, *work_arguments) RUNS ON ONE WORKER THREAD INSIDE database_manager.transaction()
+    def run_work_in_transaction():
+        with database_manager.transaction() as unit_of_work:
+            return work_function(unit_of_work, *work_arguments)
+    return await run_blocking(run_work_in_transaction)
+
+
+def get_async_statistics():
+    statistics_snapshot = dict(async_statistics_dictionary)
+    statistics_snapshot["worker_threads"] = async_worker_thread_count
+    statistics_snapshot["connection_pool"] = database_manager.get_pool_statistics()
+    return statistics_snapshot
+
+
+def shutdown(wait_for_running_queries=True):
+    global async_query_executor
+    with async_executor_lock:
+        if async_query_executor is not None:
+            async_query_executor.shutdown(wait=wait_for_running_queries)
+            async_query_executor = None
+    concurrency_gate_by_loop.clear()
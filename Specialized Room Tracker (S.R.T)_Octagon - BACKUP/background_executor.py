@@ -0,0 +1,127 @@
+# BACKEND CODE FOR RUNNING DATABASE / EMAIL WORK OFF THE GUI THREAD
+# WORK RUNS ON A QThreadPool, RESULTS COME BACK TO THE GUI THREAD THROUGH SIGNALS
+
+import traceback
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class BackgroundTaskSignals(QObject):
+    # (task, result) / (task, error message)
+    succeeded = Signal(object, object)
+    failed = Signal(object, str)
+
+
+class BackgroundTask(QRunnable):
+    def __init__(self, task_key, task_function, task_arguments, task_keyword_arguments,
+                 on_success, on_error):
+        super().__init__()
+        # WE KEEP OUR OWN REFERENCE (FOR tryTake / CANCEL), SO QT MUST NOT DELETE IT AFTER run()
+        self.setAutoDelete(False)
+        self.task_key = task_key
+        self.task_function = task_function
+        self.task_arguments = task_arguments
+        self.task_keyword_arguments = task_keyword_arguments
+        self.on_success = on_success
+        self.on_error = on_error
+        self.is_cancelled = False
+        self.signals = BackgroundTaskSignals()
+
+    def run(self):
+        # NOTHING IN HERE MAY TOUCH A WIDGET, WE ARE ON A WORKER THREAD
+        if self.is_cancelled:
+            # STILL REPORT BACK SO THE EXECUTOR STOPS COUNTING US AS PENDING
+            self.signals.failed.emit(self, "cancelled")
+            return
+        try:
+            task_result = self.task_function(*self.task_arguments, **self.task_keyword_arguments)
+        except Exception as task_error:
+            traceback.print_exc()
+            self.signals.failed.emit(self, str(task_error))
+            return
+        self.signals.succeeded.emit(self, task_result)
+
+
+class BackgroundQueryExecutor(QObject):
+    # True WHILE ANY TASK IS QUEUED OR RUNNING (FOR "Loading..." INDICATORS)
+    busy_changed = Signal(bool)
+
+    def __init__(self, parent=None, maximum_thread_count=4):
+        super().__init__(parent)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(maximum_thread_count)
+        self.pending_task_set = set()
+        # task_key -> NEWEST TASK FOR THAT KEY, OLDER ONES ARE STALE
+        self.latest_task_by_key = {}
+
+    def submit(self, task_key, task_function, *task_arguments, on_success=None, on_error=None, **task_keyword_arguments):
+        # task_key=None MEANS "NEVER STALE" (E.G. A BATCH UPDATE), ANY OTHER KEY CANCELS THE PREVIOUS TASK WITH THAT KEY
+        if task_key is not None:
+            self.cancel(task_key)
+
+        background_task = BackgroundTask(task_key, task_function, task_arguments, task_keyword_arguments,
+                                         on_success, on_error)
+        # EXECUTOR LIVES ON THE GUI THREAD, SO THESE ARE QUEUED CONNECTIONS BACK TO IT
+        background_task.signals.succeeded.connect(self.handle_task_succeeded)
+        background_task.signals.failed.connect(self.handle_task_failed)
+
+        if task_key is not None:
+            self.latest_task_by_key[task_key] = background_task
+        self.add_pending_task(background_task)
+        self.thread_pool.start(background_task)
+        return background_task
+
+    def cancel(self, task_key):
+        previous_task = self.latest_task_by_key.pop(task_key, None)
+        if previous_task is None:
+            return
+        previous_task.is_cancelled = True
+        # NOT STARTED YET -> TAKE IT OUT OF THE QUEUE. ALREADY RUNNING -> ITS RESULT WILL BE IGNORED.
+        if self.thread_pool.tryTake(previous_task):
+            self.remove_pending_task(previous_task)
+
+    def is_busy(self, task_key=None):
+        if task_key is None:
+            return len(self.pending_task_set) > 0
+        return task_key in self.latest_task_by_key
+
+    def shutdown(self, wait_milliseconds=3000):
+        for task_key in list(self.latest_task_by_key.keys()):
+            self.cancel(task_key)
+        self.thread_pool.clear()
+        self.thread_pool.waitForDone(wait_milliseconds)
+
+    @Slot(object, object)
+    def handle_task_succeeded(self, background_task, task_result):
+        is_current_task = self.finish_task(background_task)
+        if is_current_task and background_task.on_success is not None:
+            background_task.on_success(task_result)
+
+    @Slot(object, str)
+    def handle_task_failed(self, background_task, error_message):
+        is_current_task = self.finish_task(background_task)
+        if is_current_task and background_task.on_error is not None:
+            background_task.on_error(error_message)
+
+    def finish_task(self, background_task):
+        self.remove_pending_task(background_task)
+        if background_task.is_cancelled:
+            return False
+        if background_task.task_key is not None:
+            if self.latest_task_by_key.get(background_task.task_key) is not background_task:
+                return False
+            del self.latest_task_by_key[background_task.task_key]
+        return True
+
+    def add_pending_task(self, background_task):
+        was_busy = len(self.pending_task_set) > 0
+        self.pending_task_set.add(background_task)
+        if not was_busy:
+            self.busy_changed.emit(True)
+
+    def remove_pending_task(self, background_task):
+        if background_task not in self.pending_task_set:
+            return
+        self.pending_task_set.discard(background_task)
+        if len(self.pending_task_set) == 0:
+            self.busy_changed.emit(False)
@@ -0,0 +1,111 @@
+# FRONTEND CODE FOR RECEIVING CHANGE NOTIFICATIONS FROM change_notifier.py
+# WHILE CONNECTED, A DASHBOARD REFRESHES WHEN IT IS TOLD SOMETHING CHANGED (PLUS A SLOW SAFETY POLL).
+# WHEN THE NOTIFIER ISN'T RUNNING OR THE CONNECTION DROPS, connection_changed(False) TELLS THE
+# DASHBOARD TO GO BACK TO ITS NORMAL POLLING, AND WE KEEP TRYING TO RECONNECT IN THE BACKGROUND.
+
+import json
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QAbstractSocket, QTcpSocket
+
+from change_notifier import change_notifier_host_address, change_notifier_port_number, heartbeat_interval_seconds
+
+# WHILE PUSH NOTIFICATIONS WORK, POLL ONLY THIS OFTEN (CATCHES ANYTHING A MESSAGE MISSED)
+change_feed_safety_poll_interval_milliseconds = 60000
+change_feed_reconnect_interval_milliseconds = 5000
+
+
+class ChangeFeedClient(QObject):
+    # {"change_id": ..., "reservation_ids": [...], "user_ids": [...]}
+    reservations_changed = Signal(object)
+    # True = PUSH NOTIFICATIONS ACTIVE, False = FALL BACK TO POLLING
+    connection_changed = Signal(bool)
+
+    def __init__(self, host_address=None, port_number=None, parent=None):
+        super().__init__(parent)
+        self.host_address = host_address or change_notifier_host_address
+        self.port_number = port_number or change_notifier_port_number
+        self.receive_buffer = bytearray()
+        self.is_feed_connected = False
+        self.is_stopped = True
+
+        self.feed_socket = QTcpSocket(self)
+        self.feed_socket.connected.connect(self.handle_connected)
+        self.feed_socket.disconnected.connect(self.handle_disconnected)
+        self.feed_socket.readyRead.connect(self.handle_ready_read)
+        self.feed_socket.errorOccurred.connect(self.handle_socket_error)
+
+        self.reconnect_timer = QTimer(self)
+        self.reconnect_timer.setSingleShot(True)
+        self.reconnect_timer.timeout.connect(self.connect_to_notifier)
+
+        # NOTHING AT ALL (NOT EVEN A HEARTBEAT) FOR TWO HEARTBEATS = HALF-OPEN CONNECTION, DROP IT
+        self.silence_watchdog_timer = QTimer(self)
+        self.silence_watchdog_timer.setSingleShot(True)
+        self.silence_watchdog_timer.setInterval(heartbeat_interval_seconds * 2 * 1000)
+        self.silence_watchdog_timer.timeout.connect(self.feed_socket.abort)
+
+    def start(self):
+        self.is_stopped = False
+        self.connect_to_notifier()
+
+    def stop(self):
+        self.is_stopped = True
+        self.reconnect_timer.stop()
+        self.silence_watchdog_timer.stop()
+        self.feed_socket.abort()
+        self.set_connected(False)
+
+    def is_connected(self):
+        return self.is_feed_connected
+
+    def connect_to_notifier(self):
+        if self.is_stopped or self.feed_socket.state() != QAbstractSocket.UnconnectedState:
+            return
+        self.receive_buffer.clear()
+        self.feed_socket.connectToHost(self.host_address, self.port_number)
+
+    def schedule_reconnect(self):
+        if not self.is_stopped and not self.reconnect_timer.isActive():
+            self.reconnect_timer.start(change_feed_reconnect_interval_milliseconds)
+
+    def set_connected(self, is_connected):
+        if is_connected == self.is_feed_connected:
+            return
+        self.is_feed_connected = is_connected
+        self.connection_changed.emit(is_connected)
+
+    def handle_connected(self):
+        print("System: Connected to change notifier, using push refresh.")
+        self.silence_watchdog_timer.start()
+        self.set_connected(True)
+
+    def handle_disconnected(self):
+        self.silence_watchdog_timer.stop()
+        if self.is_feed_connected:
+            print("System: Change notifier connection lost, falling back to polling.")
+        self.set_connected(False)
+        self.schedule_reconnect()
+
+    def handle_socket_error(self, socket_error):
+        # CONNECTION REFUSED / HOST NOT FOUND NEVER REACH disconnected(), SO RETRY FROM HERE TOO
+        if self.feed_socket.state() == QAbstractSocket.UnconnectedState:
+            self.set_connected(False)
+            self.schedule_reconnect()
+
+    def handle_ready_read(self):
+        self.silence_watchdog_timer.start()
+        self.receive_buffer.extend(bytes(self.feed_socket.readAll()))
+        while True:
+            newline_index = self.receive_buffer.find(b"\n")
+            if newline_index < 0:
+                break
+            message_line = bytes(self.receive_buffer[:newline_index])
+            del self.receive_buffer[:newline_index + 1]
+            try:
+                message_dictionary = json.loads(message_line.decode("utf-8"))
+            except ValueError:
+                continue
+            if message_dictionary.get("heartbeat"):
+                continue
+            self.reservations_changed.emit(message_dictionary)
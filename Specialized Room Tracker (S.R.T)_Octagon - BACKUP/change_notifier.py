@@ -0,0 +1,253 @@
+# BACKEND PROCESS THAT TURNS reservation_change_log (SCHEMA VERSION 5) INTO PUSH NOTIFICATIONS
+# RUN ONE PER SITE, NEXT TO THE DATABASE OR ON ANY MACHINE THE DASHBOARDS CAN REACH:
+#     python change_notifier.py
+# (SRT_DATABASE_BACKEND=sqlite WORKS TOO, FOR A LOCAL STAND-IN WITHOUT THE CAMPUS SERVER)
+#
+# THIS PROCESS IS THE ONLY ONE POLLING THE DATABASE: ONE CHEAP "change_id > last seen" QUERY PER TICK.
+# EVERY CONNECTED DASHBOARD GETS ONE JSON LINE PER BATCH OF CHANGES:
+#     {"change_id": 1234, "reservation_ids": [5, 9], "user_ids": [3]}
+# PLUS {"heartbeat": true} WHEN NOTHING HAPPENED FOR A WHILE, SO CLIENTS CAN SPOT A DEAD CONNECTION.
+# A MESSAGE ONLY SAYS "THIS CHANGED, REFRESH". THE DATA ITSELF STILL COMES FROM THE DATABASE, SO A
+# LOST MESSAGE COSTS AT MOST ONE SAFETY POLL OF DELAY (SEE change_feed_client).
+#
+# ONCE AN HOUR IT ALSO DELETES CHANGE LOG ROWS AND reservation_tombstones OLDER THAN A DAY, SO THE
+# DASHBOARDS NEVER HAVE TO WRITE WHILE THEY REFRESH.
+
+import json
+import os
+import selectors
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import database_manager
+from reservation_change_tracking import prune_expired_tombstones
+
+# NOTIFIER CONFIG (THE DASHBOARDS READ THE SAME VALUES)
+change_notifier_host_address = os.environ.get("SRT_NOTIFIER_HOST", "127.0.0.1")
+change_notifier_port_number = int(os.environ.get("SRT_NOTIFIER_PORT", "47810"))
+change_log_poll_interval_seconds = 0.5
+change_log_batch_size = 1000
+heartbeat_interval_seconds = 15
+change_log_retention_hours = 24
+change_log_prune_interval_seconds = 3600
+# A CLIENT THAT STOPS READING GETS DROPPED INSTEAD OF GROWING OUR MEMORY
+maximum_client_backlog_bytes = 256 * 1024
+
+
+class ChangeNotifier:
+    def __init__(self, host_address=None, port_number=None, poll_interval_seconds=None):
+        self.host_address = host_address or change_notifier_host_address
+        self.port_number = port_number or change_notifier_port_number
+        self.poll_interval_seconds = poll_interval_seconds or change_log_poll_interval_seconds
+
+        self.client_selector = selectors.DefaultSelector()
+        self.listening_socket = None
+        # client socket -> bytes still waiting to be sent
+        self.client_outgoing_buffer = {}
+        self.last_change_id = 0
+        self.is_running = False
+
+        self.statistics_dictionary = {
+            "polls": 0,
+            "changes": 0,
+            "messages": 0,
+            "clients_connected": 0,
+            "clients_dropped": 0,
+            "loop_errors": 0,
+        }
+
+    # DATABASE SIDE
+
+    def read_latest_change_id(self):
+        latest_rows = database_manager.fetch_all(
+            "SELECT MAX(change_id) AS latest_change_id FROM reservation_change_log", use_cache=False)
+        if len(latest_rows) == 0 or latest_rows[0]["latest_change_id"] is None:
+            return 0
+        return int(latest_rows[0]["latest_change_id"])
+
+    def poll_change_log(self):
+        self.statistics_dictionary["polls"] += 1
+        change_row_list = database_manager.fetch_all(
+            "SELECT change_id, reservation_id, user_id FROM reservation_change_log "
+            "WHERE change_id > %s ORDER BY change_id LIMIT " + str(change_log_batch_size),
+            (self.last_change_id,), use_cache=False)
+        if len(change_row_list) == 0:
+            return None
+
+        self.last_change_id = int(change_row_list[-1]["change_id"])
+        self.statistics_dictionary["changes"] += len(change_row_list)
+        reservation_id_set = set()
+        user_id_set = set()
+        for change_row in change_row_list:
+            reservation_id_set.add(int(change_row["reservation_id"]))
+            if change_row["user_id"] is not None:
+                user_id_set.add(int(change_row["user_id"]))
+        return {
+            "change_id": self.last_change_id,
+            "reservation_ids": sorted(reservation_id_set),
+            "user_ids": sorted(user_id_set),
+        }
+
+    def prune_change_log(self):
+        prune_before_time = datetime.now() - timedelta(hours=change_log_retention_hours)
+        database_manager.execute_query("DELETE FROM reservation_change_log WHERE changed_at < %s",
+                                       (prune_before_time,))
+
+    # SOCKET SIDE
+
+    def start(self):
+        self.listening_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listening_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listening_socket.bind((self.host_address, self.port_number))
+        self.listening_socket.listen()
+        self.listening_socket.setblocking(False)
+        self.client_selector.register(self.listening_socket, selectors.EVENT_READ)
+
+        # ONLY CHANGES FROM NOW ON, DASHBOARDS LOAD THEIR OWN STARTING STATE
+        self.last_change_id = self.read_latest_change_id()
+        self.is_running = True
+        print("System: Change notifier listening on " + self.host_address + ":" + str(self.port_number)
+              + " (from change " + str(self.last_change_id) + ")")
+
+    def accept_client(self):
+        client_socket, client_address = self.listening_socket.accept()
+        client_socket.setblocking(False)
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.client_outgoing_buffer[client_socket] = bytearray()
+        self.client_selector.register(client_socket, selectors.EVENT_READ)
+        self.statistics_dictionary["clients_connected"] += 1
+        print("System: Dashboard connected from " + str(client_address))
+
+    def drop_client(self, client_socket):
+        if client_socket not in self.client_outgoing_buffer:
+            return
+        del self.client_outgoing_buffer[client_socket]
+        self.client_selector.unregister(client_socket)
+        client_socket.close()
+        self.statistics_dictionary["clients_dropped"] += 1
+
+    def read_from_client(self, client_socket):
+        # CLIENTS NEVER SEND ANYTHING, A READABLE SOCKET MEANS IT CLOSED (OR SENT JUNK WE IGNORE)
+        try:
+            received_bytes = client_socket.recv(4096)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            received_bytes = b""
+        if received_bytes == b"":
+            self.drop_client(client_socket)
+
+    def flush_client(self, client_socket):
+        outgoing_buffer = self.client_outgoing_buffer.get(client_socket)
+        if outgoing_buffer is None:
+            return
+        try:
+            sent_byte_count = client_socket.send(outgoing_buffer)
+        except (BlockingIOError, InterruptedError):
+            sent_byte_count = 0
+        except OSError:
+            self.drop_client(client_socket)
+            return
+        del outgoing_buffer[:sent_byte_count]
+
+        wanted_events = selectors.EVENT_READ
+        if len(outgoing_buffer) > 0:
+            wanted_events |= selectors.EVENT_WRITE
+        self.client_selector.modify(client_socket, wanted_events)
+
+    def broadcast(self, message_dictionary):
+        message_bytes = (json.dumps(message_dictionary) + "\n").encode("utf-8")
+        self.statistics_dictionary["messages"] += 1
+        for client_socket in list(self.client_outgoing_buffer.keys()):
+            outgoing_buffer = self.client_outgoing_buffer[client_socket]
+            if len(outgoing_buffer) + len(message_bytes) > maximum_client_backlog_bytes:
+                print("System: Dropping dashboard that stopped reading notifications.")
+                self.drop_client(client_socket)
+                continue
+            outgoing_buffer.extend(message_bytes)
+            self.flush_client(client_socket)
+
+    def serve_forever(self):
+        if not self.is_running:
+            self.start()
+
+        next_poll_time = time.monotonic()
+        last_message_time = time.monotonic()
+        next_prune_time = time.monotonic()
+
+        while self.is_running:
+            wait_seconds = max(0.0, next_poll_time - time.monotonic())
+            for selector_key, event_mask in self.client_selector.select(timeout=wait_seconds):
+                if selector_key.fileobj is self.listening_socket:
+                    self.accept_client()
+                    continue
+                if event_mask & selectors.EVENT_READ:
+                    self.read_from_client(selector_key.fileobj)
+                if event_mask & selectors.EVENT_WRITE:
+                    self.flush_client(selector_key.fileobj)
+
+            current_time = time.monotonic()
+            if current_time < next_poll_time:
+                continue
+            next_poll_time = current_time + self.poll_interval_seconds
+
+            try:
+                change_message = self.poll_change_log()
+            except Exception as poll_error:
+                self.report_loop_error("read the change log", poll_error)
+                continue
+
+            if change_message is not None:
+                self.broadcast(change_message)
+                last_message_time = current_time
+            elif current_time - last_message_time >= heartbeat_interval_seconds:
+                self.broadcast({"heartbeat": True})
+                last_message_time = current_time
+
+            # AFTER THE BROADCAST, SO A FAILED PRUNE NEVER SWALLOWS A BATCH OF CHANGES
+            if current_time >= next_prune_time:
+                next_prune_time = current_time + change_log_prune_interval_seconds
+                try:
+                    self.prune_change_log()
+                    prune_expired_tombstones(database_manager)
+                except Exception as prune_error:
+                    self.report_loop_error("prune old change records", prune_error)
+
+    def report_loop_error(self, failed_action_text, loop_error):
+        if isinstance(loop_error, database_manager.database_unavailable_error_types):
+            # KEEP SERVING, CLIENTS FALL BACK TO THEIR SAFETY POLL UNTIL THE DATABASE IS BACK
+            print("System: Change notifier could not " + failed_action_text + ": " + str(loop_error))
+            return
+        # ANYTHING ELSE IS A BUG, BUT EVERY DASHBOARD'S PUSH CHANNEL HANGS OFF THIS LOOP: LOG IT AND KEEP GOING
+        self.statistics_dictionary["loop_errors"] += 1
+        print("System: Change notifier failed to " + failed_action_text + ": "
+              + type(loop_error).__name__ + ": " + str(loop_error))
+        traceback.print_exc()
+
+    def stop(self):
+        self.is_running = False
+        for client_socket in list(self.client_outgoing_buffer.keys()):
+            self.drop_client(client_socket)
+        if self.listening_socket is not None:
+            self.client_selector.unregister(self.listening_socket)
+            self.listening_socket.close()
+            self.listening_socket = None
+
+    def get_statistics(self):
+        statistics_snapshot = dict(self.statistics_dictionary)
+        statistics_snapshot["clients"] = len(self.client_outgoing_buffer)
+        statistics_snapshot["last_change_id"] = self.last_change_id
+        return statistics_snapshot
+
+
+if __name__ == "__main__":
+    change_notifier = ChangeNotifier()
+    try:
+        change_notifier.serve_forever()
+    except KeyboardInterrupt:
+        print("System: Change notifier stopping.")
+    finally:
+        change_notifier.stop()
+        database_manager.close_pool()
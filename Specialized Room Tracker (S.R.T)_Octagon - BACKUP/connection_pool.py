@@ -0,0 +1,211 @@
+# BACKEND CODE FOR THE SHARED DATABASE CONNECTION POOL
+# KEEPS A SMALL SET OF OPEN CONNECTIONS SO WE DON'T PAY THE TCP + LOGIN HANDSHAKE ON EVERY QUERY
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, connection_factory, connection_validator,
+                 maximum_pool_size=5, checkout_timeout_seconds=10,
+                 idle_timeout_seconds=300, health_check_interval_seconds=30):
+        # connection_factory() -> NEW OPEN CONNECTION
+        # connection_validator(connection) -> True IF THE CONNECTION IS STILL USABLE
+        self.connection_factory = connection_factory
+        self.connection_validator = connection_validator
+        self.maximum_pool_size = maximum_pool_size
+        self.checkout_timeout_seconds = checkout_timeout_seconds
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+
+        self.pool_condition = threading.Condition()
+        # EACH IDLE ENTRY IS [connection, last_used_time, last_owner_thread_id]
+        self.idle_connection_list = []
+        self.open_connection_count = 0
+        self.thread_local_state = threading.local()
+
+        self.statistics_dictionary = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checkouts": 0,
+            "thread_affinity_hits": 0,
+            "reentrant_checkouts": 0,
+            "health_check_failures": 0,
+            "idle_evictions": 0,
+            "checkout_waits": 0,
+            "checkout_timeouts": 0,
+            "total_wait_seconds": 0.0,
+        }
+
+    # PUBLIC API
+
+    @contextmanager
+    def connection(self):
+        # SAME THREAD ASKING AGAIN (E.G. fetch_all INSIDE A LARGER OPERATION) GETS THE SAME CONNECTION BACK
+        held_connection = getattr(self.thread_local_state, "held_connection", None)
+        if held_connection is not None:
+            self.thread_local_state.hold_depth += 1
+            with self.pool_condition:
+                self.statistics_dictionary["reentrant_checkouts"] += 1
+            try:
+                yield held_connection
+            finally:
+                self.thread_local_state.hold_depth -= 1
+            return
+
+        checked_out_connection = self.checkout()
+        self.thread_local_state.held_connection = checked_out_connection
+        self.thread_local_state.hold_depth = 1
+        connection_is_broken = False
+        try:
+            yield checked_out_connection
+        except Exception:
+            # WE DON'T KNOW WHAT STATE THE SESSION IS IN (HALF-READ RESULT, OPEN TRANSACTION), SO DROP IT
+            connection_is_broken = True
+            raise
+        finally:
+            self.thread_local_state.held_connection = None
+            self.thread_local_state.hold_depth = 0
+            if connection_is_broken:
+                self.discard(checked_out_connection)
+            else:
+                self.checkin(checked_out_connection)
+
+    def checkout(self):
+        current_thread_id = threading.get_ident()
+        wait_started_time = time.monotonic()
+        deadline_time = wait_started_time + self.checkout_timeout_seconds
+        has_waited = False
+
+        while True:
+            reusable_entry = None
+            must_create_new_connection = False
+
+            with self.pool_condition:
+                self.evict_idle_connections_locked()
+
+                while not self.idle_connection_list and self.open_connection_count >= self.maximum_pool_size:
+                    remaining_seconds = deadline_time - time.monotonic()
+                    if remaining_seconds <= 0:
+                        self.statistics_dictionary["checkout_timeouts"] += 1
+                        raise PoolTimeoutError("No database connection became available within "
+                                               + str(self.checkout_timeout_seconds) + " seconds.")
+                    if not has_waited:
+                        has_waited = True
+                        self.statistics_dictionary["checkout_waits"] += 1
+                    self.pool_condition.wait(remaining_seconds)
+
+                if self.idle_connection_list:
+                    reusable_entry = self.take_idle_entry_locked(current_thread_id)
+                else:
+                    # RESERVE A SLOT NOW, OPEN THE SOCKET OUTSIDE THE LOCK
+                    self.open_connection_count += 1
+                    must_create_new_connection = True
+
+                self.statistics_dictionary["checkouts"] += 1
+                self.statistics_dictionary["total_wait_seconds"] += time.monotonic() - wait_started_time
+
+            if must_create_new_connection:
+                try:
+                    new_connection = self.connection_factory()
+                except Exception:
+                    with self.pool_condition:
+                        self.open_connection_count -= 1
+                        self.pool_condition.notify()
+                    raise
+                with self.pool_condition:
+                    self.statistics_dictionary["connections_created"] += 1
+                return new_connection
+
+            idle_connection, last_used_time, last_owner_thread_id = reusable_entry
+
+            # ONLY PING CONNECTIONS THAT SAT IDLE FOR A WHILE, A BUSY CONNECTION IS KNOWN GOOD
+            if time.monotonic() - last_used_time < self.health_check_interval_seconds:
+                return idle_connection
+
+            if self.is_connection_healthy(idle_connection):
+                return idle_connection
+
+            with self.pool_condition:
+                self.statistics_dictionary["health_check_failures"] += 1
+            self.discard(idle_connection)
+            # LOOP AGAIN AND TRY ANOTHER IDLE CONNECTION OR OPEN A FRESH ONE
+
+    def checkin(self, connection):
+        with self.pool_condition:
+            self.idle_connection_list.append([connection, time.monotonic(), threading.get_ident()])
+            self.pool_condition.notify()
+
+    def discard(self, connection):
+        self.close_quietly(connection)
+        with self.pool_condition:
+            self.open_connection_count -= 1
+            self.statistics_dictionary["connections_closed"] += 1
+            self.pool_condition.notify()
+
+    def evict_idle_connections(self):
+        with self.pool_condition:
+            self.evict_idle_connections_locked()
+
+    def close_all(self):
+        with self.pool_condition:
+            entries_to_close = self.idle_connection_list
+            self.idle_connection_list = []
+            self.open_connection_count -= len(entries_to_close)
+            self.statistics_dictionary["connections_closed"] += len(entries_to_close)
+            self.pool_condition.notify_all()
+        for entry in entries_to_close:
+            self.close_quietly(entry[0])
+
+    def get_statistics(self):
+        with self.pool_condition:
+            statistics_snapshot = dict(self.statistics_dictionary)
+            statistics_snapshot["maximum_pool_size"] = self.maximum_pool_size
+            statistics_snapshot["open_connections"] = self.open_connection_count
+            statistics_snapshot["idle_connections"] = len(self.idle_connection_list)
+            statistics_snapshot["in_use_connections"] = self.open_connection_count - len(self.idle_connection_list)
+        return statistics_snapshot
+
+    # INTERNAL HELPERS (CALLER MUST HOLD pool_condition FOR *_locked)
+
+    def take_idle_entry_locked(self, current_thread_id):
+        # PREFER THE CONNECTION THIS THREAD USED LAST (WARM SESSION, NO CROSS-THREAD HAND-OFF)
+        for entry_index in range(len(self.idle_connection_list) - 1, -1, -1):
+            if self.idle_connection_list[entry_index][2] == current_thread_id:
+                self.statistics_dictionary["thread_affinity_hits"] += 1
+                return self.idle_connection_list.pop(entry_index)
+        # OTHERWISE MOST RECENTLY USED FIRST SO THE OLD ONES CAN AGE OUT
+        return self.idle_connection_list.pop()
+
+    def evict_idle_connections_locked(self):
+        if self.idle_timeout_seconds is None:
+            return
+        current_time = time.monotonic()
+        kept_entry_list = []
+        for entry in self.idle_connection_list:
+            if current_time - entry[1] > self.idle_timeout_seconds:
+                self.close_quietly(entry[0])
+                self.open_connection_count -= 1
+                self.statistics_dictionary["idle_evictions"] += 1
+                self.statistics_dictionary["connections_closed"] += 1
+                self.pool_condition.notify()
+            else:
+                kept_entry_list.append(entry)
+        self.idle_connection_list = kept_entry_list
+
+    def is_connection_healthy(self, connection):
+        try:
+            return bool(self.connection_validator(connection))
+        except Exception:
+            return False
+
+    def close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
@@ -0,0 +1,216 @@
+# BACKEND CODE FOR THE PLUGGABLE DATABASE BACKENDS BEHIND database_manager
+# "mysql"  -> THE CAMPUS MYSQL SERVER (DEFAULT)
+# "sqlite" -> EMBEDDED SQLITE FILE IN WAL MODE (SINGLE-BUILDING DEPLOYMENTS, CI, BENCHMARKS)
+#
+# BOTH HAND OUT CONNECTIONS WITH THE SAME SHAPE AS mysql-connector'S:
+#     connection.cursor(dictionary=True/False, buffered=True/False), start_transaction(), commit(),
+#     rollback(), is_connected(), close()
+#     cursor.execute(sql, params) WITH %s PLACEHOLDERS, fetchall(), fetchmany(), fetchone(),
+#     description, rowcount, lastrowid, close()
+# SO THE REST OF THE APP NEVER NEEDS TO KNOW WHICH ONE IS RUNNING.
+
+import sqlite3
+import threading
+from datetime import datetime, date
+
+import mysql.connector
+
+
+class MySQLBackend:
+    name = "mysql"
+    database_error_types = (mysql.connector.Error,)
+    # SERVER GONE / UNREACHABLE, AS OPPOSED TO A BAD QUERY
+    connection_error_types = (mysql.connector.InterfaceError, mysql.connector.OperationalError)
+    # lastrowid AFTER A MULTI-ROW INSERT IS THE ID OF THE FIRST ROW
+    multi_row_insert_reports_first_id = True
+
+    def __init__(self, host_address, user_login, user_password, port_number, database_name):
+        self.host_address = host_address
+        self.user_login = user_login
+        self.user_password = user_password
+        self.port_number = port_number
+        self.database_name = database_name
+
+    def open_connection(self):
+        return mysql.connector.connect(
+            host=self.host_address,
+            user=self.user_login,
+            password=self.user_password,
+            port=self.port_number,
+            database=self.database_name,
+            # POOLED CONNECTIONS LIVE LONG, WITHOUT AUTOCOMMIT A SELECT WOULD KEEP READING AN OLD SNAPSHOT
+            autocommit=True
+        )
+
+    def is_connection_alive(self, connection_link):
+        return connection_link.is_connected()
+
+
+# SQLITE TRANSLATION HELPERS
+
+def translate_placeholders(sql_query_string):
+    # %s -> ?  AND  %% -> %  (OUTSIDE QUOTED STRINGS ONLY)
+    translated_character_list = []
+    open_quote_character = None
+    character_index = 0
+    while character_index < len(sql_query_string):
+        current_character = sql_query_string[character_index]
+        if open_quote_character is not None:
+            translated_character_list.append(current_character)
+            if current_character == open_quote_character:
+                open_quote_character = None
+        elif current_character in ("'", '"', "`"):
+            open_quote_character = current_character
+            translated_character_list.append(current_character)
+        elif current_character == "%" and character_index + 1 < len(sql_query_string):
+            next_character = sql_query_string[character_index + 1]
+            if next_character == "s":
+                translated_character_list.append("?")
+                character_index += 1
+            elif next_character == "%":
+                translated_character_list.append("%")
+                character_index += 1
+            else:
+                translated_character_list.append(current_character)
+        else:
+            translated_character_list.append(current_character)
+        character_index += 1
+    return "".join(translated_character_list)
+
+
+def adapt_datetime_value(datetime_value):
+    return datetime_value.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def convert_datetime_value(raw_value):
+    # STORED AS "YYYY-MM-DD HH:MM:SS", HANDED BACK AS datetime LIKE mysql-connector DOES
+    try:
+        return datetime.fromisoformat(raw_value.decode("utf-8"))
+    except ValueError:
+        return raw_value.decode("utf-8")
+
+
+sqlite3.register_adapter(datetime, adapt_datetime_value)
+sqlite3.register_adapter(date, lambda date_value: date_value.isoformat())
+sqlite3.register_converter("DATETIME", convert_datetime_value)
+sqlite3.register_converter("TIMESTAMP", convert_datetime_value)
+
+
+class SQLiteCursorAdapter:
+    def __init__(self, connection_adapter, return_dictionaries):
+        self.connection_adapter = connection_adapter
+        self.sqlite_cursor = connection_adapter.sqlite_connection.cursor()
+        if return_dictionaries:
+            self.sqlite_cursor.row_factory = make_dictionary_row
+
+    @property
+    def description(self):
+        return self.sqlite_cursor.description
+
+    @property
+    def rowcount(self):
+        return self.sqlite_cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self.sqlite_cursor.lastrowid
+
+    def execute(self, sql_query_string, parameters_tuple=()):
+        translated_query_string = self.connection_adapter.backend.translate_query(sql_query_string)
+        self.sqlite_cursor.execute(translated_query_string, tuple(parameters_tuple))
+
+    def executemany(self, sql_query_string, parameters_list):
+        translated_query_string = self.connection_adapter.backend.translate_query(sql_query_string)
+        self.sqlite_cursor.executemany(translated_query_string, [tuple(parameters) for parameters in parameters_list])
+
+    def fetchall(self):
+        return self.sqlite_cursor.fetchall()
+
+    def fetchmany(self, row_count):
+        return self.sqlite_cursor.fetchmany(row_count)
+
+    def fetchone(self):
+        return self.sqlite_cursor.fetchone()
+
+    def close(self):
+        self.sqlite_cursor.close()
+
+
+def make_dictionary_row(sqlite_cursor, row_values):
+    return {column_description[0]: row_values[column_index]
+            for column_index, column_description in enumerate(sqlite_cursor.description)}
+
+
+class SQLiteConnectionAdapter:
+    def __init__(self, backend, sqlite_connection):
+        self.backend = backend
+        self.sqlite_connection = sqlite_connection
+
+    def cursor(self, dictionary=False, buffered=True):
+        # SQLITE READS ROWS LAZILY ANYWAY, SO buffered=False NEEDS NO SPECIAL HANDLING
+        return SQLiteCursorAdapter(self, dictionary)
+
+    def start_transaction(self):
+        # IMMEDIATE TAKES THE WRITE LOCK UP FRONT, TWO WRITERS CAN'T DEADLOCK ON LOCK UPGRADE
+        self.sqlite_connection.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        if self.sqlite_connection.in_transaction:
+            self.sqlite_connection.commit()
+
+    def rollback(self):
+        if self.sqlite_connection.in_transaction:
+            self.sqlite_connection.rollback()
+
+    def is_connected(self):
+        try:
+            self.sqlite_connection.execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def close(self):
+        self.sqlite_connection.close()
+
+
+class SQLiteBackend:
+    name = "sqlite"
+    database_error_types = (sqlite3.Error,)
+    connection_error_types = (sqlite3.OperationalError,)
+    # lastrowid AFTER A MULTI-ROW INSERT IS THE ID OF THE LAST ROW
+    multi_row_insert_reports_first_id = False
+
+    def __init__(self, database_file_path, busy_timeout_seconds=5):
+        self.database_file_path = database_file_path
+        self.busy_timeout_seconds = busy_timeout_seconds
+        self.translation_lock = threading.Lock()
+        self.translated_query_memo = {}
+
+    def open_connection(self):
+        sqlite_connection = sqlite3.connect(
+            self.database_file_path,
+            timeout=self.busy_timeout_seconds,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            # THE POOL HANDS A CONNECTION TO ONE THREAD AT A TIME
+            check_same_thread=False,
+            # AUTOCOMMIT LIKE THE MYSQL CONNECTIONS, transaction() ISSUES ITS OWN BEGIN
+            isolation_level=None,
+            uri=self.database_file_path.startswith("file:")
+        )
+        # WAL: READERS DON'T BLOCK THE WRITER AND VICE VERSA
+        sqlite_connection.execute("PRAGMA journal_mode=WAL")
+        sqlite_connection.execute("PRAGMA synchronous=NORMAL")
+        sqlite_connection.execute("PRAGMA foreign_keys=ON")
+        return SQLiteConnectionAdapter(self, sqlite_connection)
+
+    def is_connection_alive(self, connection_link):
+        return connection_link.is_connected()
+
+    def translate_query(self, sql_query_string):
+        translated_query_string = self.translated_query_memo.get(sql_query_string)
+        if translated_query_string is None:
+            translated_query_string = translate_placeholders(sql_query_string)
+            with self.translation_lock:
+                if len(self.translated_query_memo) < 4096:
+                    self.translated_query_memo[sql_query_string] = translated_query_string
+        return translated_query_string
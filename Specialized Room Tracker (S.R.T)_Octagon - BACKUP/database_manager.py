@@ -1,6 +1,15 @@
 # 
 
-import mysql.connector
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from connection_pool import ConnectionPool, PoolTimeoutError
+from database_backends import MySQLBackend, SQLiteBackend
+from query_cache import QueryResultCache, extract_table_names
+from query_statistics import QueryStatisticsCollector
+from read_write_router import ReadWriteRouter
 
 
 
@@ -12,41 +21,416 @@ database_user_password = "password"
 database_port_number = "3306"
 database_name_string = "specialized_room_tracker_backup"
 
+# BACKEND SELECTION ("mysql" OR "sqlite"), CI / BENCHMARKS SET SRT_DATABASE_BACKEND=sqlite
+database_backend_name = os.environ.get("SRT_DATABASE_BACKEND", "mysql")
+sqlite_database_file_path = os.environ.get(
+    "SRT_SQLITE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "specialized_room_tracker.sqlite3")
+)
+
+# READ REPLICA CONFIG (MYSQL ONLY, SAME LOGIN AND PORT AS THE PRIMARY)
+# EMPTY LIST = EVERY READ GOES TO THE PRIMARY, E.G. ["10.10.0.21", "10.10.0.22"]
+database_replica_host_list = []
+# AFTER A WRITE, THIS CLIENT READS FROM THE PRIMARY FOR A WHILE SO IT SEES ITS OWN ROWS
+read_your_writes_window_seconds = 5
+replica_retry_cooldown_seconds = 30
+
+# CONNECTION POOL CONFIG
+database_pool_size = 5
+database_pool_checkout_timeout_seconds = 10
+database_pool_idle_timeout_seconds = 300
+database_pool_health_check_interval_seconds = 30
+
+# BULK INSERT CONFIG (ROWS PER MULTI-ROW INSERT STATEMENT)
+bulk_insert_chunk_size = 500
+
+# STREAMING CONFIG (ROWS PULLED FROM THE SERVER PER fetchmany CALL)
+stream_fetch_batch_size = 500
+
+# QUERY CACHE CONFIG
+# OTHER CLIENTS WRITE WITHOUT GOING THROUGH OUR CACHE, SO THE TTL IS HOW STALE A READ CAN GET
+query_cache_maximum_entries = 256
+query_cache_ttl_seconds = 5
+# ROOM LIST BARELY CHANGES, THE DIALOGS CAN KEEP IT LONGER
+reference_data_cache_ttl_seconds = 60
+
+# QUERY STATISTICS CONFIG
+slow_query_threshold_seconds = 0.2
+slow_query_log_size = 200
+
+def create_backend(backend_name, database_file_path=None):
+    if backend_name == "mysql":
+        return MySQLBackend(database_host_address, database_user_login, database_user_password,
+                            database_port_number, database_name_string)
+    if backend_name == "sqlite":
+        return SQLiteBackend(database_file_path or sqlite_database_file_path)
+    raise ValueError("Unknown database backend: " + str(backend_name))
+
+active_database_backend = create_backend(database_backend_name)
+# CATCH THESE INSTEAD OF mysql.connector.Error SO THE CODE WORKS ON EITHER BACKEND
+database_error_types = active_database_backend.database_error_types
+# DATABASE ERRORS PLUS "NO POOLED CONNECTION FREED UP IN TIME": EVERYTHING THAT MEANS "THE DATABASE IS UNAVAILABLE RIGHT NOW"
+database_unavailable_error_types = database_error_types + (PoolTimeoutError,)
+
+def get_backend_name():
+    return active_database_backend.name
+
 def database_connection():
-    connection_link = mysql.connector.connect(
-        host=database_host_address,
-        user=database_user_login,
-        password=database_user_password,
-        port=database_port_number,
-        database=database_name_string
+    return active_database_backend.open_connection()
+
+def is_connection_alive(connection_link):
+    return active_database_backend.is_connection_alive(connection_link)
+
+def build_connection_pool(database_backend=None):
+    if database_backend is None:
+        connection_factory = database_connection
+        connection_validator = is_connection_alive
+    else:
+        connection_factory = database_backend.open_connection
+        connection_validator = database_backend.is_connection_alive
+    return ConnectionPool(
+        connection_factory,
+        connection_validator,
+        maximum_pool_size=database_pool_size,
+        checkout_timeout_seconds=database_pool_checkout_timeout_seconds,
+        idle_timeout_seconds=database_pool_idle_timeout_seconds,
+        health_check_interval_seconds=database_pool_health_check_interval_seconds
     )
-    return connection_link
-
-def fetch_all(sql_query_string, parameters_tuple=()):
-    database_connection_link = database_connection()
-    database_cursor_tool = database_connection_link.cursor(dictionary=True)
-    
-    database_cursor_tool.execute(sql_query_string, parameters_tuple)
-    
-    all_rows_list = []
-    if database_cursor_tool.description is not None:
-        all_rows_list = database_cursor_tool.fetchall()
-
-    database_cursor_tool.close()
-    database_connection_link.close()
+
+database_connection_pool = build_connection_pool()
+
+def build_read_write_router(database_backend):
+    replica_pool_list = []
+    if database_backend.name == "mysql":
+        for replica_host_address in database_replica_host_list:
+            replica_backend = MySQLBackend(replica_host_address, database_user_login, database_user_password,
+                                           database_port_number, database_name_string)
+            replica_pool_list.append(build_connection_pool(replica_backend))
+    return ReadWriteRouter(
+        replica_pool_list,
+        read_your_writes_window_seconds=read_your_writes_window_seconds,
+        replica_retry_cooldown_seconds=replica_retry_cooldown_seconds
+    )
+
+read_write_router = build_read_write_router(active_database_backend)
+
+def get_routing_statistics():
+    return read_write_router.get_statistics()
+
+def is_replica_connection_failure(database_error):
+    # REPLICA DOWN / UNREACHABLE / POOL EXHAUSTED -> RETRY ON THE PRIMARY. A BAD QUERY FAILS ON BOTH, SO IT JUST RAISES.
+    return isinstance(database_error, (PoolTimeoutError,) + active_database_backend.connection_error_types)
+
+def configure_backend(backend_name, database_file_path=None):
+    # SWITCH BACKENDS AT RUNTIME (TESTS, BENCHMARKS). CALL BEFORE ANY DASHBOARD IS OPEN.
+    global active_database_backend, database_error_types, database_unavailable_error_types
+    global database_connection_pool, read_write_router
+    new_database_backend = create_backend(backend_name, database_file_path)
+    old_connection_pool = database_connection_pool
+    old_read_write_router = read_write_router
+
+    active_database_backend = new_database_backend
+    database_error_types = new_database_backend.database_error_types
+    database_unavailable_error_types = database_error_types + (PoolTimeoutError,)
+    database_connection_pool = build_connection_pool()
+    read_write_router = build_read_write_router(new_database_backend)
+
+    old_connection_pool.close_all()
+    old_read_write_router.close_all()
+    query_result_cache.clear()
+
+def pooled_connection():
+    return database_connection_pool.connection()
+
+query_result_cache = QueryResultCache(
+    maximum_entries=query_cache_maximum_entries,
+    default_ttl_seconds=query_cache_ttl_seconds
+)
+
+def get_cache_statistics():
+    return query_result_cache.get_statistics()
+
+def clear_query_cache():
+    query_result_cache.clear()
+
+query_statistics_collector = QueryStatisticsCollector(
+    slow_query_threshold_seconds=slow_query_threshold_seconds,
+    slow_query_log_size=slow_query_log_size
+)
+
+def dump_query_statistics():
+    return query_statistics_collector.dump()
+
+def print_query_statistics(limit=20):
+    print(query_statistics_collector.format_report(limit))
+
+def reset_query_statistics():
+    query_statistics_collector.reset()
+
+def set_slow_query_threshold(threshold_seconds):
+    query_statistics_collector.slow_query_threshold_seconds = threshold_seconds
+
+@contextmanager
+def timed_query(sql_query_string):
+    # CALLER FILLS IN query_measurement["rows"], WE RECORD THE TIMING EVEN IF THE QUERY RAISES
+    query_measurement = {"rows": None}
+    query_started_time = time.perf_counter()
+    query_failed = True
+    try:
+        yield query_measurement
+        query_failed = False
+    finally:
+        query_statistics_collector.record(sql_query_string, time.perf_counter() - query_started_time,
+                                          query_measurement["rows"], failed=query_failed)
+
+def get_pool_statistics():
+    return database_connection_pool.get_statistics()
+
+def close_pool():
+    database_connection_pool.close_all()
+    read_write_router.close_all()
+
+# TRANSACTION STATE (ONE OPEN UNIT OF WORK PER THREAD)
+transaction_thread_state = threading.local()
+
+def in_transaction():
+    return getattr(transaction_thread_state, "unit_of_work", None) is not None
+
+def make_write_result(database_cursor_tool):
+    return {
+        "affected_rows": database_cursor_tool.rowcount,
+        "last_insert_id": database_cursor_tool.lastrowid
+    }
+
+class UnitOfWork:
+    # EVERYTHING RUN THROUGH THIS OBJECT SHARES ONE CONNECTION AND ONE COMMIT
+    def __init__(self, database_connection_link):
+        self.database_connection_link = database_connection_link
+        self.total_affected_rows = 0
+        # CACHED READS OF THESE TABLES ARE DROPPED ONCE THE TRANSACTION COMMITS
+        self.written_table_names = set()
+
+    def fetch_all(self, sql_query_string, parameters_tuple=()):
+        with timed_query(sql_query_string) as query_measurement:
+            database_cursor_tool = self.database_connection_link.cursor(dictionary=True)
+            database_cursor_tool.execute(sql_query_string, parameters_tuple)
+
+            all_rows_list = []
+            if database_cursor_tool.description is not None:
+                all_rows_list = database_cursor_tool.fetchall()
+
+            database_cursor_tool.close()
+            query_measurement["rows"] = len(all_rows_list)
+        return all_rows_list
+
+    def execute(self, sql_query, parameters=()):
+        self.written_table_names.update(extract_table_names(sql_query))
+        with timed_query(sql_query) as query_measurement:
+            database_execution = self.database_connection_link.cursor()
+            database_execution.execute(sql_query, parameters)
+            write_result = make_write_result(database_execution)
+            database_execution.close()
+            query_measurement["rows"] = write_result["affected_rows"]
+
+        self.total_affected_rows += max(write_result["affected_rows"], 0)
+        return write_result
+
+    def execute_many(self, sql_query, parameters_list):
+        # mysql-connector REWRITES "INSERT ... VALUES" INTO ONE MULTI-ROW STATEMENT,
+        # OTHER STATEMENTS STILL RUN ONE BY ONE BUT ON THE SAME CONNECTION AND COMMIT
+        if len(parameters_list) == 0:
+            return {"affected_rows": 0, "last_insert_id": None}
+
+        self.written_table_names.update(extract_table_names(sql_query))
+        with timed_query(sql_query) as query_measurement:
+            database_execution = self.database_connection_link.cursor()
+            database_execution.executemany(sql_query, parameters_list)
+            write_result = make_write_result(database_execution)
+            database_execution.close()
+            query_measurement["rows"] = write_result["affected_rows"]
+
+        self.total_affected_rows += max(write_result["affected_rows"], 0)
+        return write_result
+
+    def bulk_insert(self, table_name, column_name_list, row_values_list, chunk_size=None):
+        if chunk_size is None:
+            chunk_size = bulk_insert_chunk_size
+
+        column_list_string = ", ".join(column_name_list)
+        row_placeholder_string = "(" + ", ".join(["%s"] * len(column_name_list)) + ")"
+
+        inserted_row_count = 0
+        first_insert_id = None
+        for chunk_start_index in range(0, len(row_values_list), chunk_size):
+            chunk_rows_list = row_values_list[chunk_start_index:chunk_start_index + chunk_size]
+
+            insert_query_string = ("INSERT INTO " + table_name + " (" + column_list_string + ") VALUES "
+                                   + ", ".join([row_placeholder_string] * len(chunk_rows_list)))
+            flattened_parameters_list = []
+            for row_values in chunk_rows_list:
+                flattened_parameters_list.extend(row_values)
+
+            write_result = self.execute(insert_query_string, tuple(flattened_parameters_list))
+            inserted_row_count += write_result["affected_rows"]
+            # ALWAYS REPORT THE ID OF THE FIRST ROW OF THE BULK INSERT, WHATEVER THE BACKEND RETURNS
+            if first_insert_id is None and write_result["last_insert_id"]:
+                first_insert_id = write_result["last_insert_id"]
+                if not active_database_backend.multi_row_insert_reports_first_id:
+                    first_insert_id = first_insert_id - write_result["affected_rows"] + 1
+
+        return {"affected_rows": inserted_row_count, "last_insert_id": first_insert_id}
+
+@contextmanager
+def transaction():
+    # NESTED transaction() CALLS JOIN THE OUTER ONE, ONLY THE OUTERMOST COMMITS
+    if in_transaction():
+        yield transaction_thread_state.unit_of_work
+        return
+
+    with pooled_connection() as database_connection_link:
+        database_connection_link.start_transaction()
+        unit_of_work = UnitOfWork(database_connection_link)
+        transaction_thread_state.unit_of_work = unit_of_work
+        try:
+            yield unit_of_work
+            database_connection_link.commit()
+            if unit_of_work.written_table_names:
+                read_write_router.note_write()
+        except Exception:
+            database_connection_link.rollback()
+            raise
+        finally:
+            transaction_thread_state.unit_of_work = None
+            # AFTER COMMIT (OR ROLLBACK) SO NO OTHER THREAD CAN RE-CACHE THE OLD ROWS IN BETWEEN
+            query_result_cache.invalidate_tables(unit_of_work.written_table_names)
+
+def execute_many(sql_query, parameters_list):
+    with transaction() as unit_of_work:
+        return unit_of_work.execute_many(sql_query, parameters_list)
+
+def bulk_insert(table_name, column_name_list, row_values_list, chunk_size=None):
+    with transaction() as unit_of_work:
+        return unit_of_work.bulk_insert(table_name, column_name_list, row_values_list, chunk_size)
+
+def fetch_all(sql_query_string, parameters_tuple=(), use_cache=True, cache_ttl_seconds=None):
+    # INSIDE A TRANSACTION WE MUST SEE OUR OWN UNCOMMITTED WRITES, SO NEVER SERVE FROM CACHE
+    if use_cache and not in_transaction():
+        database_load_state = {"loaded": False}
+
+        def load_rows_from_database():
+            database_load_state["loaded"] = True
+            return fetch_all_from_database(sql_query_string, parameters_tuple)
+
+        lookup_started_time = time.perf_counter()
+        all_rows_list = query_result_cache.get_or_load(
+            sql_query_string, parameters_tuple, load_rows_from_database, cache_ttl_seconds)
+        if not database_load_state["loaded"]:
+            query_statistics_collector.record(sql_query_string, time.perf_counter() - lookup_started_time,
+                                              len(all_rows_list), served_from_cache=True)
+        return all_rows_list
+    return fetch_all_from_database(sql_query_string, parameters_tuple)
+
+def fetch_all_from_database(sql_query_string, parameters_tuple=()):
+    # READS GO TO A REPLICA WHEN ONE IS CONFIGURED (SEE read_write_router), OTHERWISE TO THE PRIMARY
+    replica_connection_pool = read_write_router.choose_replica_pool(in_transaction())
+    if replica_connection_pool is not None:
+        try:
+            return fetch_all_on_connection(sql_query_string, parameters_tuple, replica_connection_pool.connection())
+        except database_unavailable_error_types as database_error:
+            if not is_replica_connection_failure(database_error):
+                raise
+            print("System: Read replica unavailable, reading from primary (" + str(database_error) + ")")
+            read_write_router.report_replica_failure(replica_connection_pool)
+    return fetch_all_on_connection(sql_query_string, parameters_tuple, pooled_connection())
+
+def fetch_all_on_connection(sql_query_string, parameters_tuple, connection_context):
+    with timed_query(sql_query_string) as query_measurement, connection_context as database_connection_link:
+        database_cursor_tool = database_connection_link.cursor(dictionary=True)
+
+        database_cursor_tool.execute(sql_query_string, parameters_tuple)
+
+        all_rows_list = []
+        if database_cursor_tool.description is not None:
+            all_rows_list = database_cursor_tool.fetchall()
+
+        database_cursor_tool.close()
+        query_measurement["rows"] = len(all_rows_list)
     return all_rows_list
 
+def fetch_iter(sql_query_string, parameters_tuple=(), chunk_size=None):
+    # STREAMING VERSION OF fetch_all FOR EXPORTS/REPORTS
+    # YIELDS ONE ROW DICT AT A TIME, OR LISTS OF UP TO chunk_size ROWS IF chunk_size IS GIVEN.
+    # THE CURSOR IS UNBUFFERED, SO ROWS ONLY LEAVE THE SERVER AS FAST AS THE CONSUMER ASKS FOR THEM.
+    # USES ITS OWN CONNECTION (NOT THE THREAD'S HELD ONE) BECAUSE AN OPEN RESULT STREAM BLOCKS
+    # ANY OTHER QUERY ON THE SAME CONNECTION UNTIL IT IS FULLY READ.
+    if chunk_size is not None:
+        fetch_batch_size = chunk_size
+    else:
+        fetch_batch_size = stream_fetch_batch_size
+
+    # KEEP OUR OWN REFERENCE IN CASE configure_backend() SWAPS THE POOL MID-STREAM
+    stream_connection_pool = database_connection_pool
+    database_connection_link = None
+    replica_connection_pool = read_write_router.choose_replica_pool(in_transaction())
+    if replica_connection_pool is not None:
+        try:
+            database_connection_link = replica_connection_pool.checkout()
+            stream_connection_pool = replica_connection_pool
+        except database_unavailable_error_types as database_error:
+            if not is_replica_connection_failure(database_error):
+                raise
+            read_write_router.report_replica_failure(replica_connection_pool)
+    if database_connection_link is None:
+        database_connection_link = stream_connection_pool.checkout()
+    stream_finished_cleanly = False
+    try:
+        # ONLY THE SERVER'S TIME TO START THE RESULT IS TIMED, NOT HOW LONG THE CONSUMER TAKES
+        with timed_query(sql_query_string):
+            database_cursor_tool = database_connection_link.cursor(dictionary=True, buffered=False)
+            database_cursor_tool.execute(sql_query_string, parameters_tuple)
+
+        if database_cursor_tool.description is not None:
+            while True:
+                row_batch_list = database_cursor_tool.fetchmany(fetch_batch_size)
+                if len(row_batch_list) == 0:
+                    break
+                if chunk_size is not None:
+                    yield row_batch_list
+                else:
+                    for row_dictionary in row_batch_list:
+                        yield row_dictionary
+
+        database_cursor_tool.close()
+        stream_finished_cleanly = True
+    finally:
+        if stream_finished_cleanly:
+            stream_connection_pool.checkin(database_connection_link)
+        else:
+            # CONSUMER STOPPED EARLY (break / close()) OR AN ERROR HAPPENED. THE REST OF THE RESULT IS
+            # STILL ON THE WIRE, DROPPING THE CONNECTION IS CHEAPER THAN READING IT ALL JUST TO THROW IT AWAY.
+            stream_connection_pool.discard(database_connection_link)
+
 def execute_query(sql_query, parameters=()):
-    database_link = database_connection()
-    database_execution = database_link.cursor()
+    if in_transaction():
+        transaction_thread_state.unit_of_work.written_table_names.update(extract_table_names(sql_query))
+
+    with timed_query(sql_query) as query_measurement, pooled_connection() as database_link:
+        database_execution = database_link.cursor()
+
+        database_execution.execute(sql_query, parameters)
+        # INSIDE transaction() THE OUTERMOST BLOCK DOES THE COMMIT
+        if not in_transaction():
+            database_link.commit()
 
-    database_execution.execute(sql_query, parameters)
-    database_link.commit()
+        success = False # flag
+        if database_execution.rowcount > 0:
+            success = True
 
-    success = False # flag
-    if database_execution.rowcount > 0:
-        success = True
+        query_measurement["rows"] = database_execution.rowcount
+        database_execution.close()
 
-    database_execution.close()
-    database_link.close()
-    return success
\ No newline at end of file
+    if not in_transaction():
+        query_result_cache.invalidate_for_write(sql_query)
+        # INSIDE transaction() THE COMMIT DOES THIS
+        read_write_router.note_write()
+    return success
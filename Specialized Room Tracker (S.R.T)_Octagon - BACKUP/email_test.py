@@ -1,24 +1,12 @@
-import smtplib
-from email.mime.text import MIMEText
+import mail_transport
 import user_email_list
 import os
 
 def send_real_email(recipient_email_address_string, email_subject_string, email_body_content_string):
-    sender_email_address_string = "jalmascogab002@gmail.com" # SIMULATED ADMIN EMAIL
-    sender_app_password_string = "amdw ocfr corr mkvj" # Google App Password, not login password
-
-    email_message_object = MIMEText(email_body_content_string)
-    email_message_object['Subject'] = email_subject_string
-    email_message_object['From'] = sender_email_address_string
-    email_message_object['To'] = recipient_email_address_string
-
-    smtp_server_connection = smtplib.SMTP_SSL('smtp.gmail.com', 465)
-    
-    smtp_server_connection.login(sender_email_address_string, sender_app_password_string)
-    
-    smtp_server_connection.send_message(email_message_object)
-    
-    smtp_server_connection.quit()
+    # Reuses a logged-in session from the shared pool instead of a new TLS handshake + login() per email
+    email_message_object = mail_transport.build_message(recipient_email_address_string, email_subject_string,
+                                                        email_body_content_string)
+    mail_transport.get_shared_pool().send_message(email_message_object)
     
     return True
 
@@ -40,3 +28,7 @@ if __name__ == "__main__":
             send_real_email(current_email_address_string, "SRT System Test", "This is a test email from the Specialized Room Tracker system.")
             
             print("Test Passed: Email sent successfully to " + current_email_address_string)
+
+        # Every test email above went over the same pooled session
+        print("System: Transport statistics: " + str(mail_transport.get_shared_pool().get_statistics()))
+        mail_transport.close_shared_pool()
@@ -0,0 +1,320 @@
+# BACKEND CODE FOR SENDING EMAIL THROUGH A SHARED POOL OF SMTP SESSIONS
+# OPENING A SESSION (TCP + TLS HANDSHAKE + login()) COSTS FAR MORE THAN SENDING ONE MESSAGE, SO
+# EVERY OUTGOING EMAIL (email_test.send_real_email, notification_outbox) GOES THROUGH ONE POOL THAT KEEPS
+# A FEW LOGGED-IN SESSIONS OPEN AND SENDS MANY MESSAGES OVER EACH ONE:
+#   - send_messages([...]) SENDS A WHOLE BATCH BACK TO BACK OVER ONE SESSION
+#   - A SESSION IDLE LONGER THAN session_noop_after_seconds IS CHECKED WITH NOOP BEFORE REUSE,
+#     ONE IDLE LONGER THAN session_maximum_idle_seconds IS CLOSED (THE SERVER WOULD DROP IT ANYWAY)
+#   - A SESSION THAT DROPPED IS REOPENED AUTOMATICALLY (ONCE, BEFORE ANYTHING WAS SENT ON IT)
+#   - A SESSION IS RETIRED AFTER maximum_messages_per_session (GMAIL THROTTLES LONG SESSIONS)
+#   - get_statistics(): MESSAGES SENT / FAILED, SESSIONS OPENED, LATENCY (AVERAGE, P95) AND THROUGHPUT
+#
+# CONFIG COMES FROM THE ENVIRONMENT. THERE IS NO BUILT-IN ACCOUNT: SRT_SMTP_SENDER AND SRT_SMTP_PASSWORD
+# (THE SENDER'S APP PASSWORD) MUST BE SET, OR EVERY SEND FAILS WITH SmtpConfigurationError. THE OUTBOX
+# RESCHEDULES THOSE ROWS WITHOUT COUNTING AN ATTEMPT (notification_outbox.configuration_retry_delay_seconds),
+# SO NOTHING IS DEAD-LETTERED WHILE THE SETTINGS ARE MISSING.
+# FOR A LOCAL SMTP STAND-IN SET THE PASSWORD EMPTY (= NO LOGIN):
+#     python -m aiosmtpd -n -l 127.0.0.1:1025
+#     SRT_SMTP_HOST=127.0.0.1 SRT_SMTP_PORT=1025 SRT_SMTP_SSL=0 SRT_SMTP_SENDER=srt@localhost SRT_SMTP_PASSWORD= python email_test.py
+
+import os
+import smtplib
+import threading
+import time
+from collections import deque
+from email.mime.text import MIMEText
+
+# SMTP CONFIG
+smtp_host_address = os.environ.get("SRT_SMTP_HOST", "smtp.gmail.com")
+smtp_port_number = int(os.environ.get("SRT_SMTP_PORT", "465"))
+smtp_use_ssl = os.environ.get("SRT_SMTP_SSL", "1") != "0"
+smtp_sender_address = os.environ.get("SRT_SMTP_SENDER", "") # ADMIN MAILBOX THE NOTIFICATIONS COME FROM
+smtp_sender_password = os.environ.get("SRT_SMTP_PASSWORD", "") # ITS APP PASSWORD, NOT THE LOGIN PASSWORD
+# EMPTY IS ALLOWED (NO LOGIN), UNSET IS NOT: A FORGOTTEN PASSWORD MUST NOT LOOK LIKE "THIS SERVER NEEDS NONE"
+smtp_sender_password_is_set = "SRT_SMTP_PASSWORD" in os.environ
+smtp_timeout_seconds = 20
+
+# POOL CONFIG
+smtp_pool_size = 2
+maximum_messages_per_session = 100
+session_noop_after_seconds = 60
+session_maximum_idle_seconds = 240
+# LATENCIES KEPT FOR THE AVERAGE / P95
+latency_sample_count = 500
+
+
+class SmtpConfigurationError(smtplib.SMTPException):
+    # AN SMTPException, SO THE POOL FAILS THE BATCH WITH IT AND THE OUTBOX RETRIES LATER (IT'S NOT A 5xx)
+    pass
+
+
+def check_smtp_configuration():
+    if not smtp_sender_address:
+        raise SmtpConfigurationError("SRT_SMTP_SENDER is not set")
+    if not smtp_sender_password_is_set:
+        raise SmtpConfigurationError("SRT_SMTP_PASSWORD is not set (set it empty for a server without login)")
+
+
+def is_session_broken_error(send_error):
+    # DISCONNECT / SOCKET ERROR = THE SESSION IS GONE. ANY OTHER SMTP ERROR (REFUSED RECIPIENT, REJECTED
+    # MESSAGE) ONLY CONCERNS ONE MESSAGE. (SMTPException IS ITSELF AN OSError, HENCE THE ORDER.)
+    if isinstance(send_error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(send_error, OSError) and not isinstance(send_error, smtplib.SMTPException)
+
+
+def build_message(recipient_email_address_string, email_subject_string, email_body_content_string):
+    email_message_object = MIMEText(email_body_content_string)
+    email_message_object['Subject'] = email_subject_string
+    email_message_object['From'] = smtp_sender_address
+    email_message_object['To'] = recipient_email_address_string
+    return email_message_object
+
+
+class PooledSmtpSession:
+    def __init__(self):
+        check_smtp_configuration()
+        if smtp_use_ssl:
+            self.smtp_connection = smtplib.SMTP_SSL(smtp_host_address, smtp_port_number, timeout=smtp_timeout_seconds)
+        else:
+            self.smtp_connection = smtplib.SMTP(smtp_host_address, smtp_port_number, timeout=smtp_timeout_seconds)
+        try:
+            if smtp_sender_password:
+                self.smtp_connection.login(smtp_sender_address, smtp_sender_password)
+        except OSError:
+            self.close()
+            raise
+        self.message_count = 0
+        self.last_used_time = time.monotonic()
+
+    def idle_seconds(self):
+        return time.monotonic() - self.last_used_time
+
+    def is_alive(self):
+        try:
+            return self.smtp_connection.noop()[0] == 250
+        except OSError:
+            return False
+
+    def send(self, email_message_object):
+        self.smtp_connection.send_message(email_message_object)
+        self.message_count += 1
+        self.last_used_time = time.monotonic()
+
+    def close(self):
+        try:
+            self.smtp_connection.quit()
+        except OSError:
+            self.smtp_connection.close()
+
+
+class SmtpSessionPool:
+    def __init__(self, pool_size=None):
+        self.pool_size = pool_size or smtp_pool_size
+        # AT MOST pool_size SESSIONS EXIST; A THREAD THAT WANTS ONE MORE WAITS FOR A FREE ONE
+        self.session_slots = threading.BoundedSemaphore(self.pool_size)
+        self.pool_lock = threading.Lock()
+        # MOST RECENTLY USED LAST, SO THE WARMEST SESSION IS REUSED FIRST
+        self.idle_session_list = []
+        self.latency_seconds_list = deque(maxlen=latency_sample_count)
+        self.started_time = time.monotonic()
+        self.statistics_dictionary = {
+            "messages_sent": 0,
+            "messages_failed": 0,
+            "sessions_opened": 0,
+            "sessions_retired": 0,
+            "reconnects": 0,
+            "noop_checks": 0,
+            "batches": 0,
+            "total_send_seconds": 0.0,
+            "last_error": None,
+        }
+
+    def count(self, statistic_name, amount=1):
+        with self.pool_lock:
+            self.statistics_dictionary[statistic_name] += amount
+
+    # SESSION CHECKOUT
+
+    def take_idle_session(self):
+        # -> (SESSION, True) REUSED / (None, False) NONE USABLE, THE CALLER OPENS ONE
+        while True:
+            with self.pool_lock:
+                if not self.idle_session_list:
+                    return None, False
+                smtp_session = self.idle_session_list.pop()
+            idle_seconds = smtp_session.idle_seconds()
+            if idle_seconds > session_maximum_idle_seconds:
+                smtp_session.close()
+                continue
+            if idle_seconds > session_noop_after_seconds:
+                self.count("noop_checks")
+                if not smtp_session.is_alive():
+                    smtp_session.close()
+                    continue
+            return smtp_session, True
+
+    def open_session(self):
+        smtp_session = PooledSmtpSession()
+        self.count("sessions_opened")
+        return smtp_session
+
+    def release_session(self, smtp_session):
+        if smtp_session.message_count >= maximum_messages_per_session:
+            self.count("sessions_retired")
+            smtp_session.close()
+            return
+        with self.pool_lock:
+            self.idle_session_list.append(smtp_session)
+
+    # SENDING
+
+    def send_messages(self, email_message_list):
+        # SENDS THE WHOLE LIST OVER AS FEW SESSIONS AS POSSIBLE (ONE, UNLESS IT HITS THE PER-SESSION LIMIT)
+        # -> ONE ENTRY PER MESSAGE: None IF SENT, OTHERWISE THE EXCEPTION THAT STOPPED IT
+        # A FAILED CONNECT / LOGIN FAILS EVERY REMAINING MESSAGE WITH THAT ERROR INSTEAD OF RETRYING EACH ONE
+        send_error_list = [None] * len(email_message_list)
+        if len(email_message_list) == 0:
+            return send_error_list
+        self.count("batches")
+        self.session_slots.acquire()
+        smtp_session = None
+        try:
+            smtp_session, is_reused_session = self.take_idle_session()
+            for message_index, email_message_object in enumerate(email_message_list):
+                if smtp_session is not None and smtp_session.message_count >= maximum_messages_per_session:
+                    self.release_session(smtp_session)
+                    smtp_session = None
+                if smtp_session is None:
+                    try:
+                        smtp_session = self.open_session()
+                    except OSError as connection_error:
+                        self.record_failures(send_error_list, message_index, connection_error)
+                        break
+                    is_reused_session = False
+
+                send_started_time = time.perf_counter()
+                try:
+                    smtp_session.send(email_message_object)
+                except OSError as send_error:
+                    if not is_session_broken_error(send_error):
+                        # REFUSED RECIPIENT / REJECTED MESSAGE, THE SESSION IS STILL FINE
+                        self.record_failure(send_error_list, message_index, send_error)
+                        is_reused_session = False
+                        continue
+                    smtp_session.close()
+                    smtp_session = None
+                    if not is_reused_session:
+                        self.record_failure(send_error_list, message_index, send_error)
+                        continue
+                    # THE SERVER DROPPED A POOLED SESSION BEFORE WE USED IT: NOTHING WAS SENT, RECONNECT ONCE
+                    self.count("reconnects")
+                    is_reused_session = False
+                    try:
+                        smtp_session = self.open_session()
+                        send_started_time = time.perf_counter()
+                        smtp_session.send(email_message_object)
+                    except OSError as retry_error:
+                        if smtp_session is not None and is_session_broken_error(retry_error):
+                            smtp_session.close()
+                            smtp_session = None
+                        self.record_failure(send_error_list, message_index, retry_error)
+                        continue
+                self.record_latency(time.perf_counter() - send_started_time)
+                is_reused_session = False
+        finally:
+            if smtp_session is not None:
+                self.release_session(smtp_session)
+            self.session_slots.release()
+        return send_error_list
+
+    def send_message(self, email_message_object):
+        # ONE MESSAGE, RAISES LIKE smtplib WOULD
+        send_error = self.send_messages([email_message_object])[0]
+        if send_error is not None:
+            raise send_error
+
+    # MAINTENANCE
+
+    def keep_alive_idle_sessions(self):
+        # CALL PERIODICALLY (THE OUTBOX WORKER DOES, EVERY POLL): NOOP THE QUIET SESSIONS, DROP THE DEAD ONES
+        with self.pool_lock:
+            checked_session_list = self.idle_session_list
+            self.idle_session_list = []
+        surviving_session_list = []
+        for smtp_session in checked_session_list:
+            idle_seconds = smtp_session.idle_seconds()
+            if idle_seconds > session_maximum_idle_seconds:
+                smtp_session.close()
+                continue
+            if idle_seconds > session_noop_after_seconds:
+                self.count("noop_checks")
+                if not smtp_session.is_alive():
+                    smtp_session.close()
+                    continue
+                smtp_session.last_used_time = time.monotonic()
+            surviving_session_list.append(smtp_session)
+        with self.pool_lock:
+            self.idle_session_list = surviving_session_list + self.idle_session_list
+
+    def close_all(self):
+        with self.pool_lock:
+            closing_session_list = self.idle_session_list
+            self.idle_session_list = []
+        for smtp_session in closing_session_list:
+            smtp_session.close()
+
+    # STATISTICS
+
+    def record_latency(self, send_seconds):
+        with self.pool_lock:
+            self.statistics_dictionary["messages_sent"] += 1
+            self.statistics_dictionary["total_send_seconds"] += send_seconds
+            self.latency_seconds_list.append(send_seconds)
+
+    def record_failure(self, send_error_list, message_index, send_error):
+        send_error_list[message_index] = send_error
+        with self.pool_lock:
+            self.statistics_dictionary["messages_failed"] += 1
+            self.statistics_dictionary["last_error"] = type(send_error).__name__ + ": " + str(send_error)
+
+    def record_failures(self, send_error_list, first_message_index, send_error):
+        for message_index in range(first_message_index, len(send_error_list)):
+            self.record_failure(send_error_list, message_index, send_error)
+
+    def get_statistics(self):
+        with self.pool_lock:
+            statistics_snapshot = dict(self.statistics_dictionary)
+            sorted_latency_list = sorted(self.latency_seconds_list)
+            statistics_snapshot["idle_sessions"] = len(self.idle_session_list)
+        messages_sent = statistics_snapshot["messages_sent"]
+        statistics_snapshot["average_latency_seconds"] = (
+            statistics_snapshot["total_send_seconds"] / messages_sent if messages_sent else 0.0)
+        statistics_snapshot["p95_latency_seconds"] = (
+            sorted_latency_list[int(len(sorted_latency_list) * 0.95) - 1] if sorted_latency_list else 0.0)
+        # WHILE ACTUALLY SENDING, AND OVER THE POOL'S WHOLE LIFETIME
+        statistics_snapshot["messages_per_send_second"] = (
+            messages_sent / statistics_snapshot["total_send_seconds"] if statistics_snapshot["total_send_seconds"] else 0.0)
+        statistics_snapshot["messages_per_minute"] = messages_sent * 60 / max(time.monotonic() - self.started_time, 1)
+        return statistics_snapshot
+
+
+# ONE POOL PER PROCESS, SHARED BY EVERYTHING THAT SENDS MAIL
+shared_pool = None
+shared_pool_lock = threading.Lock()
+
+
+def get_shared_pool():
+    global shared_pool
+    with shared_pool_lock:
+        if shared_pool is None:
+            shared_pool = SmtpSessionPool()
+        return shared_pool
+
+
+def close_shared_pool():
+    global shared_pool
+    with shared_pool_lock:
+        if shared_pool is not None:
+            shared_pool.close_all()
+            shared_pool = None
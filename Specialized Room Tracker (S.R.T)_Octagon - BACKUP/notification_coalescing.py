@@ -0,0 +1,79 @@
+# BACKEND CODE FOR COALESCING QUEUED NOTIFICATIONS INTO ONE DIGEST PER RECIPIENT (SCHEMA VERSION 9)
+# A BULK APPROVAL OF 50 RESERVATIONS USED TO MEAN 50 EMAILS TO EVERY ADDRESS IN user_email_list. NOW:
+#   - enqueue_status_notifications HOLDS EACH ROW FOR notification_coalescing_window_seconds
+#   - WHEN A RECIPIENT'S FIRST ROW FALLS DUE, THE WORKER CLAIMS THAT RECIPIENT'S WHOLE QUEUE
+#   - coalesce_notifications() KEEPS ONLY THE NEWEST ROW PER RESERVATION (APPROVED THEN REJECTED -> REJECTED)
+#     AND GROUPS WHAT IS LEFT INTO ONE DIGEST PER RECIPIENT
+# SO 50 APPROVALS ARE ONE EMAIL PER RECIPIENT. A DIGEST OF A SINGLE CHANGE IS THE ORDINARY SINGLE EMAIL.
+#
+# NOTHING IN HERE TOUCHES THE DATABASE OR SMTP: ROWS IN, DIGESTS OUT (notification_outbox DOES THE REST)
+
+import os
+
+# HOW LONG A NEW NOTIFICATION WAITS FOR OTHERS TO THE SAME RECIPIENT (0 = SEND RIGHT AWAY, NO DIGESTS)
+notification_coalescing_window_seconds = int(os.environ.get("SRT_NOTIFICATION_WINDOW_SECONDS", "60"))
+
+# new_status OF A START-TIME REMINDER (reminder_scheduler), WHICH NEVER SUPERSEDES A STATUS CHANGE OR IS SUPERSEDED BY ONE
+reminder_notification_status = "Reminder"
+
+# LONGER DIGESTS ARE SPLIT (A 2,000-LINE EMAIL HELPS NOBODY, AND SOME SERVERS REJECT IT)
+maximum_digest_line_count = 100
+
+
+class NotificationDigest:
+    def __init__(self, recipient_email, outbox_row_list):
+        self.recipient_email = recipient_email
+        # THE ROWS THIS EMAIL DELIVERS (ALL MARKED sent / RETRIED / dead TOGETHER)
+        self.outbox_row_list = outbox_row_list
+
+    def render(self):
+        # -> (SUBJECT, BODY)
+        if len(self.outbox_row_list) == 1:
+            only_outbox_row = self.outbox_row_list[0]
+            return only_outbox_row["message_subject"], only_outbox_row["message_body"]
+        email_subject_string = "Reservation Updates: " + str(len(self.outbox_row_list)) + " changes"
+        email_body_string = "Hello,\n\nThe following reservations have been updated:\n\n"
+        for outbox_row in self.outbox_row_list:
+            # ROWS QUEUED BEFORE digest_line EXISTED FALL BACK TO THEIR SUBJECT
+            email_body_string += "  - " + (outbox_row.get("digest_line") or outbox_row["message_subject"]) + "\n"
+        email_body_string += "\nRegards,\nCampus Administration"
+        return email_subject_string, email_body_string
+
+
+def build_digest_line(detail_row, new_status):
+    return (detail_row['room_name'] + " on " + str(detail_row['start_time']) + " ("
+            + (detail_row['full_name'] or "Student") + "): " + new_status)
+
+
+def coalescing_key(outbox_row):
+    # ROWS WITH THE SAME KEY SAY THE SAME KIND OF THING TO THE SAME PERSON, ONLY THE NEWEST IS WORTH SENDING
+    if outbox_row.get("reservation_id") is None:
+        # NOT ABOUT A RESERVATION, NOTHING CAN SUPERSEDE IT
+        return (outbox_row["recipient_email"], "outbox", outbox_row["outbox_id"])
+    if outbox_row.get("new_status") == reminder_notification_status:
+        # A LATER REMINDER (1 HOUR) STILL REPLACES AN UNSENT EARLIER ONE (24 HOURS)
+        return (outbox_row["recipient_email"], "reminder", outbox_row["reservation_id"])
+    return (outbox_row["recipient_email"], "reservation", outbox_row["reservation_id"])
+
+
+def coalesce_notifications(outbox_row_list):
+    # -> (DIGESTS TO SEND, ROWS SUPERSEDED BY A NEWER ROW FOR THE SAME RESERVATION AND RECIPIENT)
+    # "NEWER" = HIGHER outbox_id (INSERT ORDER, SO THE LATER STATUS CHANGE WINS)
+    newest_row_by_key = {}
+    superseded_row_list = []
+    for outbox_row in sorted(outbox_row_list, key=lambda outbox_row: outbox_row["outbox_id"]):
+        coalescing_key_tuple = coalescing_key(outbox_row)
+        if coalescing_key_tuple in newest_row_by_key:
+            superseded_row_list.append(newest_row_by_key.pop(coalescing_key_tuple))
+        newest_row_by_key[coalescing_key_tuple] = outbox_row
+
+    row_list_by_recipient = {}
+    for outbox_row in sorted(newest_row_by_key.values(), key=lambda outbox_row: outbox_row["outbox_id"]):
+        row_list_by_recipient.setdefault(outbox_row["recipient_email"], []).append(outbox_row)
+
+    digest_list = []
+    for recipient_email, recipient_row_list in row_list_by_recipient.items():
+        for chunk_start_index in range(0, len(recipient_row_list), maximum_digest_line_count):
+            digest_list.append(NotificationDigest(
+                recipient_email, recipient_row_list[chunk_start_index:chunk_start_index + maximum_digest_line_count]))
+    return digest_list, superseded_row_list
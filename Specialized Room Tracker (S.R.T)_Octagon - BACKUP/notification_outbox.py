@@ -0,0 +1,447 @@
+# BACKEND CODE FOR THE NOTIFICATION OUTBOX (SCHEMA VERSIONS 8 AND 9)
+# A STATUS CHANGE WRITES ITS EMAILS INTO notification_outbox IN THE SAME TRANSACTION AS THE UPDATE,
+# SO "APPROVED BUT NEVER NOTIFIED" (OR "NOTIFIED BUT ROLLED BACK") CAN'T HAPPEN. NOTHING TALKS TO
+# THE MAIL SERVER WHILE THE ADMIN WAITS: OutboxDeliveryWorker DRAINS THE TABLE IN THE BACKGROUND.
+#   - A FAILED SEND IS RETRIED WITH EXPONENTIAL BACKOFF (30s, 60s, 120s ... UP TO AN HOUR, WITH JITTER)
+#   - AFTER maximum_delivery_attempts, OR ON A PERMANENT 5xx REJECTION, THE ROW GOES TO "dead"
+#   - MISSING SMTP SETTINGS OR A REJECTED LOGIN DON'T COUNT AS ATTEMPTS: THE ROWS WAIT
+#     configuration_retry_delay_seconds AND TRY AGAIN, UNTIL THE SETTINGS ARE FIXED
+#   - A WORKER THAT DIED MID-SEND LEAVES ITS ROWS "sending", THEY ARE RECLAIMED AFTER THE LEASE
+#   - ROWS FOR THE SAME RECIPIENT GO OUT AS ONE DIGEST, SUPERSEDED ONES AS NONE (SEE notification_coalescing)
+#   - ONCE AN HOUR THE WORKER DELETES FINISHED ROWS: "sent" / "superseded" AFTER
+#     finished_notification_retention_days, "dead" AFTER dead_notification_retention_days
+#
+# RUN IT INSIDE THE ADMIN DASHBOARD (DEFAULT, SEE AdminDashboard) OR AS ITS OWN PROCESS:
+#     python notification_outbox.py
+# MAIL GOES THROUGH THE SHARED SESSION POOL IN mail_transport.py (SEE THERE FOR THE SRT_SMTP_* SETTINGS
+# THAT POINT IT AT A LOCAL SMTP STAND-IN FOR TESTS)
+
+import os
+import random
+import smtplib
+import threading
+import time
+import traceback
+from datetime import datetime, timedelta
+
+import database_manager
+import mail_transport
+import user_email_list # NOTIFICATIONS
+from notification_coalescing import (coalesce_notifications, coalescing_key, build_digest_line,
+                                     notification_coalescing_window_seconds)
+
+# DELIVERY CONFIG
+outbox_poll_interval_seconds = 2
+outbox_claim_batch_size = 50
+maximum_delivery_attempts = 6
+retry_base_delay_seconds = 30
+retry_maximum_delay_seconds = 3600
+# A "sending" ROW OLDER THAN THIS BELONGED TO A WORKER THAT DIED, SEND IT AGAIN
+sending_lease_seconds = 300
+# MOST NOT-YET-DUE ROWS SWEPT INTO ONE CLAIM ALONGSIDE THE DUE ONES OF THE SAME RECIPIENTS
+outbox_sweep_row_limit = 1000
+# PAUSE AFTER AN UNEXPECTED ERROR IN THE WORKER LOOP, SO A REPEATING BUG DOESN'T SPIN THE CPU OR FLOOD THE LOG
+worker_error_backoff_seconds = 30
+# MISSING SMTP SETTINGS / REJECTED LOGIN: THE ROW WAITS THIS LONG AND TRIES AGAIN WITHOUT USING UP AN ATTEMPT
+configuration_retry_delay_seconds = 300
+# HOUSEKEEPING: FINISHED ROWS ARE ONLY KEPT FOR LOOKING BACK, DEAD ONES LONGER SO THEY CAN STILL BE RETRIED
+finished_notification_retention_days = 7
+dead_notification_retention_days = 30
+outbox_prune_interval_seconds = 3600
+
+# AdminDashboard RUNS A WORKER THREAD ITSELF UNLESS SRT_OUTBOX_IN_DASHBOARD=0 (THEN RUN THIS FILE SEPARATELY)
+run_worker_in_dashboard = os.environ.get("SRT_OUTBOX_IN_DASHBOARD", "1") != "0"
+
+# delivery_status VALUES
+outbox_status_pending = "pending"
+outbox_status_sending = "sending"
+outbox_status_sent = "sent"
+outbox_status_dead = "dead"
+# A NEWER ROW FOR THE SAME RESERVATION AND RECIPIENT WENT OUT INSTEAD
+outbox_status_superseded = "superseded"
+
+
+# WRITE SIDE (INSIDE THE CALLER'S TRANSACTION)
+
+def render_status_message(detail_row, new_status):
+    # SAME TEXT THE DASHBOARD USED TO SEND DIRECTLY
+    email_subject_string = "Reservation Update: " + new_status
+    email_body_string = "Dear " + (detail_row['full_name'] or "Student") + ",\n\n"
+    email_body_string += ("Your reservation for " + detail_row['room_name'] + " on " + str(detail_row['start_time'])
+                          + " has been " + new_status + ".\n\n")
+    email_body_string += "Regards,\nCampus Administration"
+    return email_subject_string, email_body_string
+
+
+def enqueue_status_notifications(unit_of_work, reservation_id_list, new_status):
+    # ONE OUTBOX ROW PER (RESERVATION, RECIPIENT). RUN THIS ON THE UNIT OF WORK THAT CHANGED THE STATUS.
+    # THE ROWS WAIT OUT THE COALESCING WINDOW SO A BULK ACTION BECOMES ONE DIGEST PER RECIPIENT
+    if len(reservation_id_list) == 0:
+        return 0
+    detail_row_list = unit_of_work.fetch_all(
+        """
+        SELECT r.reservation_id, r.full_name, rm.room_name, r.start_time
+        FROM reservations r
+        JOIN users u ON r.user_id = u.user_id
+        JOIN rooms rm ON r.room_id = rm.room_id
+        WHERE r.reservation_id IN (""" + ", ".join(["%s"] * len(reservation_id_list)) + ")",
+        tuple(reservation_id_list))
+
+    message_list = []
+    for detail_row in detail_row_list:
+        email_subject_string, email_body_string = render_status_message(detail_row, new_status)
+        message_list.append((detail_row['reservation_id'], new_status, email_subject_string, email_body_string,
+                             build_digest_line(detail_row, new_status)))
+    return enqueue_messages(unit_of_work, message_list)
+
+
+def enqueue_messages(unit_of_work, message_list):
+    # message_list: [(reservation_id, new_status, SUBJECT, BODY, DIGEST LINE)], EACH ONE GOES TO EVERY RECIPIENT
+    first_attempt_time = datetime.now() + timedelta(seconds=notification_coalescing_window_seconds)
+    outbox_row_list = []
+    for reservation_id, new_status, email_subject_string, email_body_string, digest_line_string in message_list:
+        for recipient_email_string in user_email_list.list_of_active_user_email_addresses:
+            outbox_row_list.append((reservation_id, new_status, recipient_email_string,
+                                    email_subject_string, email_body_string, digest_line_string,
+                                    outbox_status_pending, first_attempt_time))
+    if len(outbox_row_list) == 0:
+        return 0
+    unit_of_work.bulk_insert("notification_outbox",
+                             ["reservation_id", "new_status", "recipient_email", "message_subject",
+                              "message_body", "digest_line", "delivery_status", "next_attempt_at"],
+                             outbox_row_list)
+    return len(outbox_row_list)
+
+
+def get_outbox_counts():
+    # QUEUE DEPTH PER delivery_status (METRICS / ADMIN CHECKS)
+    count_row_list = database_manager.fetch_all(
+        "SELECT delivery_status, COUNT(*) AS row_count FROM notification_outbox GROUP BY delivery_status",
+        use_cache=False)
+    return {count_row["delivery_status"]: int(count_row["row_count"]) for count_row in count_row_list}
+
+
+def retry_dead_notifications():
+    # PUT EVERY DEAD-LETTERED ROW BACK IN THE QUEUE (E.G. AFTER FIXING THE SMTP PASSWORD)
+    return database_manager.execute_query(
+        "UPDATE notification_outbox SET delivery_status = %s, attempt_count = 0, next_attempt_at = %s "
+        "WHERE delivery_status = %s", (outbox_status_pending, datetime.now(), outbox_status_dead))
+
+
+def prune_finished_notifications():
+    # -> HOW MANY ROWS WERE DELETED. "pending" AND "sending" ROWS ARE NEVER TOUCHED, HOWEVER OLD
+    current_time = datetime.now()
+    with database_manager.transaction() as unit_of_work:
+        finished_result = unit_of_work.execute(
+            "DELETE FROM notification_outbox WHERE delivery_status IN (%s, %s) AND created_at < %s",
+            (outbox_status_sent, outbox_status_superseded,
+             current_time - timedelta(days=finished_notification_retention_days)))
+        dead_result = unit_of_work.execute(
+            "DELETE FROM notification_outbox WHERE delivery_status = %s AND created_at < %s",
+            (outbox_status_dead, current_time - timedelta(days=dead_notification_retention_days)))
+    return finished_result["affected_rows"] + dead_result["affected_rows"]
+
+
+
+# DELIVERY SIDE
+
+def retry_delay_seconds(attempt_count):
+    backoff_delay = min(retry_base_delay_seconds * (2 ** (attempt_count - 1)), retry_maximum_delay_seconds)
+    # JITTER: WORKERS THAT FAILED TOGETHER DON'T ALL RETRY IN THE SAME SECOND
+    return backoff_delay * random.uniform(0.8, 1.2)
+
+
+def is_configuration_error(delivery_error):
+    # THE SERVER NEVER LOOKED AT THE MESSAGE, SO THE MESSAGE ISN'T WHAT FAILED
+    return isinstance(delivery_error, (mail_transport.SmtpConfigurationError, smtplib.SMTPAuthenticationError))
+
+
+def is_permanent_delivery_error(delivery_error):
+    # 5xx FOR THIS MESSAGE = RETRYING WON'T HELP. A FAILED LOGIN IS CONFIGURATION, NOT THE MESSAGE: KEEP RETRYING
+    if is_configuration_error(delivery_error):
+        return False
+    if isinstance(delivery_error, smtplib.SMTPRecipientsRefused):
+        return all(refusal[0] >= 500 for refusal in delivery_error.recipients.values())
+    if isinstance(delivery_error, smtplib.SMTPResponseException):
+        return 500 <= delivery_error.smtp_code < 600
+    return False
+
+
+class OutboxDeliveryWorker:
+    def __init__(self, poll_interval_seconds=None, claim_batch_size=None):
+        self.poll_interval_seconds = poll_interval_seconds or outbox_poll_interval_seconds
+        self.claim_batch_size = claim_batch_size or outbox_claim_batch_size
+        self.is_running = False
+        self.worker_thread = None
+        # SET BY wake() SO A FRESH BATCH GOES OUT WITHOUT WAITING FOR THE NEXT POLL
+        self.wake_event = threading.Event()
+        self.statistics_lock = threading.Lock()
+        self.statistics_dictionary = {
+            "runs": 0,
+            "claimed": 0,
+            "sent": 0,
+            "failed_attempts": 0,
+            "retries_scheduled": 0,
+            "configuration_waits": 0,
+            "dead_lettered": 0,
+            "superseded": 0,
+            "digests_sent": 0,
+            "pruned": 0,
+            "loop_errors": 0,
+            "last_error": None,
+        }
+
+    def count(self, statistic_name, amount=1):
+        with self.statistics_lock:
+            self.statistics_dictionary[statistic_name] += amount
+
+    # DATABASE SIDE
+
+    def claim_due_notifications(self):
+        # MARK A BATCH "sending" IN ONE SHORT TRANSACTION, SO TWO WORKERS NEVER SEND THE SAME ROW
+        # DUE ROWS FIRST, THEN EVERY FRESH PENDING ROW OF THE SAME RECIPIENTS (STILL INSIDE ITS COALESCING
+        # WINDOW), SO ONE DIGEST CARRIES EVERYTHING QUEUED FOR THAT RECIPIENT SO FAR
+        current_time = datetime.now()
+        lease_expired_time = current_time - timedelta(seconds=sending_lease_seconds)
+        # MYSQL: OTHER WORKERS SKIP THE ROWS WE LOCKED INSTEAD OF WAITING (SQLITE: BEGIN IMMEDIATE SERIALIZES)
+        lock_clause = " FOR UPDATE SKIP LOCKED" if database_manager.get_backend_name() == "mysql" else ""
+        claimed_columns_sql = ("SELECT outbox_id, reservation_id, new_status, recipient_email, message_subject, "
+                               "message_body, digest_line, attempt_count FROM notification_outbox ")
+        with database_manager.transaction() as unit_of_work:
+            claimed_row_list = unit_of_work.fetch_all(
+                claimed_columns_sql
+                + "WHERE (delivery_status = %s AND next_attempt_at <= %s) "
+                "OR (delivery_status = %s AND claimed_at < %s) "
+                "ORDER BY next_attempt_at LIMIT " + str(self.claim_batch_size) + lock_clause,
+                (outbox_status_pending, current_time, outbox_status_sending, lease_expired_time))
+            if claimed_row_list:
+                recipient_email_list = list(dict.fromkeys(claimed_row["recipient_email"]
+                                                          for claimed_row in claimed_row_list))
+                # attempt_count = 0: A ROW BACKING OFF AFTER A FAILURE KEEPS ITS OWN SCHEDULE
+                swept_row_list = unit_of_work.fetch_all(
+                    claimed_columns_sql
+                    + "WHERE delivery_status = %s AND attempt_count = 0 AND next_attempt_at > %s "
+                    "AND recipient_email IN (" + ", ".join(["%s"] * len(recipient_email_list)) + ") "
+                    "ORDER BY outbox_id LIMIT " + str(outbox_sweep_row_limit) + lock_clause,
+                    (outbox_status_pending, current_time) + tuple(recipient_email_list))
+                claimed_row_list, superseded_row_list = self.drop_superseded_rows(
+                    unit_of_work, claimed_row_list + swept_row_list, lock_clause)
+                if superseded_row_list:
+                    self.count("superseded", len(superseded_row_list))
+                    self.update_rows(unit_of_work, superseded_row_list, "delivery_status = %s",
+                                     (outbox_status_superseded,))
+                if claimed_row_list:
+                    self.update_rows(unit_of_work, claimed_row_list, "delivery_status = %s, claimed_at = %s",
+                                     (outbox_status_sending, current_time))
+        self.count("claimed", len(claimed_row_list))
+        return claimed_row_list
+
+    def drop_superseded_rows(self, unit_of_work, claimed_row_list, lock_clause):
+        # -> (CLAIMED ROWS STILL WORTH SENDING, ROWS TO MARK superseded)
+        # THE SWEEP LEAVES ROWS THAT ARE BACKING OFF AFTER A FAILURE ALONE, SO "Approved" (RETRYING) AND A NEWER
+        # "Rejected" FOR THE SAME RESERVATION CAN END UP IN DIFFERENT CLAIMS AND GO OUT IN THE WRONG ORDER.
+        # LOOK AT EVERY PENDING ROW WITH THE SAME coalescing_key: ONLY THE NEWEST ONE MAY STILL BE SENT, WHETHER
+        # OR NOT IT IS IN THIS CLAIM (IF IT ISN'T, THE CLAIMED OLDER ROWS GO AND IT KEEPS ITS OWN SCHEDULE)
+        reservation_id_list = list(dict.fromkeys(claimed_row["reservation_id"] for claimed_row in claimed_row_list
+                                                 if claimed_row["reservation_id"] is not None))
+        if len(reservation_id_list) == 0:
+            return claimed_row_list, []
+        recipient_email_list = list(dict.fromkeys(claimed_row["recipient_email"]
+                                                  for claimed_row in claimed_row_list))
+        claimed_outbox_id_set = set(claimed_row["outbox_id"] for claimed_row in claimed_row_list)
+        pending_row_list = unit_of_work.fetch_all(
+            "SELECT outbox_id, reservation_id, new_status, recipient_email FROM notification_outbox "
+            "WHERE delivery_status = %s "
+            "AND reservation_id IN (" + ", ".join(["%s"] * len(reservation_id_list)) + ") "
+            "AND recipient_email IN (" + ", ".join(["%s"] * len(recipient_email_list)) + ")" + lock_clause,
+            (outbox_status_pending,) + tuple(reservation_id_list) + tuple(recipient_email_list))
+        unclaimed_row_list = [pending_row for pending_row in pending_row_list
+                              if pending_row["outbox_id"] not in claimed_outbox_id_set]
+
+        newest_outbox_id_by_key = {}
+        for outbox_row in claimed_row_list + unclaimed_row_list:
+            row_key = coalescing_key(outbox_row)
+            newest_outbox_id_by_key[row_key] = max(newest_outbox_id_by_key.get(row_key, 0), outbox_row["outbox_id"])
+
+        kept_row_list = []
+        superseded_row_list = []
+        for claimed_row in claimed_row_list:
+            if claimed_row["outbox_id"] < newest_outbox_id_by_key[coalescing_key(claimed_row)]:
+                superseded_row_list.append(claimed_row)
+            else:
+                kept_row_list.append(claimed_row)
+        claimed_key_set = set(coalescing_key(claimed_row) for claimed_row in claimed_row_list)
+        for unclaimed_row in unclaimed_row_list:
+            row_key = coalescing_key(unclaimed_row)
+            # THE CROSS PRODUCT OF THE TWO IN (...) LISTS ALSO MATCHES PAIRS NOBODY CLAIMED, LEAVE THOSE ALONE
+            if row_key in claimed_key_set and unclaimed_row["outbox_id"] < newest_outbox_id_by_key[row_key]:
+                superseded_row_list.append(unclaimed_row)
+        return kept_row_list, superseded_row_list
+
+    def update_rows(self, unit_of_work, outbox_row_list, set_clause_sql, set_parameters):
+        # ONE UPDATE ... WHERE outbox_id IN (...) FOR A WHOLE DIGEST / CLAIM
+        outbox_id_list = [outbox_row["outbox_id"] for outbox_row in outbox_row_list]
+        unit_of_work.execute(
+            "UPDATE notification_outbox SET " + set_clause_sql
+            + " WHERE outbox_id IN (" + ", ".join(["%s"] * len(outbox_id_list)) + ")",
+            tuple(set_parameters) + tuple(outbox_id_list))
+
+    def mark_sent(self, outbox_row_list):
+        with database_manager.transaction() as unit_of_work:
+            self.update_rows(unit_of_work, outbox_row_list,
+                             "delivery_status = %s, sent_at = %s, attempt_count = attempt_count + 1, last_error = NULL",
+                             (outbox_status_sent, datetime.now()))
+
+    def mark_superseded(self, outbox_row_list):
+        with database_manager.transaction() as unit_of_work:
+            self.update_rows(unit_of_work, outbox_row_list, "delivery_status = %s", (outbox_status_superseded,))
+
+    def mark_failed(self, outbox_row, delivery_error):
+        attempt_count = int(outbox_row["attempt_count"]) + 1
+        error_text = type(delivery_error).__name__ + ": " + str(delivery_error)
+        self.count("failed_attempts")
+        with self.statistics_lock:
+            self.statistics_dictionary["last_error"] = error_text
+
+        if is_configuration_error(delivery_error):
+            # NOT THIS MESSAGE'S FAULT: KEEP ITS attempt_count, SO FIXING THE SETTINGS SENDS EVERYTHING
+            # INSTEAD OF FINDING THE WHOLE QUEUE DEAD-LETTERED
+            self.count("configuration_waits")
+            database_manager.execute_query(
+                "UPDATE notification_outbox SET delivery_status = %s, last_error = %s, next_attempt_at = %s "
+                "WHERE outbox_id = %s",
+                (outbox_status_pending, error_text,
+                 datetime.now() + timedelta(seconds=configuration_retry_delay_seconds), outbox_row["outbox_id"]))
+            return
+
+        if attempt_count >= maximum_delivery_attempts or is_permanent_delivery_error(delivery_error):
+            self.count("dead_lettered")
+            print("System: Giving up on notification " + str(outbox_row["outbox_id"]) + " to "
+                  + outbox_row["recipient_email"] + ": " + error_text)
+            database_manager.execute_query(
+                "UPDATE notification_outbox SET delivery_status = %s, attempt_count = %s, last_error = %s "
+                "WHERE outbox_id = %s",
+                (outbox_status_dead, attempt_count, error_text, outbox_row["outbox_id"]))
+            return
+
+        self.count("retries_scheduled")
+        next_attempt_time = datetime.now() + timedelta(seconds=retry_delay_seconds(attempt_count))
+        database_manager.execute_query(
+            "UPDATE notification_outbox SET delivery_status = %s, attempt_count = %s, last_error = %s, "
+            "next_attempt_at = %s WHERE outbox_id = %s",
+            (outbox_status_pending, attempt_count, error_text, next_attempt_time, outbox_row["outbox_id"]))
+
+    # SMTP SIDE
+
+    def run_once(self):
+        # ONE CLAIMED BATCH, COALESCED INTO DIGESTS, OVER ONE SMTP SESSION. RETURNS HOW MANY ROWS WERE HANDLED.
+        self.count("runs")
+        claimed_row_list = self.claim_due_notifications()
+        if len(claimed_row_list) == 0:
+            return 0
+        digest_list, superseded_row_list = coalesce_notifications(claimed_row_list)
+        if superseded_row_list:
+            self.count("superseded", len(superseded_row_list))
+            self.mark_superseded(superseded_row_list)
+
+        # THE WHOLE BATCH GOES OUT BACK TO BACK OVER ONE POOLED SESSION
+        email_message_list = []
+        for notification_digest in digest_list:
+            email_subject_string, email_body_string = notification_digest.render()
+            email_message_list.append(mail_transport.build_message(notification_digest.recipient_email,
+                                                                   email_subject_string, email_body_string))
+        send_error_list = mail_transport.get_shared_pool().send_messages(email_message_list)
+
+        for notification_digest, send_error in zip(digest_list, send_error_list):
+            if send_error is not None:
+                for outbox_row in notification_digest.outbox_row_list:
+                    self.mark_failed(outbox_row, send_error)
+                continue
+            self.count("digests_sent")
+            self.count("sent", len(notification_digest.outbox_row_list))
+            self.mark_sent(notification_digest.outbox_row_list)
+            print("System: Email sent successfully to " + notification_digest.recipient_email)
+        return len(claimed_row_list)
+
+    def serve_forever(self):
+        self.is_running = True
+        next_prune_time = time.monotonic()
+        while self.is_running:
+            wait_seconds = self.poll_interval_seconds
+            try:
+                handled_row_count = self.run_once()
+                if handled_row_count >= self.claim_batch_size:
+                    # MORE WAITING, DON'T SLEEP
+                    continue
+                # NOTHING TO SEND RIGHT NOW: KEEP THE POOLED SESSIONS WARM (OR LET GO OF THE DEAD ONES)
+                mail_transport.get_shared_pool().keep_alive_idle_sessions()
+                if time.monotonic() >= next_prune_time:
+                    # MOVED FIRST, SO A FAILING PRUNE IS TRIED AGAIN NEXT HOUR INSTEAD OF EVERY POLL
+                    next_prune_time = time.monotonic() + outbox_prune_interval_seconds
+                    self.count("pruned", prune_finished_notifications())
+            except database_manager.database_unavailable_error_types as database_error:
+                # ROWS STAY IN THE OUTBOX, TRY AGAIN NEXT POLL
+                print("System: Notification worker could not read the outbox: " + str(database_error))
+            except Exception as unexpected_error:
+                # THIS THREAD IS THE ONLY THING SENDING EMAIL: LOG IT, WAIT A BIT, KEEP GOING
+                # (CLAIMED ROWS LEFT "sending" ARE PICKED UP AGAIN WHEN THEIR LEASE RUNS OUT)
+                error_text = type(unexpected_error).__name__ + ": " + str(unexpected_error)
+                print("System: Notification worker error: " + error_text)
+                traceback.print_exc()
+                self.count("loop_errors")
+                with self.statistics_lock:
+                    self.statistics_dictionary["last_error"] = error_text
+                wait_seconds = worker_error_backoff_seconds
+            self.wake_event.wait(wait_seconds)
+            self.wake_event.clear()
+
+    # LIFECYCLE
+
+    def start_in_background(self):
+        if self.worker_thread is not None and self.worker_thread.is_alive():
+            return
+        self.worker_thread = threading.Thread(target=self.serve_forever, name="notification-outbox", daemon=True)
+        self.worker_thread.start()
+
+    def wake(self):
+        self.wake_event.set()
+
+    def stop(self, wait_seconds=5):
+        self.is_running = False
+        self.wake_event.set()
+        if self.worker_thread is not None:
+            self.worker_thread.join(wait_seconds)
+            self.worker_thread = None
+
+    def get_statistics(self):
+        with self.statistics_lock:
+            statistics_snapshot = dict(self.statistics_dictionary)
+        # LATENCY / THROUGHPUT ARE MEASURED BY THE POOL
+        statistics_snapshot["transport"] = mail_transport.get_shared_pool().get_statistics()
+        return statistics_snapshot
+
+
+# ONE IN-PROCESS WORKER, HOWEVER MANY TIMES THE ADMIN LOGS OUT AND BACK IN
+shared_worker = None
+
+
+def get_shared_worker():
+    global shared_worker
+    if shared_worker is None:
+        shared_worker = OutboxDeliveryWorker()
+    shared_worker.start_in_background()
+    return shared_worker
+
+
+if __name__ == "__main__":
+    outbox_worker = OutboxDeliveryWorker()
+    print("System: Notification worker sending through " + mail_transport.smtp_host_address + ":"
+          + str(mail_transport.smtp_port_number))
+    try:
+        outbox_worker.serve_forever()
+    except KeyboardInterrupt:
+        print("System: Notification worker stopping.")
+        print(outbox_worker.get_statistics())
+    finally:
+        mail_transport.close_shared_pool()
+        database_manager.close_pool()
@@ -0,0 +1,164 @@
+# BACKEND CODE FOR THE READ-THROUGH QUERY RESULT CACHE
+# KEYED ON SQL + PARAMETERS, EXPIRES BY TTL, EVICTS LEAST RECENTLY USED, INVALIDATED BY TABLE NAME
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# TABLE NAMES COME AFTER THESE KEYWORDS IN EVERY QUERY THIS APP RUNS
+table_name_pattern = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?(\w+)`?", re.IGNORECASE)
+
+# RESULTS OF THESE CHANGE WITH THE CLOCK, NOT WITH THE DATA, SO THEY ARE NEVER CACHED
+uncacheable_query_pattern = re.compile(r"\b(?:NOW|CURDATE|CURTIME|RAND|UUID|SYSDATE)\s*\(|\bCURRENT_(?:TIMESTAMP|DATE|TIME)\b|\bFOR\s+UPDATE\b", re.IGNORECASE)
+
+
+def extract_table_names(sql_query_string):
+    return set(table_name.lower() for table_name in table_name_pattern.findall(sql_query_string))
+
+
+class QueryResultCache:
+    def __init__(self, maximum_entries=256, default_ttl_seconds=5):
+        self.maximum_entries = maximum_entries
+        self.default_ttl_seconds = default_ttl_seconds
+
+        self.cache_lock = threading.Lock()
+        # KEY -> [rows_list, expiry_time, table_name_set]
+        self.cached_entries = OrderedDict()
+        # TABLE NAME -> SET OF KEYS THAT READ FROM IT
+        self.keys_by_table_name = {}
+        # BUMPED ON EVERY INVALIDATION, A LOAD THAT RACED WITH A WRITE IS NOT STORED
+        self.invalidation_generation = 0
+
+        self.statistics_dictionary = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "uncacheable": 0,
+        }
+
+    def make_cache_key(self, sql_query_string, parameters_tuple):
+        try:
+            cache_key = (sql_query_string, tuple(parameters_tuple))
+            hash(cache_key)
+        except TypeError:
+            return None
+        return cache_key
+
+    def is_cacheable(self, sql_query_string):
+        if uncacheable_query_pattern.search(sql_query_string):
+            return False
+        return len(extract_table_names(sql_query_string)) > 0
+
+    def get_or_load(self, sql_query_string, parameters_tuple, load_rows_function, ttl_seconds=None):
+        cache_key = None
+        if self.is_cacheable(sql_query_string):
+            cache_key = self.make_cache_key(sql_query_string, parameters_tuple)
+
+        if cache_key is None:
+            with self.cache_lock:
+                self.statistics_dictionary["uncacheable"] += 1
+            return load_rows_function()
+
+        cached_rows_list = self.get(cache_key)
+        if cached_rows_list is not None:
+            return cached_rows_list
+
+        with self.cache_lock:
+            generation_before_load = self.invalidation_generation
+        loaded_rows_list = load_rows_function()
+        self.put(cache_key, loaded_rows_list, extract_table_names(sql_query_string), ttl_seconds, generation_before_load)
+        return loaded_rows_list
+
+    def get(self, cache_key):
+        with self.cache_lock:
+            cached_entry = self.cached_entries.get(cache_key)
+            if cached_entry is None:
+                self.statistics_dictionary["misses"] += 1
+                return None
+
+            if time.monotonic() >= cached_entry[1]:
+                self.remove_entry_locked(cache_key)
+                self.statistics_dictionary["expired"] += 1
+                self.statistics_dictionary["misses"] += 1
+                return None
+
+            self.cached_entries.move_to_end(cache_key)
+            self.statistics_dictionary["hits"] += 1
+            cached_rows_list = cached_entry[0]
+
+        # HAND OUT COPIES SO A CALLER EDITING ITS ROWS CAN'T CORRUPT THE CACHE
+        return self.copy_rows(cached_rows_list)
+
+    def put(self, cache_key, rows_list, table_name_set, ttl_seconds=None, generation_before_load=None):
+        if ttl_seconds is None:
+            ttl_seconds = self.default_ttl_seconds
+        if ttl_seconds <= 0 or self.maximum_entries <= 0:
+            return
+
+        with self.cache_lock:
+            if generation_before_load is not None and generation_before_load != self.invalidation_generation:
+                return
+            if cache_key in self.cached_entries:
+                self.remove_entry_locked(cache_key)
+
+            self.cached_entries[cache_key] = [self.copy_rows(rows_list), time.monotonic() + ttl_seconds, table_name_set]
+            for table_name in table_name_set:
+                self.keys_by_table_name.setdefault(table_name, set()).add(cache_key)
+
+            while len(self.cached_entries) > self.maximum_entries:
+                oldest_cache_key = next(iter(self.cached_entries))
+                self.remove_entry_locked(oldest_cache_key)
+                self.statistics_dictionary["evictions"] += 1
+
+    def invalidate_tables(self, table_name_set):
+        with self.cache_lock:
+            self.invalidation_generation += 1
+            for table_name in table_name_set:
+                for cache_key in list(self.keys_by_table_name.get(table_name.lower(), ())):
+                    self.remove_entry_locked(cache_key)
+                    self.statistics_dictionary["invalidations"] += 1
+
+    def invalidate_for_write(self, sql_query_string):
+        self.invalidate_tables(extract_table_names(sql_query_string))
+
+    def clear(self):
+        with self.cache_lock:
+            self.invalidation_generation += 1
+            self.cached_entries.clear()
+            self.keys_by_table_name.clear()
+
+    def get_statistics(self):
+        with self.cache_lock:
+            statistics_snapshot = dict(self.statistics_dictionary)
+            statistics_snapshot["entries"] = len(self.cached_entries)
+            statistics_snapshot["maximum_entries"] = self.maximum_entries
+        lookup_count = statistics_snapshot["hits"] + statistics_snapshot["misses"]
+        if lookup_count > 0:
+            statistics_snapshot["hit_ratio"] = statistics_snapshot["hits"] / lookup_count
+        else:
+            statistics_snapshot["hit_ratio"] = 0.0
+        return statistics_snapshot
+
+    def reset_statistics(self):
+        with self.cache_lock:
+            for statistic_name in self.statistics_dictionary:
+                self.statistics_dictionary[statistic_name] = 0
+
+    # INTERNAL HELPERS
+
+    def remove_entry_locked(self, cache_key):
+        removed_entry = self.cached_entries.pop(cache_key, None)
+        if removed_entry is None:
+            return
+        for table_name in removed_entry[2]:
+            table_key_set = self.keys_by_table_name.get(table_name)
+            if table_key_set is not None:
+                table_key_set.discard(cache_key)
+                if len(table_key_set) == 0:
+                    del self.keys_by_table_name[table_name]
+
+    def copy_rows(self, rows_list):
+        return [dict(row) if isinstance(row, dict) else row for row in rows_list]
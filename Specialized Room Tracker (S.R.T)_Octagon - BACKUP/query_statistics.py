@@ -0,0 +1,181 @@
+# BACKEND CODE FOR QUERY TIMING, PER-STATEMENT STATISTICS AND THE SLOW-QUERY LOG
+
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+# FILES THAT ARE PART OF THE DATABASE LAYER, THE "CALLING SITE" IS THE FIRST FRAME OUTSIDE THESE
+database_layer_file_names = {
+    "database_manager.py",
+    "connection_pool.py",
+    "query_cache.py",
+    "query_statistics.py",
+    "contextlib.py",
+}
+
+string_literal_pattern = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+number_literal_pattern = re.compile(r"\b\d+(?:\.\d+)?\b")
+placeholder_list_pattern = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))+\s*\)")
+whitespace_pattern = re.compile(r"\s+")
+
+
+def normalize_statement(sql_query_string):
+    # "SELECT ... WHERE id IN (%s, %s, %s) AND x = 'Pending'" -> "SELECT ... WHERE id IN (...) AND x = ?"
+    normalized_statement = string_literal_pattern.sub("?", sql_query_string)
+    normalized_statement = number_literal_pattern.sub("?", normalized_statement)
+    normalized_statement = placeholder_list_pattern.sub("(...)", normalized_statement)
+    normalized_statement = whitespace_pattern.sub(" ", normalized_statement).strip()
+    return normalized_statement
+
+
+def find_calling_site():
+    calling_frame = sys._getframe(1)
+    while calling_frame is not None:
+        frame_file_name = os.path.basename(calling_frame.f_code.co_filename)
+        if frame_file_name not in database_layer_file_names:
+            function_name = calling_frame.f_code.co_name
+            owner_object = calling_frame.f_locals.get("self")
+            if owner_object is not None:
+                return type(owner_object).__name__ + "." + function_name
+            return os.path.splitext(frame_file_name)[0] + "." + function_name
+        calling_frame = calling_frame.f_back
+    return "unknown"
+
+
+def percentile(sorted_values_list, percentile_rank):
+    if len(sorted_values_list) == 0:
+        return 0.0
+    value_index = int(round((percentile_rank / 100.0) * (len(sorted_values_list) - 1)))
+    return sorted_values_list[value_index]
+
+
+class StatementStatistics:
+    def __init__(self, normalized_statement, latency_sample_size):
+        self.normalized_statement = normalized_statement
+        self.call_count = 0
+        self.cache_hit_count = 0
+        self.error_count = 0
+        self.total_seconds = 0.0
+        self.maximum_seconds = 0.0
+        self.total_rows = 0
+        # ONLY THE LATEST N LATENCIES ARE KEPT FOR THE PERCENTILES, MEMORY STAYS FLAT
+        self.latency_samples = deque(maxlen=latency_sample_size)
+        self.calling_site_counts = {}
+
+    def to_dictionary(self):
+        sorted_latency_list = sorted(self.latency_samples)
+        database_call_count = self.call_count - self.cache_hit_count
+        return {
+            "statement": self.normalized_statement,
+            "calls": self.call_count,
+            "cache_hits": self.cache_hit_count,
+            "errors": self.error_count,
+            "rows": self.total_rows,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "average_ms": round(self.total_seconds * 1000 / database_call_count, 3) if database_call_count > 0 else 0.0,
+            "p50_ms": round(percentile(sorted_latency_list, 50) * 1000, 3),
+            "p95_ms": round(percentile(sorted_latency_list, 95) * 1000, 3),
+            "max_ms": round(self.maximum_seconds * 1000, 3),
+            "calling_sites": dict(self.calling_site_counts),
+        }
+
+
+class QueryStatisticsCollector:
+    def __init__(self, slow_query_threshold_seconds=0.2, slow_query_log_size=200,
+                 latency_sample_size=1000, print_slow_queries=True):
+        self.slow_query_threshold_seconds = slow_query_threshold_seconds
+        self.latency_sample_size = latency_sample_size
+        self.print_slow_queries = print_slow_queries
+        self.is_enabled = True
+
+        self.statistics_lock = threading.Lock()
+        self.statistics_by_statement = {}
+        self.slow_query_log = deque(maxlen=slow_query_log_size)
+        # SAME SQL TEXT IS NORMALIZED THOUSANDS OF TIMES, REMEMBER THE RESULT
+        self.normalized_statement_memo = {}
+
+    def get_normalized_statement(self, sql_query_string):
+        normalized_statement = self.normalized_statement_memo.get(sql_query_string)
+        if normalized_statement is None:
+            normalized_statement = normalize_statement(sql_query_string)
+            if len(self.normalized_statement_memo) < 4096:
+                self.normalized_statement_memo[sql_query_string] = normalized_statement
+        return normalized_statement
+
+    def record(self, sql_query_string, elapsed_seconds, row_count, served_from_cache=False, failed=False):
+        if not self.is_enabled:
+            return
+
+        normalized_statement = self.get_normalized_statement(sql_query_string)
+        calling_site = find_calling_site()
+        is_slow = (not served_from_cache) and elapsed_seconds >= self.slow_query_threshold_seconds
+
+        with self.statistics_lock:
+            statement_statistics = self.statistics_by_statement.get(normalized_statement)
+            if statement_statistics is None:
+                statement_statistics = StatementStatistics(normalized_statement, self.latency_sample_size)
+                self.statistics_by_statement[normalized_statement] = statement_statistics
+
+            statement_statistics.call_count += 1
+            statement_statistics.calling_site_counts[calling_site] = statement_statistics.calling_site_counts.get(calling_site, 0) + 1
+            if row_count is not None and row_count > 0:
+                statement_statistics.total_rows += row_count
+            if failed:
+                statement_statistics.error_count += 1
+
+            if served_from_cache:
+                statement_statistics.cache_hit_count += 1
+            else:
+                statement_statistics.total_seconds += elapsed_seconds
+                statement_statistics.latency_samples.append(elapsed_seconds)
+                if elapsed_seconds > statement_statistics.maximum_seconds:
+                    statement_statistics.maximum_seconds = elapsed_seconds
+
+            if is_slow:
+                self.slow_query_log.append({
+                    "logged_at": time.time(),
+                    "statement": normalized_statement,
+                    "elapsed_ms": round(elapsed_seconds * 1000, 3),
+                    "rows": row_count,
+                    "calling_site": calling_site,
+                })
+
+        if is_slow and self.print_slow_queries:
+            print("System: Slow query (" + str(round(elapsed_seconds * 1000, 1)) + " ms) from "
+                  + calling_site + ": " + normalized_statement[:200])
+
+    def dump(self, sort_by="total_ms"):
+        with self.statistics_lock:
+            statement_dictionary_list = [statement_statistics.to_dictionary()
+                                         for statement_statistics in self.statistics_by_statement.values()]
+            slow_query_list = list(self.slow_query_log)
+        statement_dictionary_list.sort(key=lambda statement_dictionary: statement_dictionary[sort_by], reverse=True)
+        return {
+            "slow_query_threshold_ms": round(self.slow_query_threshold_seconds * 1000, 3),
+            "statements": statement_dictionary_list,
+            "slow_queries": slow_query_list,
+        }
+
+    def format_report(self, limit=20):
+        dumped_statistics = self.dump()
+        report_line_list = ["-" * 50, "QUERY STATISTICS (TOP " + str(limit) + " BY TOTAL TIME)", "-" * 50]
+        for statement_dictionary in dumped_statistics["statements"][:limit]:
+            report_line_list.append(
+                "calls=" + str(statement_dictionary["calls"])
+                + " cache_hits=" + str(statement_dictionary["cache_hits"])
+                + " rows=" + str(statement_dictionary["rows"])
+                + " p50=" + str(statement_dictionary["p50_ms"]) + "ms"
+                + " p95=" + str(statement_dictionary["p95_ms"]) + "ms"
+                + " max=" + str(statement_dictionary["max_ms"]) + "ms"
+            )
+            report_line_list.append("    " + statement_dictionary["statement"][:200])
+        report_line_list.append("SLOW QUERIES LOGGED: " + str(len(dumped_statistics["slow_queries"])))
+        return "\n".join(report_line_list)
+
+    def reset(self):
+        with self.statistics_lock:
+            self.statistics_by_statement.clear()
+            self.slow_query_log.clear()
@@ -0,0 +1,95 @@
+# BACKEND CODE FOR READ/WRITE SPLITTING
+# WRITES ALWAYS GO TO THE PRIMARY. READS GO ROUND-ROBIN TO THE READ REPLICAS, EXCEPT:
+#   - INSIDE A TRANSACTION (MUST SEE OUR OWN UNCOMMITTED ROWS)
+#   - FOR A SHORT WINDOW AFTER THIS PROCESS WROTE SOMETHING (READ-YOUR-WRITES, REPLICAS LAG A LITTLE)
+#   - WHILE A REPLICA IS COOLING DOWN AFTER A CONNECTION FAILURE
+
+import threading
+import time
+
+
+class ReadWriteRouter:
+    def __init__(self, replica_pool_list, read_your_writes_window_seconds=5, replica_retry_cooldown_seconds=30):
+        self.replica_pool_list = list(replica_pool_list)
+        self.read_your_writes_window_seconds = read_your_writes_window_seconds
+        self.replica_retry_cooldown_seconds = replica_retry_cooldown_seconds
+
+        self.router_lock = threading.Lock()
+        self.next_replica_index = 0
+        # ONE DESKTOP CLIENT = ONE USER, SO THE PIN IS PROCESS-WIDE (WRITES AND READS RUN ON DIFFERENT WORKER THREADS)
+        self.last_write_time = None
+        # replica pool -> monotonic time it may be tried again
+        self.replica_retry_after_time = {}
+
+        self.statistics_dictionary = {
+            "primary_reads": 0,
+            "replica_reads": 0,
+            "pinned_reads": 0,
+            "transaction_reads": 0,
+            "replica_failures": 0,
+            "writes": 0,
+        }
+
+    def has_replicas(self):
+        return len(self.replica_pool_list) > 0
+
+    def note_write(self):
+        with self.router_lock:
+            self.last_write_time = time.monotonic()
+            self.statistics_dictionary["writes"] += 1
+
+    def is_pinned_to_primary(self):
+        if self.last_write_time is None:
+            return False
+        return time.monotonic() - self.last_write_time < self.read_your_writes_window_seconds
+
+    def choose_replica_pool(self, inside_transaction):
+        # None MEANS "USE THE PRIMARY"
+        with self.router_lock:
+            if inside_transaction:
+                self.statistics_dictionary["transaction_reads"] += 1
+                self.statistics_dictionary["primary_reads"] += 1
+                return None
+            if not self.replica_pool_list:
+                self.statistics_dictionary["primary_reads"] += 1
+                return None
+            if self.is_pinned_to_primary():
+                self.statistics_dictionary["pinned_reads"] += 1
+                self.statistics_dictionary["primary_reads"] += 1
+                return None
+
+            current_time = time.monotonic()
+            for attempt_index in range(len(self.replica_pool_list)):
+                candidate_pool = self.replica_pool_list[self.next_replica_index]
+                self.next_replica_index = (self.next_replica_index + 1) % len(self.replica_pool_list)
+                if self.replica_retry_after_time.get(candidate_pool, 0) <= current_time:
+                    self.statistics_dictionary["replica_reads"] += 1
+                    return candidate_pool
+
+            # EVERY REPLICA IS COOLING DOWN
+            self.statistics_dictionary["primary_reads"] += 1
+            return None
+
+    def report_replica_failure(self, replica_pool):
+        with self.router_lock:
+            self.statistics_dictionary["replica_failures"] += 1
+            # THE READ WAS COUNTED AS A REPLICA READ BUT WILL BE RETRIED ON THE PRIMARY
+            self.statistics_dictionary["replica_reads"] -= 1
+            self.statistics_dictionary["primary_reads"] += 1
+            self.replica_retry_after_time[replica_pool] = time.monotonic() + self.replica_retry_cooldown_seconds
+
+    def close_all(self):
+        for replica_pool in self.replica_pool_list:
+            replica_pool.close_all()
+
+    def get_statistics(self):
+        with self.router_lock:
+            statistics_snapshot = dict(self.statistics_dictionary)
+            current_time = time.monotonic()
+            statistics_snapshot["replicas"] = len(self.replica_pool_list)
+            statistics_snapshot["replicas_cooling_down"] = len([
+                replica_pool for replica_pool in self.replica_pool_list
+                if self.replica_retry_after_time.get(replica_pool, 0) > current_time
+            ])
+            statistics_snapshot["pinned_to_primary"] = self.is_pinned_to_primary()
+        return statistics_snapshot
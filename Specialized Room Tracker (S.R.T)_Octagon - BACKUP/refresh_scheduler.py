@@ -0,0 +1,186 @@
+# FRONTEND CODE FOR DECIDING WHEN A DASHBOARD REFRESHES
+# SHARED BY AdminDashboard AND StudentDashboard INSTEAD OF A FIXED QTimer:
+#   - REFRESHES THAT FIND NOTHING NEW BACK OFF EXPONENTIALLY (2s, 4s, 8s ... UP TO THE MAXIMUM)
+#   - A DETECTED CHANGE OR ANY CLICK / KEY PRESS IN THE DASHBOARD SNAPS BACK TO THE FAST INTERVAL
+#   - NOTHING RUNS WHILE THE DASHBOARD IS HIDDEN OR MINIMIZED (E.G. AFTER LOGOUT), ONE REFRESH ON RETURN
+#   - WHILE change_notifier PUSHES ARRIVE, ONLY A SLOW SAFETY POLL IS KEPT
+#
+# THE DASHBOARD CONNECTS refresh_due TO ITS LOAD FUNCTION AND CALLS report_refresh_result(had_changes)
+# WHEN THE RESULT IS IN.
+
+import json
+import os
+
+from PySide6.QtCore import QObject, QTimer, QEvent, Signal
+from PySide6.QtWidgets import QApplication, QWidget
+
+# REFRESH INTERVAL CONFIG, PER DASHBOARD
+# OVERRIDE WITHOUT EDITING CODE: SRT_REFRESH_SETTINGS='{"admin": {"fast_interval_milliseconds": 5000}}'
+refresh_interval_settings = {
+    "admin": {
+        "fast_interval_milliseconds": 2000,
+        "maximum_interval_milliseconds": 30000,
+        "backoff_factor": 2.0,
+        # SAFETY POLL WHILE PUSH NOTIFICATIONS WORK
+        "push_interval_milliseconds": 60000,
+    },
+    "student": {
+        "fast_interval_milliseconds": 30000,
+        "maximum_interval_milliseconds": 300000,
+        "backoff_factor": 2.0,
+        "push_interval_milliseconds": 120000,
+    },
+}
+
+# EVENTS THAT COUNT AS "THE USER IS DOING SOMETHING HERE"
+user_activity_event_types = (
+    QEvent.MouseButtonPress,
+    QEvent.KeyPress,
+    QEvent.Wheel,
+)
+
+
+def get_refresh_settings(profile_name):
+    profile_settings = dict(refresh_interval_settings[profile_name])
+    override_json_string = os.environ.get("SRT_REFRESH_SETTINGS")
+    if override_json_string:
+        try:
+            profile_settings.update(json.loads(override_json_string).get(profile_name, {}))
+        except (ValueError, AttributeError):
+            print("System: Ignoring malformed SRT_REFRESH_SETTINGS.")
+    return profile_settings
+
+
+class RefreshScheduler(QObject):
+    refresh_due = Signal()
+
+    def __init__(self, watched_widget, profile_name, parent=None):
+        super().__init__(parent)
+        self.watched_widget = watched_widget
+        self.refresh_settings = get_refresh_settings(profile_name)
+
+        self.current_interval_milliseconds = self.refresh_settings["fast_interval_milliseconds"]
+        self.consecutive_unchanged_count = 0
+        self.is_push_active = False
+        # DASHBOARDS ARE BUILT BEFORE show(), THE FIRST Show EVENT STARTS US
+        self.is_paused = not watched_widget.isVisible()
+        # SOMETHING ASKED FOR A REFRESH WHILE WE WERE PAUSED
+        self.refresh_pending_on_resume = False
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.timeout.connect(self.fire_refresh)
+
+        watched_widget.installEventFilter(self)
+        # CLICKS AND KEYS GO TO THE CHILD WIDGETS, SO WATCH THE APPLICATION AND KEEP OURS
+        application_instance = QApplication.instance()
+        if application_instance is not None:
+            application_instance.installEventFilter(self)
+
+    # INTERVALS
+
+    def base_interval_milliseconds(self):
+        if self.is_push_active:
+            return self.refresh_settings["push_interval_milliseconds"]
+        return self.refresh_settings["fast_interval_milliseconds"]
+
+    def backed_off_interval_milliseconds(self):
+        if self.is_push_active:
+            # PUSHES TELL US ABOUT CHANGES, THE SAFETY POLL DOESN'T NEED TO BACK OFF
+            return self.base_interval_milliseconds()
+        backed_off_interval = self.base_interval_milliseconds() * \
+            (self.refresh_settings["backoff_factor"] ** self.consecutive_unchanged_count)
+        return int(min(backed_off_interval, self.refresh_settings["maximum_interval_milliseconds"]))
+
+    def restart_timer(self):
+        if self.is_paused:
+            return
+        self.refresh_timer.start(self.current_interval_milliseconds)
+
+    # CALLED BY THE DASHBOARD
+
+    def start(self):
+        # FIRST REFRESH RIGHT AWAY
+        self.request_refresh()
+
+    def request_refresh(self):
+        # PUSH NOTIFICATION, REFRESH BUTTON, AFTER OUR OWN WRITE...
+        if self.is_paused or not self.watched_widget.isVisible():
+            self.refresh_pending_on_resume = True
+            return
+        self.fire_refresh()
+
+    def report_refresh_result(self, had_changes):
+        if had_changes:
+            self.consecutive_unchanged_count = 0
+        else:
+            self.consecutive_unchanged_count += 1
+        self.current_interval_milliseconds = self.backed_off_interval_milliseconds()
+        self.restart_timer()
+
+    def note_user_activity(self):
+        if self.consecutive_unchanged_count == 0:
+            return
+        self.consecutive_unchanged_count = 0
+        self.current_interval_milliseconds = self.backed_off_interval_milliseconds()
+        # DON'T MAKE THE USER WAIT OUT A LONG BACKED-OFF TIMER
+        if self.refresh_timer.remainingTime() > self.current_interval_milliseconds:
+            self.restart_timer()
+
+    def set_push_active(self, is_active):
+        self.is_push_active = is_active
+        self.consecutive_unchanged_count = 0
+        self.current_interval_milliseconds = self.backed_off_interval_milliseconds()
+        self.restart_timer()
+
+    def pause(self):
+        if self.is_paused:
+            return
+        self.is_paused = True
+        if self.refresh_timer.isActive():
+            # IT WOULD HAVE FIRED WHILE WE WERE AWAY
+            self.refresh_pending_on_resume = True
+        self.refresh_timer.stop()
+
+    def resume(self):
+        if not self.is_paused:
+            return
+        self.is_paused = False
+        self.consecutive_unchanged_count = 0
+        self.current_interval_milliseconds = self.backed_off_interval_milliseconds()
+        if self.refresh_pending_on_resume:
+            self.fire_refresh()
+        else:
+            self.restart_timer()
+
+    def stop(self):
+        self.refresh_timer.stop()
+        application_instance = QApplication.instance()
+        if application_instance is not None:
+            application_instance.removeEventFilter(self)
+        self.watched_widget.removeEventFilter(self)
+
+    # INTERNALS
+
+    def fire_refresh(self):
+        self.refresh_pending_on_resume = False
+        # KEEP TICKING EVEN IF THE DASHBOARD NEVER REPORTS BACK (E.G. THE QUERY WAS SUPERSEDED)
+        self.restart_timer()
+        self.refresh_due.emit()
+
+    def eventFilter(self, watched_object, event):
+        event_type = event.type()
+        if watched_object is self.watched_widget:
+            if event_type == QEvent.Hide:
+                self.pause()
+            elif event_type == QEvent.Show:
+                self.resume()
+            elif event_type == QEvent.WindowStateChange:
+                if self.watched_widget.isMinimized():
+                    self.pause()
+                elif self.watched_widget.isVisible():
+                    self.resume()
+        elif event_type in user_activity_event_types and isinstance(watched_object, QWidget) \
+                and watched_object.window() is self.watched_widget:
+            self.note_user_activity()
+        return False
@@ -0,0 +1,231 @@
+# BACKEND PROCESS THAT REMINDS STUDENTS BEFORE AN APPROVED RESERVATION STARTS
+# RUN ONE PER SITE, LIKE change_notifier.py:
+#     python reminder_scheduler.py
+#
+# ON START IT READS EVERY UPCOMING APPROVED RESERVATION ONCE AND PUTS ONE TIMER PER REMINDER OFFSET
+# (24 HOURS AND 1 HOUR BEFORE start_time BY DEFAULT) ON A HierarchicalTimingWheel. AFTER THAT THE TABLE
+# IS NEVER SCANNED AGAIN:
+#   - EACH TICK READS reservation_change_log (change_id > LAST SEEN, SCHEMA VERSION 5), RE-READS ONLY THE
+#     RESERVATIONS IN IT BY PRIMARY KEY, AND MOVES / CANCELS / ADDS THEIR TIMERS (O(1) EACH)
+#   - A TIMER THAT FIRES QUEUES ITS REMINDER IN notification_outbox, WHICH DELIVERS IT LIKE A STATUS EMAIL
+#     (RETRIES, DIGESTS). THE ROW IS CHECKED AGAIN FIRST, SO A CHANGE NOT YET SEEN CAN'T SEND A STALE ONE.
+# A REMINDER WHOSE TIME HAS ALREADY PASSED (APPROVED 3 HOURS BEFORE THE START) IS SKIPPED, NOT SENT LATE.
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import database_manager
+from notification_outbox import enqueue_messages
+from notification_coalescing import reminder_notification_status
+from timing_wheel import HierarchicalTimingWheel
+
+# REMINDER CONFIG: MINUTES BEFORE start_time, E.G. SRT_REMINDER_OFFSETS_MINUTES=1440,60
+reminder_offset_minutes_list = [int(offset_text) for offset_text
+                                in os.environ.get("SRT_REMINDER_OFFSETS_MINUTES", "1440,60").split(",")
+                                if offset_text.strip()]
+reminder_poll_interval_seconds = 1
+reminder_change_batch_size = 1000
+# A REMINDER THAT COULDN'T BE QUEUED (DATABASE DOWN) IS TRIED AGAIN THIS MUCH LATER
+reminder_retry_delay_seconds = 30
+
+
+def describe_offset(offset_minutes):
+    # 1440 -> "24 hours", 60 -> "1 hour", 30 -> "30 minutes"
+    if offset_minutes % 60 == 0:
+        hour_count = offset_minutes // 60
+        return str(hour_count) + (" hour" if hour_count == 1 else " hours")
+    return str(offset_minutes) + (" minute" if offset_minutes == 1 else " minutes")
+
+
+def render_reminder_message(detail_row, offset_minutes):
+    # -> (reservation_id, new_status, SUBJECT, BODY, DIGEST LINE) FOR notification_outbox.enqueue_messages
+    offset_text = describe_offset(offset_minutes)
+    email_subject_string = "Reservation Reminder: " + detail_row['room_name'] + " in " + offset_text
+    email_body_string = "Dear " + (detail_row['full_name'] or "Student") + ",\n\n"
+    email_body_string += ("This is a reminder that your reservation for " + detail_row['room_name'] + " starts on "
+                          + str(detail_row['start_time']) + " (in " + offset_text + ").\n\n")
+    email_body_string += "Regards,\nCampus Administration"
+    digest_line_string = (detail_row['room_name'] + " on " + str(detail_row['start_time']) + " ("
+                          + (detail_row['full_name'] or "Student") + "): starts in " + offset_text)
+    return (detail_row['reservation_id'], reminder_notification_status, email_subject_string, email_body_string,
+            digest_line_string)
+
+
+class ReminderScheduler:
+    def __init__(self, offset_minutes_list=None, poll_interval_seconds=None):
+        self.offset_minutes_list = offset_minutes_list or reminder_offset_minutes_list
+        self.poll_interval_seconds = poll_interval_seconds or reminder_poll_interval_seconds
+        self.timer_wheel = HierarchicalTimingWheel(time.time())
+        # reservation_id -> start_time ITS TIMERS WERE SET FOR (SKIPS NO-OP RESCHEDULES)
+        self.scheduled_start_time_by_reservation_id = {}
+        self.last_change_id = 0
+        self.is_running = False
+
+        self.statistics_dictionary = {
+            "loaded": 0,
+            "changes_applied": 0,
+            "rescheduled": 0,
+            "unscheduled": 0,
+            "fired": 0,
+            "skipped_stale": 0,
+            "queued_rows": 0,
+        }
+
+    # TIMERS
+
+    def schedule_reservation(self, reservation_id, start_time):
+        current_time = datetime.now()
+        scheduled_timer_count = 0
+        for offset_minutes in self.offset_minutes_list:
+            fire_time = start_time - timedelta(minutes=offset_minutes)
+            if fire_time <= current_time:
+                continue
+            self.timer_wheel.schedule((reservation_id, offset_minutes), fire_time.timestamp(),
+                                      (reservation_id, offset_minutes, start_time))
+            scheduled_timer_count += 1
+        if scheduled_timer_count > 0:
+            self.scheduled_start_time_by_reservation_id[reservation_id] = start_time
+
+    def unschedule_reservation(self, reservation_id):
+        # -> True IF IT HAD REMINDERS PENDING
+        if self.scheduled_start_time_by_reservation_id.pop(reservation_id, None) is None:
+            return False
+        for offset_minutes in self.offset_minutes_list:
+            self.timer_wheel.cancel((reservation_id, offset_minutes))
+        return True
+
+    # DATABASE SIDE
+
+    def load_upcoming_reservations(self):
+        # THE ONLY FULL READ. THE CHANGE LOG POSITION IS TAKEN FIRST, SO A CHANGE MADE WHILE WE LOAD IS
+        # APPLIED (AGAIN, HARMLESSLY) ON THE FIRST TICK INSTEAD OF BEING MISSED
+        latest_rows = database_manager.fetch_all(
+            "SELECT MAX(change_id) AS latest_change_id FROM reservation_change_log", use_cache=False)
+        if len(latest_rows) > 0 and latest_rows[0]["latest_change_id"] is not None:
+            self.last_change_id = int(latest_rows[0]["latest_change_id"])
+
+        # idx_reservations_status_start
+        upcoming_row_list = database_manager.fetch_all(
+            "SELECT reservation_id, start_time FROM reservations WHERE current_status = 'Approved' AND start_time > %s",
+            (datetime.now(),), use_cache=False)
+        for upcoming_row in upcoming_row_list:
+            self.schedule_reservation(int(upcoming_row["reservation_id"]), upcoming_row["start_time"])
+        self.statistics_dictionary["loaded"] = len(upcoming_row_list)
+        print("System: Reminder scheduler loaded " + str(len(upcoming_row_list)) + " upcoming reservations ("
+              + str(len(self.timer_wheel)) + " reminders)")
+
+    def apply_changes(self):
+        # -> HOW MANY RESERVATIONS CHANGED SINCE THE LAST TICK
+        change_row_list = database_manager.fetch_all(
+            "SELECT change_id, reservation_id FROM reservation_change_log "
+            "WHERE change_id > %s ORDER BY change_id LIMIT " + str(reminder_change_batch_size),
+            (self.last_change_id,), use_cache=False)
+        if len(change_row_list) == 0:
+            return 0
+        changed_reservation_id_list = list(dict.fromkeys(int(change_row["reservation_id"])
+                                                         for change_row in change_row_list))
+        current_row_list = database_manager.fetch_all(
+            "SELECT reservation_id, start_time, current_status FROM reservations WHERE reservation_id IN ("
+            + ", ".join(["%s"] * len(changed_reservation_id_list)) + ")",
+            tuple(changed_reservation_id_list), use_cache=False)
+        current_row_by_id = {int(current_row["reservation_id"]): current_row for current_row in current_row_list}
+
+        current_time = datetime.now()
+        for reservation_id in changed_reservation_id_list:
+            current_row = current_row_by_id.get(reservation_id)
+            if current_row is None or current_row["current_status"] != "Approved" or current_row["start_time"] <= current_time:
+                # DELETED, CANCELLED / REJECTED / BACK TO PENDING, OR MOVED INTO THE PAST
+                if self.unschedule_reservation(reservation_id):
+                    self.statistics_dictionary["unscheduled"] += 1
+                continue
+            if self.scheduled_start_time_by_reservation_id.get(reservation_id) == current_row["start_time"]:
+                # SOME OTHER FIELD CHANGED, THE REMINDERS STAY AS THEY ARE
+                continue
+            self.unschedule_reservation(reservation_id)
+            self.schedule_reservation(reservation_id, current_row["start_time"])
+            self.statistics_dictionary["rescheduled"] += 1
+
+        # ONLY MOVE PAST THE CHANGES ONCE THEY ARE APPLIED
+        self.last_change_id = int(change_row_list[-1]["change_id"])
+        self.statistics_dictionary["changes_applied"] += len(change_row_list)
+        return len(changed_reservation_id_list)
+
+    def queue_reminders(self, fired_payload_list):
+        reservation_id_list = list(dict.fromkeys(reservation_id for reservation_id, _, _ in fired_payload_list))
+        with database_manager.transaction() as unit_of_work:
+            detail_row_list = unit_of_work.fetch_all(
+                """
+                SELECT r.reservation_id, r.full_name, rm.room_name, r.start_time, r.current_status
+                FROM reservations r
+                JOIN users u ON r.user_id = u.user_id
+                JOIN rooms rm ON r.room_id = rm.room_id
+                WHERE r.reservation_id IN (""" + ", ".join(["%s"] * len(reservation_id_list)) + ")",
+                tuple(reservation_id_list))
+            detail_row_by_id = {int(detail_row["reservation_id"]): detail_row for detail_row in detail_row_list}
+
+            message_list = []
+            for reservation_id, offset_minutes, start_time in fired_payload_list:
+                detail_row = detail_row_by_id.get(reservation_id)
+                if (detail_row is None or detail_row["current_status"] != "Approved"
+                        or detail_row["start_time"] != start_time):
+                    # CHANGED AFTER OUR LAST TICK, apply_changes WILL SORT OUT ITS TIMERS
+                    self.statistics_dictionary["skipped_stale"] += 1
+                    continue
+                message_list.append(render_reminder_message(detail_row, offset_minutes))
+            self.statistics_dictionary["queued_rows"] += enqueue_messages(unit_of_work, message_list)
+
+    def fire_due_reminders(self):
+        fired_payload_list = self.timer_wheel.advance(time.time())
+        if len(fired_payload_list) == 0:
+            return 0
+        try:
+            self.queue_reminders(fired_payload_list)
+        except database_manager.database_unavailable_error_types:
+            # PUT THEM BACK ON THE WHEEL, NOTHING WAS QUEUED (THE TRANSACTION ROLLED BACK)
+            retry_time_seconds = time.time() + reminder_retry_delay_seconds
+            for reservation_id, offset_minutes, start_time in fired_payload_list:
+                self.timer_wheel.schedule((reservation_id, offset_minutes), retry_time_seconds,
+                                          (reservation_id, offset_minutes, start_time))
+            raise
+        self.statistics_dictionary["fired"] += len(fired_payload_list)
+        smallest_offset_minutes = min(self.offset_minutes_list)
+        for reservation_id, offset_minutes, start_time in fired_payload_list:
+            if offset_minutes == smallest_offset_minutes:
+                # LAST REMINDER SENT, NOTHING LEFT TO TRACK
+                self.scheduled_start_time_by_reservation_id.pop(reservation_id, None)
+        return len(fired_payload_list)
+
+    def serve_forever(self):
+        self.load_upcoming_reservations()
+        self.is_running = True
+        while self.is_running:
+            try:
+                while self.apply_changes() > 0 and self.is_running:
+                    pass
+                self.fire_due_reminders()
+            except database_manager.database_unavailable_error_types as database_error:
+                # THE WHEEL KEEPS RUNNING IN MEMORY, WE CATCH UP ON THE CHANGE LOG ONCE THE DATABASE IS BACK
+                print("System: Reminder scheduler could not reach the database: " + str(database_error))
+            time.sleep(self.poll_interval_seconds)
+
+    def stop(self):
+        self.is_running = False
+
+    def get_statistics(self):
+        statistics_snapshot = dict(self.statistics_dictionary)
+        statistics_snapshot["pending_reminders"] = len(self.timer_wheel)
+        statistics_snapshot["tracked_reservations"] = len(self.scheduled_start_time_by_reservation_id)
+        statistics_snapshot["last_change_id"] = self.last_change_id
+        return statistics_snapshot
+
+
+if __name__ == "__main__":
+    reminder_scheduler = ReminderScheduler()
+    try:
+        reminder_scheduler.serve_forever()
+    except KeyboardInterrupt:
+        print("System: Reminder scheduler stopping.")
+        print(reminder_scheduler.get_statistics())
+    finally:
+        database_manager.close_pool()
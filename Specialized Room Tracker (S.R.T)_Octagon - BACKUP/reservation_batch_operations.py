@@ -0,0 +1,90 @@
+# BACKEND CODE FOR SET-BASED BATCH STATUS CHANGES (APPROVE / REJECT / CANCEL / DELETE SELECTED)
+# ONE TRANSACTION FOR THE WHOLE BATCH, AND PER CHUNK OF IDS:
+#     SELECT reservation_id, current_status ... WHERE reservation_id IN (...)   (LOCKS THE ROWS ON MYSQL)
+#     UPDATE reservations SET current_status = %s WHERE reservation_id IN (...) AND current_status <> %s
+# SO 200 APPROVALS ARE TWO STATEMENTS INSTEAD OF 200, AND EVERY ID STILL GETS ITS OWN OUTCOME.
+# THE STATUS EMAILS GO INTO notification_outbox IN THE SAME TRANSACTION (SEE notification_outbox.py),
+# SO THEY ARE QUEUED IF AND ONLY IF THE CHANGE COMMITS.
+#
+# USAGE: apply_status_batch([5, 9, 12], "Approved") -> {5: "updated", 9: "unchanged", 12: "missing"}
+
+import database_manager
+from notification_outbox import enqueue_status_notifications
+
+# IDS PER IN (...) LIST (KEEPS STATEMENTS WELL UNDER max_allowed_packet / SQLITE'S PARAMETER LIMIT)
+batch_status_chunk_size = 500
+
+# PER-ID OUTCOMES
+batch_outcome_updated = "updated"
+batch_outcome_deleted = "deleted"
+# ALREADY HAD THE NEW STATUS, NOTHING WRITTEN (AND NO NOTIFICATION NEEDED)
+batch_outcome_unchanged = "unchanged"
+# DELETED BY SOMEONE ELSE BEFORE THE BATCH RAN
+batch_outcome_missing = "missing"
+
+batch_delete_action = "Delete"
+
+
+def split_into_chunks(value_list, chunk_size):
+    for chunk_start_index in range(0, len(value_list), chunk_size):
+        yield value_list[chunk_start_index:chunk_start_index + chunk_size]
+
+
+def apply_status_batch(reservation_id_list, new_status, chunk_size=None, notify_students=True):
+    # new_status = "Approved" / "Rejected" / "Cancelled" / ..., OR "Delete" TO DELETE THE ROWS
+    # notify_students: QUEUE A STATUS EMAIL FOR EVERY UPDATED ROW (DELETIONS NEVER SEND ONE)
+    # RETURNS {reservation_id: outcome} IN THE ORDER THE IDS WERE GIVEN
+    if chunk_size is None:
+        chunk_size = batch_status_chunk_size
+    # SAME ID CHECKED TWICE (CHECKBOX + SELECTION) ONLY COUNTS ONCE
+    unique_reservation_id_list = list(dict.fromkeys(int(reservation_id) for reservation_id in reservation_id_list))
+    outcome_by_reservation_id = {}
+    if len(unique_reservation_id_list) == 0:
+        return outcome_by_reservation_id
+
+    # NOBODY ELSE MAY CHANGE THE ROWS BETWEEN OUR SELECT AND OUR UPDATE
+    # (SQLITE'S transaction() ALREADY HOLDS THE WRITE LOCK, BEGIN IMMEDIATE)
+    row_lock_clause = " FOR UPDATE" if database_manager.get_backend_name() == "mysql" else ""
+
+    with database_manager.transaction() as unit_of_work:
+        for reservation_id_chunk in split_into_chunks(unique_reservation_id_list, chunk_size):
+            id_placeholder_string = ", ".join(["%s"] * len(reservation_id_chunk))
+            current_row_list = unit_of_work.fetch_all(
+                "SELECT reservation_id, current_status FROM reservations WHERE reservation_id IN ("
+                + id_placeholder_string + ")" + row_lock_clause, tuple(reservation_id_chunk))
+            current_status_by_id = {int(current_row["reservation_id"]): current_row["current_status"]
+                                    for current_row in current_row_list}
+
+            if new_status == batch_delete_action:
+                if current_status_by_id:
+                    unit_of_work.execute("DELETE FROM reservations WHERE reservation_id IN ("
+                                         + id_placeholder_string + ")", tuple(reservation_id_chunk))
+                for reservation_id in reservation_id_chunk:
+                    if reservation_id in current_status_by_id:
+                        outcome_by_reservation_id[reservation_id] = batch_outcome_deleted
+                    else:
+                        outcome_by_reservation_id[reservation_id] = batch_outcome_missing
+                continue
+
+            if any(current_status != new_status for current_status in current_status_by_id.values()):
+                unit_of_work.execute("UPDATE reservations SET current_status = %s WHERE reservation_id IN ("
+                                     + id_placeholder_string + ") AND current_status <> %s",
+                                     (new_status,) + tuple(reservation_id_chunk) + (new_status,))
+            updated_reservation_id_list = []
+            for reservation_id in reservation_id_chunk:
+                if reservation_id not in current_status_by_id:
+                    outcome_by_reservation_id[reservation_id] = batch_outcome_missing
+                elif current_status_by_id[reservation_id] == new_status:
+                    outcome_by_reservation_id[reservation_id] = batch_outcome_unchanged
+                else:
+                    outcome_by_reservation_id[reservation_id] = batch_outcome_updated
+                    updated_reservation_id_list.append(reservation_id)
+            if notify_students:
+                enqueue_status_notifications(unit_of_work, updated_reservation_id_list, new_status)
+    return outcome_by_reservation_id
+
+
+def changed_reservation_ids(outcome_by_reservation_id):
+    # IDS THE BATCH ACTUALLY WROTE (THE ONES THAT NEED A NOTIFICATION / COUNT AS PROCESSED)
+    return [reservation_id for reservation_id, outcome in outcome_by_reservation_id.items()
+            if outcome in (batch_outcome_updated, batch_outcome_deleted)]
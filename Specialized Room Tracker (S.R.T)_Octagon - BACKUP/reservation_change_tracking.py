@@ -0,0 +1,148 @@
+# BACKEND CODE FOR DELTA REFRESHES OF THE RESERVATION TABLE
+# INSTEAD OF RE-SELECTING EVERY RESERVATION ON EVERY TICK, WE REMEMBER HOW FAR WE HAVE READ
+# (HIGH-WATER MARKS ON reservations.updated_at AND reservation_tombstones.deleted_at, SCHEMA VERSION 4)
+# AND ONLY ASK FOR WHAT CHANGED SINCE THEN. REFRESH COST FOLLOWS THE NUMBER OF EDITS, NOT THE TABLE SIZE.
+#
+# fetch_full_result / fetch_changes RUN ON A WORKER THREAD AND ONLY RETURN DATA.
+# THE HIGH-WATER MARKS MOVE IN accept_result(), ON THE GUI THREAD, ONCE THE RESULT WAS ACTUALLY SHOWN
+# (A REFRESH THAT WAS CANCELLED OR SUPERSEDED MUST NOT ADVANCE THEM).
+
+import time
+from datetime import datetime, timedelta
+
+from reservation_queries import build_page_query, split_page
+
+# A WRITE THAT STARTED BEFORE OUR READ CAN COMMIT AFTER IT WITH AN OLDER updated_at (OR REACH A
+# LAGGING REPLICA LATE), SO EVERY DELTA LOOKS BACK A LITTLE PAST THE MARK. ROWS SEEN TWICE MERGE AS NO-OPS.
+high_water_overlap_seconds = 5
+# SAFETY NET FOR ANYTHING CHANGE TRACKING CAN'T SEE (E.G. A ROOM RENAME ONLY TOUCHES rooms)
+full_resync_interval_seconds = 300
+# EVERY CLIENT RESYNCS WELL WITHIN THIS, OLDER TOMBSTONES ARE NO LONGER NEEDED
+tombstone_retention_hours = 24
+
+
+def latest_timestamp(current_mark, candidate_value):
+    # SQLITE HANDS BACK MAX(...) AS TEXT (AGGREGATES LOSE THE COLUMN TYPE)
+    if isinstance(candidate_value, str):
+        try:
+            candidate_value = datetime.fromisoformat(candidate_value)
+        except ValueError:
+            return current_mark
+    if not isinstance(candidate_value, datetime):
+        return current_mark
+    if current_mark is None or candidate_value > current_mark:
+        return candidate_value
+    return current_mark
+
+
+def prune_expired_tombstones(db_manager):
+    # HOUSEKEEPING, RUN BY change_notifier NEXT TO ITS OWN CHANGE LOG PRUNE. NEVER FROM A REFRESH: A WRITE
+    # PINS THE WHOLE PROCESS TO THE PRIMARY (read_write_router), SO THE DASHBOARDS' READ PATH STAYS READ-ONLY
+    prune_before_time = datetime.now() - timedelta(hours=tombstone_retention_hours)
+    db_manager.execute_query("DELETE FROM reservation_tombstones WHERE deleted_at < %s", (prune_before_time,))
+
+
+class ReservationChangeTracker:
+    def __init__(self, db_manager, base_select_sql):
+        # base_select_sql: "SELECT ..., r.updated_at FROM reservations r JOIN ..." WITHOUT A WHERE CLAUSE
+        self.db_manager = db_manager
+        self.base_select_sql = base_select_sql
+
+        self.row_high_water_mark = None
+        self.tombstone_high_water_mark = None
+        # FILTER THE CURRENT ROWS WERE LOADED WITH, A DIFFERENT FILTER NEEDS A FULL LOAD
+        self.loaded_filter_key = None
+        self.last_full_load_time = 0.0
+
+    def needs_full_load(self, filter_key):
+        if self.row_high_water_mark is None or filter_key != self.loaded_filter_key:
+            return True
+        return time.monotonic() - self.last_full_load_time > full_resync_interval_seconds
+
+    def reset(self):
+        self.row_high_water_mark = None
+        self.tombstone_high_water_mark = None
+        self.loaded_filter_key = None
+
+    # WORKER THREAD
+
+    def read_current_marks(self):
+        # READ THE MARKS *BEFORE* THE DATA: ANYTHING WRITTEN IN BETWEEN IS PICKED UP BY THE NEXT DELTA
+        row_mark_rows = self.db_manager.fetch_all(
+            "SELECT MAX(updated_at) AS latest_updated_at FROM reservations", use_cache=False)
+        tombstone_mark_rows = self.db_manager.fetch_all(
+            "SELECT MAX(deleted_at) AS latest_deleted_at FROM reservation_tombstones", use_cache=False)
+        row_mark = latest_timestamp(None, row_mark_rows[0]["latest_updated_at"] if row_mark_rows else None)
+        tombstone_mark = latest_timestamp(
+            None, tombstone_mark_rows[0]["latest_deleted_at"] if tombstone_mark_rows else None)
+        # EMPTY TABLES: START FROM "NOW" SO THE FIRST DELTA DOESN'T RESCAN EVERYTHING
+        if row_mark is None:
+            row_mark = datetime.now()
+        if tombstone_mark is None:
+            tombstone_mark = datetime.now()
+        return row_mark, tombstone_mark
+
+    def fetch_full_result(self, filter_sql, filter_parameters, filter_key, sort_key_name="start_time",
+                          is_descending=False, page_row_limit=None):
+        # FIRST PAGE IN THE CLICKED COLUMN'S ORDER (A RESYNC ASKS FOR AS MANY ROWS AS ARE ALREADY SHOWN)
+        row_mark, tombstone_mark = self.read_current_marks()
+        page_query_string, page_parameters = build_page_query(self.base_select_sql, filter_sql, filter_parameters,
+                                                              sort_key_name, is_descending,
+                                                              page_row_limit=page_row_limit)
+        result_row_list, has_more_rows = split_page(
+            self.db_manager.fetch_all(page_query_string, page_parameters, use_cache=False), page_row_limit)
+        return {
+            "is_full": True,
+            "rows": result_row_list,
+            "has_more": has_more_rows,
+            "deleted_ids": [],
+            "row_mark": row_mark,
+            "tombstone_mark": tombstone_mark,
+            "filter_key": filter_key,
+        }
+
+    def fetch_changes(self, row_mark, tombstone_mark):
+        overlap = timedelta(seconds=high_water_overlap_seconds)
+        # NO FILTER HERE: A ROW THAT STOPPED MATCHING THE FILTER MUST STILL COME BACK SO IT CAN LEAVE THE TABLE
+        changed_row_list = self.db_manager.fetch_all(self.base_select_sql + " WHERE r.updated_at >= %s",
+                                                     (row_mark - overlap,), use_cache=False)
+        tombstone_row_list = self.db_manager.fetch_all(
+            "SELECT reservation_id, deleted_at FROM reservation_tombstones WHERE deleted_at >= %s",
+            (tombstone_mark - overlap,), use_cache=False)
+
+        for changed_row in changed_row_list:
+            row_mark = latest_timestamp(row_mark, changed_row.get("updated_at"))
+        for tombstone_row in tombstone_row_list:
+            tombstone_mark = latest_timestamp(tombstone_mark, tombstone_row["deleted_at"])
+
+        return {
+            "is_full": False,
+            "rows": changed_row_list,
+            "has_more": None,
+            "deleted_ids": [tombstone_row["reservation_id"] for tombstone_row in tombstone_row_list],
+            "row_mark": row_mark,
+            "tombstone_mark": tombstone_mark,
+            "filter_key": None,
+        }
+
+    def fetch_next_page(self, filter_sql, filter_parameters, sort_key_name, is_descending, after_cursor):
+        # ROWS AFTER THE LAST ONE SHOWN. NO MARKS HERE: ANYTHING THAT CHANGES MEANWHILE COMES WITH THE NEXT DELTA
+        page_query_string, page_parameters = build_page_query(self.base_select_sql, filter_sql, filter_parameters,
+                                                              sort_key_name, is_descending, after_cursor=after_cursor)
+        result_row_list, has_more_rows = split_page(
+            self.db_manager.fetch_all(page_query_string, page_parameters, use_cache=False), None)
+        return {"rows": result_row_list, "has_more": has_more_rows}
+
+    # GUI THREAD
+
+    def accept_result(self, fetch_result):
+        if fetch_result["is_full"]:
+            # A FULL LOAD REPLACES THE MARKS
+            self.row_high_water_mark = fetch_result["row_mark"]
+            self.tombstone_high_water_mark = fetch_result["tombstone_mark"]
+            self.loaded_filter_key = fetch_result["filter_key"]
+            self.last_full_load_time = time.monotonic()
+        else:
+            self.row_high_water_mark = latest_timestamp(self.row_high_water_mark, fetch_result["row_mark"])
+            self.tombstone_high_water_mark = latest_timestamp(self.tombstone_high_water_mark,
+                                                              fetch_result["tombstone_mark"])
@@ -0,0 +1,68 @@
+# FRONTEND CODE FOR FILTERING THE RESERVATION TABLE WITHOUT A DATABASE ROUND TRIP
+# THE DASHBOARDS LOAD ONE SNAPSHOT PER DATE WINDOW (EVERY STATUS, NO SEARCH) INTO ReservationTableModel,
+# AND THIS PROXY HIDES THE ROWS THAT DON'T MATCH THE STATUS COMBO / SEARCH BOX. CHANGING EITHER ONE
+# ONLY RE-RUNS filterAcceptsRow OVER ROWS ALREADY IN MEMORY, SO TYPING IN THE SEARCH BOX IS INSTANT.
+# THE SNAPSHOT ITSELF STAYS FRESH THROUGH THE NORMAL (DELTA) REFRESHES.
+#
+# ORDER STILL COMES FROM THE SOURCE MODEL (SERVER-SIDE, PAGED), sort() IS PASSED STRAIGHT THROUGH, AND
+# canFetchMore / fetchMore REACH THE SOURCE MODEL THROUGH QSortFilterProxyModel AS USUAL.
+
+from PySide6.QtCore import QSortFilterProxyModel, Qt
+
+# WAIT THIS LONG AFTER THE LAST KEYSTROKE BEFORE RE-FILTERING
+search_debounce_milliseconds = 200
+
+
+class ReservationFilterProxyModel(QSortFilterProxyModel):
+    def __init__(self, search_key_list=("room_name", "full_name"), parent=None):
+        super().__init__(parent)
+        self.search_key_list = search_key_list
+        # None = ALL STATUSES
+        self.status_filter_text = None
+        self.search_text = ""
+        self.status_value_index = -1
+        self.search_value_index_list = []
+
+    def setSourceModel(self, source_model):
+        super().setSourceModel(source_model)
+        self.status_value_index = source_model.result_key_list.index("current_status")
+        self.search_value_index_list = [source_model.result_key_list.index(search_key)
+                                        for search_key in self.search_key_list]
+
+    # CALLED BY THE DASHBOARD
+
+    def set_filters(self, status_filter_text, search_text):
+        # RETURNS True IF ANYTHING CHANGED (AND THE ROWS WERE RE-FILTERED)
+        if status_filter_text == "All":
+            status_filter_text = None
+        search_text = search_text.strip().lower()
+        if status_filter_text == self.status_filter_text and search_text == self.search_text:
+            return False
+        self.status_filter_text = status_filter_text
+        self.search_text = search_text
+        self.invalidateFilter()
+        return True
+
+    def visible_reservation_ids(self):
+        source_model = self.sourceModel()
+        return [source_model.reservation_id_at(self.mapToSource(self.index(row_index, 0)).row())
+                for row_index in range(self.rowCount())]
+
+    # QSortFilterProxyModel HOOKS
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        # READ THE ROW TUPLE DIRECTLY, NOT THROUGH data() ONE CELL AT A TIME
+        row_tuple = self.sourceModel().row_tuple_list[source_row]
+        if self.status_filter_text is not None and row_tuple[self.status_value_index] != self.status_filter_text:
+            return False
+        if self.search_text:
+            # SAME AS THE OLD LIKE '%...%' (CASE-INSENSITIVE UNDER THE DEFAULT COLLATION)
+            for search_value_index in self.search_value_index_list:
+                if self.search_text in row_tuple[search_value_index].lower():
+                    return True
+            return False
+        return True
+
+    def sort(self, column_index, order=Qt.AscendingOrder):
+        # THE SOURCE MODEL OWNS THE ORDER (IT MATCHES THE SERVER'S PAGES), WE KEEP ITS ROW ORDER
+        self.sourceModel().sort(column_index, order)
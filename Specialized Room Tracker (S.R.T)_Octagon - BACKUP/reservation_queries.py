@@ -0,0 +1,109 @@
+# BACKEND CODE FOR PAGED, SERVER-SORTED RESERVATION LIST QUERIES
+# KEYSET PAGINATION: EACH PAGE CONTINUES AFTER THE LAST ROW WE ALREADY HAVE
+#     ... WHERE <filters> AND (sort_col > last_value OR (sort_col = last_value AND reservation_id > last_id))
+#     ORDER BY sort_col, reservation_id LIMIT page_size + 1
+# UNLIKE OFFSET, THE DATABASE NEVER READS AND THROWS AWAY THE ROWS OF EARLIER PAGES, AND A ROW
+# INSERTED WHILE SCROLLING CAN'T SHIFT A PAGE BOUNDARY. reservation_id BREAKS TIES SO THE ORDER IS TOTAL.
+# THE EXTRA (+1) ROW ONLY TELLS US WHETHER ANOTHER PAGE EXISTS.
+#
+# DATE WINDOW: BOTH DASHBOARDS ONLY LOAD RESERVATIONS STARTING INSIDE THE SELECTED DATES (PLUS EVERY
+# PENDING ONE, HOWEVER OLD, SO NOTHING WAITING FOR A DECISION DROPS OUT OF SIGHT). PAST SEMESTERS STAY
+# IN THE DATABASE BUT ARE NEVER RE-FETCHED. THE RANGE IS A PLAIN start_time >= / < PREDICATE SO IT USES
+# idx_reservations_start_id / idx_reservations_user_start, AND PENDING USES idx_reservations_status_start.
+
+from datetime import date, datetime, time, timedelta
+
+# ROWS PER PAGE (FIRST PAGE SHOWS INSTANTLY, THE REST STREAM IN AS THE USER SCROLLS)
+reservation_page_size = 200
+
+# DEFAULT WINDOW: TODAY THROUGH THE NEXT 30 DAYS
+default_date_window_days = 30
+
+# RESULT KEY -> WHAT THE DATABASE ORDERS BY WHEN THAT COLUMN IS CLICKED
+# NULLABLE TEXT IS COALESCED SO THE KEYSET COMPARISON NEVER MEETS A NULL, AND TEXT IS LOWERED SO
+# MYSQL AND SQLITE (DIFFERENT COLLATIONS) BOTH MATCH ReservationTableModel.sort_key
+# (reservation_id AND start_time HAVE INDEXES FOR THIS, SEE SCHEMA VERSION 6)
+reservation_sort_expression_dictionary = {
+    "reservation_id": "r.reservation_id",
+    "start_time": "r.start_time",
+    "room_name": "LOWER(rm.room_name)",
+    "current_status": "LOWER(r.current_status)",
+    "full_name": "LOWER(COALESCE(r.full_name, ''))",
+    "course_section": "LOWER(COALESCE(r.course_section, ''))",
+    "reservation_type": "LOWER(COALESCE(r.reservation_type, ''))",
+    "activity_description": "LOWER(COALESCE(r.activity_description, ''))",
+}
+
+
+def build_page_query(base_select_sql, filter_sql, filter_parameters, sort_key_name, is_descending,
+                     after_cursor=None, page_row_limit=None):
+    # after_cursor = (SORT VALUE AS ABOVE, reservation_id) OF THE LAST ROW ALREADY LOADED, None FOR THE FIRST PAGE
+    if page_row_limit is None:
+        page_row_limit = reservation_page_size
+    sort_expression = reservation_sort_expression_dictionary[sort_key_name]
+    comparison_operator = "<" if is_descending else ">"
+    sort_direction = "DESC" if is_descending else "ASC"
+
+    page_query_string = base_select_sql + " WHERE 1=1" + filter_sql
+    page_parameter_list = list(filter_parameters)
+
+    if after_cursor is not None:
+        after_sort_value, after_reservation_id = after_cursor
+        if sort_key_name == "reservation_id":
+            page_query_string += " AND r.reservation_id " + comparison_operator + " %s"
+            page_parameter_list.append(after_reservation_id)
+        else:
+            page_query_string += (" AND (" + sort_expression + " " + comparison_operator + " %s OR ("
+                                  + sort_expression + " = %s AND r.reservation_id " + comparison_operator + " %s))")
+            page_parameter_list.extend([after_sort_value, after_sort_value, after_reservation_id])
+
+    page_query_string += " ORDER BY " + sort_expression + " " + sort_direction
+    if sort_key_name != "reservation_id":
+        page_query_string += ", r.reservation_id " + sort_direction
+    page_query_string += " LIMIT %s"
+    page_parameter_list.append(page_row_limit + 1)
+    return page_query_string, tuple(page_parameter_list)
+
+
+def split_page(result_row_list, page_row_limit):
+    # -> (ROWS OF THIS PAGE, WHETHER MORE ROWS EXIST)
+    if page_row_limit is None:
+        page_row_limit = reservation_page_size
+    return result_row_list[:page_row_limit], len(result_row_list) > page_row_limit
+
+
+def default_date_window():
+    # -> (FIRST DAY, LAST DAY), BOTH INCLUDED
+    today_date = date.today()
+    return today_date, today_date + timedelta(days=default_date_window_days)
+
+
+def date_window_bounds(window_start_date, window_end_date):
+    # WHOLE DAYS -> [start 00:00, day after end 00:00), HALF-OPEN SO NO 23:59:59 EDGE CASES
+    return (datetime.combine(window_start_date, time.min),
+            datetime.combine(window_end_date + timedelta(days=1), time.min))
+
+
+def build_date_window_sql(window_start_date, window_end_date, include_all_pending=True):
+    # -> (" AND ...", PARAMETERS) TO APPEND TO A DASHBOARD'S FILTER
+    window_start_time, window_end_time = date_window_bounds(window_start_date, window_end_date)
+    if include_all_pending:
+        return (" AND ((r.start_time >= %s AND r.start_time < %s) OR r.current_status = 'Pending')",
+                [window_start_time, window_end_time])
+    return " AND r.start_time >= %s AND r.start_time < %s", [window_start_time, window_end_time]
+
+
+def row_in_date_window(result_row, window_start_date, window_end_date, include_all_pending=True):
+    # SAME TEST AS build_date_window_sql, FOR ROWS THAT ARRIVE THROUGH A DELTA REFRESH
+    if include_all_pending and result_row.get("current_status") == "Pending":
+        return True
+    start_time_value = result_row.get("start_time")
+    if isinstance(start_time_value, str):
+        try:
+            start_time_value = datetime.fromisoformat(start_time_value)
+        except ValueError:
+            return False
+    if not isinstance(start_time_value, datetime):
+        return False
+    window_start_time, window_end_time = date_window_bounds(window_start_date, window_end_date)
+    return window_start_time <= start_time_value < window_end_time
@@ -0,0 +1,98 @@
+# BACKEND CODE FOR RANKED FULL-TEXT RESERVATION SEARCH (SCHEMA VERSION 7)
+# SEARCHES ROOM NAME, NAME, COURSE/SECTION AND PURPOSE THROUGH A TOKEN INDEX INSTEAD OF
+# "LIKE '%...%'" (WHICH HAS TO READ EVERY ROW), AND RETURNS THE BEST MATCHES FIRST:
+#     mysql  -> FULLTEXT INDEXES ON reservations AND rooms, MATCH ... AGAINST IN BOOLEAN MODE
+#     sqlite -> FTS5 TABLE reservation_search, RANKED BY bm25()
+# EVERY WORD MATCHES AS A PREFIX ("chem" FINDS "Chemistry"), ROWS MATCHING MORE / RARER WORDS RANK HIGHER.
+# NOTE: MYSQL IGNORES WORDS SHORTER THAN innodb_ft_min_token_size (3 BY DEFAULT) AND ITS STOPWORDS.
+#
+# USAGE: reservation_search.search_reservations("chem lab", user_id=None, result_limit=50)
+#     -> SAME COLUMNS AS THE ADMIN TABLE, PLUS search_rank (HIGHER = BETTER)
+
+import re
+
+import database_manager
+
+default_search_result_limit = 50
+# STOP EARLY ON PASTED PARAGRAPHS, THE FIRST FEW WORDS DECIDE THE RANKING ANYWAY
+maximum_search_word_count = 8
+
+search_word_pattern = re.compile(r"\w+", re.UNICODE)
+
+mysql_search_sql = """
+    SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section,
+           r.reservation_type, r.created_at, r.start_time,
+           r.current_status, r.activity_description, r.updated_at,
+           search_match.search_rank
+    FROM (
+        SELECT match_score.reservation_id, SUM(match_score.score) AS search_rank
+        FROM (
+            SELECT reservation_id,
+                   MATCH(full_name, course_section, activity_description) AGAINST (%s IN BOOLEAN MODE) AS score
+            FROM reservations
+            WHERE MATCH(full_name, course_section, activity_description) AGAINST (%s IN BOOLEAN MODE)
+            UNION ALL
+            SELECT matched_reservation.reservation_id, MATCH(matched_room.room_name) AGAINST (%s IN BOOLEAN MODE)
+            FROM rooms matched_room
+            JOIN reservations matched_reservation ON matched_reservation.room_id = matched_room.room_id
+            WHERE MATCH(matched_room.room_name) AGAINST (%s IN BOOLEAN MODE)
+        ) match_score
+        GROUP BY match_score.reservation_id
+    ) search_match
+    JOIN reservations r ON r.reservation_id = search_match.reservation_id
+    JOIN rooms rm ON r.room_id = rm.room_id
+    WHERE 1=1
+"""
+
+sqlite_search_sql = """
+    SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section,
+           r.reservation_type, r.created_at, r.start_time,
+           r.current_status, r.activity_description, r.updated_at,
+           -bm25(reservation_search) AS search_rank
+    FROM reservation_search
+    JOIN reservations r ON r.reservation_id = reservation_search.rowid
+    JOIN rooms rm ON r.room_id = rm.room_id
+    WHERE reservation_search MATCH %s
+"""
+
+
+def split_search_words(search_text):
+    # ONLY LETTERS / DIGITS REACH THE INDEX, SO USER INPUT CAN NEVER BE READ AS SEARCH OPERATORS
+    return search_word_pattern.findall(search_text.lower())[:maximum_search_word_count]
+
+
+def build_mysql_match_expression(search_word_list):
+    # "chem lab" -> "chem* lab*" (NO +: ANY WORD MAY MATCH, MORE MATCHES RANK HIGHER)
+    return " ".join(search_word + "*" for search_word in search_word_list)
+
+
+def build_sqlite_match_expression(search_word_list):
+    # "chem lab" -> '"chem"* OR "lab"*'
+    return " OR ".join('"' + search_word + '"*' for search_word in search_word_list)
+
+
+def search_reservations(search_text, user_id=None, status_filter=None, result_limit=None):
+    search_word_list = split_search_words(search_text)
+    if len(search_word_list) == 0:
+        return []
+    if result_limit is None:
+        result_limit = default_search_result_limit
+
+    if database_manager.get_backend_name() == "sqlite":
+        search_query_string = sqlite_search_sql
+        search_parameter_list = [build_sqlite_match_expression(search_word_list)]
+    else:
+        search_query_string = mysql_search_sql
+        match_expression = build_mysql_match_expression(search_word_list)
+        search_parameter_list = [match_expression] * 4
+
+    if user_id is not None:
+        search_query_string += " AND r.user_id = %s"
+        search_parameter_list.append(user_id)
+    if status_filter is not None and status_filter != "All":
+        search_query_string += " AND r.current_status = %s"
+        search_parameter_list.append(status_filter)
+
+    search_query_string += " ORDER BY search_rank DESC, r.reservation_id LIMIT %s"
+    search_parameter_list.append(result_limit)
+    return database_manager.fetch_all(search_query_string, tuple(search_parameter_list))
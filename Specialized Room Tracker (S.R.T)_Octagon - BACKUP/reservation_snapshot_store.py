@@ -0,0 +1,87 @@
+# BACKEND CODE FOR VERSION-CHECKED STUDENT RESERVATION SNAPSHOTS (SCHEMA VERSION 10)
+# TRIGGERS BUMP user_versions.data_version WHENEVER ANYTHING A STUDENT'S DASHBOARD SHOWS CHANGES
+# (THEIR RESERVATIONS, OR THE NAME OF A ROOM THEY BOOKED). A REFRESH THEN COSTS:
+#     SELECT data_version FROM user_versions WHERE user_id = %s       (ONE PRIMARY-KEY LOOKUP)
+# AND ONLY IF THE VERSION MOVED, THE FULL JOIN. OTHERWISE THE ROWS COME FROM shared_snapshot_store, WHICH
+# EVERY StudentDashboard IN THE PROCESS SHARES (LOG OUT AND BACK IN = NO RELOAD).
+#
+# USAGE (WORKER THREAD):
+#     page_result, data_version = fetch_with_version_check(user_id, snapshot_key, load_function)
+# A DASHBOARD ALREADY SHOWING data_version FOR THE SAME KEY HAS NOTHING TO REDRAW.
+
+import threading
+from collections import OrderedDict
+
+import database_manager
+
+# SNAPSHOTS KEPT (ONE PER STUDENT + DATE WINDOW + ORDER + ROW COUNT), LEAST RECENTLY USED GOES FIRST
+maximum_snapshot_count = 64
+
+
+def read_user_version(user_id):
+    # NEVER FROM THE QUERY CACHE: THIS IS THE CHECK THAT DECIDES WHETHER CACHED ROWS ARE STILL GOOD
+    version_rows = database_manager.fetch_all(
+        "SELECT data_version FROM user_versions WHERE user_id = %s", (user_id,), use_cache=False)
+    if len(version_rows) == 0:
+        # NOTHING OF THEIRS HAS CHANGED SINCE SCHEMA VERSION 10 (OR THEY HAVE NO RESERVATIONS YET)
+        return 0
+    return int(version_rows[0]["data_version"])
+
+
+class ReservationSnapshotStore:
+    def __init__(self, maximum_entries=None):
+        self.maximum_entries = maximum_entries or maximum_snapshot_count
+        self.store_lock = threading.Lock()
+        # (user_id, SNAPSHOT KEY) -> (data_version, RESULT)
+        self.snapshot_entries = OrderedDict()
+        self.statistics_dictionary = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "evictions": 0,
+        }
+
+    def get(self, store_key, data_version):
+        with self.store_lock:
+            snapshot_entry = self.snapshot_entries.get(store_key)
+            if snapshot_entry is None:
+                self.statistics_dictionary["misses"] += 1
+                return None
+            if snapshot_entry[0] != data_version:
+                self.statistics_dictionary["stale"] += 1
+                del self.snapshot_entries[store_key]
+                return None
+            self.snapshot_entries.move_to_end(store_key)
+            self.statistics_dictionary["hits"] += 1
+            return snapshot_entry[1]
+
+    def put(self, store_key, data_version, snapshot_result):
+        with self.store_lock:
+            self.snapshot_entries[store_key] = (data_version, snapshot_result)
+            self.snapshot_entries.move_to_end(store_key)
+            while len(self.snapshot_entries) > self.maximum_entries:
+                self.snapshot_entries.popitem(last=False)
+                self.statistics_dictionary["evictions"] += 1
+
+    def get_statistics(self):
+        with self.store_lock:
+            statistics_snapshot = dict(self.statistics_dictionary)
+            statistics_snapshot["entries"] = len(self.snapshot_entries)
+        return statistics_snapshot
+
+
+shared_snapshot_store = ReservationSnapshotStore()
+
+
+def fetch_with_version_check(user_id, snapshot_key, load_function):
+    # -> (RESULT, THE data_version IT IS CURRENT FOR)
+    # THE VERSION IS READ BEFORE THE ROWS: A WRITE IN BETWEEN LEAVES NEWER ROWS UNDER THE OLDER VERSION,
+    # SO THE NEXT PROBE SEES THE BUMP AND LOADS AGAIN (NEVER THE OTHER WAY ROUND)
+    store_key = (user_id, snapshot_key)
+    data_version = read_user_version(user_id)
+    snapshot_result = shared_snapshot_store.get(store_key, data_version)
+    if snapshot_result is not None:
+        return snapshot_result, data_version
+    snapshot_result = load_function()
+    shared_snapshot_store.put(store_key, data_version, snapshot_result)
+    return snapshot_result, data_version
@@ -0,0 +1,400 @@
+# FRONTEND CODE FOR THE RESERVATION TABLE MODEL (QTableView BACKEND)
+# THE VIEW ONLY ASKS FOR THE CELLS IT IS PAINTING, SO THOUSANDS OF ROWS COST NO WIDGETS.
+# set_rows() DIFFS THE NEW QUERY RESULT AGAINST WHAT IS SHOWN AND EMITS ROW-LEVEL
+# insert / remove / dataChanged SIGNALS, SO A REFRESH WHERE NOTHING CHANGED REPAINTS NOTHING
+# AND SELECTION / SCROLL POSITION SURVIVE EVERY REFRESH. apply_delta() MERGES JUST THE ROWS
+# THAT CHANGED (SEE reservation_change_tracking).
+# CHECKBOXES LIVE IN THE MODEL, KEYED BY reservation_id (NOT BY ROW NUMBER).
+# LARGE RESULTS ARRIVE IN PAGES (SEE reservation_queries): THE VIEW CALLS canFetchMore / fetchMore
+# WHEN THE USER SCROLLS NEAR THE BOTTOM, WE ASK THE DASHBOARD FOR THE NEXT PAGE THROUGH
+# fetch_more_requested AND IT HANDS THE ROWS BACK TO append_page().
+
+import bisect
+
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, Signal
+
+# ONE ENTRY PER COLUMN: (HEADER TEXT, RESULT KEY, TEXT WHEN NULL)
+# result key None = CHECKBOX COLUMN
+admin_reservation_column_list = [
+    ("", None, ""),
+    ("ID", "reservation_id", ""),
+    ("Room", "room_name", ""),
+    ("Name", "full_name", "N/A"),
+    ("Course/Section", "course_section", "-"),
+    ("Type", "reservation_type", "Academic"),
+    ("Date & Time", "start_time", ""),
+    ("Purpose", "activity_description", "N/A"),
+    ("Status", "current_status", ""),
+]
+
+# StudentDashboard: SAME COLUMNS WITHOUT THE CHECKBOX
+student_reservation_column_list = admin_reservation_column_list[1:]
+
+# CUSTOM ROLES
+reservation_id_role = Qt.UserRole + 1
+sort_value_role = Qt.UserRole + 2
+
+
+class ReservationTableModel(QAbstractTableModel):
+    # EMITTED WHENEVER THE SET OF CHECKED reservation_ids CHANGES (count)
+    checked_count_changed = Signal(int)
+    # THE VIEW SCROLLED TO THE END OF A PARTIAL RESULT: (sort value, reservation_id) OF THE LAST ROW
+    fetch_more_requested = Signal(object)
+    # A HEADER WAS CLICKED, THE DASHBOARD RELOADS THE FIRST PAGE IN THE NEW SERVER-SIDE ORDER
+    sort_changed = Signal()
+
+    def __init__(self, column_list=None, parent=None):
+        super().__init__(parent)
+        if column_list is None:
+            column_list = admin_reservation_column_list
+        self.column_list = column_list
+        self.result_key_list = [result_key for _, result_key, _ in column_list]
+        self.checkbox_column_index = self.result_key_list.index(None) if None in self.result_key_list else -1
+        self.id_value_index = self.result_key_list.index("reservation_id")
+
+        # COMPACT ROW STORAGE: ONE TUPLE OF STRINGS PER ROW (ID STAYS AN INT FOR SORTING)
+        # NULL IS STORED AS "" (LIKE THE COALESCE IN THE PAGE QUERY), ITS null_text IS ONLY FOR DISPLAY
+        self.row_tuple_list = []
+        self.row_index_by_id = {}
+        self.checked_reservation_id_set = set()
+
+        self.sort_column_index = self.id_value_index
+        self.sort_order = Qt.AscendingOrder
+
+        # PAGING STATE: MORE ROWS WAITING ON THE SERVER / A PAGE REQUEST IS IN FLIGHT
+        self.has_more_rows = False
+        self.is_fetching_more = False
+
+    # READ SIDE (CALLED BY THE VIEW)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.row_tuple_list)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.column_list)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.column_list[section][0]
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        if index.column() == self.checkbox_column_index:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsUserCheckable
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row_tuple = self.row_tuple_list[index.row()]
+        column_index = index.column()
+
+        if role == reservation_id_role:
+            return row_tuple[self.id_value_index]
+        if column_index == self.checkbox_column_index:
+            if role == Qt.CheckStateRole:
+                if row_tuple[self.id_value_index] in self.checked_reservation_id_set:
+                    return Qt.Checked
+                return Qt.Unchecked
+            return None
+
+        cell_value = row_tuple[column_index]
+        if role == Qt.DisplayRole:
+            if cell_value == "":
+                return self.column_list[column_index][2]
+            return str(cell_value)
+        if role == sort_value_role:
+            return cell_value
+        # THE STATUS COLUMN IS PAINTED BY status_badge_delegate
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or index.column() != self.checkbox_column_index or role != Qt.CheckStateRole:
+            return False
+        reservation_id = self.row_tuple_list[index.row()][self.id_value_index]
+        # PySide6 HANDS CHECK STATES BACK AS int OR Qt.CheckState
+        if value == Qt.Checked or value == 2:
+            self.checked_reservation_id_set.add(reservation_id)
+        else:
+            self.checked_reservation_id_set.discard(reservation_id)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.checked_count_changed.emit(len(self.checked_reservation_id_set))
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return self.has_more_rows and not self.is_fetching_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.is_fetching_more = True
+        self.fetch_more_requested.emit(self.last_row_cursor())
+
+    # HELPERS FOR THE DASHBOARD
+
+    def sort_key_name(self):
+        # RESULT KEY OF THE SORTED COLUMN (KEY INTO reservation_queries.reservation_sort_expression_dictionary)
+        return self.result_key_list[self.sort_column_index]
+
+    def is_sorted_descending(self):
+        return self.sort_order == Qt.DescendingOrder
+
+    def last_row_cursor(self):
+        if len(self.row_tuple_list) == 0:
+            return None
+        # SAME (LOWERED) VALUE THE PAGE QUERY COMPARES AGAINST
+        return self.sort_key(self.row_tuple_list[-1])
+
+    def cancel_fetch_more(self):
+        # THE PAGE REQUEST WAS SUPERSEDED OR FAILED, LET THE VIEW ASK AGAIN
+        self.is_fetching_more = False
+
+    def reservation_id_at(self, row_index):
+        if row_index < 0 or row_index >= len(self.row_tuple_list):
+            return None
+        return self.row_tuple_list[row_index][self.id_value_index]
+
+    def row_for_reservation_id(self, reservation_id):
+        return self.row_index_by_id.get(reservation_id, -1)
+
+    def checked_reservation_ids(self):
+        # IN TABLE ORDER
+        return [row_tuple[self.id_value_index] for row_tuple in self.row_tuple_list
+                if row_tuple[self.id_value_index] in self.checked_reservation_id_set]
+
+    def set_all_checked(self, is_checked, reservation_id_list=None):
+        # reservation_id_list: ONLY THESE ROWS (E.G. THE ONES THE FILTER PROXY SHOWS), None = EVERY ROW
+        if is_checked:
+            if reservation_id_list is None:
+                reservation_id_list = self.row_index_by_id.keys()
+            self.checked_reservation_id_set = set(reservation_id_list)
+        else:
+            self.checked_reservation_id_set = set()
+        self.emit_checkbox_column_changed()
+        self.checked_count_changed.emit(len(self.checked_reservation_id_set))
+
+    def retain_checked(self, reservation_id_set):
+        # UNCHECK EVERYTHING NOT IN reservation_id_set (ROWS A FILTER JUST HID MUST NOT BE BATCH-PROCESSED)
+        still_checked_id_set = self.checked_reservation_id_set & reservation_id_set
+        if still_checked_id_set == self.checked_reservation_id_set:
+            return
+        self.checked_reservation_id_set = still_checked_id_set
+        self.emit_checkbox_column_changed()
+        self.checked_count_changed.emit(len(self.checked_reservation_id_set))
+
+    def emit_checkbox_column_changed(self):
+        if self.checkbox_column_index < 0 or len(self.row_tuple_list) == 0:
+            return
+        self.dataChanged.emit(self.index(0, self.checkbox_column_index),
+                              self.index(len(self.row_tuple_list) - 1, self.checkbox_column_index),
+                              [Qt.CheckStateRole])
+
+    # WRITE SIDE (QUERY RESULTS IN)
+
+    def make_row_tuple(self, result_row):
+        row_value_list = []
+        for _, result_key, null_text in self.column_list:
+            if result_key is None:
+                row_value_list.append(None)
+            elif result_key == "reservation_id":
+                row_value_list.append(int(result_row[result_key]))
+            else:
+                cell_value = result_row.get(result_key)
+                row_value_list.append("" if cell_value is None else str(cell_value))
+        return tuple(row_value_list)
+
+    def sort_key(self, row_tuple):
+        # TIES BROKEN BY ID SO THE ORDER IS STABLE ACROSS REFRESHES
+        # TEXT COMPARES LOWERED, LIKE THE PAGE QUERY'S ORDER BY, SO LOCAL ORDER = PAGE ORDER
+        sort_value = row_tuple[self.sort_column_index]
+        if isinstance(sort_value, str):
+            sort_value = sort_value.lower()
+        return (sort_value, row_tuple[self.id_value_index])
+
+    def is_beyond_loaded_rows(self, row_tuple):
+        # PAST THE LAST LOADED ROW OF A PARTIAL RESULT: THAT ROW BELONGS TO A PAGE WE HAVEN'T FETCHED YET
+        if not self.has_more_rows or len(self.row_tuple_list) == 0:
+            return False
+        last_sort_key = self.sort_key(self.row_tuple_list[-1])
+        if self.sort_order == Qt.DescendingOrder:
+            return self.sort_key(row_tuple) < last_sort_key
+        return self.sort_key(row_tuple) > last_sort_key
+
+    def set_rows(self, result_row_list, has_more_rows=False):
+        # FULL RESULT (FIRST PAGE, OR EVERY PAGE LOADED SO FAR): ANYTHING NOT IN IT LEAVES THE TABLE
+        self.has_more_rows = has_more_rows
+        self.is_fetching_more = False
+        new_row_tuple_by_id = {}
+        for result_row in result_row_list:
+            row_tuple = self.make_row_tuple(result_row)
+            new_row_tuple_by_id[row_tuple[self.id_value_index]] = row_tuple
+        removed_id_set = set(self.row_index_by_id.keys()) - set(new_row_tuple_by_id.keys())
+        return self.merge_row_tuples(new_row_tuple_by_id, removed_id_set)
+
+    def append_page(self, result_row_list, has_more_rows):
+        # NEXT PAGE: EVERY ROW SORTS AFTER THE ONES WE HAVE (KEYSET QUERY), SO ONE INSERT AT THE END
+        self.is_fetching_more = False
+        self.has_more_rows = has_more_rows
+        appended_row_tuple_list = []
+        updated_row_tuple_by_id = {}
+        for result_row in result_row_list:
+            row_tuple = self.make_row_tuple(result_row)
+            reservation_id = row_tuple[self.id_value_index]
+            if reservation_id in self.row_index_by_id:
+                # ALREADY HERE (A DELTA REFRESH GOT TO IT FIRST)
+                updated_row_tuple_by_id[reservation_id] = row_tuple
+            else:
+                appended_row_tuple_list.append(row_tuple)
+        if updated_row_tuple_by_id:
+            self.merge_row_tuples(updated_row_tuple_by_id, set())
+        if len(appended_row_tuple_list) == 0:
+            return
+        first_row_index = len(self.row_tuple_list)
+        self.beginInsertRows(QModelIndex(), first_row_index, first_row_index + len(appended_row_tuple_list) - 1)
+        self.row_tuple_list.extend(appended_row_tuple_list)
+        self.endInsertRows()
+        self.rebuild_row_index()
+
+    def apply_delta(self, changed_result_row_list, deleted_id_list, row_matcher):
+        # ONLY THE ROWS THAT CHANGED SINCE THE LAST REFRESH. A CHANGED ROW THAT NO LONGER
+        # MATCHES THE DASHBOARD FILTER (row_matcher) LEAVES THE TABLE LIKE A DELETED ONE.
+        # ONE THAT NOW SORTS PAST THE LAST LOADED ROW LEAVES TOO, ITS PAGE WILL BRING IT BACK.
+        upsert_row_tuple_by_id = {}
+        removed_id_set = set(int(reservation_id) for reservation_id in deleted_id_list)
+        for result_row in changed_result_row_list:
+            row_tuple = self.make_row_tuple(result_row)
+            reservation_id = row_tuple[self.id_value_index]
+            if reservation_id in removed_id_set:
+                continue
+            if row_matcher(result_row) and not self.is_beyond_loaded_rows(row_tuple):
+                upsert_row_tuple_by_id[reservation_id] = row_tuple
+            else:
+                removed_id_set.add(reservation_id)
+        return self.merge_row_tuples(upsert_row_tuple_by_id, removed_id_set)
+
+    def merge_row_tuples(self, upsert_row_tuple_by_id, removed_id_set):
+        # RETURNS True IF ANY ROW WAS ADDED, REMOVED OR CHANGED (REFRESH SCHEDULER BACKS OFF OTHERWISE)
+        changed_row_count = 0
+        # 1. REMOVED ROWS (AND ROWS WHOSE SORT POSITION CHANGED), BACK TO FRONT IN CONTIGUOUS RUNS
+        removed_row_index_list = []
+        for reservation_id in removed_id_set:
+            row_index = self.row_index_by_id.get(reservation_id)
+            if row_index is not None:
+                removed_row_index_list.append(row_index)
+        for reservation_id, new_row_tuple in upsert_row_tuple_by_id.items():
+            row_index = self.row_index_by_id.get(reservation_id)
+            if row_index is not None and self.sort_key(new_row_tuple) != self.sort_key(self.row_tuple_list[row_index]):
+                removed_row_index_list.append(row_index)
+        if removed_row_index_list:
+            changed_row_count += len(removed_row_index_list)
+            self.remove_row_indexes(sorted(removed_row_index_list))
+            self.rebuild_row_index()
+
+        # 2. CHANGED ROWS THAT KEEP THEIR POSITION
+        inserted_row_tuple_list = []
+        for reservation_id, new_row_tuple in upsert_row_tuple_by_id.items():
+            row_index = self.row_index_by_id.get(reservation_id)
+            if row_index is None:
+                inserted_row_tuple_list.append(new_row_tuple)
+            elif new_row_tuple != self.row_tuple_list[row_index]:
+                changed_row_count += 1
+                self.row_tuple_list[row_index] = new_row_tuple
+                self.dataChanged.emit(self.index(row_index, 0), self.index(row_index, len(self.column_list) - 1))
+
+        # 3. NEW (OR MOVED) ROWS, EACH INSERTED AT ITS SORTED POSITION
+        if inserted_row_tuple_list:
+            changed_row_count += len(inserted_row_tuple_list)
+            self.insert_sorted_rows(inserted_row_tuple_list)
+            self.rebuild_row_index()
+
+        # CHECKS ON ROWS THAT LEFT THE TABLE ARE DROPPED, LIKE THE OLD TABLE DID
+        still_checked_id_set = self.checked_reservation_id_set & set(self.row_index_by_id.keys())
+        if still_checked_id_set != self.checked_reservation_id_set:
+            self.checked_reservation_id_set = still_checked_id_set
+            self.checked_count_changed.emit(len(self.checked_reservation_id_set))
+        return changed_row_count > 0
+
+    def remove_row_indexes(self, removed_row_index_list):
+        run_end_index = len(removed_row_index_list) - 1
+        while run_end_index >= 0:
+            run_start_index = run_end_index
+            while run_start_index > 0 and \
+                    removed_row_index_list[run_start_index - 1] == removed_row_index_list[run_start_index] - 1:
+                run_start_index -= 1
+            first_row_index = removed_row_index_list[run_start_index]
+            last_row_index = removed_row_index_list[run_end_index]
+
+            self.beginRemoveRows(QModelIndex(), first_row_index, last_row_index)
+            del self.row_tuple_list[first_row_index:last_row_index + 1]
+            self.endRemoveRows()
+            run_end_index = run_start_index - 1
+
+    def insert_sorted_rows(self, new_row_tuple_list):
+        if len(new_row_tuple_list) == 0:
+            return
+        is_descending = self.sort_order == Qt.DescendingOrder
+        new_row_tuple_list.sort(key=self.sort_key, reverse=is_descending)
+
+        if len(self.row_tuple_list) == 0:
+            # FIRST LOAD: ONE INSERT FOR EVERYTHING
+            self.beginInsertRows(QModelIndex(), 0, len(new_row_tuple_list) - 1)
+            self.row_tuple_list = new_row_tuple_list
+            self.endInsertRows()
+            return
+
+        # KEYS IN ASCENDING ORDER (THE TABLE IS ALREADY SORTED, JUST MAYBE BACKWARDS)
+        ascending_sort_key_list = [self.sort_key(row_tuple) for row_tuple in self.row_tuple_list]
+        if is_descending:
+            ascending_sort_key_list.reverse()
+
+        for new_row_tuple in new_row_tuple_list:
+            new_sort_key = self.sort_key(new_row_tuple)
+            ascending_position = bisect.bisect_left(ascending_sort_key_list, new_sort_key)
+            ascending_sort_key_list.insert(ascending_position, new_sort_key)
+            if is_descending:
+                insert_row_index = len(ascending_sort_key_list) - 1 - ascending_position
+            else:
+                insert_row_index = ascending_position
+
+            self.beginInsertRows(QModelIndex(), insert_row_index, insert_row_index)
+            self.row_tuple_list.insert(insert_row_index, new_row_tuple)
+            self.endInsertRows()
+
+    def rebuild_row_index(self):
+        self.row_index_by_id = {row_tuple[self.id_value_index]: row_index
+                                for row_index, row_tuple in enumerate(self.row_tuple_list)}
+
+    def sort(self, column_index, order=Qt.AscendingOrder):
+        # CALLED BY THE VIEW WHEN A HEADER IS CLICKED (setSortingEnabled(True))
+        if column_index == self.checkbox_column_index:
+            return
+        self.layoutAboutToBeChanged.emit()
+        old_row_id_list = [row_tuple[self.id_value_index] for row_tuple in self.row_tuple_list]
+
+        self.sort_column_index = column_index
+        self.sort_order = order
+        self.row_tuple_list.sort(key=self.sort_key, reverse=(order == Qt.DescendingOrder))
+        self.rebuild_row_index()
+
+        # KEEP SELECTION / CURRENT ROW ON THE SAME RESERVATIONS
+        old_persistent_index_list = self.persistentIndexList()
+        new_persistent_index_list = []
+        for persistent_index in old_persistent_index_list:
+            reservation_id = old_row_id_list[persistent_index.row()]
+            new_persistent_index_list.append(
+                self.index(self.row_index_by_id[reservation_id], persistent_index.column()))
+        self.changePersistentIndexList(old_persistent_index_list, new_persistent_index_list)
+        self.layoutChanged.emit()
+
+        # ONLY PART OF THE RESULT IS LOADED: NO MORE PAGES IN THE OLD ORDER UNTIL THE RELOAD ARRIVES
+        if self.has_more_rows:
+            self.is_fetching_more = True
+        self.sort_changed.emit()
@@ -1,61 +1,41 @@
 # BACKEND CODE FOR ROOM DATA INITIALIZATION
 
-import mysql.connector
 from specialized_room_list import special_room_list
-
-# DATABASE CONFIGURATION
-database_host_address = "localhost"
-database_user_login = "root"
-database_user_password = "password"
-database_port_number = "3306"
-database_name_identity = "specialized_room_tracker_backup"
+import database_manager
 
 def room_initialization_process():
-    database_connection_link = mysql.connector.connect(
-        host=database_host_address,
-        user=database_user_login,
-        password=database_user_password,
-        port=database_port_number,
-        database=database_name_identity
-    )
-
-    if database_connection_link.is_connected():
-        database_command_cursor = database_connection_link.cursor()
-        
+    # ONE TRANSACTION: ONE LOOKUP, ONE BATCH OF UPDATES, ONE MULTI-ROW INSERT, ONE COMMIT
+    with database_manager.transaction() as unit_of_work:
         print("-" * 50)
         print("Starting Room Table Initialization...")
 
+        # FIND WHICH ROOMS ALREADY EXIST (SINGLE ROUND TRIP)
+        target_room_name_list = [current_room_data_list[0] for current_room_data_list in special_room_list]
+        check_query_string = "SELECT room_name FROM rooms WHERE room_name IN (" + ", ".join(["%s"] * len(target_room_name_list)) + ")"
+        existing_room_records_list = unit_of_work.fetch_all(check_query_string, tuple(target_room_name_list))
+        existing_room_name_set = set(record["room_name"] for record in existing_room_records_list)
+
+        update_data_values_list = []
+        insert_data_values_list = []
+
         for current_room_data_list in special_room_list:
             
             target_room_name_string = current_room_data_list[0]
             target_room_location_string = current_room_data_list[1]
             default_room_capacity_integer = 40 
 
-            check_query_string = "SELECT room_id FROM rooms WHERE room_name = %s"
-            check_data_tuple = (target_room_name_string,)
-            database_command_cursor.execute(check_query_string, check_data_tuple)
-            
-            existing_room_record = database_command_cursor.fetchone()
-
-            if existing_room_record is not None:
+            if target_room_name_string in existing_room_name_set:
                 print("Updating location for: " + target_room_name_string)
-                update_query_string = "UPDATE rooms SET location = %s WHERE room_name = %s"
-                update_data_values = (target_room_location_string, target_room_name_string)
-                database_command_cursor.execute(update_query_string, update_data_values)
+                update_data_values_list.append((target_room_location_string, target_room_name_string))
             else:
                 print("Inserting new room: " + target_room_name_string)
-                insert_query_string = "INSERT INTO rooms (room_name, capacity, location) VALUES (%s, %s, %s)"
-                insert_data_values = (target_room_name_string, default_room_capacity_integer, target_room_location_string)
-                database_command_cursor.execute(insert_query_string, insert_data_values)
+                insert_data_values_list.append((target_room_name_string, default_room_capacity_integer, target_room_location_string))
 
-            database_connection_link.commit()
+        update_query_string = "UPDATE rooms SET location = %s WHERE room_name = %s"
+        unit_of_work.execute_many(update_query_string, update_data_values_list)
+        unit_of_work.bulk_insert("rooms", ["room_name", "capacity", "location"], insert_data_values_list)
 
         print("-" * 50)
         print("ROOM INITIALIZATION COMPLETED SUCCESSFULLY.")
-        
-        database_command_cursor.close()
-        database_connection_link.close()
-    else:
-        print("Error: Could not connect to the database to initialize rooms.")
 
 room_initialization_process()
\ No newline at end of file
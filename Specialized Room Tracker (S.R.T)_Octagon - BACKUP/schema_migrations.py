@@ -0,0 +1,586 @@
+# BACKEND CODE FOR VERSIONED DATABASE SCHEMA MIGRATIONS
+# RUN THIS BEFORE room_creation.py / account_creation.py ON A NEW DATABASE, AND AFTER EVERY UPDATE
+# EACH MIGRATION RUNS ONCE, THE APPLIED VERSIONS ARE RECORDED IN THE schema_migrations TABLE
+# "statements" ARE FOR MYSQL, "sqlite_statements" ARE THE SAME SCHEMA FOR THE EMBEDDED SQLITE BACKEND
+
+import database_manager
+
+# MYSQL ERRORS THAT JUST MEAN "ALREADY DONE" (SCHEMA WAS CREATED BY HAND BEFORE MIGRATIONS EXISTED,
+# OR A PREVIOUS RUN STOPPED HALF-WAY THROUGH A VERSION). DDL AUTO-COMMITS, SO RE-RUNS MUST BE SAFE.
+already_applied_error_numbers = {
+    1050, # TABLE ALREADY EXISTS
+    1060, # DUPLICATE COLUMN NAME
+    1061, # DUPLICATE KEY NAME
+    1826, # DUPLICATE FOREIGN KEY CONSTRAINT NAME
+    1359, # TRIGGER ALREADY EXISTS
+}
+# SQLITE HAS NO ERROR NUMBERS, AND NO "ADD COLUMN IF NOT EXISTS"
+already_applied_error_messages = (
+    "duplicate column name",
+    "already exists",
+)
+
+schema_migration_list = [
+    {
+        "version": 1,
+        "description": "Base tables for users, rooms and reservations",
+        "statements": [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INT AUTO_INCREMENT PRIMARY KEY,
+                username VARCHAR(100) NOT NULL,
+                password_hash VARCHAR(255) NOT NULL,
+                email VARCHAR(255) NOT NULL,
+                role VARCHAR(50) NOT NULL
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS rooms (
+                room_id INT AUTO_INCREMENT PRIMARY KEY,
+                room_name VARCHAR(150) NOT NULL,
+                capacity INT NOT NULL DEFAULT 40,
+                location VARCHAR(100) NULL,
+                is_active TINYINT(1) NOT NULL DEFAULT 1
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS reservations (
+                reservation_id INT AUTO_INCREMENT PRIMARY KEY,
+                user_id INT NULL,
+                room_id INT NOT NULL,
+                full_name VARCHAR(150) NULL,
+                course_section VARCHAR(100) NULL,
+                reservation_type VARCHAR(50) NULL,
+                start_time DATETIME NOT NULL,
+                end_time DATETIME NULL,
+                activity_description TEXT NULL,
+                current_status VARCHAR(20) NOT NULL DEFAULT 'Pending',
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+            ) ENGINE=InnoDB
+            """,
+        ],
+        "sqlite_statements": [
+            """
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL,
+                password_hash TEXT NOT NULL,
+                email TEXT NOT NULL,
+                role TEXT NOT NULL
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS rooms (
+                room_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                room_name TEXT NOT NULL,
+                capacity INTEGER NOT NULL DEFAULT 40,
+                location TEXT NULL,
+                is_active INTEGER NOT NULL DEFAULT 1
+            )
+            """,
+            # SQLITE CAN'T ADD FOREIGN KEYS LATER, SO THEY ARE DECLARED HERE (VERSION 3 IS A NO-OP ON SQLITE)
+            """
+            CREATE TABLE IF NOT EXISTS reservations (
+                reservation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NULL REFERENCES users (user_id) ON DELETE SET NULL,
+                room_id INTEGER NOT NULL REFERENCES rooms (room_id) ON DELETE CASCADE,
+                full_name TEXT NULL,
+                course_section TEXT NULL,
+                reservation_type TEXT NULL,
+                start_time DATETIME NOT NULL,
+                end_time DATETIME NULL,
+                activity_description TEXT NULL,
+                current_status TEXT NOT NULL DEFAULT 'Pending',
+                -- LOCAL TIME LIKE MYSQL'S CURRENT_TIMESTAMP (THE 5-MINUTE EDIT RULE COMPARES TO datetime.now())
+                created_at DATETIME NOT NULL DEFAULT (datetime('now', 'localtime'))
+            )
+            """,
+        ],
+    },
+    {
+        "version": 2,
+        "description": "Natural keys and lookup indexes for login and dashboard filters",
+        "statements": [
+            # LOGIN LOOKUP (login_authentication) + NO DUPLICATE ACCOUNTS
+            "ALTER TABLE users ADD UNIQUE KEY uq_users_email (email)",
+            # room_creation USES room_name AS ITS NATURAL KEY
+            "ALTER TABLE rooms ADD UNIQUE KEY uq_rooms_room_name (room_name)",
+            # ROOM SCHEDULE / CONFLICT CHECKS, ALSO SERVES THE room_id FOREIGN KEY
+            "ALTER TABLE reservations ADD INDEX idx_reservations_room_time (room_id, start_time, end_time)",
+            # StudentDashboard.load_data (user_id + status filter), ALSO SERVES THE user_id FOREIGN KEY
+            "ALTER TABLE reservations ADD INDEX idx_reservations_user_status (user_id, current_status)",
+            # AdminDashboard.load_requests STATUS FILTER
+            "ALTER TABLE reservations ADD INDEX idx_reservations_status_start (current_status, start_time)",
+        ],
+        "sqlite_statements": [
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_users_email ON users (email)",
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_rooms_room_name ON rooms (room_name)",
+            "CREATE INDEX IF NOT EXISTS idx_reservations_room_time ON reservations (room_id, start_time, end_time)",
+            "CREATE INDEX IF NOT EXISTS idx_reservations_user_status ON reservations (user_id, current_status)",
+            "CREATE INDEX IF NOT EXISTS idx_reservations_status_start ON reservations (current_status, start_time)",
+        ],
+    },
+    {
+        "version": 3,
+        "description": "Foreign keys from reservations to rooms and users",
+        "statements": [
+            """
+            ALTER TABLE reservations ADD CONSTRAINT fk_reservations_room
+                FOREIGN KEY (room_id) REFERENCES rooms (room_id) ON DELETE CASCADE
+            """,
+            """
+            ALTER TABLE reservations ADD CONSTRAINT fk_reservations_user
+                FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE SET NULL
+            """,
+        ],
+        "sqlite_statements": [],
+    },
+    {
+        "version": 4,
+        "description": "Change tracking for delta refreshes (updated_at + deletion tombstones)",
+        "statements": [
+            # STAMPED BY THE SERVER ON EVERY INSERT/UPDATE, MICROSECONDS SO A BURST OF EDITS STAYS ORDERED
+            """
+            ALTER TABLE reservations ADD COLUMN updated_at DATETIME(6) NOT NULL
+                DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+            """,
+            # AdminDashboard DELTA QUERY: WHERE r.updated_at >= high-water mark
+            "ALTER TABLE reservations ADD INDEX idx_reservations_updated_at (updated_at)",
+            """
+            CREATE TABLE IF NOT EXISTS reservation_tombstones (
+                tombstone_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                reservation_id INT NOT NULL,
+                deleted_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+                INDEX idx_reservation_tombstones_deleted_at (deleted_at)
+            ) ENGINE=InnoDB
+            """,
+            # NOTE: MYSQL DOES NOT FIRE TRIGGERS FOR FOREIGN KEY CASCADES, SO CODE THAT REMOVES A ROOM
+            # DELETES ITS RESERVATIONS EXPLICITLY FIRST (RoomDialog.delete_room)
+            """
+            CREATE TRIGGER trg_reservations_tombstone AFTER DELETE ON reservations
+            FOR EACH ROW INSERT INTO reservation_tombstones (reservation_id) VALUES (OLD.reservation_id)
+            """,
+        ],
+        "sqlite_statements": [
+            # SQLITE CAN'T ADD A COLUMN WITH A NON-CONSTANT DEFAULT, THE TRIGGERS BELOW STAMP IT INSTEAD
+            "ALTER TABLE reservations ADD COLUMN updated_at DATETIME NULL",
+            "UPDATE reservations SET updated_at = created_at WHERE updated_at IS NULL",
+            "CREATE INDEX IF NOT EXISTS idx_reservations_updated_at ON reservations (updated_at)",
+            """
+            CREATE TABLE IF NOT EXISTS reservation_tombstones (
+                tombstone_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reservation_id INTEGER NOT NULL,
+                deleted_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_reservation_tombstones_deleted_at ON reservation_tombstones (deleted_at)",
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_stamp_insert AFTER INSERT ON reservations
+            BEGIN
+                UPDATE reservations SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+                WHERE reservation_id = NEW.reservation_id;
+            END
+            """,
+            # THE WHEN CLAUSE SKIPS THE TRIGGER'S OWN UPDATE
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_stamp_update AFTER UPDATE ON reservations
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE reservations SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+                WHERE reservation_id = NEW.reservation_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_tombstone AFTER DELETE ON reservations
+            BEGIN
+                INSERT INTO reservation_tombstones (reservation_id) VALUES (OLD.reservation_id);
+            END
+            """,
+        ],
+    },
+    {
+        "version": 5,
+        "description": "Reservation change log for the push notifier",
+        "statements": [
+            # ONE ROW PER INSERT/UPDATE/DELETE, READ BY change_notifier.py (change_id > last seen)
+            """
+            CREATE TABLE IF NOT EXISTS reservation_change_log (
+                change_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                reservation_id INT NOT NULL,
+                user_id INT NULL,
+                change_type VARCHAR(10) NOT NULL,
+                changed_at DATETIME(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+                INDEX idx_reservation_change_log_changed_at (changed_at)
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE TRIGGER trg_reservations_change_log_insert AFTER INSERT ON reservations
+            FOR EACH ROW INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (NEW.reservation_id, NEW.user_id, 'insert')
+            """,
+            """
+            CREATE TRIGGER trg_reservations_change_log_update AFTER UPDATE ON reservations
+            FOR EACH ROW INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (NEW.reservation_id, NEW.user_id, 'update')
+            """,
+            """
+            CREATE TRIGGER trg_reservations_change_log_delete AFTER DELETE ON reservations
+            FOR EACH ROW INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (OLD.reservation_id, OLD.user_id, 'delete')
+            """,
+        ],
+        "sqlite_statements": [
+            """
+            CREATE TABLE IF NOT EXISTS reservation_change_log (
+                change_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reservation_id INTEGER NOT NULL,
+                user_id INTEGER NULL,
+                change_type TEXT NOT NULL,
+                changed_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime'))
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_reservation_change_log_changed_at ON reservation_change_log (changed_at)",
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_change_log_insert AFTER INSERT ON reservations
+            BEGIN
+                INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (NEW.reservation_id, NEW.user_id, 'insert');
+            END
+            """,
+            # SAME WHEN AS trg_reservations_stamp_update: THE updated_at STAMP ITSELF IS NOT A CHANGE
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_change_log_update AFTER UPDATE ON reservations
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (NEW.reservation_id, NEW.user_id, 'update');
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_change_log_delete AFTER DELETE ON reservations
+            BEGIN
+                INSERT INTO reservation_change_log (reservation_id, user_id, change_type)
+                VALUES (OLD.reservation_id, OLD.user_id, 'delete');
+            END
+            """,
+        ],
+    },
+    {
+        "version": 6,
+        "description": "Keyset pagination indexes for the paged reservation tables",
+        "statements": [
+            # AdminDashboard FIRST PAGE / NEXT PAGE: ORDER BY start_time, reservation_id LIMIT n
+            "ALTER TABLE reservations ADD INDEX idx_reservations_start_id (start_time, reservation_id)",
+            # StudentDashboard PAGES: user_id = %s ORDER BY start_time, reservation_id LIMIT n
+            "ALTER TABLE reservations ADD INDEX idx_reservations_user_start (user_id, start_time, reservation_id)",
+        ],
+        "sqlite_statements": [
+            "CREATE INDEX IF NOT EXISTS idx_reservations_start_id ON reservations (start_time, reservation_id)",
+            "CREATE INDEX IF NOT EXISTS idx_reservations_user_start ON reservations (user_id, start_time, reservation_id)",
+        ],
+    },
+    {
+        "version": 7,
+        "description": "Full-text search indexes for ranked reservation search",
+        "statements": [
+            # reservation_search.search_reservations (A LEADING-WILDCARD LIKE CAN NEVER USE AN INDEX)
+            # FULLTEXT CAN'T SPAN TABLES: ONE INDEX PER TABLE, THE SEARCH ADDS THE TWO SCORES UP
+            """
+            ALTER TABLE reservations ADD FULLTEXT INDEX ftx_reservations_search
+                (full_name, course_section, activity_description)
+            """,
+            "ALTER TABLE rooms ADD FULLTEXT INDEX ftx_rooms_room_name (room_name)",
+        ],
+        "sqlite_statements": [
+            # FTS5 TOKEN INDEX, ONE ROW PER RESERVATION (rowid = reservation_id) WITH ITS ROOM NAME COPIED IN,
+            # KEPT IN STEP BY THE TRIGGERS BELOW
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS reservation_search USING fts5(
+                room_name, full_name, course_section, activity_description,
+                tokenize = 'unicode61 remove_diacritics 2'
+            )
+            """,
+            """
+            INSERT INTO reservation_search (rowid, room_name, full_name, course_section, activity_description)
+            SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section, r.activity_description
+            FROM reservations r
+            JOIN rooms rm ON r.room_id = rm.room_id
+            WHERE r.reservation_id NOT IN (SELECT rowid FROM reservation_search)
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_search_insert AFTER INSERT ON reservations
+            BEGIN
+                INSERT INTO reservation_search (rowid, room_name, full_name, course_section, activity_description)
+                SELECT NEW.reservation_id, rm.room_name, NEW.full_name, NEW.course_section, NEW.activity_description
+                FROM rooms rm WHERE rm.room_id = NEW.room_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_search_update
+            AFTER UPDATE OF room_id, full_name, course_section, activity_description ON reservations
+            BEGIN
+                DELETE FROM reservation_search WHERE rowid = OLD.reservation_id;
+                INSERT INTO reservation_search (rowid, room_name, full_name, course_section, activity_description)
+                SELECT NEW.reservation_id, rm.room_name, NEW.full_name, NEW.course_section, NEW.activity_description
+                FROM rooms rm WHERE rm.room_id = NEW.room_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_search_delete AFTER DELETE ON reservations
+            BEGIN
+                DELETE FROM reservation_search WHERE rowid = OLD.reservation_id;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_rooms_search_rename AFTER UPDATE OF room_name ON rooms
+            BEGIN
+                UPDATE reservation_search SET room_name = NEW.room_name
+                WHERE rowid IN (SELECT reservation_id FROM reservations WHERE room_id = NEW.room_id);
+            END
+            """,
+        ],
+    },
+    {
+        "version": 8,
+        "description": "Notification outbox drained by the background delivery worker",
+        "statements": [
+            # ONE ROW PER EMAIL, WRITTEN IN THE SAME TRANSACTION AS THE STATUS CHANGE (SEE notification_outbox)
+            # delivery_status: pending -> sending -> sent, OR BACK TO pending FOR A RETRY, OR dead AFTER THE LAST ATTEMPT
+            """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                outbox_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                reservation_id INT NULL,
+                new_status VARCHAR(20) NULL,
+                recipient_email VARCHAR(255) NOT NULL,
+                message_subject VARCHAR(255) NOT NULL,
+                message_body TEXT NOT NULL,
+                delivery_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempt_count INT NOT NULL DEFAULT 0,
+                next_attempt_at DATETIME NOT NULL,
+                claimed_at DATETIME NULL,
+                sent_at DATETIME NULL,
+                last_error TEXT NULL,
+                created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_notification_outbox_due (delivery_status, next_attempt_at)
+            ) ENGINE=InnoDB
+            """,
+        ],
+        "sqlite_statements": [
+            """
+            CREATE TABLE IF NOT EXISTS notification_outbox (
+                outbox_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                reservation_id INTEGER NULL,
+                new_status VARCHAR(20) NULL,
+                recipient_email VARCHAR(255) NOT NULL,
+                message_subject VARCHAR(255) NOT NULL,
+                message_body TEXT NOT NULL,
+                delivery_status VARCHAR(20) NOT NULL DEFAULT 'pending',
+                attempt_count INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at DATETIME NOT NULL,
+                claimed_at DATETIME NULL,
+                sent_at DATETIME NULL,
+                last_error TEXT NULL,
+                created_at DATETIME NOT NULL DEFAULT (strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'))
+            )
+            """,
+            "CREATE INDEX IF NOT EXISTS idx_notification_outbox_due ON notification_outbox (delivery_status, next_attempt_at)",
+        ],
+    },
+    {
+        "version": 9,
+        "description": "Per-recipient digests for the notification outbox",
+        "statements": [
+            # ONE LINE PER CHANGE ("Room 101 on ... (Juan Dela Cruz): Approved") FOR THE DIGEST EMAIL
+            "ALTER TABLE notification_outbox ADD COLUMN digest_line VARCHAR(500) NULL",
+            # COALESCING: EVERY PENDING ROW OF A RECIPIENT WHOSE FIRST ROW FELL DUE
+            "ALTER TABLE notification_outbox ADD INDEX idx_notification_outbox_recipient (recipient_email, delivery_status)",
+        ],
+        "sqlite_statements": [
+            "ALTER TABLE notification_outbox ADD COLUMN digest_line VARCHAR(500) NULL",
+            "CREATE INDEX IF NOT EXISTS idx_notification_outbox_recipient ON notification_outbox (recipient_email, delivery_status)",
+        ],
+    },
+    {
+        "version": 10,
+        "description": "Per-user data versions for the student dashboard snapshot check",
+        "statements": [
+            # ONE ROW PER STUDENT, BUMPED WHENEVER ANYTHING THEIR DASHBOARD SHOWS CHANGES
+            # (SEE reservation_snapshot_store: A REFRESH FIRST READS THIS ONE ROW BY PRIMARY KEY)
+            """
+            CREATE TABLE IF NOT EXISTS user_versions (
+                user_id INT PRIMARY KEY,
+                data_version BIGINT NOT NULL DEFAULT 0
+            ) ENGINE=InnoDB
+            """,
+            """
+            CREATE TRIGGER trg_reservations_user_version_insert AFTER INSERT ON reservations
+            FOR EACH ROW INSERT INTO user_versions (user_id, data_version)
+                SELECT NEW.user_id, 1 FROM DUAL WHERE NEW.user_id IS NOT NULL
+                ON DUPLICATE KEY UPDATE data_version = user_versions.data_version + 1
+            """,
+            # A RESERVATION MOVED TO ANOTHER STUDENT CHANGES BOTH DASHBOARDS
+            """
+            CREATE TRIGGER trg_reservations_user_version_update AFTER UPDATE ON reservations
+            FOR EACH ROW INSERT INTO user_versions (user_id, data_version)
+                SELECT changed_user.user_id, 1
+                FROM (SELECT NEW.user_id AS user_id UNION SELECT OLD.user_id) changed_user
+                WHERE changed_user.user_id IS NOT NULL
+                ON DUPLICATE KEY UPDATE data_version = user_versions.data_version + 1
+            """,
+            """
+            CREATE TRIGGER trg_reservations_user_version_delete AFTER DELETE ON reservations
+            FOR EACH ROW INSERT INTO user_versions (user_id, data_version)
+                SELECT OLD.user_id, 1 FROM DUAL WHERE OLD.user_id IS NOT NULL
+                ON DUPLICATE KEY UPDATE data_version = user_versions.data_version + 1
+            """,
+            # THE STUDENT TABLE SHOWS room_name, SO A RENAME CHANGES EVERY DASHBOARD WITH THAT ROOM
+            """
+            CREATE TRIGGER trg_rooms_user_version_rename AFTER UPDATE ON rooms
+            FOR EACH ROW INSERT INTO user_versions (user_id, data_version)
+                SELECT DISTINCT r.user_id, 1 FROM reservations r
+                WHERE r.room_id = NEW.room_id AND r.user_id IS NOT NULL AND NOT (NEW.room_name <=> OLD.room_name)
+                ON DUPLICATE KEY UPDATE data_version = user_versions.data_version + 1
+            """,
+        ],
+        "sqlite_statements": [
+            """
+            CREATE TABLE IF NOT EXISTS user_versions (
+                user_id INTEGER PRIMARY KEY,
+                data_version INTEGER NOT NULL DEFAULT 0
+            )
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_user_version_insert AFTER INSERT ON reservations
+            BEGIN
+                INSERT INTO user_versions (user_id, data_version)
+                SELECT NEW.user_id, 1 WHERE NEW.user_id IS NOT NULL
+                ON CONFLICT (user_id) DO UPDATE SET data_version = data_version + 1;
+            END
+            """,
+            # SAME WHEN AS trg_reservations_stamp_update: THE updated_at STAMP ITSELF IS NOT A CHANGE
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_user_version_update AFTER UPDATE ON reservations
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                INSERT INTO user_versions (user_id, data_version)
+                SELECT changed_user.user_id, 1
+                FROM (SELECT NEW.user_id AS user_id UNION SELECT OLD.user_id) AS changed_user
+                WHERE changed_user.user_id IS NOT NULL
+                ON CONFLICT (user_id) DO UPDATE SET data_version = data_version + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_reservations_user_version_delete AFTER DELETE ON reservations
+            BEGIN
+                INSERT INTO user_versions (user_id, data_version)
+                SELECT OLD.user_id, 1 WHERE OLD.user_id IS NOT NULL
+                ON CONFLICT (user_id) DO UPDATE SET data_version = data_version + 1;
+            END
+            """,
+            """
+            CREATE TRIGGER IF NOT EXISTS trg_rooms_user_version_rename AFTER UPDATE OF room_name ON rooms
+            WHEN NEW.room_name IS NOT OLD.room_name
+            BEGIN
+                INSERT INTO user_versions (user_id, data_version)
+                SELECT DISTINCT r.user_id, 1 FROM reservations r
+                WHERE r.room_id = NEW.room_id AND r.user_id IS NOT NULL
+                ON CONFLICT (user_id) DO UPDATE SET data_version = data_version + 1;
+            END
+            """,
+        ],
+    },
+]
+
+
+def ensure_migration_table(database_cursor_tool):
+    database_cursor_tool.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def get_applied_versions(database_cursor_tool):
+    database_cursor_tool.execute("SELECT version FROM schema_migrations")
+    return set(row[0] for row in database_cursor_tool.fetchall())
+
+
+def get_current_schema_version():
+    with database_manager.pooled_connection() as database_connection_link:
+        database_cursor_tool = database_connection_link.cursor()
+        ensure_migration_table(database_cursor_tool)
+        applied_version_set = get_applied_versions(database_cursor_tool)
+        database_cursor_tool.close()
+    if len(applied_version_set) == 0:
+        return 0
+    return max(applied_version_set)
+
+
+def get_migration_statements(migration):
+    if database_manager.get_backend_name() == "sqlite":
+        return migration["sqlite_statements"]
+    return migration["statements"]
+
+
+def is_already_applied_error(database_error):
+    if getattr(database_error, "errno", None) in already_applied_error_numbers:
+        return True
+    error_message_string = str(database_error).lower()
+    return any(error_message in error_message_string for error_message in already_applied_error_messages)
+
+
+def run_statement(database_cursor_tool, sql_statement_string):
+    try:
+        database_cursor_tool.execute(sql_statement_string)
+    except database_manager.database_error_types as database_error:
+        if is_already_applied_error(database_error):
+            print("    (already present, skipped)")
+            return
+        raise
+
+
+def run_migrations(target_version=None):
+    applied_now_list = []
+
+    with database_manager.pooled_connection() as database_connection_link:
+        database_cursor_tool = database_connection_link.cursor()
+        ensure_migration_table(database_cursor_tool)
+        applied_version_set = get_applied_versions(database_cursor_tool)
+
+        for migration in sorted(schema_migration_list, key=lambda migration: migration["version"]):
+            migration_version = migration["version"]
+            if migration_version in applied_version_set:
+                continue
+            if target_version is not None and migration_version > target_version:
+                break
+
+            print("Applying migration " + str(migration_version) + ": " + migration["description"])
+            for sql_statement_string in get_migration_statements(migration):
+                run_statement(database_cursor_tool, sql_statement_string)
+
+            database_cursor_tool.execute(
+                "INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                (migration_version, migration["description"])
+            )
+            database_connection_link.commit()
+            applied_now_list.append(migration_version)
+
+        database_cursor_tool.close()
+
+    # TABLE LAYOUT CHANGED UNDER ANY CACHED RESULTS
+    database_manager.clear_query_cache()
+    return applied_now_list
+
+
+if __name__ == "__main__":
+    print("-" * 50)
+    print("Running schema migrations...")
+    applied_version_list = run_migrations()
+    print("-" * 50)
+    if len(applied_version_list) == 0:
+        print("SCHEMA ALREADY UP TO DATE (VERSION " + str(get_current_schema_version()) + ").")
+    else:
+        print("APPLIED VERSIONS: " + ", ".join(str(version) for version in applied_version_list))
+    print("-" * 50)
@@ -0,0 +1,75 @@
+# FRONTEND CODE FOR PAINTING THE STATUS BADGES IN THE RESERVATION TABLES
+# ONE DELEGATE PAINTS EVERY STATUS CELL STRAIGHT ONTO THE VIEW: NO QLabel PER ROW, NO setStyleSheet
+# PER ROW, SO A REFRESH OF THOUSANDS OF ROWS CREATES ZERO CHILD WIDGETS.
+# USAGE: table.setItemDelegateForColumn(status_column_index, StatusBadgeDelegate(table))
+
+from PySide6.QtCore import Qt, QRectF, QSize
+from PySide6.QtGui import QBrush, QColor, QFont, QPainter, QPen
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionViewItem, QApplication
+
+# STATUS -> (BADGE COLOUR, TEXT COLOUR), SAME COLOURS THE OLD QLabel BADGES USED
+status_badge_colour_dictionary = {
+    "Approved": ("#8BC34A", "#000000"),
+    "Pending": ("#FF9800", "#000000"),
+    "Cancelled": ("#FFCDD2", "#D32F2F"),
+    "Rejected": ("#FFCDD2", "#D32F2F"),
+}
+# ANYTHING ELSE (SHOULDN'T HAPPEN, BUT NEVER PAINT NOTHING)
+unknown_status_badge_colours = ("#E0E0E0", "#000000")
+
+badge_margin_pixels = 4
+badge_corner_radius_pixels = 4
+
+
+def build_badge_palette():
+    # QBrush / QPen OBJECTS ARE BUILT ONCE, paint() ONLY LOOKS THEM UP
+    badge_palette_dictionary = {}
+    for status_text, (badge_colour, text_colour) in status_badge_colour_dictionary.items():
+        badge_palette_dictionary[status_text] = (QBrush(QColor(badge_colour)), QPen(QColor(text_colour)))
+    return badge_palette_dictionary
+
+
+class StatusBadgeDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.badge_palette_dictionary = build_badge_palette()
+        self.unknown_status_palette = (QBrush(QColor(unknown_status_badge_colours[0])),
+                                       QPen(QColor(unknown_status_badge_colours[1])))
+        self.badge_font = None
+
+    def paint(self, painter, option, index):
+        status_text = index.data(Qt.DisplayRole)
+        if status_text is None:
+            super().paint(painter, option, index)
+            return
+        status_text = str(status_text)
+
+        # ROW BACKGROUND / SELECTION HIGHLIGHT FROM THE CURRENT STYLE, WITHOUT THE TEXT
+        background_option = QStyleOptionViewItem(option)
+        self.initStyleOption(background_option, index)
+        background_option.text = ""
+        widget = background_option.widget
+        style = widget.style() if widget is not None else QApplication.style()
+        style.drawControl(QStyle.CE_ItemViewItem, background_option, painter, widget)
+
+        if self.badge_font is None:
+            self.badge_font = QFont(option.font)
+            self.badge_font.setBold(True)
+
+        badge_brush, text_pen = self.badge_palette_dictionary.get(status_text, self.unknown_status_palette)
+        badge_rectangle = QRectF(option.rect).adjusted(badge_margin_pixels, badge_margin_pixels,
+                                                       -badge_margin_pixels, -badge_margin_pixels)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(badge_brush)
+        painter.drawRoundedRect(badge_rectangle, badge_corner_radius_pixels, badge_corner_radius_pixels)
+        painter.setPen(text_pen)
+        painter.setFont(self.badge_font)
+        painter.drawText(badge_rectangle, Qt.AlignCenter, status_text)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        size_hint = super().sizeHint(option, index)
+        return QSize(size_hint.width() + 4 * badge_margin_pixels, size_hint.height() + 2 * badge_margin_pixels)
@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-                               QPushButton, QTableWidget, QTableWidgetItem,
+                               QPushButton, QTableView, QAbstractItemView,
                                QHeaderView, QLineEdit, QDialog, QGridLayout,
                                QComboBox, QFrame, QDateEdit, QTimeEdit, QMessageBox, QApplication)
 from PySide6.QtCore import Qt, QDate, QTime, QSize, Signal, QTimer
@@ -8,7 +8,23 @@ import os
 
 from datetime import datetime
 
-
+from background_executor import BackgroundQueryExecutor
+from reservation_table_model import ReservationTableModel, student_reservation_column_list, reservation_id_role
+from reservation_filter_proxy import ReservationFilterProxyModel, search_debounce_milliseconds
+from status_badge_delegate import StatusBadgeDelegate
+from change_feed_client import ChangeFeedClient
+from refresh_scheduler import RefreshScheduler
+from reservation_queries import (build_page_query, split_page, reservation_page_size, default_date_window,
+                                 build_date_window_sql)
+from reservation_snapshot_store import fetch_with_version_check
+
+# Columns for the student table (filtered to the logged-in user in load_data)
+student_reservations_select_sql = """
+    SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section,
+           r.reservation_type, r.start_time, r.current_status, r.activity_description
+    FROM reservations r
+    JOIN rooms rm ON r.room_id = rm.room_id
+"""
 
 
 class StudentDashboard(QWidget):
@@ -81,20 +97,51 @@ class StudentDashboard(QWidget):
             ["All", "Approved", "Pending", "Cancelled", "Rejected"])
         self.filter_combo.setFixedWidth(180)
         self.filter_combo.setFixedHeight(35)
-        self.filter_combo.currentTextChanged.connect(lambda: self.load_data())
+        # Status and search filter the loaded rows locally (no database round trip)
+        self.filter_combo.currentTextChanged.connect(lambda: self.apply_local_filters())
         filter_layout.addWidget(filter_label)
         filter_layout.addWidget(self.filter_combo)
         controls_layout.addLayout(filter_layout)
 
         controls_layout.addSpacing(40)
 
+        # Date window: today through the next 30 days by default, pending requests of any age always show
+        date_layout = QHBoxLayout()
+        date_label = QLabel("Dates:")
+        date_label.setStyleSheet("font-size: 16px;")
+        window_start_date, window_end_date = default_date_window()
+        self.window_start_input = QDateEdit()
+        self.window_start_input.setCalendarPopup(True)
+        self.window_start_input.setFixedHeight(35)
+        self.window_start_input.setDate(QDate(window_start_date.year, window_start_date.month, window_start_date.day))
+        self.window_start_input.dateChanged.connect(lambda: self.load_data())
+        self.window_end_input = QDateEdit()
+        self.window_end_input.setCalendarPopup(True)
+        self.window_end_input.setFixedHeight(35)
+        self.window_end_input.setDate(QDate(window_end_date.year, window_end_date.month, window_end_date.day))
+        self.window_end_input.dateChanged.connect(lambda: self.load_data())
+        date_to_label = QLabel("to")
+        date_to_label.setStyleSheet("font-size: 16px;")
+        date_layout.addWidget(date_label)
+        date_layout.addWidget(self.window_start_input)
+        date_layout.addWidget(date_to_label)
+        date_layout.addWidget(self.window_end_input)
+        controls_layout.addLayout(date_layout)
+
+        controls_layout.addSpacing(40)
+
         search_layout = QHBoxLayout()
         search_label = QLabel("Search by Room/Name:")
         search_label.setStyleSheet("font-size: 16px;")
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter room or name")
         self.search_input.setFixedHeight(35)
-        self.search_input.textChanged.connect(lambda: self.load_data())
+        # Re-filter once typing pauses, not on every keystroke
+        self.search_debounce_timer = QTimer(self)
+        self.search_debounce_timer.setSingleShot(True)
+        self.search_debounce_timer.setInterval(search_debounce_milliseconds)
+        self.search_debounce_timer.timeout.connect(self.apply_local_filters)
+        self.search_input.textChanged.connect(lambda: self.search_debounce_timer.start())
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_input)
         controls_layout.addLayout(search_layout)
@@ -102,17 +149,23 @@ class StudentDashboard(QWidget):
         layout.addLayout(controls_layout)
 
         # 3. Table
-        self.table = QTableWidget()
-        cols = ["ID", "Room", "Name", "Course/Section",
-                "Type", "Date & Time", "Purpose", "Status"]
-        self.table.setColumnCount(len(cols))
-        self.table.setHorizontalHeaderLabels(cols)
+        # Model/view with paged loading (first page shows at once, the rest streams in on scroll)
+        # The model holds the date window's snapshot, the proxy hides rows outside the status/search filter
+        self.table_model = ReservationTableModel(student_reservation_column_list, self)
+        self.filter_proxy = ReservationFilterProxyModel(("room_name",), self)
+        self.filter_proxy.setSourceModel(self.table_model)
+        self.filter_proxy.set_filters(self.filter_combo.currentText(), self.search_input.text())
+        self.table = QTableView()
+        self.table.setModel(self.filter_proxy)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
         self.table.verticalHeader().setVisible(False)
         self.table.verticalHeader().setDefaultSectionSize(45)  # Set row height
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSortingEnabled(True)  # Enable sorting
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSortingEnabled(True)  # Enable sorting (server-side order, see load_data)
+        self.table.sortByColumn(5, Qt.AscendingOrder)  # Date & Time
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        # Status badges are painted by one delegate (no per-row widgets)
+        self.table.setItemDelegateForColumn(7, StatusBadgeDelegate(self.table))
         self.table.setStyleSheet(
             "selection-background-color: #5d1010; selection-color: white;")
         layout.addWidget(self.table)
@@ -182,6 +235,11 @@ class StudentDashboard(QWidget):
             btn_style_small + "QPushButton { background-color: #4CAF50; } QPushButton:hover { background-color: #45a049; }")
         self.refresh_btn.clicked.connect(self.load_data)
 
+        # Non-blocking loading indicator (DB work runs on background threads)
+        self.loading_label = QLabel("")
+        self.loading_label.setStyleSheet("font-size: 14px;")
+
+        action_row_layout.addWidget(self.loading_label)
         action_row_layout.addWidget(details_btn)
         action_row_layout.addWidget(cancel_btn)
         action_row_layout.addWidget(edit_btn)
@@ -189,13 +247,30 @@ class StudentDashboard(QWidget):
 
         layout.addLayout(action_row_layout)
 
-        # Auto-Refresh Timer (30 seconds)
-        self.refresh_timer = QTimer(self)
-        self.refresh_timer.timeout.connect(self.load_data)
-        self.refresh_timer.start(30000)  # 30 seconds
+        # Background executor: MySQL calls never run on the GUI thread
+        self.query_executor = BackgroundQueryExecutor(self)
+        self.query_executor.busy_changed.connect(self.show_loading_state)
 
-        # Initial Load
-        self.load_data()
+        # Auto-Refresh: 30 seconds, backing off while nothing changes, paused while hidden
+        # (intervals in refresh_scheduler.refresh_interval_settings["student"])
+        self.refresh_scheduler = RefreshScheduler(self, "student", self)
+        self.refresh_scheduler.refresh_due.connect(self.load_data)
+
+        self.table_model.fetch_more_requested.connect(self.load_next_page)
+        self.table_model.sort_changed.connect(self.load_data)
+        # Filter/order the rows on screen were loaded with (a new one starts again from page one)
+        self.loaded_filter_key = None
+        # user_versions value those rows were current for (see reservation_snapshot_store)
+        self.loaded_data_version = None
+
+        # Push refresh from change_notifier.py; polling above is the fallback when it isn't running
+        self.change_feed = ChangeFeedClient(parent=self)
+        self.change_feed.reservations_changed.connect(self.handle_reservations_changed)
+        self.change_feed.connection_changed.connect(self.handle_change_feed_connection)
+        self.change_feed.start()
+
+        # Initial Load (as soon as the dashboard is shown)
+        self.refresh_scheduler.start()
 
     def toggle_theme(self):
         if self.is_currently_dark == False:
@@ -207,51 +282,122 @@ class StudentDashboard(QWidget):
             self.setStyleSheet("background-color: white; color: black;")
             print("System: Light mode activated.")
 
-    def load_data(self):
-        query = """
-            SELECT r.reservation_id, rm.room_name, r.full_name, r.course_section,
-                   r.reservation_type, r.start_time, r.current_status, r.activity_description
-            FROM reservations r
-            JOIN rooms rm ON r.room_id = rm.room_id
-            WHERE r.user_id = %s
-        """
+    def handle_reservations_changed(self, change_message):
+        # Only refresh when one of this student's own reservations changed
+        if int(self.user['id']) in change_message.get("user_ids", []):
+            self.refresh_scheduler.request_refresh()
+
+    def handle_change_feed_connection(self, is_connected):
+        self.refresh_scheduler.set_push_active(is_connected)
+        if is_connected:
+            self.refresh_scheduler.request_refresh()
+
+    def show_loading_state(self, is_busy):
+        self.loading_label.setText("Loading..." if is_busy else "")
+
+    def show_background_error(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        self.loading_label.setText("Could not reach the database.")
+
+    def current_reservation_id(self):
+        current_index = self.table.currentIndex()
+        if not current_index.isValid():
+            return None
+        return current_index.data(reservation_id_role)
+
+    def apply_local_filters(self):
+        self.search_debounce_timer.stop()
+        self.filter_proxy.set_filters(self.filter_combo.currentText(), self.search_input.text())
+
+    def current_date_window(self):
+        # (first day, last day) in order, whichever way round the user picked them
+        first_date = self.window_start_input.date().toPython()
+        last_date = self.window_end_input.date().toPython()
+        return min(first_date, last_date), max(first_date, last_date)
+
+    def build_filter_sql(self):
+        filter_sql = " AND r.user_id = %s"
         params = [self.user['id']]
-        
-        filter_text = self.filter_combo.currentText()
-        if filter_text != "All":
-            query = query + " AND r.current_status = %s"
-            params.append(filter_text)
-
-        search_text = self.search_input.text()
-        if search_text != "":
-            query = query + " AND rm.room_name LIKE %s"
-            params.append("%" + search_text + "%")
-
-        results = self.db_manager.fetch_all(query, tuple(params))
-        self.table.setRowCount(len(results))
-
-        for i, row in enumerate(results):
-            self.table.setItem(i, 0, QTableWidgetItem(str(row['reservation_id'])))
-            self.table.setItem(i, 1, QTableWidgetItem(str(row['room_name'])))
-            self.table.setItem(i, 2, QTableWidgetItem(str(row['full_name'])))
-            self.table.setItem(i, 3, QTableWidgetItem(str(row['course_section'])))
-            self.table.setItem(i, 4, QTableWidgetItem(str(row['reservation_type'])))
-            self.table.setItem(i, 5, QTableWidgetItem(str(row['start_time'])))
-            self.table.setItem(i, 6, QTableWidgetItem(str(row['activity_description'])))
-
-            status_label = QLabel(str(row['current_status']))
-            status_label.setAlignment(Qt.AlignCenter)
-            status_label.setStyleSheet("font-weight: bold; background-color: #FF9800; color: black;")
-            self.table.setCellWidget(i, 7, status_label)
+
+        window_sql, window_params = build_date_window_sql(*self.current_date_window())
+        filter_sql = filter_sql + window_sql
+        params.extend(window_params)
+        # Status / search are applied by self.filter_proxy, the snapshot holds every status
+        return filter_sql, params
+
+    def fetch_reservation_page(self, filter_sql, params, sort_key_name, is_descending,
+                               after_cursor=None, page_row_limit=None, use_cache=True):
+        # Worker thread: one keyset page -> {"rows": [...], "has_more": bool}
+        query, query_params = build_page_query(student_reservations_select_sql, filter_sql, params,
+                                               sort_key_name, is_descending, after_cursor, page_row_limit)
+        rows, has_more = split_page(self.db_manager.fetch_all(query, query_params, use_cache=use_cache),
+                                    page_row_limit)
+        return {"rows": rows, "has_more": has_more}
+
+    def fetch_reservation_snapshot(self, filter_sql, params, sort_key_name, is_descending, page_row_limit):
+        # Worker thread: probe this student's version first, run the join only if it moved
+        # (the query cache is skipped on a reload, it could still hold rows from before the bump)
+        snapshot_key = (filter_sql, tuple(params), sort_key_name, is_descending, page_row_limit)
+        page_result, data_version = fetch_with_version_check(
+            self.user['id'], snapshot_key,
+            lambda: self.fetch_reservation_page(filter_sql, params, sort_key_name, is_descending,
+                                                None, page_row_limit, use_cache=False))
+        return dict(page_result, data_version=data_version)
+
+    def load_data(self):
+        filter_sql, params = self.build_filter_sql()
+        sort_key_name = self.table_model.sort_key_name()
+        is_descending = self.table_model.is_sorted_descending()
+        filter_key = (self.current_date_window(), sort_key_name, is_descending)
+
+        # Same filter/order: reload every row already scrolled in, so the refresh can diff them
+        page_row_limit = reservation_page_size
+        if filter_key == self.loaded_filter_key:
+            page_row_limit = max(reservation_page_size, self.table_model.rowCount())
+
+        # Runs on a worker thread; a newer refresh cancels this one if it is still in flight
+        self.query_executor.cancel("load_next_page")
+        self.query_executor.submit("load_data", self.fetch_reservation_snapshot,
+                                   filter_sql, params, sort_key_name, is_descending, page_row_limit,
+                                   on_success=lambda page_result: self.populate_table(page_result, filter_key),
+                                   on_error=self.handle_load_failed)
+
+    def handle_load_failed(self, error_message):
+        self.show_background_error(error_message)
+        self.table_model.cancel_fetch_more()
+        self.refresh_scheduler.report_refresh_result(False)
+
+    def populate_table(self, page_result, filter_key):
+        if filter_key == self.loaded_filter_key and page_result["data_version"] == self.loaded_data_version:
+            # Nothing of this student's changed since the rows on screen were loaded
+            self.refresh_scheduler.report_refresh_result(False)
+            return
+        # The model diffs against what is shown; an unchanged refresh touches no rows
+        had_changes = self.table_model.set_rows(page_result["rows"], page_result["has_more"])
+        self.loaded_filter_key = filter_key
+        self.loaded_data_version = page_result["data_version"]
+        self.refresh_scheduler.report_refresh_result(had_changes)
+
+    def load_next_page(self, after_cursor):
+        filter_sql, params = self.build_filter_sql()
+        self.query_executor.submit("load_next_page", self.fetch_reservation_page,
+                                   filter_sql, params, self.table_model.sort_key_name(),
+                                   self.table_model.is_sorted_descending(), after_cursor,
+                                   on_success=lambda page_result: self.table_model.append_page(
+                                       page_result["rows"], page_result["has_more"]),
+                                   on_error=self.handle_page_failed)
+
+    def handle_page_failed(self, error_message):
+        self.show_background_error(error_message)
+        self.table_model.cancel_fetch_more()
 
     def open_reservation_modal(self):
         ReservationDialog(self.db_manager, self.user, self.is_currently_dark, self).exec()
         self.load_data()
         
     def view_details(self):
-        selected_row = self.table.currentRow()
-        if selected_row >= 0:
-            target_res_id = self.table.item(selected_row, 0).text()
+        target_res_id = self.current_reservation_id()
+        if target_res_id is not None:
             # Open the ReservationDialog in view-only mode
             dialog = ReservationDialog(self.db_manager, self.user, self.is_currently_dark, self, res_id=target_res_id, view_only=True)
             dialog.exec()
@@ -259,32 +405,37 @@ class StudentDashboard(QWidget):
             QMessageBox.warning(self, "No Selection", "Please select a row first.")
 
     def cancel_request(self):
-        selected_row = self.table.currentRow()
-        if selected_row >= 0:
-            target_res_id = self.table.item(selected_row, 0).text()
+        target_res_id = self.current_reservation_id()
+        if target_res_id is not None:
             sql = "UPDATE reservations SET current_status = 'Cancelled' WHERE reservation_id = %s"
-            if self.db_manager.execute_query(sql, (target_res_id,)):
-                QMessageBox.information(self, "Success", "Reservation Cancelled.")
-                self.load_data()
+            self.query_executor.submit(None, self.db_manager.execute_query, sql, (target_res_id,),
+                                       on_success=self.finish_cancel_request,
+                                       on_error=self.show_background_error)
+
+    def finish_cancel_request(self, was_cancelled):
+        if was_cancelled:
+            QMessageBox.information(self, "Success", "Reservation Cancelled.")
+            self.load_data()
 
     def edit_reservation(self):
-        # index of the row the user clicked on
-        selected_row_index_integer = self.table.currentRow()
+        # reservation of the row the user clicked on
+        selected_reservation_id = self.current_reservation_id()
 
-        if selected_row_index_integer < 0:
+        if selected_reservation_id is None:
             QMessageBox.warning(self, "No Selection", "Please select a reservation to edit.")
             return
 
-        # KUNIN reservation_id FIRST COUMN
-        selected_item_object = self.table.item(selected_row_index_integer, 0)
-        reservation_id_string = selected_item_object.text()
-
-        # 'created_at' CHECK 'reservation_id'
+        # 'created_at' CHECK 'reservation_id' (worker thread, open_edit_dialog gets the result)
         sql_query_string = "SELECT created_at FROM reservations WHERE reservation_id = %s"
-        query_parameters_tuple = (reservation_id_string,)
+        query_parameters_tuple = (selected_reservation_id,)
         
-        database_results_list = self.db_manager.fetch_all(sql_query_string, query_parameters_tuple)
+        self.query_executor.submit("check_edit_window", self.db_manager.fetch_all,
+                                   sql_query_string, query_parameters_tuple,
+                                   on_success=lambda database_results_list: self.open_edit_dialog(
+                                       selected_reservation_id, database_results_list),
+                                   on_error=self.show_background_error)
 
+    def open_edit_dialog(self, selected_reservation_id, database_results_list):
         # NAHANAP BA YUNG RESERVATION? (CHECK LOGIC)
         if len(database_results_list) == 0:
             return
@@ -322,24 +473,26 @@ class StudentDashboard(QWidget):
             QMessageBox.warning(self, "Action Denied", full_error_message)
             return
 
-        edit_dialog_window = ReservationDialog(self.db_manager, self.user, self.is_currently_dark, self, res_id=reservation_id_string)
+        edit_dialog_window = ReservationDialog(self.db_manager, self.user, self.is_currently_dark, self, res_id=selected_reservation_id)
         dialog_result = edit_dialog_window.exec()
         
         if dialog_result == 1:
             self.load_data()
 
     def delete_reservation(self):
-        row = self.table.currentRow()
-        if row < 0:
+        res_id = self.current_reservation_id()
+        if res_id is None:
             QMessageBox.warning(self, "No Selection",
                                 "Please select a reservation to delete.")
             return
 
-        res_id = self.table.item(row, 0).text()
+        # Check time limit (5 minutes), confirm_delete_reservation gets the result
+        self.query_executor.submit("check_delete_window", self.db_manager.fetch_all,
+                                   "SELECT created_at FROM reservations WHERE reservation_id = %s", (res_id,),
+                                   on_success=lambda results: self.confirm_delete_reservation(res_id, results),
+                                   on_error=self.show_background_error)
 
-        # Check time limit (5 minutes)
-        results = self.db_manager.fetch_all(
-            "SELECT created_at FROM reservations WHERE reservation_id = %s", (res_id,))
+    def confirm_delete_reservation(self, res_id, results):
         if not results:
             return
 
@@ -362,13 +515,19 @@ class StudentDashboard(QWidget):
                                        QMessageBox.Yes | QMessageBox.No)
 
         if confirm == QMessageBox.Yes:
-            if self.db_manager.execute_query("DELETE FROM reservations WHERE reservation_id = %s", (res_id,)):
-                QMessageBox.information(
-                    self, "Deleted", "Reservation successfully deleted.")
-                self.load_data()
-            else:
-                QMessageBox.critical(
-                    self, "Error", "Failed to delete reservation.")
+            self.query_executor.submit(None, self.db_manager.execute_query,
+                                       "DELETE FROM reservations WHERE reservation_id = %s", (res_id,),
+                                       on_success=self.finish_delete_reservation,
+                                       on_error=self.show_background_error)
+
+    def finish_delete_reservation(self, was_deleted):
+        if was_deleted:
+            QMessageBox.information(
+                self, "Deleted", "Reservation successfully deleted.")
+            self.load_data()
+        else:
+            QMessageBox.critical(
+                self, "Error", "Failed to delete reservation.")
 
 
 class ReservationDialog(QDialog):
@@ -430,11 +589,8 @@ class ReservationDialog(QDialog):
         form_layout.setVerticalSpacing(15)
         form_layout.setHorizontalSpacing(10)
 
-        # Fields
+        # Fields (rooms are filled in by populate_form)
         self.room_combo = QComboBox()
-        rooms = self.db_manager.fetch_all("SELECT * FROM rooms")
-        for r in rooms:
-            self.room_combo.addItem(r['room_name'], r['room_id'])
 
         self.name_input = QLineEdit()
         self.name_input.setText(self.user.get('full_name', ''))
@@ -482,11 +638,13 @@ class ReservationDialog(QDialog):
         # Buttons
         btn_layout = QHBoxLayout()
 
-        submit_btn = QPushButton("Submit Reservation")
-        submit_btn.setStyleSheet(
+        self.submit_btn = QPushButton("Submit Reservation")
+        self.submit_btn.setStyleSheet(
             "background-color: #8BC34A; color: black; font-size: 16px; border-radius: 5px; padding: 10px; font-weight: bold;")
-        submit_btn.setFixedHeight(45)
-        submit_btn.clicked.connect(self.submit)
+        self.submit_btn.setFixedHeight(45)
+        self.submit_btn.clicked.connect(self.submit)
+        # Enabled once the rooms (and the reservation being edited) have arrived
+        self.submit_btn.setEnabled(False)
 
         cancel_btn = QPushButton("Cancel")
         cancel_btn.setStyleSheet(
@@ -494,13 +652,13 @@ class ReservationDialog(QDialog):
         cancel_btn.setFixedHeight(45)
         cancel_btn.clicked.connect(self.reject)
 
-        btn_layout.addWidget(submit_btn)
+        btn_layout.addWidget(self.submit_btn)
         btn_layout.addWidget(cancel_btn)
         layout.addLayout(btn_layout)
         
         # Handle View Only Mode
         if self.view_only:
-            submit_btn.setVisible(False)
+            self.submit_btn.setVisible(False)
             cancel_btn.setText("Close")
             
             self.room_combo.setEnabled(False)
@@ -513,13 +671,38 @@ class ReservationDialog(QDialog):
             self.duration_input.setReadOnly(True)
             self.purpose_input.setReadOnly(True)
 
+        # Rooms, the reservation being edited and the submit all run on a worker thread
+        self.query_executor = BackgroundQueryExecutor(self)
+        self.query_executor.submit("load_form", self.fetch_form_data,
+                                   on_success=self.populate_form,
+                                   on_error=self.handle_load_failed)
+
+    def fetch_form_data(self):
+        # Worker thread: (rooms, [reservation row] when editing or viewing)
+        rooms = self.db_manager.fetch_all("SELECT * FROM rooms", cache_ttl_seconds=self.db_manager.reference_data_cache_ttl_seconds)
+        results = []
+        if self.res_id:
+            results = self.db_manager.fetch_all(
+                "SELECT * FROM reservations WHERE reservation_id = %s", (self.res_id,), use_cache=False)
+        return rooms, results
+
+    def handle_load_failed(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        QMessageBox.critical(self, "Error", "Could not reach the database.")
+        self.reject()
+
+    def populate_form(self, form_data):
+        rooms, results = form_data
+        for r in rooms:
+            self.room_combo.addItem(r['room_name'], r['room_id'])
         if self.res_id:
-            self.load_existing_data()
+            self.load_existing_data(results)
+        else:
+            self.submit_btn.setEnabled(True)
 
-    def load_existing_data(self):
-        results = self.db_manager.fetch_all(
-            "SELECT * FROM reservations WHERE reservation_id = %s", (self.res_id,))
+    def load_existing_data(self, results):
         if results:
+            self.submit_btn.setEnabled(True)
             # Match current index for room
             res = results[0]
             for i in range(self.room_combo.count()):
@@ -589,12 +772,6 @@ class ReservationDialog(QDialog):
             params = (self.room_combo.currentData(), self.name_input.text(), 
                       self.course_input.text(), self.type_input.currentText(), 
                       dt_str, end_dt_str, self.purpose_input.text(), self.res_id)
-            
-            if self.db_manager.execute_query(query, params):
-                QMessageBox.information(self, "Success", "Reservation Updated Successfully!")
-                self.accept()
-            else:
-                QMessageBox.critical(self, "Error", "Failed to update reservation")
         else:
             query = """
                 INSERT INTO reservations (user_id, room_id, full_name, course_section, 
@@ -604,6 +781,25 @@ class ReservationDialog(QDialog):
             params = (self.user['id'], self.room_combo.currentData(), self.name_input.text(), 
                       self.course_input.text(), self.type_input.currentText(), dt_str, end_dt_str, self.purpose_input.text())
 
-            if self.db_manager.execute_query(query, params):
+        # No second click while the write is on its way
+        self.submit_btn.setEnabled(False)
+        self.query_executor.submit(None, self.db_manager.execute_query, query, params,
+                                   on_success=self.finish_submit,
+                                   on_error=self.handle_submit_failed)
+
+    def finish_submit(self, was_saved):
+        if was_saved:
+            if self.res_id:
+                QMessageBox.information(self, "Success", "Reservation Updated Successfully!")
+            else:
                 QMessageBox.information(self, "Success", "Reservation Request Sent!")
-                self.accept()
\ No newline at end of file
+            self.accept()
+            return
+        self.submit_btn.setEnabled(True)
+        if self.res_id:
+            QMessageBox.critical(self, "Error", "Failed to update reservation")
+
+    def handle_submit_failed(self, error_message):
+        print("System: Background database task failed: " + error_message)
+        self.submit_btn.setEnabled(True)
+        QMessageBox.critical(self, "Error", "Could not reach the database.")
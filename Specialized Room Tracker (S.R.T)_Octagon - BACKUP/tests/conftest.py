@@ -0,0 +1,170 @@
+# SHARED FIXTURES FOR THE BACKEND TESTS
+# EVERY TEST GETS ITS OWN THROWAWAY SQLITE FILE (ALL SCHEMA MIGRATIONS APPLIED) AND, WHEN IT SENDS MAIL,
+# A LOCAL SMTP STAND-IN ON 127.0.0.1. NOTHING HERE TOUCHES THE CAMPUS MYSQL SERVER OR GMAIL.
+#     python -m pytest -q        (FROM THE PROJECT FOLDER)
+
+import os
+import socketserver
+import sys
+import tempfile
+import threading
+from datetime import datetime
+
+import pytest
+
+project_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_directory not in sys.path:
+    sys.path.insert(0, project_directory)
+
+# database_manager PICKS ITS BACKEND AT IMPORT TIME, SO THIS MUST HAPPEN BEFORE ANY PROJECT IMPORT
+os.environ["SRT_DATABASE_BACKEND"] = "sqlite"
+os.environ["SRT_SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="srt-tests-"), "import.sqlite3")
+
+import database_manager
+import mail_transport
+import notification_outbox
+import schema_migrations
+import user_email_list
+
+test_recipient_email_list = ["first@example.test", "second@example.test"]
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch, capsys):
+    database_manager.configure_backend("sqlite", str(tmp_path / "srt.sqlite3"))
+    schema_migrations.run_migrations()
+    capsys.readouterr()
+    database_manager.execute_query(
+        "INSERT INTO users (username, password_hash, email, role) VALUES (%s, %s, %s, %s)",
+        ("Test Student", "x", "student@example.test", "student"))
+    for room_name in ("Room A", "Room B"):
+        database_manager.execute_query("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)", (room_name, 40))
+    # QUEUED EMAILS GO OUT AS SOON AS THEY ARE CLAIMED, AND ONLY TO THE TEST ADDRESSES
+    monkeypatch.setattr(notification_outbox, "notification_coalescing_window_seconds", 0)
+    monkeypatch.setattr(user_email_list, "list_of_active_user_email_addresses", list(test_recipient_email_list))
+    yield database_manager
+    database_manager.close_pool()
+
+
+@pytest.fixture
+def add_reservation(database):
+    def insert_reservation(start_time, current_status="Pending", full_name="Test Student", room_id=1, user_id=1):
+        with database_manager.transaction() as unit_of_work:
+            insert_result = unit_of_work.execute(
+                "INSERT INTO reservations (user_id, room_id, full_name, course_section, reservation_type, "
+                "start_time, end_time, activity_description, current_status) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (user_id, room_id, full_name, "BSIT 1-1", "Academic", start_time, start_time,
+                 "Testing", current_status))
+        return int(insert_result["last_insert_id"])
+    return insert_reservation
+
+
+@pytest.fixture
+def outbox_rows(database):
+    def fetch_outbox_rows():
+        return database_manager.fetch_all(
+            "SELECT outbox_id, reservation_id, new_status, recipient_email, delivery_status, attempt_count, "
+            "next_attempt_at, last_error FROM notification_outbox ORDER BY outbox_id", use_cache=False)
+    return fetch_outbox_rows
+
+
+class SmtpStandInHandler(socketserver.StreamRequestHandler):
+    # JUST ENOUGH SMTP FOR smtplib: EHLO / MAIL / RCPT / DATA / NOOP / QUIT
+    def handle(self):
+        smtp_server = self.server
+        recipient_list = []
+        self.reply("220 srt-test ready")
+        while True:
+            command_line = self.rfile.readline()
+            if not command_line:
+                return
+            command_text = command_line.decode("utf-8").rstrip("\r\n")
+            command_word = command_text[:4].upper()
+            if command_word in ("EHLO", "HELO"):
+                self.reply("250 srt-test")
+            elif command_word == "MAIL":
+                recipient_list = []
+                self.reply("250 ok")
+            elif command_word == "RCPT":
+                recipient_email = command_text.split("<", 1)[1].split(">", 1)[0]
+                refusal_reply = smtp_server.refusal_reply_by_recipient.get(recipient_email)
+                if refusal_reply is not None:
+                    self.reply(refusal_reply)
+                    continue
+                recipient_list.append(recipient_email)
+                self.reply("250 ok")
+            elif command_word == "DATA":
+                self.reply("354 go ahead")
+                message_line_list = []
+                while True:
+                    data_line = self.rfile.readline().decode("utf-8").rstrip("\r\n")
+                    if data_line == ".":
+                        break
+                    message_line_list.append(data_line)
+                with smtp_server.received_lock:
+                    smtp_server.received_message_list.append((list(recipient_list), "\n".join(message_line_list)))
+                self.reply("250 queued")
+            elif command_word == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("250 ok")
+
+    def reply(self, reply_text):
+        self.wfile.write((reply_text + "\r\n").encode("utf-8"))
+
+
+class SmtpStandInServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SmtpStandInHandler)
+        self.received_lock = threading.Lock()
+        # [(RECIPIENTS, RAW MESSAGE)]
+        self.received_message_list = []
+        # recipient -> REPLY TO RCPT TO, E.G. "550 no such user" / "451 try again later"
+        self.refusal_reply_by_recipient = {}
+
+    def received_subjects(self, recipient_email):
+        subject_list = []
+        for recipient_list, raw_message in self.received_message_list:
+            if recipient_email in recipient_list:
+                for message_line in raw_message.split("\n"):
+                    if message_line.startswith("Subject: "):
+                        subject_list.append(message_line[len("Subject: "):])
+        return subject_list
+
+
+@pytest.fixture
+def smtp_server(monkeypatch):
+    smtp_stand_in = SmtpStandInServer()
+    threading.Thread(target=smtp_stand_in.serve_forever, daemon=True).start()
+    monkeypatch.setattr(mail_transport, "smtp_host_address", "127.0.0.1")
+    monkeypatch.setattr(mail_transport, "smtp_port_number", smtp_stand_in.server_address[1])
+    monkeypatch.setattr(mail_transport, "smtp_use_ssl", False)
+    monkeypatch.setattr(mail_transport, "smtp_sender_address", "srt@example.test")
+    monkeypatch.setattr(mail_transport, "smtp_sender_password", "")
+    monkeypatch.setattr(mail_transport, "smtp_sender_password_is_set", True)
+    mail_transport.close_shared_pool()
+    yield smtp_stand_in
+    mail_transport.close_shared_pool()
+    smtp_stand_in.shutdown()
+    smtp_stand_in.server_close()
+
+
+@pytest.fixture
+def make_due(database):
+    # SKIP THE BACKOFF: EVERY (OR THE GIVEN) PENDING ROW IS DUE NOW
+    def set_rows_due(outbox_id_list=None):
+        due_time = datetime(2000, 1, 1)
+        if outbox_id_list is None:
+            database_manager.execute_query(
+                "UPDATE notification_outbox SET next_attempt_at = %s WHERE delivery_status = %s",
+                (due_time, notification_outbox.outbox_status_pending))
+            return
+        for outbox_id in outbox_id_list:
+            database_manager.execute_query("UPDATE notification_outbox SET next_attempt_at = %s WHERE outbox_id = %s",
+                                           (due_time, outbox_id))
+    return set_rows_due
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import async_database_manager
+
+
+class ConcurrencyMeter:
+    def __init__(self):
+        self.meter_lock = threading.Lock()
+        self.running_count = 0
+        self.maximum_running_count = 0
+
+    def run(self, call_number):
+        with self.meter_lock:
+            self.running_count += 1
+            self.maximum_running_count = max(self.maximum_running_count, self.running_count)
+        time.sleep(0.02)
+        with self.meter_lock:
+            self.running_count -= 1
+        return call_number
+
+
+@pytest.fixture
+def small_worker_pool(monkeypatch):
+    # THE EXECUTOR AND THE SEMAPHORES ARE BUILT LAZILY FROM async_worker_thread_count
+    async_database_manager.shutdown()
+    monkeypatch.setattr(async_database_manager, "async_worker_thread_count", 3)
+    for statistic_name in ("waiting", "in_flight", "maximum_waiting"):
+        monkeypatch.setitem(async_database_manager.async_statistics_dictionary, statistic_name, 0)
+    yield async_database_manager
+    async_database_manager.shutdown()
+
+
+def test_only_worker_thread_count_calls_are_in_flight(small_worker_pool):
+    concurrency_meter = ConcurrencyMeter()
+
+    async def run_many_calls():
+        return await asyncio.gather(*[async_database_manager.run_blocking(concurrency_meter.run, call_number)
+                                      for call_number in range(20)])
+    result_list = asyncio.run(run_many_calls())
+
+    assert result_list == list(range(20))
+    assert concurrency_meter.maximum_running_count == 3
+    async_statistics = async_database_manager.get_async_statistics()
+    # THE FIRST THREE GOT A SLOT STRAIGHT AWAY, THE OTHER SEVENTEEN QUEUED BEHIND THEM
+    assert async_statistics["maximum_waiting"] == 17
+    assert (async_statistics["waiting"], async_statistics["in_flight"]) == (0, 0)
+
+
+def test_cancelled_call_keeps_its_slot_until_the_query_returns(small_worker_pool, monkeypatch):
+    monkeypatch.setattr(async_database_manager, "async_worker_thread_count", 1)
+    release_first_query = threading.Event()
+    started_query_list = []
+
+    def blocking_query(query_name):
+        started_query_list.append(query_name)
+        if query_name == "first":
+            release_first_query.wait(5)
+        return query_name
+
+    async def cancel_then_queue_another():
+        first_task = asyncio.ensure_future(async_database_manager.run_blocking(blocking_query, "first"))
+        await asyncio.sleep(0.05)
+        first_task.cancel()
+        second_task = asyncio.ensure_future(async_database_manager.run_blocking(blocking_query, "second"))
+        await asyncio.sleep(0.05)
+        # THE FIRST QUERY IS STILL RUNNING ON ITS THREAD, SO THE SECOND ONE MUST STILL BE WAITING
+        started_before_release = list(started_query_list)
+        release_first_query.set()
+        return started_before_release, await second_task, first_task.cancelled()
+
+    started_before_release, second_result, first_was_cancelled = asyncio.run(cancel_then_queue_another())
+
+    assert started_before_release == ["first"]
+    assert second_result == "second"
+    assert first_was_cancelled
+    assert async_database_manager.get_async_statistics()["in_flight"] == 0
+
+
+def test_errors_reach_the_awaiting_coroutine(small_worker_pool):
+    def failing_query():
+        raise ValueError("bad parameter")
+
+    with pytest.raises(ValueError):
+        asyncio.run(async_database_manager.run_blocking(failing_query))
+
+    assert async_database_manager.get_async_statistics()["in_flight"] == 0
+
+
+def test_facade_reads_and_writes_through_database_manager(database, small_worker_pool):
+    def rename_room(unit_of_work, room_id, room_name):
+        return unit_of_work.execute("UPDATE rooms SET room_name = %s WHERE room_id = %s", (room_name, room_id))
+
+    async def read_and_write():
+        await async_database_manager.execute_query("UPDATE rooms SET capacity = %s WHERE room_id = %s", (12, 1))
+        await async_database_manager.bulk_insert("rooms", ["room_name", "capacity"], [("Room C", 5), ("Room D", 6)])
+        await async_database_manager.run_in_transaction(rename_room, 2, "Room Two")
+        return await async_database_manager.fetch_all("SELECT room_name, capacity FROM rooms ORDER BY room_id")
+
+    assert asyncio.run(read_and_write()) == [
+        {"room_name": "Room A", "capacity": 12},
+        {"room_name": "Room Two", "capacity": 40},
+        {"room_name": "Room C", "capacity": 5},
+        {"room_name": "Room D", "capacity": 6},
+    ]
@@ -0,0 +1,197 @@
+import threading
+import time
+
+import pytest
+
+import database_manager
+from connection_pool import ConnectionPool, PoolTimeoutError
+
+
+class RecordingConnection:
+    # STANDS IN FOR A DRIVER CONNECTION: THE POOL ONLY EVER CALLS close() AND THE VALIDATOR
+    def __init__(self, connection_number):
+        self.connection_number = connection_number
+        self.is_open = True
+
+    def close(self):
+        self.is_open = False
+
+
+class ConnectionFactory:
+    def __init__(self):
+        self.created_connection_list = []
+        self.failures_left = 0
+
+    def __call__(self):
+        if self.failures_left > 0:
+            self.failures_left -= 1
+            raise ConnectionRefusedError("database is down")
+        new_connection = RecordingConnection(len(self.created_connection_list) + 1)
+        self.created_connection_list.append(new_connection)
+        return new_connection
+
+
+def run_in_other_thread(work_function):
+    worker_thread = threading.Thread(target=work_function)
+    worker_thread.start()
+    worker_thread.join(5)
+
+
+def make_pool(connection_factory, connection_validator=lambda connection: connection.is_open, **pool_options):
+    pool_options.setdefault("maximum_pool_size", 2)
+    pool_options.setdefault("checkout_timeout_seconds", 0.2)
+    return ConnectionPool(connection_factory, connection_validator, **pool_options)
+
+
+def test_connections_are_reused_not_reopened():
+    connection_factory = ConnectionFactory()
+    connection_pool = make_pool(connection_factory)
+
+    for _ in range(5):
+        with connection_pool.connection() as pooled_connection:
+            assert pooled_connection is connection_factory.created_connection_list[0]
+
+    pool_statistics = connection_pool.get_statistics()
+    assert pool_statistics["connections_created"] == 1
+    assert pool_statistics["checkouts"] == 5
+    assert pool_statistics["idle_connections"] == 1
+
+
+def test_same_thread_gets_its_held_connection_back():
+    connection_pool = make_pool(ConnectionFactory(), maximum_pool_size=1)
+
+    with connection_pool.connection() as outer_connection:
+        with connection_pool.connection() as inner_connection:
+            assert inner_connection is outer_connection
+
+    assert connection_pool.get_statistics()["reentrant_checkouts"] == 1
+    assert connection_pool.get_statistics()["in_use_connections"] == 0
+
+
+def test_connection_that_saw_an_error_is_dropped():
+    connection_factory = ConnectionFactory()
+    connection_pool = make_pool(connection_factory)
+
+    with pytest.raises(ValueError):
+        with connection_pool.connection():
+            raise ValueError("half-read result")
+
+    assert connection_factory.created_connection_list[0].is_open is False
+    assert connection_pool.get_statistics()["open_connections"] == 0
+    with connection_pool.connection() as pooled_connection:
+        assert pooled_connection is connection_factory.created_connection_list[1]
+
+
+def test_checkout_times_out_when_every_connection_is_busy():
+    connection_pool = make_pool(ConnectionFactory(), maximum_pool_size=1, checkout_timeout_seconds=0.05)
+    held_connection = connection_pool.checkout()
+
+    with pytest.raises(PoolTimeoutError):
+        connection_pool.checkout()
+
+    assert connection_pool.get_statistics()["checkout_timeouts"] == 1
+    connection_pool.checkin(held_connection)
+    assert connection_pool.checkout() is held_connection
+
+
+def test_waiting_thread_gets_the_connection_when_it_is_returned():
+    connection_pool = make_pool(ConnectionFactory(), maximum_pool_size=1, checkout_timeout_seconds=5)
+    held_connection = connection_pool.checkout()
+    checked_out_connection_list = []
+    waiting_thread = threading.Thread(target=lambda: checked_out_connection_list.append(connection_pool.checkout()))
+    waiting_thread.start()
+    time.sleep(0.05)
+
+    connection_pool.checkin(held_connection)
+    waiting_thread.join(5)
+
+    assert checked_out_connection_list == [held_connection]
+    assert connection_pool.get_statistics()["checkout_waits"] == 1
+
+
+def test_failed_connect_gives_its_slot_back():
+    connection_factory = ConnectionFactory()
+    connection_factory.failures_left = 1
+    connection_pool = make_pool(connection_factory, maximum_pool_size=1)
+
+    with pytest.raises(ConnectionRefusedError):
+        connection_pool.checkout()
+
+    assert connection_pool.get_statistics()["open_connections"] == 0
+    assert connection_pool.checkout() is connection_factory.created_connection_list[0]
+
+
+def test_idle_connection_failing_its_health_check_is_replaced():
+    connection_factory = ConnectionFactory()
+    connection_pool = make_pool(connection_factory, health_check_interval_seconds=0)
+    with connection_pool.connection() as first_connection:
+        pass
+    # THE SERVER DROPPED IT WHILE IT SAT IN THE POOL
+    first_connection.is_open = False
+
+    with connection_pool.connection() as second_connection:
+        assert second_connection is not first_connection
+
+    assert connection_pool.get_statistics()["health_check_failures"] == 1
+    assert connection_pool.get_statistics()["open_connections"] == 1
+
+
+def test_recently_used_connection_skips_the_health_check():
+    validated_connection_list = []
+    connection_pool = make_pool(ConnectionFactory(),
+                                connection_validator=lambda connection: validated_connection_list.append(connection),
+                                health_check_interval_seconds=60)
+    for _ in range(3):
+        with connection_pool.connection():
+            pass
+
+    assert validated_connection_list == []
+
+
+def test_connections_idle_too_long_are_closed():
+    connection_factory = ConnectionFactory()
+    connection_pool = make_pool(connection_factory, idle_timeout_seconds=0.01)
+    with connection_pool.connection():
+        pass
+    time.sleep(0.02)
+
+    connection_pool.evict_idle_connections()
+
+    assert connection_factory.created_connection_list[0].is_open is False
+    assert connection_pool.get_statistics()["idle_evictions"] == 1
+    assert connection_pool.get_statistics()["open_connections"] == 0
+
+
+def test_each_thread_prefers_the_connection_it_used_last():
+    connection_pool = make_pool(ConnectionFactory(), maximum_pool_size=2)
+    own_connection = connection_pool.checkout()
+    other_connection_list = []
+    run_in_other_thread(lambda: other_connection_list.append(connection_pool.checkout()))
+    connection_pool.checkin(own_connection)
+    # THE OTHER THREAD RETURNS ITS CONNECTION LAST, SO IT IS THE MOST RECENTLY USED ONE
+    run_in_other_thread(lambda: connection_pool.checkin(other_connection_list[0]))
+
+    assert connection_pool.checkout() is own_connection
+    assert connection_pool.get_statistics()["thread_affinity_hits"] == 1
+
+
+def test_close_all_closes_idle_connections():
+    connection_factory = ConnectionFactory()
+    connection_pool = make_pool(connection_factory)
+    with connection_pool.connection():
+        pass
+
+    connection_pool.close_all()
+
+    assert connection_factory.created_connection_list[0].is_open is False
+    assert connection_pool.get_statistics()["open_connections"] == 0
+
+
+def test_login_reports_a_busy_pool_as_a_connection_error(database, monkeypatch):
+    login_authentication = pytest.importorskip("login_authentication")
+
+    def time_out(*query_arguments, **query_options):
+        raise PoolTimeoutError("No database connection became available within 10 seconds.")
+    monkeypatch.setattr(database_manager, "fetch_all", time_out)
+
+    assert login_authentication.verify_user_credentials("student@example.test", "secret")[0] == "ERROR"
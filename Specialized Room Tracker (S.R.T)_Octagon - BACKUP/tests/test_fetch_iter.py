@@ -0,0 +1,74 @@
+import pytest
+
+import database_manager
+
+
+@pytest.fixture
+def many_rooms(database):
+    database_manager.bulk_insert("rooms", ["room_name", "capacity"],
+                                 [("Lab " + str(room_number), room_number) for room_number in range(1, 26)])
+    return ["Room A", "Room B"] + ["Lab " + str(room_number) for room_number in range(1, 26)]
+
+
+def test_rows_stream_one_at_a_time_in_order(many_rooms, monkeypatch):
+    monkeypatch.setattr(database_manager, "stream_fetch_batch_size", 4)
+
+    streamed_row_list = list(database_manager.fetch_iter("SELECT room_name FROM rooms ORDER BY room_id"))
+
+    assert [streamed_row["room_name"] for streamed_row in streamed_row_list] == many_rooms
+
+
+def test_chunks_hold_at_most_chunk_size_rows(many_rooms):
+    chunk_list = list(database_manager.fetch_iter("SELECT room_name FROM rooms ORDER BY room_id", chunk_size=10))
+
+    assert [len(row_chunk) for row_chunk in chunk_list] == [10, 10, 7]
+    assert [chunk_row["room_name"] for row_chunk in chunk_list for chunk_row in row_chunk] == many_rooms
+
+
+def test_fully_read_stream_returns_its_connection(many_rooms):
+    database_manager.close_pool()
+    closed_before = database_manager.get_pool_statistics()["connections_closed"]
+
+    for _ in database_manager.fetch_iter("SELECT room_name FROM rooms"):
+        pass
+
+    pool_statistics = database_manager.get_pool_statistics()
+    assert pool_statistics["connections_closed"] == closed_before
+    assert pool_statistics["in_use_connections"] == 0
+    assert pool_statistics["idle_connections"] == 1
+
+
+@pytest.mark.parametrize("stop_early", ["after_one_chunk", "after_a_few_rows", "on_an_error"])
+def test_stopping_early_drops_the_connection(many_rooms, stop_early):
+    database_manager.close_pool()
+    closed_before = database_manager.get_pool_statistics()["connections_closed"]
+
+    if stop_early == "after_one_chunk":
+        row_stream = database_manager.fetch_iter("SELECT room_name FROM rooms ORDER BY room_id", chunk_size=5)
+        for _ in row_stream:
+            break
+        row_stream.close()
+    elif stop_early == "after_a_few_rows":
+        row_stream = database_manager.fetch_iter("SELECT room_name FROM rooms ORDER BY room_id")
+        for _ in range(3):
+            next(row_stream)
+        row_stream.close()
+    else:
+        with pytest.raises(database_manager.database_error_types):
+            next(database_manager.fetch_iter("SELECT no_such_column FROM rooms"))
+
+    pool_statistics = database_manager.get_pool_statistics()
+    assert pool_statistics["connections_closed"] == closed_before + 1
+    assert pool_statistics["in_use_connections"] == 0
+    # THE POOL STILL WORKS AFTERWARDS
+    assert len(database_manager.fetch_all("SELECT room_name FROM rooms", use_cache=False)) == len(many_rooms)
+
+
+def test_stream_does_not_take_the_threads_held_connection(many_rooms):
+    with database_manager.pooled_connection():
+        row_stream = database_manager.fetch_iter("SELECT room_name FROM rooms ORDER BY room_id")
+        next(row_stream)
+        # ANOTHER QUERY ON THIS THREAD WHILE THE STREAM IS STILL OPEN
+        assert len(database_manager.fetch_all("SELECT room_name FROM rooms", use_cache=False)) == len(many_rooms)
+        assert database_manager.get_pool_statistics()["in_use_connections"] == 2
+        row_stream.close()
@@ -0,0 +1,152 @@
+import smtplib
+from datetime import datetime, timedelta
+
+import pytest
+
+import database_manager
+import mail_transport
+import notification_outbox
+from mail_transport import SmtpConfigurationError, SmtpSessionPool
+
+
+def build_messages(message_count, recipient_email="first@example.test"):
+    return [mail_transport.build_message(recipient_email, "Message " + str(message_number), "Body")
+            for message_number in range(message_count)]
+
+
+@pytest.fixture
+def session_pool(smtp_server):
+    smtp_session_pool = SmtpSessionPool(pool_size=1)
+    yield smtp_session_pool
+    smtp_session_pool.close_all()
+
+
+def test_many_messages_share_one_session(smtp_server, session_pool):
+    assert session_pool.send_messages(build_messages(5)) == [None] * 5
+    session_pool.send_message(build_messages(1)[0])
+
+    pool_statistics = session_pool.get_statistics()
+    assert (pool_statistics["sessions_opened"], pool_statistics["messages_sent"]) == (1, 6)
+    assert pool_statistics["idle_sessions"] == 1
+    assert len(smtp_server.received_subjects("first@example.test")) == 6
+
+
+def test_session_is_retired_after_its_message_limit(smtp_server, session_pool, monkeypatch):
+    monkeypatch.setattr(mail_transport, "maximum_messages_per_session", 2)
+
+    assert session_pool.send_messages(build_messages(5)) == [None] * 5
+
+    pool_statistics = session_pool.get_statistics()
+    assert (pool_statistics["sessions_opened"], pool_statistics["sessions_retired"]) == (3, 2)
+    # THE THIRD SESSION SENT ONE MESSAGE, IT GOES BACK TO THE POOL
+    assert pool_statistics["idle_sessions"] == 1
+
+
+def test_pooled_session_dropped_by_the_server_is_reopened_once(smtp_server, session_pool):
+    session_pool.send_messages(build_messages(1))
+    # THE SERVER HUNG UP WHILE THE SESSION SAT IDLE
+    session_pool.idle_session_list[0].smtp_connection.close()
+
+    assert session_pool.send_messages(build_messages(2)) == [None, None]
+
+    pool_statistics = session_pool.get_statistics()
+    assert (pool_statistics["reconnects"], pool_statistics["sessions_opened"]) == (1, 2)
+    assert len(smtp_server.received_subjects("first@example.test")) == 3
+
+
+def test_quiet_session_is_checked_with_noop_before_reuse(smtp_server, session_pool, monkeypatch):
+    session_pool.send_messages(build_messages(1))
+    monkeypatch.setattr(mail_transport, "session_noop_after_seconds", 0)
+    session_pool.idle_session_list[0].smtp_connection.close()
+
+    assert session_pool.send_messages(build_messages(1)) == [None]
+
+    pool_statistics = session_pool.get_statistics()
+    # THE NOOP CAUGHT IT, SO NO SEND FAILED AND NOTHING HAD TO BE RETRIED
+    assert (pool_statistics["noop_checks"], pool_statistics["reconnects"]) == (1, 0)
+    assert pool_statistics["sessions_opened"] == 2
+
+
+def test_keep_alive_noops_quiet_sessions_and_closes_stale_ones(smtp_server, session_pool, monkeypatch):
+    session_pool.send_messages(build_messages(1))
+    monkeypatch.setattr(mail_transport, "session_noop_after_seconds", 0)
+
+    session_pool.keep_alive_idle_sessions()
+    assert session_pool.get_statistics()["noop_checks"] == 1
+    assert session_pool.get_statistics()["idle_sessions"] == 1
+
+    monkeypatch.setattr(mail_transport, "session_maximum_idle_seconds", -1)
+    session_pool.keep_alive_idle_sessions()
+    assert session_pool.get_statistics()["idle_sessions"] == 0
+
+
+def test_refused_recipient_fails_only_its_own_message(smtp_server, session_pool):
+    smtp_server.refusal_reply_by_recipient["first@example.test"] = "550 no such user"
+    email_message_list = build_messages(1, "first@example.test") + build_messages(1, "second@example.test")
+
+    send_error_list = session_pool.send_messages(email_message_list)
+
+    assert isinstance(send_error_list[0], smtplib.SMTPRecipientsRefused)
+    assert send_error_list[1] is None
+    pool_statistics = session_pool.get_statistics()
+    assert (pool_statistics["sessions_opened"], pool_statistics["messages_failed"]) == (1, 1)
+    assert smtp_server.received_subjects("second@example.test") == ["Message 0"]
+
+
+def test_unreachable_server_fails_the_whole_batch(smtp_server, session_pool):
+    smtp_server.shutdown()
+    smtp_server.server_close()
+
+    send_error_list = session_pool.send_messages(build_messages(3))
+
+    assert all(isinstance(send_error, OSError) for send_error in send_error_list)
+    assert session_pool.get_statistics()["sessions_opened"] == 0
+
+
+@pytest.mark.parametrize("unset_setting, patched_value", [
+    ("smtp_sender_address", ""),
+    ("smtp_sender_password_is_set", False),
+])
+def test_missing_settings_fail_every_message_without_connecting(smtp_server, session_pool, monkeypatch,
+                                                               unset_setting, patched_value):
+    monkeypatch.setattr(mail_transport, unset_setting, patched_value)
+
+    send_error_list = session_pool.send_messages(build_messages(3))
+
+    assert all(isinstance(send_error, SmtpConfigurationError) for send_error in send_error_list)
+    assert session_pool.get_statistics()["sessions_opened"] == 0
+    with pytest.raises(SmtpConfigurationError):
+        session_pool.send_message(build_messages(1)[0])
+
+
+def test_outbox_waits_out_missing_settings_without_using_attempts(database, outbox_rows, smtp_server, make_due,
+                                                                  monkeypatch):
+    monkeypatch.setattr(mail_transport, "smtp_sender_password_is_set", False)
+    monkeypatch.setattr(notification_outbox, "maximum_delivery_attempts", 2)
+    with database_manager.transaction() as unit_of_work:
+        notification_outbox.enqueue_messages(unit_of_work, [(1, "Approved", "Subject", "Body", "Line")])
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+
+    # MORE FAILURES THAN maximum_delivery_attempts, NONE OF THEM COUNT
+    for _ in range(3):
+        outbox_worker.run_once()
+        for outbox_row in outbox_rows():
+            assert outbox_row["delivery_status"] == "pending"
+            assert outbox_row["attempt_count"] == 0
+            assert "SmtpConfigurationError" in outbox_row["last_error"]
+            assert outbox_row["next_attempt_at"] > datetime.now() + timedelta(
+                seconds=notification_outbox.configuration_retry_delay_seconds - 5)
+        make_due()
+    assert outbox_worker.get_statistics()["configuration_waits"] == 6
+    assert outbox_worker.get_statistics()["dead_lettered"] == 0
+
+    monkeypatch.setattr(mail_transport, "smtp_sender_password_is_set", True)
+    outbox_worker.run_once()
+    assert {outbox_row["delivery_status"] for outbox_row in outbox_rows()} == {"sent"}
+
+
+def test_rejected_login_counts_as_configuration_not_as_the_message():
+    assert notification_outbox.is_configuration_error(smtplib.SMTPAuthenticationError(535, b"bad credentials"))
+    assert notification_outbox.is_configuration_error(SmtpConfigurationError("SRT_SMTP_SENDER is not set"))
+    assert not notification_outbox.is_configuration_error(smtplib.SMTPServerDisconnected("gone"))
+    assert not notification_outbox.is_permanent_delivery_error(smtplib.SMTPAuthenticationError(535, b"bad"))
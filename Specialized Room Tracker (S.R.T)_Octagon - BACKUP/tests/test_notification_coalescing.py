@@ -0,0 +1,85 @@
+import notification_coalescing
+from notification_coalescing import coalesce_notifications, reminder_notification_status
+
+
+def outbox_row(outbox_id, reservation_id, new_status, recipient_email="first@example.test"):
+    return {
+        "outbox_id": outbox_id,
+        "reservation_id": reservation_id,
+        "new_status": new_status,
+        "recipient_email": recipient_email,
+        "message_subject": "Reservation Update: " + new_status,
+        "message_body": "Your reservation " + str(reservation_id) + " is " + new_status,
+        "digest_line": "Room A: " + new_status,
+    }
+
+
+def outbox_ids(row_list):
+    return [listed_row["outbox_id"] for listed_row in row_list]
+
+
+def test_newest_row_per_reservation_and_recipient_wins():
+    digest_list, superseded_row_list = coalesce_notifications([
+        outbox_row(3, 10, "Cancelled"),
+        outbox_row(1, 10, "Approved"),
+        outbox_row(2, 10, "Rejected", "second@example.test"),
+        outbox_row(4, 11, "Approved"),
+    ])
+
+    assert outbox_ids(superseded_row_list) == [1]
+    assert [(digest.recipient_email, outbox_ids(digest.outbox_row_list)) for digest in digest_list] == [
+        ("second@example.test", [2]), ("first@example.test", [3, 4])]
+
+
+def test_reminders_and_status_changes_never_supersede_each_other():
+    digest_list, superseded_row_list = coalesce_notifications([
+        outbox_row(1, 10, "Approved"),
+        outbox_row(2, 10, reminder_notification_status),
+        outbox_row(3, 10, reminder_notification_status),
+    ])
+
+    # ONLY THE LATER REMINDER REPLACES THE EARLIER ONE
+    assert outbox_ids(superseded_row_list) == [2]
+    assert outbox_ids(digest_list[0].outbox_row_list) == [1, 3]
+
+
+def test_rows_without_a_reservation_are_never_superseded():
+    digest_list, superseded_row_list = coalesce_notifications([
+        outbox_row(1, None, "Announcement"),
+        outbox_row(2, None, "Announcement"),
+    ])
+
+    assert superseded_row_list == []
+    assert outbox_ids(digest_list[0].outbox_row_list) == [1, 2]
+
+
+def test_long_digests_are_split(monkeypatch):
+    monkeypatch.setattr(notification_coalescing, "maximum_digest_line_count", 2)
+
+    digest_list, _ = coalesce_notifications([outbox_row(outbox_id, outbox_id, "Approved")
+                                             for outbox_id in range(1, 6)])
+
+    assert [outbox_ids(digest.outbox_row_list) for digest in digest_list] == [[1, 2], [3, 4], [5]]
+
+
+def test_single_row_digest_is_the_plain_email():
+    digest_list, _ = coalesce_notifications([outbox_row(1, 10, "Approved")])
+
+    assert digest_list[0].render() == ("Reservation Update: Approved", "Your reservation 10 is Approved")
+
+
+def test_multi_row_digest_lists_every_change():
+    rejected_row = outbox_row(2, 11, "Rejected")
+    # QUEUED BEFORE digest_line EXISTED
+    rejected_row["digest_line"] = None
+    digest_list, _ = coalesce_notifications([outbox_row(1, 10, "Approved"), rejected_row])
+
+    email_subject_string, email_body_string = digest_list[0].render()
+
+    assert email_subject_string == "Reservation Updates: 2 changes"
+    assert "  - Room A: Approved\n" in email_body_string
+    assert "  - Reservation Update: Rejected\n" in email_body_string
+
+
+def test_nothing_in_nothing_out():
+    assert coalesce_notifications([]) == ([], [])
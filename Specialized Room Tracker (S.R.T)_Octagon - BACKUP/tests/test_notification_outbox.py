@@ -0,0 +1,266 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import database_manager
+import notification_outbox
+import user_email_list
+from reservation_batch_operations import apply_status_batch
+
+
+def queue_status_message(reservation_id, new_status):
+    with database_manager.transaction() as unit_of_work:
+        return notification_outbox.enqueue_messages(unit_of_work, [(
+            reservation_id, new_status, "Reservation Update: " + new_status, "Your reservation is " + new_status,
+            "Room A: " + new_status)])
+
+
+def set_backing_off(outbox_id, attempt_count=1):
+    # AS IF A SEND HAD FAILED attempt_count TIMES AND THE RETRY IS STILL AN HOUR AWAY
+    database_manager.execute_query(
+        "UPDATE notification_outbox SET attempt_count = %s, next_attempt_at = %s WHERE outbox_id = %s",
+        (attempt_count, datetime.now() + timedelta(hours=1), outbox_id))
+
+
+def statuses_by_id(outbox_row_list):
+    return {outbox_row["outbox_id"]: outbox_row["delivery_status"] for outbox_row in outbox_row_list}
+
+
+@pytest.fixture
+def one_recipient(monkeypatch):
+    monkeypatch.setattr(user_email_list, "list_of_active_user_email_addresses", ["first@example.test"])
+
+
+# QUEUEING
+
+def test_rows_are_queued_only_if_the_transaction_commits(database, outbox_rows):
+    with pytest.raises(RuntimeError):
+        with database_manager.transaction() as unit_of_work:
+            notification_outbox.enqueue_messages(unit_of_work, [(1, "Approved", "Subject", "Body", "Line")])
+            raise RuntimeError("status change failed")
+    assert outbox_rows() == []
+
+    assert queue_status_message(1, "Approved") == 2
+    assert [outbox_row["recipient_email"] for outbox_row in outbox_rows()] == [
+        "first@example.test", "second@example.test"]
+    assert all(outbox_row["delivery_status"] == "pending" for outbox_row in outbox_rows())
+
+
+# CLAIMING
+
+def test_claim_marks_due_rows_sending_exactly_once(database, outbox_rows):
+    queue_status_message(1, "Approved")
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+
+    claimed_row_list = outbox_worker.claim_due_notifications()
+
+    assert len(claimed_row_list) == 2
+    assert set(statuses_by_id(outbox_rows()).values()) == {"sending"}
+    assert outbox_worker.claim_due_notifications() == []
+
+
+def test_claim_reclaims_rows_whose_lease_ran_out(database, outbox_rows):
+    queue_status_message(1, "Approved")
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+    outbox_worker.claim_due_notifications()
+    expired_claim_time = datetime.now() - timedelta(seconds=notification_outbox.sending_lease_seconds + 1)
+    database_manager.execute_query("UPDATE notification_outbox SET claimed_at = %s", (expired_claim_time,))
+
+    assert len(outbox_worker.claim_due_notifications()) == 2
+
+
+def test_claim_sweeps_fresh_rows_of_the_same_recipient_but_not_backing_off_ones(database, outbox_rows,
+                                                                                monkeypatch, one_recipient):
+    monkeypatch.setattr(notification_outbox, "notification_coalescing_window_seconds", 600)
+    queue_status_message(2, "Approved")
+    queue_status_message(3, "Approved")
+    backing_off_outbox_id = outbox_rows()[1]["outbox_id"]
+    set_backing_off(backing_off_outbox_id)
+    monkeypatch.setattr(notification_outbox, "notification_coalescing_window_seconds", 0)
+    queue_status_message(1, "Approved")
+
+    claimed_row_list = notification_outbox.OutboxDeliveryWorker().claim_due_notifications()
+
+    # THE DUE ROW PLUS THE ONE STILL INSIDE ITS COALESCING WINDOW, THE RETRY KEEPS ITS OWN SCHEDULE
+    assert sorted(claimed_row["reservation_id"] for claimed_row in claimed_row_list) == [1, 2]
+    assert statuses_by_id(outbox_rows())[backing_off_outbox_id] == "pending"
+
+
+# SENDING, RETRIES, DEAD LETTERS
+
+def test_run_once_sends_and_marks_rows_sent(database, outbox_rows, smtp_server):
+    queue_status_message(1, "Approved")
+
+    assert notification_outbox.OutboxDeliveryWorker().run_once() == 2
+
+    assert smtp_server.received_subjects("first@example.test") == ["Reservation Update: Approved"]
+    assert smtp_server.received_subjects("second@example.test") == ["Reservation Update: Approved"]
+    for outbox_row in outbox_rows():
+        assert outbox_row["delivery_status"] == "sent"
+        assert outbox_row["attempt_count"] == 1
+
+
+def test_temporary_rejection_schedules_a_retry(database, outbox_rows, smtp_server):
+    smtp_server.refusal_reply_by_recipient["first@example.test"] = "451 mailbox busy"
+    queue_status_message(1, "Approved")
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+
+    outbox_worker.run_once()
+
+    first_row, second_row = outbox_rows()
+    assert first_row["delivery_status"] == "pending"
+    assert first_row["attempt_count"] == 1
+    assert "451" in first_row["last_error"]
+    minimum_delay = notification_outbox.retry_base_delay_seconds * 0.8 - 1
+    assert first_row["next_attempt_at"] > datetime.now() + timedelta(seconds=minimum_delay)
+    assert second_row["delivery_status"] == "sent"
+    assert outbox_worker.get_statistics()["retries_scheduled"] == 1
+
+    # NOT DUE YET: THE NEXT RUN LEAVES IT ALONE
+    assert outbox_worker.run_once() == 0
+
+
+def test_permanent_rejection_dead_letters_at_once(database, outbox_rows, smtp_server):
+    smtp_server.refusal_reply_by_recipient["first@example.test"] = "550 no such user"
+    queue_status_message(1, "Approved")
+
+    notification_outbox.OutboxDeliveryWorker().run_once()
+
+    first_row, second_row = outbox_rows()
+    assert first_row["delivery_status"] == "dead"
+    assert first_row["attempt_count"] == 1
+    assert second_row["delivery_status"] == "sent"
+
+
+def test_row_is_dead_lettered_after_the_last_attempt_and_can_be_requeued(database, outbox_rows, smtp_server,
+                                                                         make_due, monkeypatch, one_recipient):
+    monkeypatch.setattr(notification_outbox, "maximum_delivery_attempts", 3)
+    smtp_server.refusal_reply_by_recipient["first@example.test"] = "451 mailbox busy"
+    queue_status_message(1, "Approved")
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+
+    for attempt_number in range(1, 4):
+        outbox_worker.run_once()
+        assert outbox_rows()[0]["attempt_count"] == attempt_number
+        make_due()
+
+    assert outbox_rows()[0]["delivery_status"] == "dead"
+    assert outbox_worker.get_statistics()["dead_lettered"] == 1
+
+    del smtp_server.refusal_reply_by_recipient["first@example.test"]
+    notification_outbox.retry_dead_notifications()
+    assert outbox_rows()[0]["delivery_status"] == "pending"
+    assert outbox_rows()[0]["attempt_count"] == 0
+    outbox_worker.run_once()
+    assert outbox_rows()[0]["delivery_status"] == "sent"
+
+
+# COALESCING AND SUPERSESSION
+
+def test_a_bulk_approval_is_one_digest_per_recipient(database, add_reservation, outbox_rows, smtp_server):
+    reservation_id_list = [add_reservation(datetime(2030, 1, day, 9, 0)) for day in (1, 2, 3)]
+    apply_status_batch(reservation_id_list, "Approved")
+
+    notification_outbox.OutboxDeliveryWorker().run_once()
+
+    assert smtp_server.received_subjects("first@example.test") == ["Reservation Updates: 3 changes"]
+    assert smtp_server.received_subjects("second@example.test") == ["Reservation Updates: 3 changes"]
+    assert set(statuses_by_id(outbox_rows()).values()) == {"sent"}
+
+
+def test_newer_status_in_the_same_claim_supersedes_the_older_one(database, add_reservation, outbox_rows,
+                                                                 smtp_server, one_recipient):
+    reservation_id = add_reservation(datetime(2030, 1, 1, 9, 0))
+    apply_status_batch([reservation_id], "Approved")
+    apply_status_batch([reservation_id], "Rejected")
+
+    notification_outbox.OutboxDeliveryWorker().run_once()
+
+    assert smtp_server.received_subjects("first@example.test") == ["Reservation Update: Rejected"]
+    assert [outbox_row["delivery_status"] for outbox_row in outbox_rows()] == ["superseded", "sent"]
+
+
+def test_backing_off_older_row_is_superseded_when_a_newer_one_is_claimed(database, outbox_rows, smtp_server,
+                                                                        one_recipient):
+    queue_status_message(5, "Approved")
+    older_outbox_id = outbox_rows()[0]["outbox_id"]
+    set_backing_off(older_outbox_id)
+    queue_status_message(5, "Rejected")
+    outbox_worker = notification_outbox.OutboxDeliveryWorker()
+
+    outbox_worker.run_once()
+
+    assert smtp_server.received_subjects("first@example.test") == ["Reservation Update: Rejected"]
+    assert [outbox_row["delivery_status"] for outbox_row in outbox_rows()] == ["superseded", "sent"]
+    assert outbox_worker.get_statistics()["superseded"] == 1
+
+
+def test_due_older_row_is_superseded_by_a_newer_row_still_backing_off(database, outbox_rows, smtp_server,
+                                                                     make_due, one_recipient):
+    queue_status_message(6, "Approved")
+    queue_status_message(6, "Rejected")
+    older_outbox_id, newer_outbox_id = [outbox_row["outbox_id"] for outbox_row in outbox_rows()]
+    set_backing_off(older_outbox_id)
+    set_backing_off(newer_outbox_id)
+    make_due([older_outbox_id])
+
+    notification_outbox.OutboxDeliveryWorker().run_once()
+
+    # THE STALE "Approved" NEVER GOES OUT, "Rejected" KEEPS ITS OWN RETRY SCHEDULE
+    assert smtp_server.received_subjects("first@example.test") == []
+    assert statuses_by_id(outbox_rows()) == {older_outbox_id: "superseded", newer_outbox_id: "pending"}
+
+
+def test_a_reminder_never_supersedes_a_status_change(database, outbox_rows, smtp_server, one_recipient):
+    queue_status_message(7, "Approved")
+    set_backing_off(outbox_rows()[0]["outbox_id"])
+    queue_status_message(7, "Reminder")
+
+    notification_outbox.OutboxDeliveryWorker().run_once()
+
+    assert [outbox_row["delivery_status"] for outbox_row in outbox_rows()] == ["pending", "sent"]
+
+
+# HOUSEKEEPING
+
+def add_aged_row(delivery_status, days_old):
+    queue_status_message(1, "Approved")
+    outbox_id = int(database_manager.fetch_all("SELECT MAX(outbox_id) AS outbox_id FROM notification_outbox",
+                                               use_cache=False)[0]["outbox_id"])
+    database_manager.execute_query(
+        "UPDATE notification_outbox SET delivery_status = %s, created_at = %s WHERE outbox_id = %s",
+        (delivery_status, datetime.now() - timedelta(days=days_old), outbox_id))
+    return outbox_id
+
+
+def test_prune_deletes_only_finished_rows_past_their_retention(database, outbox_rows, one_recipient):
+    kept_outbox_id_list = [add_aged_row("sent", 1), add_aged_row("dead", 8),
+                           add_aged_row("pending", 40), add_aged_row("sending", 40)]
+    for delivery_status, days_old in (("sent", 8), ("superseded", 8), ("dead", 31)):
+        add_aged_row(delivery_status, days_old)
+
+    assert notification_outbox.prune_finished_notifications() == 3
+
+    assert [outbox_row["outbox_id"] for outbox_row in outbox_rows()] == kept_outbox_id_list
+    assert notification_outbox.prune_finished_notifications() == 0
+
+
+def test_worker_prunes_when_idle_and_then_waits_for_the_interval(database, outbox_rows, one_recipient):
+    add_aged_row("sent", 8)
+    outbox_worker = notification_outbox.OutboxDeliveryWorker(poll_interval_seconds=0.01)
+    outbox_worker.start_in_background()
+    try:
+        wait_until_time = time.monotonic() + 5
+        while outbox_rows() and time.monotonic() < wait_until_time:
+            time.sleep(0.01)
+        add_aged_row("sent", 8)
+        runs_before = outbox_worker.get_statistics()["runs"]
+        while outbox_worker.get_statistics()["runs"] < runs_before + 3 and time.monotonic() < wait_until_time:
+            time.sleep(0.01)
+    finally:
+        outbox_worker.stop()
+
+    # THE FIRST IDLE POLL PRUNED, THE NEXT ONE IS AN HOUR AWAY
+    assert outbox_worker.get_statistics()["pruned"] == 1
+    assert len(outbox_rows()) == 1
@@ -0,0 +1,153 @@
+import time
+
+import database_manager
+from query_cache import QueryResultCache, extract_table_names
+
+rooms_sql = "SELECT room_id, room_name FROM rooms"
+reservations_sql = "SELECT r.reservation_id, rm.room_name FROM reservations r JOIN rooms rm ON r.room_id = rm.room_id"
+
+
+class CountingLoader:
+    def __init__(self, rows_list):
+        self.rows_list = rows_list
+        self.load_count = 0
+
+    def __call__(self):
+        self.load_count += 1
+        return [dict(row) for row in self.rows_list]
+
+
+def test_table_names_come_from_every_clause():
+    assert extract_table_names(reservations_sql) == {"reservations", "rooms"}
+    assert extract_table_names("UPDATE `Rooms` SET capacity = 1") == {"rooms"}
+    assert extract_table_names("INSERT INTO notification_outbox (x) VALUES (1)") == {"notification_outbox"}
+    assert extract_table_names("SELECT 1") == set()
+
+
+def test_second_read_is_a_hit_and_callers_get_their_own_copy():
+    query_cache = QueryResultCache()
+    room_loader = CountingLoader([{"room_id": 1, "room_name": "Room A"}])
+
+    first_rows = query_cache.get_or_load(rooms_sql, (), room_loader)
+    first_rows[0]["room_name"] = "edited by the caller"
+    second_rows = query_cache.get_or_load(rooms_sql, (), room_loader)
+
+    assert room_loader.load_count == 1
+    assert second_rows == [{"room_id": 1, "room_name": "Room A"}]
+    assert query_cache.get_statistics()["hits"] == 1
+    assert query_cache.get_statistics()["hit_ratio"] == 0.5
+
+
+def test_parameters_are_part_of_the_key():
+    query_cache = QueryResultCache()
+    room_loader = CountingLoader([])
+
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (1,), room_loader)
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (2,), room_loader)
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (1,), room_loader)
+
+    assert room_loader.load_count == 2
+
+
+def test_entries_expire_after_their_ttl():
+    query_cache = QueryResultCache(default_ttl_seconds=0.02)
+    room_loader = CountingLoader([])
+
+    query_cache.get_or_load(rooms_sql, (), room_loader)
+    time.sleep(0.03)
+    query_cache.get_or_load(rooms_sql, (), room_loader)
+
+    assert room_loader.load_count == 2
+    assert query_cache.get_statistics()["expired"] == 1
+
+
+def test_zero_ttl_is_never_stored():
+    query_cache = QueryResultCache()
+    room_loader = CountingLoader([])
+
+    for _ in range(2):
+        query_cache.get_or_load(rooms_sql, (), room_loader, ttl_seconds=0)
+
+    assert room_loader.load_count == 2
+    assert query_cache.get_statistics()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    query_cache = QueryResultCache(maximum_entries=2)
+    room_loader = CountingLoader([])
+    for room_id in (1, 2):
+        query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (room_id,), room_loader)
+    # TOUCH 1, SO 2 IS THE OLDEST WHEN 3 ARRIVES
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (1,), room_loader)
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (3,), room_loader)
+
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (1,), room_loader)
+    assert room_loader.load_count == 3
+    query_cache.get_or_load(rooms_sql + " WHERE room_id = %s", (2,), room_loader)
+    assert room_loader.load_count == 4
+    assert query_cache.get_statistics()["evictions"] == 2
+
+
+def test_a_write_drops_every_result_that_read_the_table():
+    query_cache = QueryResultCache()
+    room_loader = CountingLoader([])
+    reservation_loader = CountingLoader([])
+    user_loader = CountingLoader([])
+    query_cache.get_or_load(rooms_sql, (), room_loader)
+    query_cache.get_or_load(reservations_sql, (), reservation_loader)
+    query_cache.get_or_load("SELECT email FROM users", (), user_loader)
+
+    query_cache.invalidate_for_write("UPDATE rooms SET room_name = %s WHERE room_id = %s")
+    for sql_query_string, row_loader in ((rooms_sql, room_loader), (reservations_sql, reservation_loader),
+                                         ("SELECT email FROM users", user_loader)):
+        query_cache.get_or_load(sql_query_string, (), row_loader)
+
+    # THE JOIN READ rooms TOO, users DIDN'T
+    assert (room_loader.load_count, reservation_loader.load_count, user_loader.load_count) == (2, 2, 1)
+
+
+def test_a_load_that_raced_a_write_is_not_stored():
+    query_cache = QueryResultCache()
+
+    def load_while_someone_writes():
+        query_cache.invalidate_tables({"rooms"})
+        return [{"room_name": "read before the write committed"}]
+    query_cache.get_or_load(rooms_sql, (), load_while_someone_writes)
+
+    assert query_cache.get_statistics()["entries"] == 0
+
+
+def test_clock_dependent_and_locking_reads_are_never_cached():
+    query_cache = QueryResultCache()
+    for sql_query_string in ("SELECT reservation_id FROM reservations WHERE start_time > NOW()",
+                             "SELECT reservation_id FROM reservations WHERE start_time > CURRENT_TIMESTAMP",
+                             "SELECT reservation_id FROM reservations FOR UPDATE",
+                             "SELECT 1"):
+        row_loader = CountingLoader([])
+        query_cache.get_or_load(sql_query_string, (), row_loader)
+        query_cache.get_or_load(sql_query_string, (), row_loader)
+        assert row_loader.load_count == 2, sql_query_string
+    # UNHASHABLE PARAMETERS CAN'T BE A KEY EITHER
+    row_loader = CountingLoader([])
+    query_cache.get_or_load(rooms_sql, ([1, 2],), row_loader)
+    query_cache.get_or_load(rooms_sql, ([1, 2],), row_loader)
+    assert row_loader.load_count == 2
+
+
+def test_fetch_all_sees_its_own_writes_straight_away(database):
+    assert database_manager.fetch_all("SELECT room_name FROM rooms WHERE room_id = %s", (1,)) == [
+        {"room_name": "Room A"}]
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Room Z", 1))
+
+    assert database_manager.fetch_all("SELECT room_name FROM rooms WHERE room_id = %s", (1,)) == [
+        {"room_name": "Room Z"}]
+
+
+def test_fetch_all_serves_repeat_reads_from_the_cache(database):
+    hits_before = database_manager.get_cache_statistics()["hits"]
+
+    for _ in range(3):
+        database_manager.fetch_all("SELECT room_name FROM rooms ORDER BY room_id")
+    database_manager.fetch_all("SELECT room_name FROM rooms ORDER BY room_id", use_cache=False)
+
+    assert database_manager.get_cache_statistics()["hits"] == hits_before + 2
@@ -0,0 +1,132 @@
+import pytest
+
+import database_manager
+from query_statistics import QueryStatisticsCollector, normalize_statement
+
+
+def statement_statistics(collector, statement):
+    return [statement_dictionary for statement_dictionary in collector.dump()["statements"]
+            if statement_dictionary["statement"] == statement][0]
+
+
+@pytest.mark.parametrize("sql_query_string, expected_statement", [
+    ("SELECT * FROM rooms WHERE room_id = 7", "SELECT * FROM rooms WHERE room_id = ?"),
+    ("SELECT *\n  FROM reservations\n WHERE current_status = 'Pending'",
+     "SELECT * FROM reservations WHERE current_status = ?"),
+    ("DELETE FROM reservations WHERE reservation_id IN (%s, %s, %s)",
+     "DELETE FROM reservations WHERE reservation_id IN (...)"),
+    ("SELECT user_id FROM users WHERE email = \"a@b.test\" LIMIT 1", "SELECT user_id FROM users WHERE email = ? LIMIT ?"),
+])
+def test_literals_and_in_lists_are_folded(sql_query_string, expected_statement):
+    assert normalize_statement(sql_query_string) == expected_statement
+
+
+def test_calls_with_different_literals_share_one_entry():
+    collector = QueryStatisticsCollector(print_slow_queries=False)
+
+    collector.record("SELECT * FROM rooms WHERE room_id = 1", 0.001, 1)
+    collector.record("SELECT * FROM rooms WHERE room_id = 2", 0.003, 0)
+    collector.record("SELECT * FROM rooms WHERE room_id = 3", 0.002, None, failed=True)
+
+    rooms_statistics = statement_statistics(collector, "SELECT * FROM rooms WHERE room_id = ?")
+    assert len(collector.dump()["statements"]) == 1
+    assert (rooms_statistics["calls"], rooms_statistics["rows"], rooms_statistics["errors"]) == (3, 1, 1)
+    assert rooms_statistics["p50_ms"] == 2.0
+    assert rooms_statistics["max_ms"] == 3.0
+
+
+def test_only_queries_over_the_threshold_are_logged_as_slow(capsys):
+    collector = QueryStatisticsCollector(slow_query_threshold_seconds=0.1, print_slow_queries=False)
+
+    collector.record("SELECT * FROM rooms", 0.05, 2)
+    collector.record("SELECT * FROM reservations", 0.25, 40)
+
+    slow_query_list = collector.dump()["slow_queries"]
+    assert [slow_query["statement"] for slow_query in slow_query_list] == ["SELECT * FROM reservations"]
+    assert slow_query_list[0]["elapsed_ms"] == 250.0
+    assert capsys.readouterr().out == ""
+
+
+def test_slow_query_log_keeps_only_the_latest_entries():
+    collector = QueryStatisticsCollector(slow_query_threshold_seconds=0, slow_query_log_size=2,
+                                         print_slow_queries=False)
+
+    for room_id in range(5):
+        collector.record("SELECT * FROM rooms WHERE room_id = " + str(room_id), 0.01, 1)
+
+    assert len(collector.dump()["slow_queries"]) == 2
+
+
+def test_cache_hits_are_counted_but_not_timed():
+    collector = QueryStatisticsCollector(slow_query_threshold_seconds=0, print_slow_queries=False)
+
+    collector.record("SELECT * FROM rooms", 0.004, 2)
+    collector.record("SELECT * FROM rooms", 0.5, 2, served_from_cache=True)
+
+    rooms_statistics = statement_statistics(collector, "SELECT * FROM rooms")
+    assert (rooms_statistics["calls"], rooms_statistics["cache_hits"]) == (2, 1)
+    assert rooms_statistics["max_ms"] == 4.0
+    assert rooms_statistics["average_ms"] == 4.0
+    assert len(collector.dump()["slow_queries"]) == 1
+
+
+def test_calling_site_is_the_first_frame_outside_the_database_layer():
+    collector = QueryStatisticsCollector(print_slow_queries=False)
+
+    class RoomScreen:
+        def load_rooms(self):
+            collector.record("SELECT * FROM rooms", 0.001, 2)
+    RoomScreen().load_rooms()
+    collector.record("SELECT * FROM rooms", 0.001, 2)
+
+    assert statement_statistics(collector, "SELECT * FROM rooms")["calling_sites"] == {
+        "RoomScreen.load_rooms": 1,
+        "test_query_statistics.test_calling_site_is_the_first_frame_outside_the_database_layer": 1,
+    }
+
+
+def test_dump_sorts_by_the_requested_column_and_reset_empties_it():
+    collector = QueryStatisticsCollector(print_slow_queries=False)
+    for _ in range(3):
+        collector.record("SELECT * FROM rooms", 0.001, 1)
+    collector.record("SELECT * FROM reservations", 0.05, 1)
+
+    assert [statement_dictionary["statement"] for statement_dictionary in collector.dump("calls")["statements"]] == [
+        "SELECT * FROM rooms", "SELECT * FROM reservations"]
+    assert collector.dump("total_ms")["statements"][0]["statement"] == "SELECT * FROM reservations"
+    assert "SLOW QUERIES LOGGED: 0" in collector.format_report()
+
+    collector.reset()
+    assert collector.dump()["statements"] == []
+
+
+def test_disabled_collector_records_nothing():
+    collector = QueryStatisticsCollector(print_slow_queries=False)
+    collector.is_enabled = False
+
+    collector.record("SELECT * FROM rooms", 0.001, 1)
+
+    assert collector.dump()["statements"] == []
+
+
+def test_database_manager_times_reads_writes_and_cache_hits(database):
+    database_manager.reset_query_statistics()
+
+    for _ in range(2):
+        database_manager.fetch_all("SELECT room_name FROM rooms WHERE capacity > %s", (10,))
+    database_manager.execute_query("UPDATE rooms SET capacity = %s WHERE room_id = %s", (45, 1))
+
+    statements_by_text = {statement_dictionary["statement"]: statement_dictionary
+                          for statement_dictionary in database_manager.dump_query_statistics()["statements"]}
+    read_statistics = statements_by_text["SELECT room_name FROM rooms WHERE capacity > %s"]
+    assert (read_statistics["calls"], read_statistics["cache_hits"], read_statistics["rows"]) == (2, 1, 4)
+    assert statements_by_text["UPDATE rooms SET capacity = %s WHERE room_id = %s"]["calls"] == 1
+
+
+def test_failed_query_is_recorded_as_an_error(database):
+    database_manager.reset_query_statistics()
+
+    with pytest.raises(database_manager.database_error_types):
+        database_manager.fetch_all("SELECT missing_column FROM rooms", use_cache=False)
+
+    assert database_manager.dump_query_statistics()["statements"][0]["errors"] == 1
@@ -0,0 +1,145 @@
+import sqlite3
+
+import pytest
+
+import database_manager
+import read_write_router
+from database_backends import SQLiteBackend
+from read_write_router import ReadWriteRouter
+
+
+class FakeClock:
+    def __init__(self):
+        self.current_time = 1000.0
+
+    def monotonic(self):
+        return self.current_time
+
+
+class ReplicaPool:
+    def __init__(self, pool_name):
+        self.pool_name = pool_name
+        self.is_closed = False
+
+    def close_all(self):
+        self.is_closed = True
+
+    def __repr__(self):
+        return self.pool_name
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(read_write_router, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def replica_pools():
+    return [ReplicaPool("replica-1"), ReplicaPool("replica-2")]
+
+
+def test_without_replicas_every_read_goes_to_the_primary(fake_clock):
+    router = ReadWriteRouter([])
+
+    assert router.choose_replica_pool(False) is None
+    assert router.get_statistics()["primary_reads"] == 1
+
+
+def test_reads_take_turns_across_the_replicas(fake_clock, replica_pools):
+    router = ReadWriteRouter(replica_pools)
+
+    assert [router.choose_replica_pool(False) for _ in range(4)] == replica_pools * 2
+    assert router.get_statistics()["replica_reads"] == 4
+
+
+def test_reads_inside_a_transaction_stay_on_the_primary(fake_clock, replica_pools):
+    router = ReadWriteRouter(replica_pools)
+
+    assert router.choose_replica_pool(True) is None
+    assert router.get_statistics()["transaction_reads"] == 1
+
+
+def test_reads_stay_on_the_primary_for_a_while_after_a_write(fake_clock, replica_pools):
+    router = ReadWriteRouter(replica_pools, read_your_writes_window_seconds=5)
+    router.note_write()
+
+    fake_clock.current_time += 4.9
+    assert router.choose_replica_pool(False) is None
+    assert router.get_statistics()["pinned_to_primary"] is True
+
+    fake_clock.current_time += 0.1
+    assert router.choose_replica_pool(False) is replica_pools[0]
+    router_statistics = router.get_statistics()
+    assert (router_statistics["pinned_reads"], router_statistics["writes"]) == (1, 1)
+    assert router_statistics["pinned_to_primary"] is False
+
+
+def test_failed_replica_is_skipped_until_its_cooldown_ends(fake_clock, replica_pools):
+    router = ReadWriteRouter(replica_pools, replica_retry_cooldown_seconds=30)
+    failed_replica = router.choose_replica_pool(False)
+    router.report_replica_failure(failed_replica)
+
+    assert [router.choose_replica_pool(False) for _ in range(3)] == [replica_pools[1]] * 3
+    assert router.get_statistics()["replicas_cooling_down"] == 1
+
+    fake_clock.current_time += 30
+    assert {router.choose_replica_pool(False) for _ in range(2)} == set(replica_pools)
+    router_statistics = router.get_statistics()
+    # THE FAILED READ WAS RETRIED ON THE PRIMARY
+    assert (router_statistics["replica_failures"], router_statistics["replica_reads"],
+            router_statistics["primary_reads"]) == (1, 5, 1)
+
+
+def test_every_replica_cooling_down_falls_back_to_the_primary(fake_clock, replica_pools):
+    router = ReadWriteRouter(replica_pools)
+    for replica_pool in replica_pools:
+        router.report_replica_failure(replica_pool)
+
+    assert router.choose_replica_pool(False) is None
+
+
+def test_close_all_closes_every_replica_pool(replica_pools):
+    ReadWriteRouter(replica_pools).close_all()
+
+    assert all(replica_pool.is_closed for replica_pool in replica_pools)
+
+
+@pytest.fixture
+def lagging_replica(database, tmp_path, monkeypatch):
+    # A SECOND SQLITE FILE PLAYS THE REPLICA, ITS ROOM NAME SHOWS WHICH SIDE ANSWERED
+    replica_file_path = str(tmp_path / "replica.sqlite3")
+    replica_connection = sqlite3.connect(replica_file_path)
+    replica_connection.execute("CREATE TABLE rooms (room_id INTEGER PRIMARY KEY, room_name TEXT)")
+    replica_connection.execute("INSERT INTO rooms VALUES (1, 'Room A (replica)')")
+    replica_connection.commit()
+    replica_connection.close()
+    replica_pool = database_manager.build_connection_pool(SQLiteBackend(replica_file_path))
+    monkeypatch.setattr(database_manager, "read_write_router", ReadWriteRouter([replica_pool]))
+    yield replica_pool
+    replica_pool.close_all()
+
+
+def read_room_name():
+    return database_manager.fetch_all("SELECT room_name FROM rooms WHERE room_id = %s", (1,),
+                                      use_cache=False)[0]["room_name"]
+
+
+def test_database_manager_reads_from_the_replica_until_it_writes(lagging_replica):
+    assert read_room_name() == "Room A (replica)"
+
+    database_manager.execute_query("UPDATE rooms SET capacity = %s WHERE room_id = %s", (30, 1))
+
+    assert read_room_name() == "Room A"
+    assert database_manager.get_routing_statistics()["pinned_reads"] == 1
+
+
+def test_database_manager_falls_back_to_the_primary_when_the_replica_is_down(lagging_replica, monkeypatch, capsys):
+    def replica_is_down():
+        raise sqlite3.OperationalError("unable to open database file")
+    monkeypatch.setattr(lagging_replica, "connection_factory", replica_is_down)
+
+    assert read_room_name() == "Room A"
+    assert "Read replica unavailable" in capsys.readouterr().out
+    assert database_manager.get_routing_statistics()["replicas_cooling_down"] == 1
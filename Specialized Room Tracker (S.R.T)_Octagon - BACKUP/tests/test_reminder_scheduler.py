@@ -0,0 +1,197 @@
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+import database_manager
+import reminder_scheduler
+from reminder_scheduler import ReminderScheduler, describe_offset
+
+
+class FakeClock:
+    # THE WHEEL RUNS ON time.time(), THE RESERVATIONS ON THE REAL datetime.now(): START BOTH TOGETHER
+    def __init__(self):
+        self.current_time = time.time()
+
+    def time(self):
+        return self.current_time
+
+    def advance(self, **elapsed):
+        self.current_time += timedelta(**elapsed).total_seconds()
+
+
+@pytest.fixture
+def fake_clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(reminder_scheduler, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def scheduler(database, fake_clock):
+    return ReminderScheduler(offset_minutes_list=[1440, 60])
+
+
+def hours_from_now(hour_count):
+    # WHOLE SECONDS, LIKE THE STORED start_time
+    return datetime.now().replace(microsecond=0) + timedelta(hours=hour_count)
+
+
+def reminder_rows(outbox_rows):
+    return [outbox_row for outbox_row in outbox_rows() if outbox_row["new_status"] == "Reminder"]
+
+
+def reminder_subjects():
+    return [outbox_row["message_subject"] for outbox_row in database_manager.fetch_all(
+        "SELECT message_subject FROM notification_outbox WHERE recipient_email = %s ORDER BY outbox_id",
+        ("first@example.test",), use_cache=False)]
+
+
+def update_reservation(set_clause_sql, set_parameters, reservation_id):
+    database_manager.execute_query("UPDATE reservations SET " + set_clause_sql + " WHERE reservation_id = %s",
+                                   tuple(set_parameters) + (reservation_id,))
+
+
+@pytest.mark.parametrize("offset_minutes, offset_text", [
+    (1440, "24 hours"), (60, "1 hour"), (30, "30 minutes"), (1, "1 minute"), (90, "90 minutes")])
+def test_offsets_are_described_for_people(offset_minutes, offset_text):
+    assert describe_offset(offset_minutes) == offset_text
+
+
+def test_load_schedules_only_approved_reservations_with_reminders_ahead(scheduler, add_reservation):
+    add_reservation(hours_from_now(25), "Approved")
+    add_reservation(hours_from_now(5), "Approved")
+    add_reservation(hours_from_now(25), "Pending")
+    add_reservation(hours_from_now(-2), "Approved")
+    # STARTS IN 30 MINUTES: BOTH REMINDERS ARE ALREADY PAST
+    add_reservation(hours_from_now(0.5), "Approved")
+
+    scheduler.load_upcoming_reservations()
+
+    scheduler_statistics = scheduler.get_statistics()
+    assert scheduler_statistics["loaded"] == 3
+    # 24 h AND 1 h FOR THE FIRST, ONLY 1 h FOR THE SECOND
+    assert (scheduler_statistics["pending_reminders"], scheduler_statistics["tracked_reservations"]) == (3, 2)
+    assert scheduler_statistics["last_change_id"] > 0
+    assert scheduler.apply_changes() == 0
+
+
+def test_each_offset_queues_its_reminder_when_it_comes_due(scheduler, add_reservation, fake_clock, outbox_rows):
+    add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+
+    fake_clock.advance(minutes=59)
+    assert scheduler.fire_due_reminders() == 0
+    fake_clock.advance(minutes=1, seconds=1)
+    assert scheduler.fire_due_reminders() == 1
+    assert reminder_subjects() == ["Reservation Reminder: Room A in 24 hours"]
+    assert [outbox_row["recipient_email"] for outbox_row in reminder_rows(outbox_rows)] == [
+        "first@example.test", "second@example.test"]
+
+    fake_clock.advance(hours=23)
+    assert scheduler.fire_due_reminders() == 1
+    assert reminder_subjects()[-1] == "Reservation Reminder: Room A in 1 hour"
+    scheduler_statistics = scheduler.get_statistics()
+    assert (scheduler_statistics["fired"], scheduler_statistics["queued_rows"]) == (2, 4)
+    assert (scheduler_statistics["pending_reminders"], scheduler_statistics["tracked_reservations"]) == (0, 0)
+
+
+def test_approving_a_reservation_schedules_it(scheduler, add_reservation):
+    scheduler.load_upcoming_reservations()
+    reservation_id = add_reservation(hours_from_now(25))
+    assert scheduler.apply_changes() == 1
+    assert scheduler.get_statistics()["pending_reminders"] == 0
+
+    update_reservation("current_status = %s", ("Approved",), reservation_id)
+
+    assert scheduler.apply_changes() == 1
+    assert scheduler.get_statistics()["pending_reminders"] == 2
+    assert scheduler.get_statistics()["rescheduled"] == 1
+
+
+def test_moving_the_start_moves_the_reminders(scheduler, add_reservation, fake_clock):
+    reservation_id = add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+
+    update_reservation("start_time = %s", (hours_from_now(49),), reservation_id)
+    scheduler.apply_changes()
+
+    # THE OLD 24 h REMINDER WOULD HAVE FIRED AFTER AN HOUR
+    fake_clock.advance(hours=2)
+    assert scheduler.fire_due_reminders() == 0
+    fake_clock.advance(hours=23)
+    assert scheduler.fire_due_reminders() == 1
+    assert scheduler.get_statistics()["rescheduled"] == 1
+
+
+@pytest.mark.parametrize("change_sql, change_parameters", [
+    ("UPDATE reservations SET current_status = %s WHERE reservation_id = %s", ("Rejected",)),
+    ("DELETE FROM reservations WHERE reservation_id = %s", ()),
+])
+def test_cancelled_or_deleted_reservation_loses_its_reminders(scheduler, add_reservation, fake_clock,
+                                                              change_sql, change_parameters):
+    reservation_id = add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+
+    database_manager.execute_query(change_sql, change_parameters + (reservation_id,))
+    scheduler.apply_changes()
+
+    scheduler_statistics = scheduler.get_statistics()
+    assert scheduler_statistics["unscheduled"] == 1
+    assert (scheduler_statistics["pending_reminders"], scheduler_statistics["tracked_reservations"]) == (0, 0)
+    fake_clock.advance(hours=25)
+    assert scheduler.fire_due_reminders() == 0
+
+
+def test_other_field_changes_leave_the_reminders_alone(scheduler, add_reservation):
+    reservation_id = add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+
+    update_reservation("full_name = %s", ("Renamed Student",), reservation_id)
+
+    assert scheduler.apply_changes() == 1
+    scheduler_statistics = scheduler.get_statistics()
+    assert (scheduler_statistics["rescheduled"], scheduler_statistics["unscheduled"]) == (0, 0)
+    assert scheduler_statistics["pending_reminders"] == 2
+
+
+def test_change_not_yet_applied_never_sends_a_stale_reminder(scheduler, add_reservation, fake_clock, outbox_rows):
+    reservation_id = add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+    update_reservation("start_time = %s", (hours_from_now(49),), reservation_id)
+
+    fake_clock.advance(hours=1, seconds=1)
+    scheduler.fire_due_reminders()
+
+    assert scheduler.get_statistics()["skipped_stale"] == 1
+    assert reminder_rows(outbox_rows) == []
+    # THE NEXT TICK PUTS THE TIMERS WHERE THEY BELONG
+    scheduler.apply_changes()
+    assert scheduler.get_statistics()["pending_reminders"] == 2
+
+
+def test_reminder_that_could_not_be_queued_is_retried(scheduler, add_reservation, fake_clock, outbox_rows,
+                                                      monkeypatch):
+    add_reservation(hours_from_now(25), "Approved")
+    scheduler.load_upcoming_reservations()
+
+    working_enqueue_messages = reminder_scheduler.enqueue_messages
+
+    def database_is_down(unit_of_work, message_list):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(reminder_scheduler, "enqueue_messages", database_is_down)
+    fake_clock.advance(hours=1, seconds=1)
+
+    with pytest.raises(sqlite3.OperationalError):
+        scheduler.fire_due_reminders()
+    scheduler_statistics = scheduler.get_statistics()
+    assert (scheduler_statistics["fired"], scheduler_statistics["pending_reminders"]) == (0, 2)
+
+    monkeypatch.setattr(reminder_scheduler, "enqueue_messages", working_enqueue_messages)
+    fake_clock.advance(seconds=reminder_scheduler.reminder_retry_delay_seconds - 2)
+    assert scheduler.fire_due_reminders() == 0
+    # THE WHEEL ROUNDS A FRACTIONAL RETRY TIME UP TO ITS NEXT ONE-SECOND TICK
+    fake_clock.advance(seconds=3)
+    assert scheduler.fire_due_reminders() == 1
+    assert len(reminder_rows(outbox_rows)) == 2
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+import pytest
+
+import database_manager
+from reservation_batch_operations import (apply_status_batch, batch_delete_action, batch_outcome_deleted,
+                                          batch_outcome_missing, batch_outcome_unchanged, batch_outcome_updated,
+                                          changed_reservation_ids)
+
+
+def current_statuses(reservation_id_list):
+    status_rows = database_manager.fetch_all(
+        "SELECT reservation_id, current_status FROM reservations ORDER BY reservation_id", use_cache=False)
+    return {status_row["reservation_id"]: status_row["current_status"] for status_row in status_rows
+            if status_row["reservation_id"] in reservation_id_list}
+
+
+@pytest.fixture
+def three_reservations(add_reservation):
+    return [add_reservation(datetime(2030, 1, 1, 9, 0)),
+            add_reservation(datetime(2030, 1, 2, 9, 0), current_status="Approved"),
+            add_reservation(datetime(2030, 1, 3, 9, 0))]
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2])
+def test_every_id_gets_its_own_outcome(database, three_reservations, outbox_rows, chunk_size):
+    pending_id, approved_id, other_pending_id = three_reservations
+    missing_id = other_pending_id + 100
+
+    outcome_by_reservation_id = apply_status_batch(
+        [approved_id, missing_id, pending_id, str(pending_id), other_pending_id], "Approved", chunk_size=chunk_size)
+
+    # IN THE ORDER GIVEN, THE DUPLICATE (ALSO AS TEXT) COUNTED ONCE
+    assert list(outcome_by_reservation_id.items()) == [
+        (approved_id, batch_outcome_unchanged),
+        (missing_id, batch_outcome_missing),
+        (pending_id, batch_outcome_updated),
+        (other_pending_id, batch_outcome_updated),
+    ]
+    assert current_statuses(three_reservations) == {
+        pending_id: "Approved", approved_id: "Approved", other_pending_id: "Approved"}
+    assert changed_reservation_ids(outcome_by_reservation_id) == [pending_id, other_pending_id]
+    # ONE ROW PER UPDATED RESERVATION AND RECIPIENT, NOTHING FOR "unchanged" / "missing"
+    assert sorted(outbox_row["reservation_id"] for outbox_row in outbox_rows()) == sorted(
+        [pending_id, other_pending_id] * 2)
+
+
+def test_delete_reports_deleted_and_missing(database, three_reservations, outbox_rows):
+    pending_id, approved_id, other_pending_id = three_reservations
+
+    outcome_by_reservation_id = apply_status_batch([approved_id, 999, pending_id], batch_delete_action,
+                                                   chunk_size=2)
+
+    assert outcome_by_reservation_id == {
+        approved_id: batch_outcome_deleted, 999: batch_outcome_missing, pending_id: batch_outcome_deleted}
+    assert changed_reservation_ids(outcome_by_reservation_id) == [approved_id, pending_id]
+    assert current_statuses(three_reservations) == {other_pending_id: "Pending"}
+    assert outbox_rows() == []
+
+
+def test_no_notifications_when_asked_not_to(database, three_reservations, outbox_rows):
+    outcome_by_reservation_id = apply_status_batch(three_reservations, "Rejected", notify_students=False)
+
+    assert set(outcome_by_reservation_id.values()) == {batch_outcome_updated}
+    assert outbox_rows() == []
+
+
+def test_empty_batch_touches_nothing(database, outbox_rows):
+    assert apply_status_batch([], "Approved") == {}
+    assert outbox_rows() == []
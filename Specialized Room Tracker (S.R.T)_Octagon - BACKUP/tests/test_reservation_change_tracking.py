@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import database_manager
+import reservation_change_tracking
+from reservation_change_tracking import ReservationChangeTracker, prune_expired_tombstones
+
+tracked_select_sql = ("SELECT r.reservation_id, rm.room_name, r.full_name, r.start_time, r.current_status, "
+                      "r.updated_at FROM reservations r JOIN rooms rm ON r.room_id = rm.room_id")
+
+
+def returned_ids(fetch_result):
+    return sorted(result_row["reservation_id"] for result_row in fetch_result["rows"])
+
+
+@pytest.fixture
+def loaded_tracker(database, add_reservation):
+    # THREE ROWS LAST TOUCHED 3, 2 AND 1 HOURS AGO, ALREADY SHOWN BY A FULL LOAD
+    reservation_id_list = [add_reservation(datetime(2030, 1, day, 9, 0)) for day in (1, 2, 3)]
+    for hours_ago, reservation_id in zip((3, 2, 1), reservation_id_list):
+        # SETTING updated_at OURSELVES KEEPS trg_reservations_stamp_update FROM RE-STAMPING IT
+        database_manager.execute_query("UPDATE reservations SET updated_at = %s WHERE reservation_id = %s",
+                                       (datetime.now() - timedelta(hours=hours_ago), reservation_id))
+    change_tracker = ReservationChangeTracker(database_manager, tracked_select_sql)
+    full_result = change_tracker.fetch_full_result("", (), "everything")
+    change_tracker.accept_result(full_result)
+    return change_tracker, reservation_id_list, full_result
+
+
+def test_full_load_is_needed_until_a_result_is_accepted(database, monkeypatch):
+    change_tracker = ReservationChangeTracker(database_manager, tracked_select_sql)
+    assert change_tracker.needs_full_load("everything")
+
+    change_tracker.accept_result(change_tracker.fetch_full_result("", (), "everything"))
+
+    assert not change_tracker.needs_full_load("everything")
+    # A DIFFERENT FILTER, OR THE PERIODIC RESYNC
+    assert change_tracker.needs_full_load("only pending")
+    monkeypatch.setattr(reservation_change_tracking, "full_resync_interval_seconds", -1)
+    assert change_tracker.needs_full_load("everything")
+    monkeypatch.undo()
+    change_tracker.reset()
+    assert change_tracker.needs_full_load("everything")
+
+
+def test_full_load_returns_every_row_and_writes_nothing(loaded_tracker):
+    change_tracker, reservation_id_list, full_result = loaded_tracker
+    write_count_before = database_manager.get_routing_statistics()["writes"]
+
+    repeated_full_result = change_tracker.fetch_full_result("", (), "everything")
+
+    assert returned_ids(full_result) == reservation_id_list
+    assert returned_ids(repeated_full_result) == reservation_id_list
+    assert repeated_full_result["has_more"] is False
+    assert database_manager.get_routing_statistics()["writes"] == write_count_before
+
+
+def test_delta_brings_only_changed_inserted_and_deleted_rows(loaded_tracker, add_reservation):
+    change_tracker, reservation_id_list, full_result = loaded_tracker
+    changed_id, untouched_id, deleted_id = reservation_id_list
+    database_manager.execute_query("UPDATE reservations SET current_status = %s WHERE reservation_id = %s",
+                                   ("Approved", changed_id))
+    inserted_id = add_reservation(datetime(2030, 1, 4, 9, 0))
+    database_manager.execute_query("DELETE FROM reservations WHERE reservation_id = %s", (deleted_id,))
+
+    delta_result = change_tracker.fetch_changes(change_tracker.row_high_water_mark,
+                                                change_tracker.tombstone_high_water_mark)
+
+    assert delta_result["is_full"] is False
+    assert returned_ids(delta_result) == [changed_id, inserted_id]
+    assert untouched_id not in returned_ids(delta_result)
+    assert delta_result["deleted_ids"] == [deleted_id]
+    assert [result_row["current_status"] for result_row in delta_result["rows"]
+            if result_row["reservation_id"] == changed_id] == ["Approved"]
+
+    # THE MARKS ONLY MOVE ONCE THE RESULT IS ACCEPTED, AND NEVER BACKWARDS
+    assert change_tracker.row_high_water_mark == full_result["row_mark"]
+    change_tracker.accept_result(delta_result)
+    assert change_tracker.row_high_water_mark > full_result["row_mark"]
+    assert change_tracker.tombstone_high_water_mark >= full_result["tombstone_mark"]
+    change_tracker.accept_result(full_result | {"is_full": False})
+    assert change_tracker.row_high_water_mark == delta_result["row_mark"]
+
+
+def test_delta_with_nothing_changed_only_repeats_the_overlap(loaded_tracker):
+    change_tracker, reservation_id_list, _ = loaded_tracker
+    # DELETED BEFORE THE FULL LOAD, SO ALREADY GONE FROM IT
+    database_manager.execute_query("INSERT INTO reservation_tombstones (reservation_id, deleted_at) VALUES (%s, %s)",
+                                   (999, datetime.now() - timedelta(hours=2)))
+
+    delta_result = change_tracker.fetch_changes(change_tracker.row_high_water_mark,
+                                                change_tracker.tombstone_high_water_mark)
+
+    # ONLY THE NEWEST ROW IS INSIDE high_water_overlap_seconds OF THE MARK (MERGES AS A NO-OP)
+    assert returned_ids(delta_result) == [reservation_id_list[2]]
+    assert delta_result["deleted_ids"] == []
+
+
+def test_only_expired_tombstones_are_pruned(database, add_reservation):
+    kept_id = add_reservation(datetime(2030, 1, 1, 9, 0))
+    database_manager.execute_query("DELETE FROM reservations WHERE reservation_id = %s", (kept_id,))
+    expired_time = datetime.now() - timedelta(hours=reservation_change_tracking.tombstone_retention_hours, minutes=1)
+    database_manager.execute_query("INSERT INTO reservation_tombstones (reservation_id, deleted_at) VALUES (%s, %s)",
+                                   (999, expired_time))
+
+    prune_expired_tombstones(database_manager)
+
+    tombstone_rows = database_manager.fetch_all("SELECT reservation_id FROM reservation_tombstones",
+                                                use_cache=False)
+    assert [tombstone_row["reservation_id"] for tombstone_row in tombstone_rows] == [kept_id]
@@ -0,0 +1,106 @@
+from datetime import datetime
+
+import pytest
+
+import database_manager
+from reservation_queries import build_page_query, split_page
+
+page_select_sql = ("SELECT r.reservation_id, rm.room_name, r.full_name, r.start_time FROM reservations r "
+                   "JOIN rooms rm ON r.room_id = rm.room_id")
+
+
+def cursor_value(result_row, sort_key_name):
+    # WHAT reservation_table_model.last_row_cursor HANDS BACK: THE LOWERED TEXT (NULL NAMES SORT AS "")
+    sort_value = result_row[sort_key_name]
+    if sort_key_name in ("full_name", "room_name"):
+        sort_value = (sort_value or "").lower()
+    return sort_value, result_row["reservation_id"]
+
+
+def read_all_pages(sort_key_name, is_descending, page_row_limit, filter_sql="", filter_parameters=()):
+    # -> [[reservation_id, ...] PER PAGE], has_more OF EVERY PAGE
+    page_id_list, has_more_list = [], []
+    after_cursor = None
+    while True:
+        page_query_string, page_parameters = build_page_query(page_select_sql, filter_sql, filter_parameters,
+                                                              sort_key_name, is_descending, after_cursor,
+                                                              page_row_limit)
+        page_row_list, has_more_rows = split_page(
+            database_manager.fetch_all(page_query_string, page_parameters, use_cache=False), page_row_limit)
+        page_id_list.append([page_row["reservation_id"] for page_row in page_row_list])
+        has_more_list.append(has_more_rows)
+        if not has_more_rows:
+            return page_id_list, has_more_list
+        assert len(page_id_list) < 100, "pagination never reached the last page"
+        after_cursor = cursor_value(page_row_list[-1], sort_key_name)
+
+
+@pytest.fixture
+def seeded_reservations(add_reservation):
+    # TIES ON EVERY SORT COLUMN, A NULL NAME, AND NAMES THAT ONLY DIFFER IN CASE
+    reservation_spec_list = [
+        (datetime(2030, 1, 2, 9), "bea", 1),
+        (datetime(2030, 1, 1, 9), "Abe", 2),
+        (datetime(2030, 1, 2, 9), "abe", 1),
+        (datetime(2030, 1, 3, 9), None, 2),
+        (datetime(2030, 1, 1, 9), "Cid", 1),
+        (datetime(2030, 1, 2, 9), "bea", 2),
+        (datetime(2030, 1, 3, 9), "Bea", 1),
+        (datetime(2030, 1, 1, 9), None, 1),
+        (datetime(2030, 1, 4, 9), "cid", 2),
+    ]
+    expected_row_list = []
+    for start_time, full_name, room_id in reservation_spec_list:
+        reservation_id = add_reservation(start_time, full_name=full_name, room_id=room_id)
+        expected_row_list.append({"reservation_id": reservation_id, "start_time": start_time,
+                                  "full_name": (full_name or "").lower(),
+                                  "room_name": "room a" if room_id == 1 else "room b"})
+    return expected_row_list
+
+
+def expected_order(expected_row_list, sort_key_name, is_descending):
+    return [expected_row["reservation_id"] for expected_row in sorted(
+        expected_row_list, key=lambda expected_row: (expected_row[sort_key_name], expected_row["reservation_id"]),
+        reverse=is_descending)]
+
+
+@pytest.mark.parametrize("sort_key_name", ["reservation_id", "start_time", "full_name", "room_name"])
+@pytest.mark.parametrize("is_descending", [False, True])
+@pytest.mark.parametrize("page_row_limit", [1, 2, 3, 4, 9, 50])
+def test_pages_add_up_to_the_full_order(database, seeded_reservations, sort_key_name, is_descending,
+                                        page_row_limit):
+    page_id_list, has_more_list = read_all_pages(sort_key_name, is_descending, page_row_limit)
+
+    assert [reservation_id for page_ids in page_id_list for reservation_id in page_ids] == expected_order(
+        seeded_reservations, sort_key_name, is_descending)
+    # EVERY PAGE BUT THE LAST IS FULL AND SAYS THERE IS MORE, ALSO WHEN THE ROW COUNT IS A MULTIPLE OF THE PAGE SIZE
+    assert has_more_list == [True] * (len(page_id_list) - 1) + [False]
+    assert all(len(page_ids) == page_row_limit for page_ids in page_id_list[:-1])
+    assert len(page_id_list) == max(1, -(-len(seeded_reservations) // page_row_limit))
+
+
+def test_filters_apply_to_every_page(database, seeded_reservations):
+    page_id_list, _ = read_all_pages("full_name", False, 2, " AND r.room_id = %s", (2,))
+
+    room_b_row_list = [expected_row for expected_row in seeded_reservations
+                       if expected_row["room_name"] == "room b"]
+    assert [reservation_id for page_ids in page_id_list for reservation_id in page_ids] == expected_order(
+        room_b_row_list, "full_name", False)
+
+
+def test_empty_result_is_one_empty_last_page(database):
+    assert read_all_pages("start_time", False, 3) == ([[]], [False])
+
+
+def test_query_asks_for_one_row_more_than_a_page():
+    page_query_string, page_parameters = build_page_query(page_select_sql, "", (), "full_name", True,
+                                                          ("abe", 7), 25)
+
+    assert page_query_string.endswith("ORDER BY LOWER(COALESCE(r.full_name, '')) DESC, r.reservation_id DESC LIMIT %s")
+    assert page_parameters == ("abe", "abe", 7, 26)
+
+
+def test_split_page_boundaries():
+    assert split_page([], 3) == ([], False)
+    assert split_page([1, 2, 3], 3) == ([1, 2, 3], False)
+    assert split_page([1, 2, 3, 4], 3) == ([1, 2, 3], True)
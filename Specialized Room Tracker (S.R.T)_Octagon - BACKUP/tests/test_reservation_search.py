@@ -0,0 +1,120 @@
+from datetime import datetime
+
+import pytest
+
+import database_manager
+from reservation_search import (build_mysql_match_expression, build_sqlite_match_expression, search_reservations,
+                                split_search_words)
+
+
+@pytest.fixture
+def add_described_reservation(database, add_reservation):
+    def insert_described_reservation(activity_description, full_name="Test Student", room_id=1,
+                                     current_status="Pending", user_id=1):
+        reservation_id = add_reservation(datetime(2030, 1, 1, 9, 0), current_status, full_name, room_id, user_id)
+        database_manager.execute_query("UPDATE reservations SET activity_description = %s WHERE reservation_id = %s",
+                                       (activity_description, reservation_id))
+        return reservation_id
+    return insert_described_reservation
+
+
+def found_ids(search_text, **search_options):
+    return [result_row["reservation_id"] for result_row in search_reservations(search_text, **search_options)]
+
+
+def test_search_text_is_reduced_to_plain_words():
+    assert split_search_words('Chem-Lab "NEAR(x" OR*') == ["chem", "lab", "near", "x", "or"]
+    assert len(split_search_words("word " * 20)) == 8
+    assert build_sqlite_match_expression(["chem", "lab"]) == '"chem"* OR "lab"*'
+    assert build_mysql_match_expression(["chem", "lab"]) == "chem* lab*"
+
+
+def test_blank_or_punctuation_only_search_finds_nothing(database):
+    assert search_reservations("") == []
+    assert search_reservations(" -*\"() ") == []
+
+
+def test_words_match_as_prefixes(add_described_reservation):
+    chemistry_id = add_described_reservation("Chemistry practical")
+    add_described_reservation("Physics review")
+
+    assert found_ids("chem") == [chemistry_id]
+    assert found_ids("CHEMISTRY") == [chemistry_id]
+
+
+def test_rows_matching_more_words_rank_first(add_described_reservation):
+    one_word_id = add_described_reservation("Chemistry review")
+    two_word_id = add_described_reservation("Chemistry lab practical")
+    add_described_reservation("Thesis defense")
+
+    search_result_list = search_reservations("chemistry lab")
+
+    assert [result_row["reservation_id"] for result_row in search_result_list] == [two_word_id, one_word_id]
+    assert search_result_list[0]["search_rank"] > search_result_list[1]["search_rank"]
+    assert search_result_list[0]["room_name"] == "Room A"
+
+
+def test_search_covers_names_and_room_names(add_described_reservation):
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Physics Lab", 2))
+    named_id = add_described_reservation("Review", full_name="Maria Santos")
+    physics_lab_id = add_described_reservation("Review", room_id=2)
+
+    assert found_ids("santos") == [named_id]
+    assert found_ids("physics") == [physics_lab_id]
+
+
+def test_operator_characters_cannot_break_the_query(add_described_reservation):
+    chemistry_id = add_described_reservation("Chemistry practical")
+
+    assert found_ids('chem" OR NEAR(') == [chemistry_id]
+    assert found_ids("chem*") == [chemistry_id]
+
+
+def test_user_status_and_limit_filters(add_described_reservation):
+    database_manager.execute_query(
+        "INSERT INTO users (username, password_hash, email, role) VALUES (%s, %s, %s, %s)",
+        ("Other Student", "x", "other@example.test", "student"))
+    own_pending_id = add_described_reservation("Chemistry practical")
+    own_approved_id = add_described_reservation("Chemistry practical", current_status="Approved")
+    other_user_id = add_described_reservation("Chemistry practical", user_id=2)
+
+    assert found_ids("chemistry", user_id=1) == [own_pending_id, own_approved_id]
+    assert found_ids("chemistry", status_filter="Approved") == [own_approved_id]
+    assert found_ids("chemistry", status_filter="All") == [own_pending_id, own_approved_id, other_user_id]
+    assert found_ids("chemistry", result_limit=1) == [own_pending_id]
+
+
+def test_index_follows_inserts_updates_and_deletes(add_described_reservation):
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Physics Lab", 2))
+    reservation_id = add_described_reservation("Chemistry practical")
+    assert found_ids("chemistry") == [reservation_id]
+
+    database_manager.execute_query("UPDATE reservations SET activity_description = %s WHERE reservation_id = %s",
+                                   ("Robotics club", reservation_id))
+    assert found_ids("chemistry") == []
+    assert found_ids("robotics") == [reservation_id]
+
+    # A STATUS CHANGE DOESN'T TOUCH THE INDEXED COLUMNS, THE ROW STAYS FINDABLE
+    database_manager.execute_query("UPDATE reservations SET current_status = %s WHERE reservation_id = %s",
+                                   ("Approved", reservation_id))
+    assert found_ids("robotics") == [reservation_id]
+
+    database_manager.execute_query("UPDATE reservations SET room_id = %s WHERE reservation_id = %s",
+                                   (2, reservation_id))
+    assert found_ids("physics") == [reservation_id]
+
+    database_manager.execute_query("DELETE FROM reservations WHERE reservation_id = %s", (reservation_id,))
+    assert found_ids("robotics") == []
+
+
+def test_renaming_a_room_reindexes_its_reservations(add_described_reservation):
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Chemistry Hall", 1))
+    renamed_room_id = add_described_reservation("Review")
+    other_room_id = add_described_reservation("Review", room_id=2)
+    assert found_ids("hall") == [renamed_room_id]
+
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Science Annex", 1))
+
+    assert found_ids("annex") == [renamed_room_id]
+    assert found_ids("hall") == []
+    assert found_ids("review") == [renamed_room_id, other_room_id]
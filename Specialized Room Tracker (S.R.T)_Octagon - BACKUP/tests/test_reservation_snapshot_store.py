@@ -0,0 +1,123 @@
+from datetime import datetime
+
+import pytest
+
+import database_manager
+import reservation_snapshot_store
+from reservation_snapshot_store import ReservationSnapshotStore, fetch_with_version_check, read_user_version
+
+
+class CountingLoader:
+    def __init__(self):
+        self.load_count = 0
+
+    def __call__(self):
+        self.load_count += 1
+        return {"rows": ["load " + str(self.load_count)]}
+
+
+@pytest.fixture
+def snapshot_store(monkeypatch):
+    fresh_snapshot_store = ReservationSnapshotStore()
+    monkeypatch.setattr(reservation_snapshot_store, "shared_snapshot_store", fresh_snapshot_store)
+    return fresh_snapshot_store
+
+
+@pytest.fixture
+def second_user(database):
+    database_manager.execute_query(
+        "INSERT INTO users (username, password_hash, email, role) VALUES (%s, %s, %s, %s)",
+        ("Other Student", "x", "other@example.test", "student"))
+    return 2
+
+
+def test_version_is_zero_until_something_of_theirs_changes(database):
+    assert read_user_version(1) == 0
+    assert read_user_version(999) == 0
+
+
+def test_every_reservation_change_bumps_the_owners_version(database, add_reservation, second_user):
+    # ONLY "IT MOVED" MATTERS: TWO WRITES IN THE SAME MILLISECOND CAN BUMP TWICE (AN EXTRA RELOAD, NEVER A MISSED ONE)
+    reservation_id = add_reservation(datetime(2030, 1, 1, 9, 0))
+    inserted_version = read_user_version(1)
+    assert inserted_version >= 1
+
+    database_manager.execute_query("UPDATE reservations SET current_status = %s WHERE reservation_id = %s",
+                                   ("Approved", reservation_id))
+    approved_version = read_user_version(1)
+    assert approved_version > inserted_version
+
+    # HANDED TO ANOTHER STUDENT: BOTH DASHBOARDS CHANGE
+    database_manager.execute_query("UPDATE reservations SET user_id = %s WHERE reservation_id = %s",
+                                   (second_user, reservation_id))
+    handed_over_version = read_user_version(1)
+    second_user_version = read_user_version(second_user)
+    assert handed_over_version > approved_version
+    assert second_user_version >= 1
+
+    database_manager.execute_query("DELETE FROM reservations WHERE reservation_id = %s", (reservation_id,))
+    assert read_user_version(1) == handed_over_version
+    assert read_user_version(second_user) > second_user_version
+
+
+def test_only_renaming_a_booked_room_bumps_the_version(database, add_reservation, second_user):
+    add_reservation(datetime(2030, 1, 1, 9, 0), room_id=1)
+    add_reservation(datetime(2030, 1, 1, 9, 0), room_id=2, user_id=second_user)
+
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Physics Lab", 1))
+    database_manager.execute_query("UPDATE rooms SET capacity = %s WHERE room_id = %s", (10, 2))
+    database_manager.execute_query("UPDATE rooms SET room_name = %s WHERE room_id = %s", ("Room B", 2))
+
+    assert (read_user_version(1), read_user_version(second_user)) == (2, 1)
+
+
+def test_unchanged_version_serves_the_stored_snapshot(database, add_reservation, snapshot_store):
+    add_reservation(datetime(2030, 1, 1, 9, 0))
+    snapshot_loader = CountingLoader()
+
+    first_result, first_version = fetch_with_version_check(1, "upcoming", snapshot_loader)
+    second_result, second_version = fetch_with_version_check(1, "upcoming", snapshot_loader)
+
+    assert snapshot_loader.load_count == 1
+    assert second_result is first_result
+    assert first_version == second_version == 1
+    assert snapshot_store.get_statistics()["hits"] == 1
+
+
+def test_a_change_makes_the_next_fetch_reload(database, add_reservation, snapshot_store):
+    reservation_id = add_reservation(datetime(2030, 1, 1, 9, 0))
+    snapshot_loader = CountingLoader()
+    _, loaded_version = fetch_with_version_check(1, "upcoming", snapshot_loader)
+
+    database_manager.execute_query("UPDATE reservations SET current_status = %s WHERE reservation_id = %s",
+                                   ("Approved", reservation_id))
+    reloaded_result, reloaded_version = fetch_with_version_check(1, "upcoming", snapshot_loader)
+
+    assert reloaded_result == {"rows": ["load 2"]}
+    assert reloaded_version > loaded_version
+    store_statistics = snapshot_store.get_statistics()
+    assert (store_statistics["stale"], store_statistics["misses"], store_statistics["entries"]) == (1, 1, 1)
+
+
+def test_snapshots_are_kept_per_user_and_key(database, snapshot_store, second_user):
+    snapshot_loader = CountingLoader()
+
+    for _ in range(2):
+        fetch_with_version_check(1, "upcoming", snapshot_loader)
+        fetch_with_version_check(1, "past", snapshot_loader)
+        fetch_with_version_check(second_user, "upcoming", snapshot_loader)
+
+    assert snapshot_loader.load_count == 3
+
+
+def test_least_recently_used_snapshot_is_evicted():
+    snapshot_store = ReservationSnapshotStore(maximum_entries=2)
+    snapshot_store.put((1, "a"), 1, "first")
+    snapshot_store.put((1, "b"), 1, "second")
+    assert snapshot_store.get((1, "a"), 1) == "first"
+
+    snapshot_store.put((1, "c"), 1, "third")
+
+    assert snapshot_store.get((1, "b"), 1) is None
+    assert snapshot_store.get((1, "a"), 1) == "first"
+    assert snapshot_store.get_statistics()["evictions"] == 1
@@ -0,0 +1,72 @@
+import sqlite3
+
+import pytest
+
+import database_manager
+import schema_migrations
+
+latest_version = max(migration["version"] for migration in schema_migrations.schema_migration_list)
+
+
+class MysqlStyleError(Exception):
+    def __init__(self, errno, message):
+        super().__init__(message)
+        self.errno = errno
+
+
+@pytest.fixture
+def empty_database(tmp_path, capsys):
+    database_manager.configure_backend("sqlite", str(tmp_path / "empty.sqlite3"))
+    yield database_manager
+    database_manager.close_pool()
+    capsys.readouterr()
+
+
+def table_names():
+    return {table_row["name"] for table_row in database_manager.fetch_all(
+        "SELECT name FROM sqlite_master WHERE type = 'table'", use_cache=False)}
+
+
+def test_every_migration_runs_once(empty_database):
+    assert schema_migrations.get_current_schema_version() == 0
+
+    assert schema_migrations.run_migrations() == list(range(1, latest_version + 1))
+    assert schema_migrations.run_migrations() == []
+    assert schema_migrations.get_current_schema_version() == latest_version
+    assert {"users", "rooms", "reservations", "notification_outbox", "reservation_change_log"} <= table_names()
+
+
+def test_target_version_stops_early_and_the_rest_follow_later(empty_database):
+    assert schema_migrations.run_migrations(target_version=3) == [1, 2, 3]
+    assert schema_migrations.get_current_schema_version() == 3
+
+    assert schema_migrations.run_migrations() == list(range(4, latest_version + 1))
+
+
+def test_rerunning_over_an_existing_schema_is_safe(empty_database):
+    schema_migrations.run_migrations()
+    # SCHEMA BUILT BY AN EARLIER RUN THAT NEVER GOT TO RECORD ITS VERSIONS
+    database_manager.execute_query("DELETE FROM schema_migrations")
+
+    assert schema_migrations.run_migrations() == list(range(1, latest_version + 1))
+    assert schema_migrations.get_current_schema_version() == latest_version
+
+
+@pytest.mark.parametrize("database_error, is_already_applied", [
+    (MysqlStyleError(1060, "Duplicate column name 'updated_at'"), True),
+    (MysqlStyleError(1061, "Duplicate key name 'idx_reservations_start'"), True),
+    (MysqlStyleError(1146, "Table 'srt.rooms' doesn't exist"), False),
+    (sqlite3.OperationalError("duplicate column name: updated_at"), True),
+    (sqlite3.OperationalError("index idx_reservations_start already exists"), True),
+    (sqlite3.OperationalError("no such table: rooms"), False),
+])
+def test_already_applied_errors_are_recognised(database_error, is_already_applied):
+    assert schema_migrations.is_already_applied_error(database_error) is is_already_applied
+
+
+def test_other_statement_errors_stop_the_run(empty_database):
+    with database_manager.pooled_connection() as database_connection_link:
+        database_cursor_tool = database_connection_link.cursor()
+        with pytest.raises(sqlite3.OperationalError):
+            schema_migrations.run_statement(database_cursor_tool, "ALTER TABLE missing_table ADD COLUMN x INT")
+        database_cursor_tool.close()
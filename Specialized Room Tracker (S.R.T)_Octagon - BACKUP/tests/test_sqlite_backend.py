@@ -0,0 +1,80 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+import database_manager
+from database_backends import SQLiteBackend, translate_placeholders
+
+
+@pytest.mark.parametrize("sql_query_string, expected_query_string", [
+    ("SELECT * FROM rooms WHERE room_id = %s AND capacity > %s", "SELECT * FROM rooms WHERE room_id = ? AND capacity > ?"),
+    ("SELECT * FROM rooms WHERE room_name LIKE %s", "SELECT * FROM rooms WHERE room_name LIKE ?"),
+    ("SELECT * FROM rooms WHERE room_name LIKE 'Lab %s%'", "SELECT * FROM rooms WHERE room_name LIKE 'Lab %s%'"),
+    ("SELECT capacity %% 2 FROM rooms", "SELECT capacity % 2 FROM rooms"),
+    ('SELECT "odd%sname", `tick%s` FROM rooms WHERE room_id = %s', 'SELECT "odd%sname", `tick%s` FROM rooms WHERE room_id = ?'),
+    ("SELECT 100%", "SELECT 100%"),
+])
+def test_placeholders_are_translated_outside_quotes_only(sql_query_string, expected_query_string):
+    assert translate_placeholders(sql_query_string) == expected_query_string
+
+
+def test_translation_is_memoized(tmp_path):
+    sqlite_backend = SQLiteBackend(str(tmp_path / "memo.sqlite3"))
+
+    first_translation = sqlite_backend.translate_query("SELECT %s")
+
+    assert first_translation == "SELECT ?"
+    assert sqlite_backend.translate_query("SELECT %s") is first_translation
+
+
+def test_datetimes_come_back_as_datetimes_to_the_second(database, add_reservation):
+    reservation_id = add_reservation(datetime(2030, 1, 2, 9, 30, 15, 123456))
+
+    reservation_rows = database_manager.fetch_all(
+        "SELECT start_time FROM reservations WHERE reservation_id = %s", (reservation_id,))
+
+    assert reservation_rows == [{"start_time": datetime(2030, 1, 2, 9, 30, 15)}]
+
+
+def test_connections_use_wal_and_enforce_foreign_keys(database):
+    with database_manager.pooled_connection() as database_connection_link:
+        database_cursor_tool = database_connection_link.cursor()
+        database_cursor_tool.execute("PRAGMA journal_mode")
+        assert database_cursor_tool.fetchone() == ("wal",)
+        database_cursor_tool.close()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        with database_manager.transaction() as unit_of_work:
+            unit_of_work.execute("INSERT INTO reservations (user_id, room_id, full_name, course_section, "
+                                 "reservation_type, start_time, end_time, activity_description, current_status) "
+                                 "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                                 (1, 999, "Test Student", "BSIT 1-1", "Academic", datetime(2030, 1, 1),
+                                  datetime(2030, 1, 1), "Testing", "Pending"))
+
+
+def test_cursor_shapes_match_mysql_connector(database):
+    with database_manager.pooled_connection() as database_connection_link:
+        tuple_cursor = database_connection_link.cursor()
+        tuple_cursor.execute("SELECT room_id, room_name FROM rooms WHERE room_id = %s", (1,))
+        assert tuple_cursor.fetchall() == [(1, "Room A")]
+        dictionary_cursor = database_connection_link.cursor(dictionary=True, buffered=False)
+        dictionary_cursor.execute("SELECT room_id, room_name FROM rooms ORDER BY room_id")
+        assert dictionary_cursor.fetchmany(1) == [{"room_id": 1, "room_name": "Room A"}]
+        assert dictionary_cursor.fetchone() == {"room_id": 2, "room_name": "Room B"}
+        assert [column_description[0] for column_description in dictionary_cursor.description] == [
+            "room_id", "room_name"]
+        tuple_cursor.close()
+        dictionary_cursor.close()
+
+
+def test_configure_backend_switches_files_and_drops_the_old_cache(database, tmp_path):
+    assert database_manager.get_backend_name() == "sqlite"
+    assert database_manager.database_error_types == (sqlite3.Error,)
+    assert len(database_manager.fetch_all("SELECT room_id FROM rooms")) == 2
+
+    database_manager.configure_backend("sqlite", str(tmp_path / "second.sqlite3"))
+    database_manager.execute_query("CREATE TABLE rooms (room_id INTEGER PRIMARY KEY)")
+
+    assert database_manager.fetch_all("SELECT room_id FROM rooms") == []
+    assert database_manager.get_pool_statistics()["connections_created"] == 1
@@ -0,0 +1,92 @@
+import random
+
+from timing_wheel import HierarchicalTimingWheel
+
+start_time_seconds = 1_000_000
+
+
+def test_timers_fire_in_order_across_levels():
+    timer_wheel = HierarchicalTimingWheel(start_time_seconds)
+    # SECONDS, MINUTES, HOURS AND DAYS AHEAD, SCHEDULED OUT OF ORDER
+    for delay_seconds in (90_000, 5, 3_700, 59, 61, 86_400 * 3, 7_200, 1):
+        timer_wheel.schedule(delay_seconds, start_time_seconds + delay_seconds, delay_seconds)
+
+    assert timer_wheel.advance(start_time_seconds + 60) == [1, 5, 59]
+    assert timer_wheel.advance(start_time_seconds + 7_200) == [61, 3_700, 7_200]
+    assert timer_wheel.advance(start_time_seconds + 86_400 * 5) == [90_000, 86_400 * 3]
+    assert len(timer_wheel) == 0
+
+
+def test_timer_fires_at_its_time_not_before():
+    timer_wheel = HierarchicalTimingWheel(start_time_seconds)
+    timer_wheel.schedule("lesson", start_time_seconds + 3_600.5, "lesson")
+
+    assert timer_wheel.advance(start_time_seconds + 3_600) == []
+    # FRACTIONAL TIMES ROUND UP TO THE NEXT TICK
+    assert timer_wheel.advance(start_time_seconds + 3_601) == ["lesson"]
+
+
+def test_cancel_and_reschedule():
+    timer_wheel = HierarchicalTimingWheel(start_time_seconds)
+    timer_wheel.schedule("a", start_time_seconds + 30, "a")
+    timer_wheel.schedule("b", start_time_seconds + 40, "b")
+    timer_wheel.schedule("a", start_time_seconds + 4_000, "a later")
+
+    assert "b" in timer_wheel and len(timer_wheel) == 2
+    assert timer_wheel.cancel("b") is True
+    assert timer_wheel.cancel("b") is False
+    assert "b" not in timer_wheel
+    assert timer_wheel.advance(start_time_seconds + 3_999) == []
+    assert timer_wheel.advance(start_time_seconds + 4_000) == ["a later"]
+
+
+def test_timer_in_the_past_fires_on_the_next_advance():
+    timer_wheel = HierarchicalTimingWheel(start_time_seconds)
+    timer_wheel.schedule("late", start_time_seconds - 500, "late")
+
+    assert len(timer_wheel) == 1
+    assert timer_wheel.advance(start_time_seconds) == ["late"]
+    assert len(timer_wheel) == 0
+
+
+def test_overflow_timers_come_back_when_they_fit():
+    # 4 x 4 x 4 TICKS = 64 TICKS OF WHEEL, ANYTHING LATER STARTS IN THE OVERFLOW
+    timer_wheel = HierarchicalTimingWheel(0, level_slot_counts=(4, 4, 4))
+    for fire_tick in (200, 70, 3, 64, 1_000):
+        timer_wheel.schedule(fire_tick, fire_tick, fire_tick)
+
+    assert timer_wheel.advance(69) == [3, 64]
+    assert timer_wheel.advance(199) == [70]
+    assert timer_wheel.advance(200) == [200]
+    assert 1_000 in timer_wheel
+    assert timer_wheel.advance(2_000) == [1_000]
+
+
+def test_matches_a_sorted_list():
+    random_generator = random.Random(20261018)
+    tick_seconds = 60
+    timer_wheel = HierarchicalTimingWheel(start_time_seconds, tick_seconds=tick_seconds)
+    fire_tick_by_key = {}
+    for timer_number in range(2_000):
+        fire_time_seconds = start_time_seconds + random_generator.randint(0, 2 * 86_400)
+        timer_wheel.schedule(timer_number, fire_time_seconds, timer_number)
+        fire_tick_by_key[timer_number] = -(-fire_time_seconds // tick_seconds)
+    for cancelled_key in random_generator.sample(sorted(fire_tick_by_key), 300):
+        timer_wheel.cancel(cancelled_key)
+        del fire_tick_by_key[cancelled_key]
+
+    current_time_seconds = start_time_seconds
+    while current_time_seconds < start_time_seconds + 2 * 86_400 + tick_seconds:
+        current_time_seconds += random_generator.randint(1, 7_200)
+        fired_key_list = timer_wheel.advance(current_time_seconds)
+        current_tick = current_time_seconds // tick_seconds
+        expected_key_list = [timer_key for timer_key, fire_tick in fire_tick_by_key.items()
+                             if fire_tick <= current_tick]
+        assert sorted(fired_key_list) == sorted(expected_key_list)
+        # WITHIN ONE advance() TIMERS COME OUT IN TICK ORDER
+        fired_tick_list = [fire_tick_by_key[timer_key] for timer_key in fired_key_list]
+        assert fired_tick_list == sorted(fired_tick_list)
+        for timer_key in fired_key_list:
+            del fire_tick_by_key[timer_key]
+
+    assert fire_tick_by_key == {} and len(timer_wheel) == 0
@@ -0,0 +1,89 @@
+import pytest
+
+import database_manager
+
+room_names_sql = "SELECT room_name FROM rooms ORDER BY room_id"
+
+
+def room_names():
+    return [room_row["room_name"] for room_row in database_manager.fetch_all(room_names_sql, use_cache=False)]
+
+
+def test_transaction_commits_everything_together(database):
+    with database_manager.transaction() as unit_of_work:
+        insert_result = unit_of_work.execute("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)", ("Room C", 30))
+        update_result = unit_of_work.execute("UPDATE rooms SET capacity = %s WHERE room_name = %s", (35, "Room A"))
+
+    assert insert_result == {"affected_rows": 1, "last_insert_id": 3}
+    assert update_result["affected_rows"] == 1
+    assert unit_of_work.total_affected_rows == 2
+    assert room_names() == ["Room A", "Room B", "Room C"]
+
+
+def test_error_rolls_back_every_statement(database):
+    with pytest.raises(RuntimeError):
+        with database_manager.transaction() as unit_of_work:
+            unit_of_work.execute("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)", ("Room C", 30))
+            database_manager.execute_query("DELETE FROM rooms WHERE room_name = %s", ("Room A",))
+            raise RuntimeError("second half failed")
+
+    assert room_names() == ["Room A", "Room B"]
+    assert not database_manager.in_transaction()
+
+
+def test_nested_transaction_joins_the_outer_one(database):
+    with pytest.raises(RuntimeError):
+        with database_manager.transaction() as outer_unit_of_work:
+            with database_manager.transaction() as inner_unit_of_work:
+                assert inner_unit_of_work is outer_unit_of_work
+                inner_unit_of_work.execute("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)", ("Room C", 30))
+            # THE INNER BLOCK ENDED WITHOUT COMMITTING, THE OUTER ONE STILL DECIDES
+            raise RuntimeError("outer failed")
+
+    assert room_names() == ["Room A", "Room B"]
+
+
+def test_reads_inside_a_transaction_see_its_own_writes_and_skip_the_cache(database):
+    assert room_names() == ["Room A", "Room B"]
+    database_manager.fetch_all(room_names_sql)
+
+    with database_manager.transaction() as unit_of_work:
+        unit_of_work.execute("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)", ("Room C", 30))
+        cached_lookups_before = database_manager.get_cache_statistics()["hits"]
+        assert len(database_manager.fetch_all(room_names_sql)) == 3
+        assert database_manager.get_cache_statistics()["hits"] == cached_lookups_before
+
+    # THE COMMIT DROPPED THE CACHED (TWO-ROOM) RESULT
+    assert len(database_manager.fetch_all(room_names_sql)) == 3
+
+
+def test_execute_many_runs_every_parameter_set(database):
+    write_result = database_manager.execute_many("INSERT INTO rooms (room_name, capacity) VALUES (%s, %s)",
+                                                 [("Room C", 10), ("Room D", 20), ("Room E", 30)])
+
+    assert write_result["affected_rows"] == 3
+    assert room_names() == ["Room A", "Room B", "Room C", "Room D", "Room E"]
+    assert database_manager.execute_many("DELETE FROM rooms WHERE room_name = %s", []) == {
+        "affected_rows": 0, "last_insert_id": None}
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1, 2, 5])
+def test_bulk_insert_reports_the_first_id_whatever_the_chunking(database, chunk_size):
+    new_room_list = [("Room " + room_letter, 10) for room_letter in "CDEFG"]
+
+    write_result = database_manager.bulk_insert("rooms", ["room_name", "capacity"], new_room_list, chunk_size)
+
+    assert write_result == {"affected_rows": 5, "last_insert_id": 3}
+    assert room_names() == ["Room A", "Room B"] + [room_name for room_name, _ in new_room_list]
+
+
+def test_only_transactions_that_wrote_pin_reads_to_the_primary(database):
+    write_count_before = database_manager.get_routing_statistics()["writes"]
+
+    with database_manager.transaction() as unit_of_work:
+        unit_of_work.fetch_all(room_names_sql)
+    assert database_manager.get_routing_statistics()["writes"] == write_count_before
+
+    with database_manager.transaction() as unit_of_work:
+        unit_of_work.execute("UPDATE rooms SET capacity = %s", (50,))
+    assert database_manager.get_routing_statistics()["writes"] == write_count_before + 1
@@ -70,12 +70,12 @@ class ThemeHandler:
             }}
             
             /* Tables */
-            QTableWidget {{
+            QTableView {{
                 background-color: {theme['table_bg']};
                 gridline-color: {theme['border']};
                 border: 1px solid {theme['border']};
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 color: {theme['table_item_text']};
                 padding: 5px;
             }}
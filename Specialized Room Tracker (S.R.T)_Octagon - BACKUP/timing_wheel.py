@@ -0,0 +1,113 @@
+# BACKEND CODE FOR A HIERARCHICAL TIMING WHEEL (USED BY reminder_scheduler)
+# TIMERS LIVE IN SLOTS ON FOUR WHEELS, LIKE THE HANDS OF A CLOCK:
+#     LEVEL 0: 60 SLOTS OF 1 TICK     (THE NEXT MINUTE, TICK = 1 SECOND BY DEFAULT)
+#     LEVEL 1: 60 SLOTS OF 60 TICKS   (THE NEXT HOUR)
+#     LEVEL 2: 24 SLOTS OF 1 HOUR     (THE NEXT DAY)
+#     LEVEL 3: 400 SLOTS OF 1 DAY     (THE NEXT ~13 MONTHS, ANYTHING LATER WAITS IN AN OVERFLOW LIST)
+# schedule() AND cancel() ARE O(1) (ONE DICTIONARY INSERT / DELETE), HOWEVER MANY TIMERS EXIST. WHEN A
+# COARSE SLOT COMES DUE ITS TIMERS MOVE DOWN ONE LEVEL ("CASCADE"), SO EACH TIMER IS TOUCHED AT MOST
+# ONCE PER LEVEL BEFORE IT FIRES. advance() NEVER SCANS THE TIMERS THAT AREN'T DUE.
+#
+# USAGE:
+#     timer_wheel = HierarchicalTimingWheel(time.time())
+#     timer_wheel.schedule("some key", fire_time_seconds, payload)
+#     timer_wheel.cancel("some key")
+#     for payload in timer_wheel.advance(time.time()): ...
+
+import math
+
+default_level_slot_counts = (60, 60, 24, 400)
+
+
+class HierarchicalTimingWheel:
+    def __init__(self, start_time_seconds, tick_seconds=1, level_slot_counts=default_level_slot_counts):
+        self.tick_seconds = tick_seconds
+        self.level_slot_counts = level_slot_counts
+        # TICKS COVERED BY ONE SLOT OF EACH LEVEL: 1, 60, 3600, 86400
+        self.level_slot_ticks = []
+        slot_tick_count = 1
+        for slot_count in level_slot_counts:
+            self.level_slot_ticks.append(slot_tick_count)
+            slot_tick_count *= slot_count
+        self.current_tick = int(start_time_seconds // tick_seconds)
+        # EACH SLOT: {timer key: (expiry tick, payload)}
+        self.level_slot_list = [[{} for _ in range(slot_count)] for slot_count in level_slot_counts]
+        self.overflow_timer_dictionary = {}
+        # DUE BUT NOT YET RETURNED BY advance() (SCHEDULED IN THE PAST, OR CASCADED STRAIGHT TO "NOW")
+        self.due_timer_dictionary = {}
+        # TIMER KEY -> THE DICTIONARY (SLOT / OVERFLOW / DUE) HOLDING IT, SO cancel() NEVER SEARCHES
+        self.timer_location_dictionary = {}
+
+    def __len__(self):
+        return len(self.timer_location_dictionary)
+
+    def __contains__(self, timer_key):
+        return timer_key in self.timer_location_dictionary
+
+    def schedule(self, timer_key, fire_time_seconds, payload=None):
+        # RESCHEDULING AN EXISTING KEY MOVES IT
+        self.cancel(timer_key)
+        self.place_timer(timer_key, math.ceil(fire_time_seconds / self.tick_seconds), payload)
+
+    def cancel(self, timer_key):
+        # -> True IF THE TIMER EXISTED
+        timer_location = self.timer_location_dictionary.pop(timer_key, None)
+        if timer_location is None:
+            return False
+        del timer_location[timer_key]
+        return True
+
+    def place_timer(self, timer_key, expiry_tick, payload):
+        timer_location = self.overflow_timer_dictionary
+        for level_index, slot_count in enumerate(self.level_slot_counts):
+            slot_ticks = self.level_slot_ticks[level_index]
+            bucket_distance = expiry_tick // slot_ticks - self.current_tick // slot_ticks
+            if bucket_distance < slot_count:
+                if bucket_distance <= 0:
+                    # ONLY POSSIBLE ON LEVEL 0: ALREADY DUE
+                    timer_location = self.due_timer_dictionary
+                else:
+                    timer_location = self.level_slot_list[level_index][(expiry_tick // slot_ticks) % slot_count]
+                break
+        timer_location[timer_key] = (expiry_tick, payload)
+        self.timer_location_dictionary[timer_key] = timer_location
+
+    def cascade(self, timer_dictionary):
+        # RE-PLACE EVERY TIMER OF A SLOT THAT JUST CAME DUE, ON A FINER LEVEL
+        moving_timer_list = list(timer_dictionary.items())
+        timer_dictionary.clear()
+        for timer_key, (expiry_tick, payload) in moving_timer_list:
+            self.place_timer(timer_key, expiry_tick, payload)
+
+    def advance(self, current_time_seconds):
+        # MOVE THE WHEEL UP TO current_time_seconds -> PAYLOADS OF EVERY TIMER THAT FIRED, IN FIRING ORDER
+        target_tick = int(current_time_seconds // self.tick_seconds)
+        fired_payload_list = self.take_due_timers()
+        top_level_index = len(self.level_slot_counts) - 1
+        while self.current_tick < target_tick:
+            self.current_tick += 1
+            # COARSEST FIRST, SO A TIMER CAN CASCADE SEVERAL LEVELS IN ONE TICK
+            for level_index in range(top_level_index, 0, -1):
+                slot_ticks = self.level_slot_ticks[level_index]
+                if self.current_tick % slot_ticks != 0:
+                    continue
+                if level_index == top_level_index and self.overflow_timer_dictionary:
+                    # A NEW DAY ON THE TOP WHEEL: SOME OVERFLOW TIMERS NOW FIT
+                    self.cascade(self.overflow_timer_dictionary)
+                slot_count = self.level_slot_counts[level_index]
+                self.cascade(self.level_slot_list[level_index][(self.current_tick // slot_ticks) % slot_count])
+            fired_payload_list.extend(self.take_due_timers())
+            level_zero_slot = self.level_slot_list[0][self.current_tick % self.level_slot_counts[0]]
+            for timer_key, (expiry_tick, payload) in level_zero_slot.items():
+                del self.timer_location_dictionary[timer_key]
+                fired_payload_list.append(payload)
+            level_zero_slot.clear()
+        return fired_payload_list
+
+    def take_due_timers(self):
+        due_payload_list = []
+        for timer_key, (expiry_tick, payload) in self.due_timer_dictionary.items():
+            del self.timer_location_dictionary[timer_key]
+            due_payload_list.append(payload)
+        self.due_timer_dictionary.clear()
+        return due_payload_list